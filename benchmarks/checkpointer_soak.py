@@ -0,0 +1,89 @@
+"""
+Soak test of the checkpointer memory footprint.
+
+Simulates a long running server: every thread runs a few conversation turns
+through a graph with the agent's state (validation JSON, tool call, tool
+result and answer per turn) and is never deleted. The process RSS is sampled
+as threads accumulate; with the bounded checkpointer it must stay flat once
+the memory budget is reached, with `memory` (LangGraph's MemorySaver) it grows
+linearly.
+
+Run from the repository root:
+    python -m benchmarks.checkpointer_soak --threads 100000
+    python -m benchmarks.checkpointer_soak --threads 100000 --backend memory
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import resource
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import START, StateGraph
+
+from constructionagent.agent.checkpointer import BoundedMemorySaver
+from constructionagent.agent.state import MessagesState
+
+
+def rss_mb() -> float:
+    """Current resident set size in MB (peak RSS where /proc is unavailable)."""
+    try:
+        with open("/proc/self/statm") as statm:
+            return int(statm.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+async def simulated_turn(state: MessagesState):
+    """Append the messages of one answered query, as the agent graph would."""
+    turn = len(state["messages"])
+    validation = {"unrelated": False, "intents": [{
+        "tool": "query_pipe_info", "is_ambiguous": False, "ambiguous_reason": "",
+        "arguments": {"location": f"Junction J-{turn}"}, "missing_arguments": [],
+    }]}
+    return {"messages": [
+        AIMessage(content=json.dumps(validation)),
+        AIMessage(content="", tool_calls=[{"id": f"call_{turn}", "name": "query_pipe_info", "args": {"location": f"Junction J-{turn}"}}]),
+        ToolMessage(content=json.dumps({"pipe_id": "WP-1023", "diameter": "300 mm", "condition": "Good"}), tool_call_id=f"call_{turn}"),
+        AIMessage(content="The water pipe at Junction J-4 is WP-1023: 300 mm in diameter, condition: Good."),
+    ]}
+
+
+async def main(threads: int, turns: int, backend: str, max_mb: float, samples: int) -> None:
+    """Run the soak and print RSS samples."""
+    if backend == "bounded_memory":
+        checkpointer = BoundedMemorySaver(max_bytes=int(max_mb * 2**20))
+    else:
+        checkpointer = InMemorySaver()
+    builder = StateGraph(MessagesState)
+    builder.add_node("Agent", simulated_turn)
+    builder.add_edge(START, "Agent")
+    graph = builder.compile(checkpointer=checkpointer)
+
+    print(f"backend={backend} threads={threads} turns={turns}" + (f" budget={max_mb:g} MB" if backend == "bounded_memory" else ""))
+    start = time.perf_counter()
+    every = max(1, threads // samples)
+    for thread in range(1, threads + 1):
+        config = {"configurable": {"thread_id": f"thread-{thread}"}}
+        for _ in range(turns):
+            await graph.ainvoke({"messages": [HumanMessage(content=f"Pipe info at junction J-{thread}?")]}, config=config)
+        if thread % every == 0:
+            line = f"  threads={thread:>7}  rss={rss_mb():8.1f} MB  elapsed={time.perf_counter() - start:7.1f} s"
+            if isinstance(checkpointer, BoundedMemorySaver):
+                stats = checkpointer.stats()
+                line += f"  retained={stats['threads']:>6}  accounted={stats['bytes'] / 2**20:6.1f} MB  evicted={stats['lru_evictions']}"
+            print(line, flush=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=100_000, help="Number of simulated conversation threads")
+    parser.add_argument("--turns", type=int, default=2, help="Turns per thread")
+    parser.add_argument("--backend", choices=("bounded_memory", "memory"), default="bounded_memory")
+    parser.add_argument("--max-mb", type=float, default=64, help="Memory budget of the bounded checkpointer")
+    parser.add_argument("--samples", type=int, default=20, help="Number of RSS samples printed")
+    args = parser.parse_args()
+    asyncio.run(main(args.threads, args.turns, args.backend, args.max_mb, args.samples))
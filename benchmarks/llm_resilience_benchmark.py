@@ -0,0 +1,123 @@
+"""
+Benchmark of LLM call latency and errors with retries and hedging.
+
+Sends concurrent calls to a `FaultInjectingChatModel` with a slow tail and
+transient errors, through:
+- plain: the model alone
+- retry: `ResilientCaller` with retries only
+- retry+hedge: `ResilientCaller` with retries and hedged requests
+then has the model fail every call for a while, to show the circuit breaker
+failing fast instead of retrying into the outage.
+
+Run from the repository root:
+    python -m benchmarks.llm_resilience_benchmark --calls 400 --slow-rate 0.05 --error-rate 0.05
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import HumanMessage
+
+from constructionagent.agent.logger import LLMUnavailableError
+from constructionagent.agent.resilience import CircuitBreaker, ResilientCaller
+from constructionagent.utils.fake_llm import FaultInjectingChatModel
+
+NODE = "Query_Validation"
+MESSAGES = [HumanMessage(content="What is the scale of drawing D-101?")]
+
+
+def summarize(latencies: List[float], errors: int) -> Dict[str, float]:
+    """
+    Summarize latencies in milliseconds.
+
+    Args:
+        latencies (List[float]): Latencies in seconds of the successful calls
+        errors (int): Failed calls
+
+    Returns:
+        Dict[str, float]: p50, p95, p99 and max in milliseconds, and the error rate
+    """
+    ordered = sorted(latencies) or [0.0]
+    pick = lambda q: ordered[min(len(ordered) - 1, int(len(ordered) * q))] * 1000
+    return {
+        "p50_ms": pick(0.5),
+        "p95_ms": pick(0.95),
+        "p99_ms": pick(0.99),
+        "max_ms": ordered[-1] * 1000,
+        "error_rate": errors / (len(latencies) + errors),
+    }
+
+
+async def run(model: FaultInjectingChatModel, caller: Optional[ResilientCaller], calls: int, concurrency: int) -> Dict[str, float]:
+    """Send calls with bounded concurrency and summarize them."""
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies, errors = [], 0
+
+    async def one() -> None:
+        nonlocal errors
+        async with semaphore:
+            start = time.perf_counter()
+            try:
+                if caller is None:
+                    await model.ainvoke(MESSAGES)
+                else:
+                    await caller.call(NODE, lambda: model.ainvoke(MESSAGES))
+                latencies.append(time.perf_counter() - start)
+            except Exception:
+                errors += 1
+
+    await asyncio.gather(*(one() for _ in range(calls)))
+    return summarize(latencies, errors)
+
+
+async def outage(args: argparse.Namespace) -> Dict[str, Any]:
+    """Time calls during an outage, with the circuit breaker."""
+    model = FaultInjectingChatModel(latency=args.latency, seed=args.seed)
+    caller = ResilientCaller(CircuitBreaker(window=20, min_calls=10, cooldown=args.outage), hedge_nodes=[])
+    model.outage(args.outage)
+    failed_fast, slow_failures, start = 0, 0, time.perf_counter()
+    for _ in range(50):
+        try:
+            await caller.call(NODE, lambda: model.ainvoke(MESSAGES))
+        except LLMUnavailableError:
+            failed_fast += 1
+        except Exception:
+            slow_failures += 1
+    return {"failed_fast": failed_fast, "failed_after_retries": slow_failures,
+            "elapsed_s": time.perf_counter() - start, "breaker": caller.breaker.stats()["state"]}
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Run every variant and print their summaries."""
+    faults = dict(latency=args.latency, slow_rate=args.slow_rate, slow_latency=args.slow_latency, error_rate=args.error_rate)
+    variants = {
+        "plain": None,
+        "retry": ResilientCaller(hedge_nodes=[]),
+        "retry+hedge": ResilientCaller(hedge_nodes=[NODE], hedge_min_delay=args.latency),
+    }
+    print(f"{args.calls} calls, concurrency {args.concurrency}, latency {args.latency}s, "
+          f"{args.slow_rate:.0%} slow ({args.slow_latency}s), {args.error_rate:.0%} errors")
+    for label, caller in variants.items():
+        if caller is not None:
+            # Warm up the latency window the hedge delay is computed from
+            await run(FaultInjectingChatModel(latency=args.latency, seed=args.seed), caller, caller.hedge_min_samples, 1)
+            caller.counters = dict.fromkeys(caller.counters, 0)
+        summary = await run(FaultInjectingChatModel(seed=args.seed, **faults), caller, args.calls, args.concurrency)
+        extra = f"  hedges={caller.counters['hedges']} retries={caller.counters['retries']}" if caller else ""
+        print(f"  {label:12} " + "  ".join(f"{key}={value:9.3f}" for key, value in summary.items()) + extra)
+    print(f"  outage of {args.outage}s: {await outage(args)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=400, help="Calls per variant")
+    parser.add_argument("--concurrency", type=int, default=20, help="Calls in flight")
+    parser.add_argument("--latency", type=float, default=0.05, help="Usual latency in seconds")
+    parser.add_argument("--slow-rate", type=float, default=0.05, help="Share of slow calls")
+    parser.add_argument("--slow-latency", type=float, default=1.0, help="Latency of a slow call in seconds")
+    parser.add_argument("--error-rate", type=float, default=0.05, help="Share of failing calls")
+    parser.add_argument("--outage", type=float, default=10.0, help="Length of the simulated outage in seconds")
+    parser.add_argument("--seed", type=int, default=7, help="Seed of the injected faults")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,87 @@
+"""
+Benchmark of MCP tool call latency with and without session pooling.
+
+Compares the tools returned by `MultiServerMCPClient.get_tools()`, which open a
+new session (and spawn a new server process for stdio servers) on every call,
+with the pooled tools returned by `MCPLayer.fetch_tools()`. The pooled variant
+uses the configured MCP_TRANSPORT_MODE; cold start is the time for
+`fetch_tools()` to bring up the pools and list the tools.
+
+Run from the repository root:
+    python -m benchmarks.mcp_pool_benchmark --calls 20
+    MCP_TRANSPORT_MODE=in_process python -m benchmarks.mcp_pool_benchmark --calls 20
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+from langchain_mcp_adapters.client import MultiServerMCPClient
+
+from constructionagent.agent.mcp_config import MCP_CLIENT_CONFIG, MCP_TRANSPORT_MODE
+from constructionagent.agent.mcp_layer import MCPLayer
+
+TOOL_NAME = "get_scale"
+TOOL_ARGS = {"drawing": "Drawing 101"}
+
+
+def summarize(latencies: List[float]) -> Dict[str, float]:
+    """
+    Summarize latencies in milliseconds.
+
+    Args:
+        latencies (List[float]): Latencies in seconds
+
+    Returns:
+        Dict[str, float]: Mean, p50, p95 and max in milliseconds
+    """
+    ordered = sorted(latencies)
+    return {
+        "mean_ms": statistics.mean(ordered) * 1000,
+        "p50_ms": ordered[len(ordered) // 2] * 1000,
+        "p95_ms": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000,
+        "max_ms": ordered[-1] * 1000,
+    }
+
+
+async def time_calls(tool, calls: int) -> List[float]:
+    """Time sequential calls of a tool."""
+    latencies = []
+    for _ in range(calls):
+        start = time.perf_counter()
+        await tool.ainvoke(TOOL_ARGS)
+        latencies.append(time.perf_counter() - start)
+    return latencies
+
+
+async def main(calls: int) -> None:
+    """Run both variants and print their latency summaries."""
+    results = {}
+    if MCP_CLIENT_CONFIG["tools_server"]["transport"] != "in_process":
+        client = MultiServerMCPClient({"tools_server": MCP_CLIENT_CONFIG["tools_server"]})
+        unpooled = next(tool for tool in await client.get_tools() if tool.name == TOOL_NAME)
+        results["per-call session"] = summarize(await time_calls(unpooled, calls))
+
+    layer = MCPLayer()
+    try:
+        start = time.perf_counter()
+        pooled = next(tool for tool in await layer.fetch_tools() if tool.name == TOOL_NAME)
+        cold_start = time.perf_counter() - start
+        results[f"pooled {MCP_TRANSPORT_MODE}"] = summarize(await time_calls(pooled, calls))
+    finally:
+        await layer.close()
+
+    print(f"{TOOL_NAME} x {calls} calls (cold start {cold_start * 1000:.2f} ms)")
+    for label, summary in results.items():
+        print(f"  {label:17} " + "  ".join(f"{key}={value:9.2f}" for key, value in summary.items()))
+    if len(results) == 2:
+        before, after = results.values()
+        print(f"  speedup (p50): {before['p50_ms'] / after['p50_ms']:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--calls", type=int, default=20, help="Number of sequential tool calls per variant")
+    asyncio.run(main(parser.parse_args().calls))
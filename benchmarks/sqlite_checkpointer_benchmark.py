@@ -0,0 +1,93 @@
+"""
+Benchmark of the SQLite checkpointer.
+
+Measures, with and without append-only message deltas:
+- Write throughput: checkpoints per second while threads accumulate turns
+  (each turn is a super-step writing the agent's messages)
+- Database size after the run
+- Resume latency: time to load the latest state of a thread with a long
+  history from a freshly opened database (cold delta cache), as after a
+  restart
+
+Run from the repository root:
+    python -m benchmarks.sqlite_checkpointer_benchmark --threads 50 --turns 40 --long-turns 500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import tempfile
+import time
+from typing import Dict, Sequence
+
+from langchain_core.messages import HumanMessage
+from langgraph.graph import START, StateGraph
+
+from benchmarks.checkpointer_soak import simulated_turn
+from constructionagent.agent.sqlite_checkpointer import SqliteCheckpointSaver
+from constructionagent.agent.state import MessagesState
+
+
+def build_graph(checkpointer: SqliteCheckpointSaver):
+    """Compile a one-node graph appending an answered query per turn."""
+    builder = StateGraph(MessagesState)
+    builder.add_node("Agent", simulated_turn)
+    builder.add_edge(START, "Agent")
+    return builder.compile(checkpointer=checkpointer)
+
+
+async def run_variant(path: str, delta_channels: Sequence[str], threads: int, turns: int, long_turns: int, resumes: int) -> Dict[str, float]:
+    """Run the write and resume measurements for one storage variant."""
+    saver = SqliteCheckpointSaver(path, delta_channels=delta_channels, compaction_interval=0)
+    graph = build_graph(saver)
+    start = time.perf_counter()
+    for turn in range(turns):
+        for thread in range(threads):
+            config = {"configurable": {"thread_id": f"thread-{thread}"}}
+            await graph.ainvoke({"messages": [HumanMessage(content=f"Turn {turn}")]}, config=config)
+    elapsed = time.perf_counter() - start
+    checkpoints = saver.stats()["checkpoints"]
+
+    long_config = {"configurable": {"thread_id": "long-thread"}}
+    for turn in range(long_turns):
+        await graph.ainvoke({"messages": [HumanMessage(content=f"Turn {turn}")]}, config=long_config)
+    saver.close()
+    db_bytes = sum(os.path.getsize(path + suffix) for suffix in ("", "-wal") if os.path.exists(path + suffix))
+
+    latencies = []
+    for _ in range(resumes):
+        saver = SqliteCheckpointSaver(path, delta_channels=delta_channels, compaction_interval=0)
+        start = time.perf_counter()
+        state = await build_graph(saver).aget_state(long_config)
+        latencies.append(time.perf_counter() - start)
+        saver.close()
+    return {
+        "checkpoints_per_s": checkpoints / elapsed,
+        "db_mb": db_bytes / 2**20,
+        "resume_p50_ms": statistics.median(latencies) * 1000,
+        "resume_max_ms": max(latencies) * 1000,
+        "messages": len(state.values["messages"]),
+    }
+
+
+async def main(threads: int, turns: int, long_turns: int, resumes: int) -> None:
+    """Run both variants and print their results."""
+    print(f"{threads} threads x {turns} turns, resume of a {long_turns} turn thread")
+    with tempfile.TemporaryDirectory() as directory:
+        for label, delta_channels in (("full values", ()), ("message deltas", ("messages",))):
+            result = await run_variant(os.path.join(directory, f"{len(delta_channels)}.sqlite"), delta_channels,
+                                       threads, turns, long_turns, resumes)
+            print(f"  {label:15} " + "  ".join(
+                f"{key}={value:.2f}" if isinstance(value, float) else f"{key}={value}" for key, value in result.items()
+            ))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--threads", type=int, default=50, help="Threads written concurrently (round-robin)")
+    parser.add_argument("--turns", type=int, default=40, help="Turns per thread")
+    parser.add_argument("--long-turns", type=int, default=500, help="Turns of the thread that is resumed")
+    parser.add_argument("--resumes", type=int, default=5, help="Number of timed resumes")
+    args = parser.parse_args()
+    asyncio.run(main(args.threads, args.turns, args.long_turns, args.resumes))
@@ -0,0 +1,198 @@
+"""
+Admission control for the HTTP service.
+
+A fixed number of requests run the graph at once; the others wait in a bounded
+FIFO queue, each with a deadline. Shedding early keeps a saturated agent
+answering at its capacity instead of collapsing under a growing backlog:
+- queue full: rejected at once (OVERLOADED_QUEUE_FULL, HTTP 429)
+- expected wait (queue position x mean service time) beyond the deadline:
+  rejected at once (OVERLOADED_DEADLINE, HTTP 503)
+- still waiting at the deadline: rejected (OVERLOADED_DEADLINE, HTTP 503)
+"""
+
+import asyncio
+import math
+import os
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional
+
+from constructionagent.agent.logger import logger, OverloadedError
+
+# Admission configuration
+SERVICE_MAX_IN_FLIGHT = int(os.getenv("SERVICE_MAX_IN_FLIGHT", "16"))
+SERVICE_MAX_QUEUE = int(os.getenv("SERVICE_MAX_QUEUE", "64"))
+SERVICE_QUEUE_TIMEOUT = float(os.getenv("SERVICE_QUEUE_TIMEOUT", "10"))
+
+# Weight of the latest request in the mean service time
+SERVICE_TIME_ALPHA = 0.2
+
+
+class AdmissionController:
+    """
+    Bounded in-flight limit with a deadline-aware wait queue.
+
+    A finishing request hands its slot directly to the oldest live waiter, so
+    waiters are served in arrival order and never race new arrivals.
+    """
+
+    def __init__(self, max_in_flight: int = SERVICE_MAX_IN_FLIGHT, max_queue: int = SERVICE_MAX_QUEUE,
+                 queue_timeout: float = SERVICE_QUEUE_TIMEOUT):
+        """
+        Initialize the controller.
+
+        Args:
+            max_in_flight (int): Requests running at once
+            max_queue (int): Requests waiting for a slot
+            queue_timeout (float): Longest wait for a slot, in seconds
+        """
+        self.max_in_flight = max_in_flight
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.in_flight = 0
+        self.service_ms: Optional[float] = None
+        self._waiters: Deque[asyncio.Future] = deque()
+        self.counters = {"admitted": 0, "queued": 0, "rejected_queue_full": 0, "shed_expected_wait": 0, "shed_timeout": 0}
+
+    @property
+    def waiting(self) -> int:
+        """Requests waiting for a slot."""
+        return len(self._waiters)
+
+    def expected_wait(self, position: int) -> float:
+        """
+        Estimate the wait of a request at a queue position.
+
+        Args:
+            position (int): Requests ahead of it, plus one
+
+        Returns:
+            float: Seconds (0.0 until a request has completed)
+        """
+        if self.service_ms is None:
+            return 0.0
+        return position * self.service_ms / 1000 / self.max_in_flight
+
+    def retry_after(self) -> int:
+        """Seconds a shed client should wait before retrying (at least 1)."""
+        return max(1, math.ceil(self.expected_wait(self.waiting + 1)))
+
+    def _overloaded(self, message: str, error_code: str, counter: str) -> OverloadedError:
+        """Count a shed request and build its error."""
+        self.counters[counter] += 1
+        details = {"in_flight": self.in_flight, "waiting": self.waiting, "retry_after": self.retry_after()}
+        logger.warning(message, extra={"error_code": error_code, **details})
+        return OverloadedError(message, error_code, details)
+
+    async def acquire(self, timeout: Optional[float] = None) -> float:
+        """
+        Wait for a slot.
+
+        Args:
+            timeout (Optional[float]): Longest wait in seconds, capped at
+                queue_timeout
+
+        Returns:
+            float: Seconds spent waiting
+
+        Raises:
+            OverloadedError: If the request is shed
+        """
+        timeout = self.queue_timeout if timeout is None else min(timeout, self.queue_timeout)
+        if self.in_flight < self.max_in_flight and not self._waiters:
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            return 0.0
+        if self.waiting >= self.max_queue:
+            raise self._overloaded("Wait queue is full", "OVERLOADED_QUEUE_FULL", "rejected_queue_full")
+        if self.expected_wait(self.waiting + 1) > timeout:
+            raise self._overloaded("Expected wait exceeds the deadline", "OVERLOADED_DEADLINE", "shed_expected_wait")
+
+        start = time.perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        self.counters["queued"] += 1
+        expiry = asyncio.get_running_loop().call_later(timeout, self._expire, waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled() and waiter.exception() is None:
+                # The slot was handed over but the caller is gone; pass it on
+                self._release_slot()
+            raise
+        finally:
+            expiry.cancel()
+            if waiter in self._waiters:
+                self._waiters.remove(waiter)
+        self.counters["admitted"] += 1
+        return time.perf_counter() - start
+
+    def _expire(self, waiter: asyncio.Future) -> None:
+        """Shed a waiter whose deadline has passed."""
+        if not waiter.done():
+            self._waiters.remove(waiter)
+            waiter.set_exception(
+                self._overloaded("No slot before the deadline", "OVERLOADED_DEADLINE", "shed_timeout")
+            )
+
+    def release(self, service_ms: Optional[float] = None) -> None:
+        """
+        Free a slot, handing it to the oldest waiter if any.
+
+        Args:
+            service_ms (Optional[float]): How long the request held the slot,
+                folded into the mean service time
+        """
+        if service_ms is not None:
+            self.service_ms = service_ms if self.service_ms is None else (
+                SERVICE_TIME_ALPHA * service_ms + (1 - SERVICE_TIME_ALPHA) * self.service_ms
+            )
+        self._release_slot()
+
+    def _release_slot(self) -> None:
+        """Hand the slot to the oldest live waiter, or free it."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    @asynccontextmanager
+    async def admit(self, timeout: Optional[float] = None) -> AsyncIterator[float]:
+        """
+        Hold a slot for the duration of a block.
+
+        Args:
+            timeout (Optional[float]): Longest wait in seconds
+
+        Yields:
+            float: Seconds spent waiting
+
+        Raises:
+            OverloadedError: If the request is shed
+        """
+        waited = await self.acquire(timeout)
+        start = time.perf_counter()
+        try:
+            yield waited
+        finally:
+            self.release((time.perf_counter() - start) * 1000)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the admission state and counters.
+
+        Returns:
+            Dict[str, Any]: Limits, occupancy, mean service time and counters
+        """
+        return {
+            "max_in_flight": self.max_in_flight,
+            "max_queue": self.max_queue,
+            "queue_timeout_s": self.queue_timeout,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "mean_service_ms": self.service_ms,
+            **self.counters,
+        }
@@ -0,0 +1,314 @@
+"""
+Checkpointers for the agent graph.
+
+LangGraph's `MemorySaver` keeps every checkpoint of every thread forever, so a
+long running server grows without limit. This module provides a bounded
+in-memory replacement and the factory used by `AgentGraph` to pick a backend.
+It includes:
+- BoundedMemorySaver: per-thread TTL, a global memory budget with LRU eviction
+  of whole threads, a cap on the checkpoints retained per thread and
+  memory/eviction metrics
+- create_checkpointer: backend selection by name (the durable SQLite backend
+  lives in `sqlite_checkpointer`)
+"""
+
+import os
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from typing import Any, Dict, Optional, Sequence, Set, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import BaseCheckpointSaver, ChannelVersions, Checkpoint, CheckpointMetadata, CheckpointTuple
+from langgraph.checkpoint.memory import InMemorySaver
+
+from constructionagent.agent.logger import logger, ConfigurationError
+from constructionagent.agent.sqlite_checkpointer import SqliteCheckpointSaver
+
+# Checkpointer configuration
+CHECKPOINTER_BACKEND = os.getenv("CHECKPOINTER_BACKEND", "bounded_memory")
+CHECKPOINT_TTL_SECONDS = float(os.getenv("CHECKPOINT_TTL_SECONDS", "3600"))
+CHECKPOINT_MAX_BYTES = int(os.getenv("CHECKPOINT_MAX_BYTES", str(256 * 1024 * 1024)))
+CHECKPOINT_MAX_PER_THREAD = int(os.getenv("CHECKPOINT_MAX_PER_THREAD", "20"))
+
+CHECKPOINTER_BACKENDS = ("bounded_memory", "memory", "sqlite")
+
+
+def _typed_size(value: Tuple[str, bytes]) -> int:
+    """Size in bytes of a serialized (type, payload) pair."""
+    return len(value[0]) + len(value[1])
+
+
+class BoundedMemorySaver(InMemorySaver):
+    """
+    In-memory checkpointer with bounded memory.
+
+    Memory is accounted as the size of the serialized checkpoints, channel
+    values and pending writes of each thread. Limits are enforced on every
+    write:
+    - Threads idle for longer than `ttl_seconds` are dropped
+    - Only the `max_checkpoints_per_thread` latest checkpoints of a thread
+      (per namespace) are kept, with the channel values only they reference
+    - When the total exceeds `max_bytes`, least recently used threads are
+      evicted until it fits again
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = CHECKPOINT_TTL_SECONDS,
+        max_bytes: int = CHECKPOINT_MAX_BYTES,
+        max_checkpoints_per_thread: int = CHECKPOINT_MAX_PER_THREAD,
+        **kwargs: Any,
+    ):
+        """
+        Initialize an empty checkpointer.
+
+        Args:
+            ttl_seconds (float): Idle time before a thread expires, 0 disables
+            max_bytes (int): Global memory budget in bytes, 0 disables
+            max_checkpoints_per_thread (int): Checkpoints kept per thread and
+                namespace, 0 keeps all of them
+            **kwargs: Passed to InMemorySaver (e.g. serde)
+        """
+        super().__init__(**kwargs)
+        self.ttl_seconds = ttl_seconds
+        self.max_bytes = max_bytes
+        self.max_checkpoints_per_thread = max_checkpoints_per_thread
+        self._lock = threading.RLock()
+        # thread ID -> last access time, least recently used first
+        self._last_access: "OrderedDict[str, float]" = OrderedDict()
+        self._thread_bytes: Dict[str, int] = defaultdict(int)
+        self._total_bytes = 0
+        # Per-thread indexes so evicting a thread does not scan every key
+        self._thread_writes: Dict[str, Set[Tuple[str, str, str]]] = defaultdict(set)
+        self._thread_blobs: Dict[str, Set[Tuple[str, str, str, Any]]] = defaultdict(set)
+        # thread ID -> (checkpoint NS, checkpoint ID) -> channel versions of the checkpoint
+        self._checkpoint_versions: Dict[str, Dict[Tuple[str, str], Dict[str, Any]]] = defaultdict(dict)
+        self.metrics = {"lru_evictions": 0, "ttl_evictions": 0, "pruned_checkpoints": 0}
+
+    def _account(self, thread_id: str, delta: int) -> None:
+        """Add `delta` bytes to a thread and the global total."""
+        self._thread_bytes[thread_id] += delta
+        self._total_bytes += delta
+
+    def _touch(self, thread_id: str) -> None:
+        """Mark a thread as most recently used."""
+        self._last_access[thread_id] = time.monotonic()
+        self._last_access.move_to_end(thread_id)
+
+    def _is_expired(self, thread_id: str, now: float) -> bool:
+        """Check whether a thread has been idle for longer than the TTL."""
+        last_access = self._last_access.get(thread_id)
+        return bool(self.ttl_seconds) and last_access is not None and now - last_access > self.ttl_seconds
+
+    def _expire(self) -> None:
+        """Drop the threads idle for longer than the TTL."""
+        now = time.monotonic()
+        while self._last_access:
+            thread_id = next(iter(self._last_access))
+            if not self._is_expired(thread_id, now):
+                break
+            self._delete(thread_id)
+            self.metrics["ttl_evictions"] += 1
+
+    def _enforce_budget(self, current_thread: str) -> None:
+        """Evict least recently used threads until the memory budget is met."""
+        if not self.max_bytes:
+            return
+        while self._total_bytes > self.max_bytes and len(self._last_access) > 1:
+            thread_id = next(iter(self._last_access))
+            if thread_id == current_thread:
+                self._last_access.move_to_end(thread_id)
+                thread_id = next(iter(self._last_access))
+            self._delete(thread_id)
+            self.metrics["lru_evictions"] += 1
+            logger.debug("Evicted checkpoint thread", extra={"thread_id": thread_id, "total_bytes": self._total_bytes})
+
+    def _prune(self, thread_id: str, checkpoint_ns: str) -> None:
+        """Keep only the latest checkpoints of a thread namespace."""
+        checkpoints = self.storage[thread_id][checkpoint_ns]
+        excess = len(checkpoints) - self.max_checkpoints_per_thread
+        if not self.max_checkpoints_per_thread or excess <= 0:
+            return
+        # Checkpoint IDs are time ordered, insertion order is chronological
+        for checkpoint_id in list(checkpoints)[:excess]:
+            checkpoint, metadata, _ = checkpoints.pop(checkpoint_id)
+            self._account(thread_id, -_typed_size(checkpoint) - _typed_size(metadata))
+            self._checkpoint_versions[thread_id].pop((checkpoint_ns, checkpoint_id), None)
+            writes_key = (thread_id, checkpoint_ns, checkpoint_id)
+            for _, _, value, _ in self.writes.pop(writes_key, {}).values():
+                self._account(thread_id, -_typed_size(value))
+            self._thread_writes[thread_id].discard(writes_key)
+            self.metrics["pruned_checkpoints"] += 1
+
+        referenced = {
+            (channel, version)
+            for checkpoint_id in checkpoints
+            for channel, version in self._checkpoint_versions[thread_id].get((checkpoint_ns, checkpoint_id), {}).items()
+        }
+        for key in list(self._thread_blobs[thread_id]):
+            if key[1] == checkpoint_ns and (key[2], key[3]) not in referenced:
+                self._account(thread_id, -_typed_size(self.blobs.pop(key)))
+                self._thread_blobs[thread_id].discard(key)
+
+    def _delete(self, thread_id: str) -> None:
+        """Drop every checkpoint, write and channel value of a thread."""
+        self.storage.pop(thread_id, None)
+        for key in self._thread_writes.pop(thread_id, ()):
+            self.writes.pop(key, None)
+        for key in self._thread_blobs.pop(thread_id, ()):
+            self.blobs.pop(key, None)
+        self._checkpoint_versions.pop(thread_id, None)
+        self._total_bytes -= self._thread_bytes.pop(thread_id, 0)
+        self._last_access.pop(thread_id, None)
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Get a checkpoint tuple, treating expired threads as missing.
+
+        Args:
+            config (RunnableConfig): Config with the thread (and checkpoint) ID
+
+        Returns:
+            Optional[CheckpointTuple]: The checkpoint, or None
+        """
+        thread_id = config["configurable"]["thread_id"]
+        with self._lock:
+            if self._is_expired(thread_id, time.monotonic()):
+                self._delete(thread_id)
+                self.metrics["ttl_evictions"] += 1
+                return None
+            if thread_id not in self.storage:
+                # Avoid re-creating an entry in the storage defaultdict
+                return None
+            self._touch(thread_id)
+            return super().get_tuple(config)
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint, then enforce the TTL, retention and memory limits.
+
+        Args:
+            config (RunnableConfig): Config of the checkpoint
+            checkpoint (Checkpoint): The checkpoint to save
+            metadata (CheckpointMetadata): Checkpoint metadata
+            new_versions (ChannelVersions): Channel versions written by this checkpoint
+
+        Returns:
+            RunnableConfig: Config of the saved checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        with self._lock:
+            self._expire()
+            for channel, version in new_versions.items():
+                key = (thread_id, checkpoint_ns, channel, version)
+                if key in self.blobs:
+                    self._account(thread_id, -_typed_size(self.blobs[key]))
+                self._thread_blobs[thread_id].add(key)
+            previous = self.storage.get(thread_id, {}).get(checkpoint_ns, {}).get(checkpoint["id"])
+            if previous is not None:
+                self._account(thread_id, -_typed_size(previous[0]) - _typed_size(previous[1]))
+
+            result = super().put(config, checkpoint, metadata, new_versions)
+
+            for channel, version in new_versions.items():
+                self._account(thread_id, _typed_size(self.blobs[(thread_id, checkpoint_ns, channel, version)]))
+            saved, saved_metadata, _ = self.storage[thread_id][checkpoint_ns][checkpoint["id"]]
+            self._account(thread_id, _typed_size(saved) + _typed_size(saved_metadata))
+            self._checkpoint_versions[thread_id][(checkpoint_ns, checkpoint["id"])] = dict(checkpoint["channel_versions"])
+            # Reads create (empty) writes entries in the writes defaultdict, track them too
+            self._thread_writes[thread_id].add((thread_id, checkpoint_ns, checkpoint["id"]))
+            self._touch(thread_id)
+            self._prune(thread_id, checkpoint_ns)
+            self._enforce_budget(thread_id)
+            return result
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """
+        Save pending writes and account for their size.
+
+        Args:
+            config (RunnableConfig): Config of the checkpoint the writes belong to
+            writes (Sequence[Tuple[str, Any]]): (channel, value) pairs
+            task_id (str): ID of the task creating the writes
+            task_path (str): Path of the task creating the writes
+        """
+        thread_id = config["configurable"]["thread_id"]
+        key = (
+            thread_id,
+            config["configurable"].get("checkpoint_ns", ""),
+            config["configurable"]["checkpoint_id"],
+        )
+        with self._lock:
+            before = sum(_typed_size(value) for _, _, value, _ in self.writes.get(key, {}).values())
+            super().put_writes(config, writes, task_id, task_path)
+            after = sum(_typed_size(value) for _, _, value, _ in self.writes.get(key, {}).values())
+            self._thread_writes[thread_id].add(key)
+            self._account(thread_id, after - before)
+            self._touch(thread_id)
+            self._enforce_budget(thread_id)
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete every checkpoint and write of a thread.
+
+        Args:
+            thread_id (str): The thread to delete
+        """
+        with self._lock:
+            self._delete(thread_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get memory and eviction counters.
+
+        Returns:
+            Dict[str, Any]: Threads, accounted bytes, budget and eviction counts
+        """
+        with self._lock:
+            return {
+                **self.metrics,
+                "threads": len(self._last_access),
+                "bytes": self._total_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+
+def create_checkpointer(backend: str = CHECKPOINTER_BACKEND) -> BaseCheckpointSaver:
+    """
+    Create the checkpointer of the agent graph.
+
+    Args:
+        backend (str): "bounded_memory", "memory" (LangGraph's unbounded
+            MemorySaver) or "sqlite" (durable, see SQLITE_CHECKPOINT_PATH)
+
+    Returns:
+        BaseCheckpointSaver: The checkpointer
+
+    Raises:
+        ConfigurationError: If the backend is unknown
+    """
+    if backend == "bounded_memory":
+        return BoundedMemorySaver()
+    if backend == "memory":
+        return InMemorySaver()
+    if backend == "sqlite":
+        return SqliteCheckpointSaver()
+    raise ConfigurationError(
+        message=f"Unknown checkpointer backend '{backend}'",
+        error_code="CHECKPOINTER_CONFIG_ERROR",
+        details={"backend": backend, "expected": list(CHECKPOINTER_BACKENDS)}
+    )
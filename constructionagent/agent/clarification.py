@@ -0,0 +1,154 @@
+"""
+Deterministic clarification questions for ambiguous intents.
+
+The validator already reports the tool, its `missing_arguments` and an
+`ambiguous_reason` for every ambiguous intent, so asking the user for the
+missing information does not need an LLM. This module builds the question from
+the tool schemas and the `Args:` section of the tool docstrings. It includes:
+- Docstring argument parsing
+- Per-intent questions with an example value per argument
+- Counters of generated questions
+"""
+
+import os
+import re
+from typing import Any, Dict, List
+
+from constructionagent.agent.fast_path import GENERIC_TOOL_WORDS
+
+# Clarification configuration
+# Let the LLM rephrase the generated question (costs an LLM round trip)
+CLARIFICATION_LLM_POLISH = os.getenv("CLARIFICATION_LLM_POLISH", "false").lower() == "true"
+
+# Example values shown to the user, keyed by argument name
+ARGUMENT_EXAMPLES = {
+    "region": "Room 101",
+    "drawing": "Drawing D-205",
+    "location": "Junction J-4 or coordinates like (50, 60)",
+}
+
+DOCSTRING_ARG_PATTERN = re.compile(r"^\s*(?P<name>\w+)\s*(?:\([^)]*\))?\s*:\s*(?P<description>.+?)\s*$")
+DOCSTRING_SECTION_PATTERN = re.compile(r"^\s*(?:Returns?|Raises|Yields|Examples?|Notes?)\s*:", re.IGNORECASE)
+
+
+def parse_docstring_arguments(docstring: str) -> Dict[str, str]:
+    """
+    Extract argument descriptions from the `Args:` section of a docstring.
+
+    Args:
+        docstring (str): Tool description (its docstring)
+
+    Returns:
+        Dict[str, str]: Descriptions keyed by lower-cased argument name
+    """
+    arguments = {}
+    in_args = False
+    for line in (docstring or "").splitlines():
+        if re.match(r"^\s*Args\s*:", line):
+            in_args = True
+            continue
+        if not in_args:
+            continue
+        if DOCSTRING_SECTION_PATTERN.match(line):
+            break
+        match = DOCSTRING_ARG_PATTERN.match(line)
+        if match:
+            arguments[match.group("name").lower()] = match.group("description")
+    return arguments
+
+
+class ClarificationGenerator:
+    """
+    Builds clarification questions from tool schemas.
+
+    For every ambiguous intent, the question names what the tool does, the
+    missing arguments with their docstring description and an example value.
+    Intents without identifiable missing arguments fall back to the
+    validator's `ambiguous_reason`.
+    """
+
+    def __init__(self, tools: List[Any]):
+        """
+        Build the argument tables of the given tools.
+
+        Args:
+            tools (List[Any]): Tools fetched from MCP (need name, description and args_schema)
+        """
+        self.tool_arguments: Dict[str, List[str]] = {}
+        self.argument_descriptions: Dict[str, Dict[str, str]] = {}
+        for tool in tools:
+            schema = tool.args_schema if isinstance(tool.args_schema, dict) else tool.args_schema.model_json_schema()
+            self.tool_arguments[tool.name] = list(schema.get("required", []))
+            descriptions = parse_docstring_arguments(tool.description)
+            for arg, prop in schema.get("properties", {}).items():
+                if prop.get("description"):
+                    descriptions.setdefault(arg.lower(), prop["description"])
+            self.argument_descriptions[tool.name] = descriptions
+        self.generated = 0
+
+    @staticmethod
+    def _lead_in(tool_name: str) -> str:
+        """Turn a tool name into a lead-in, e.g. measure_area -> "To measure the area"."""
+        words = tool_name.split("_")
+        if len(words) > 1 and words[0].lower() not in GENERIC_TOOL_WORDS:
+            return f"To {words[0]} the {' '.join(words[1:])}"
+        subject = [word for word in words if word.lower() not in GENERIC_TOOL_WORDS] or words
+        if words[-1].lower() in GENERIC_TOOL_WORDS and len(words) > 1:
+            subject.append(words[-1])
+        return f"For the {' '.join(subject)}"
+
+    def _missing(self, intent: Dict[str, Any]) -> List[str]:
+        """Return the arguments of an intent that still need a value."""
+        missing = list(intent.get("missing_arguments") or [])
+        arguments = intent.get("arguments") or {}
+        for arg in self.tool_arguments.get(intent.get("tool"), []):
+            value = arguments.get(arg)
+            if arg not in missing and (not value or str(value).lower() == "null"):
+                missing.append(arg)
+        return missing
+
+    def _ask(self, intent: Dict[str, Any]) -> str:
+        """Build the question for one intent."""
+        tool = intent.get("tool", "")
+        lead_in = self._lead_in(tool)
+        missing = self._missing(intent)
+        if not missing:
+            reason = intent.get("ambiguous_reason") or "the request is not specific enough"
+            return f"{lead_in}, could you be more specific? ({reason.rstrip('.')})"
+        requests = []
+        descriptions = self.argument_descriptions.get(tool, {})
+        for arg in missing:
+            text = f"which {arg.replace('_', ' ')}"
+            description = descriptions.get(arg.lower())
+            if description:
+                text += f" ({description[0].lower() + description[1:].rstrip('.')})"
+            if arg in ARGUMENT_EXAMPLES:
+                text += f", e.g. {ARGUMENT_EXAMPLES[arg]}"
+            requests.append(text)
+        return f"{lead_in}, please tell me {' and '.join(requests)}."
+
+    def generate(self, ambiguous_intents: List[Dict[str, Any]]) -> str:
+        """
+        Build the clarification message for ambiguous intents.
+
+        Args:
+            ambiguous_intents (List[Dict[str, Any]]): Ambiguous intents from the
+                validation JSON
+
+        Returns:
+            str: A plain language question asking for the missing information
+        """
+        self.generated += 1
+        questions = [self._ask(intent) for intent in ambiguous_intents]
+        if len(questions) == 1:
+            return f"I need a bit more information. {questions[0]}"
+        return "I need a bit more information:\n" + "\n".join(f"- {question}" for question in questions)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the generator counters.
+
+        Returns:
+            Dict[str, Any]: Number of generated clarifications
+        """
+        return {"generated": self.generated}
@@ -6,8 +6,9 @@ conversational AI workflows. It handles tool management, prompt management, and
 implements a state-based graph for processing user queries through validation,
 intent recognition, and tool execution.
 
-The module uses Google's Generative AI (Gemini) as the underlying LLM and integrates
-with a custom MCP (Model Control Panel) layer for tool and prompt management.
+The module uses Google's Generative AI (Gemini) as the underlying LLM, with a model
+per node when MODEL_ROUTES is set, and integrates with a custom MCP (Model Control
+Panel) layer for tool and prompt management.
 
 Key Components:
     - AgentGraph: Main class that orchestrates the agent's workflow
@@ -17,25 +18,52 @@ Key Components:
 """
 
 import os
-from typing import Dict, List, Optional, Any
+from typing import AsyncIterator, Callable, Dict, List, Optional, Any
 from dotenv import load_dotenv
 from langchain_google_genai import ChatGoogleGenerativeAI
 import asyncio
 from langchain_core.messages import SystemMessage, HumanMessage, AIMessage, ToolMessage, ToolCall 
 from langgraph.graph import StateGraph, START, END
-from langgraph.prebuilt import tools_condition, ToolNode
-from langgraph.checkpoint.memory import MemorySaver
+from langgraph.constants import TAG_NOSTREAM
+from langchain_core.runnables.config import ensure_config, merge_configs
+from langgraph.prebuilt import tools_condition
 from pathlib import Path
 from constructionagent.agent.mcp_layer import MCPLayer
+from constructionagent.agent.fast_path import FastPathClassifier, FAST_PATH_ENABLED, FAST_PATH_DEGRADED_MIN_CONFIDENCE
+from constructionagent.agent.semantic_cache import SemanticIntentCache, SEMANTIC_CACHE_ENABLED
+from constructionagent.agent.prompt_compiler import PromptCompiler
+from constructionagent.agent.tool_executor import ParallelToolNode
+from constructionagent.agent.clarification import ClarificationGenerator, CLARIFICATION_LLM_POLISH
+from constructionagent.agent.response_renderer import ResponseRenderer, RESPONSE_TEMPLATES_ENABLED
+from constructionagent.agent.checkpointer import create_checkpointer, CHECKPOINTER_BACKEND
+from constructionagent.agent.metrics import MetricsRegistry, call_sample, METRICS_DUMP_PATH
+from constructionagent.agent.tracing import tracer, traced_node, SPAN_KIND_CLIENT
+from constructionagent.agent.llm_cache import LLMResponseCache
+from constructionagent.agent.resilience import ResilientCaller, StreamedOutput, LLM_RESILIENCE_ENABLED
+from constructionagent.agent.model_router import ModelRouter
+from constructionagent.agent.singleflight import SingleFlight, request_key, normalize_messages, SINGLEFLIGHT_ENABLED
+from constructionagent.agent.history import HistoryManager, llm_summarizer, summary_message, HISTORY_SUMMARY_MODE
+from constructionagent.agent.sqlite_checkpointer import SqliteCheckpointSaver
+from constructionagent.agent.snapshot import load_snapshot, save_snapshot, snapshot_hash, MCP_SNAPSHOT_ENABLED
 from constructionagent.agent.state import MessagesState
-from constructionagent.agent.logger import logger, AgentError, ToolExecutionError, PromptError, ValidationError, ConfigurationError
+from constructionagent.agent.logger import logger, AgentError, ToolExecutionError, PromptError, ValidationError, ConfigurationError, LLMUnavailableError
 import json
 import random
+import time
+import uuid
 from constructionagent.agent.mcp_config import REQUIRED_PROMPT_NAMES
 
 load_dotenv()
 GOOGLE_API_KEY = os.getenv("GOOGLE_API_KEY")
 GOOGLE_GENAI_MODEL = os.getenv("GOOGLE_GENAI_MODEL", "gemini-pro")
+# Answer clear intents while clarifying ambiguous ones in the same turn
+PARTIAL_EXECUTION_ENABLED = os.getenv("PARTIAL_EXECUTION_ENABLED", "true").lower() == "true"
+# Progress messages streamed when a node starts (the tools node names its tools)
+NODE_PROGRESS = {
+    'Fast_Path': "Understanding the query",
+    'Query_Validation': "Validating the query",
+    'Agent': "Preparing the answer",
+}
 
 class AgentGraph:
     """
@@ -48,10 +76,14 @@ class AgentGraph:
     - State management for conversation history
     """
 
-    def __init__(self):
+    def __init__(self, checkpointer_backend: str = CHECKPOINTER_BACKEND):
         """
         Initialize the AgentGraph with required components.
         
+        Args:
+            checkpointer_backend (str): Conversation state persistence,
+                "bounded_memory" (default), "memory" or "sqlite"
+        
         Raises:
             ConfigurationError: If required configuration is missing
         """
@@ -61,6 +93,27 @@ class AgentGraph:
             self.llm = ChatGoogleGenerativeAI(model=GOOGLE_GENAI_MODEL, temperature=0, google_api_key=GOOGLE_API_KEY)
             self.tools = None
             self.prompts = None
+            self.fast_path = None
+            self.semantic_cache = None
+            self.prompt_compiler = PromptCompiler()
+            self.validation_prompt = None
+            self.tool_executor = None
+            self.response_renderer = None
+            self.clarifier = None
+            self.metrics = MetricsRegistry()
+            self.llm_flight = SingleFlight("llm")
+            self.llm_cache = LLMResponseCache()
+            self.resilience = ResilientCaller()
+            self.router = ModelRouter(GOOGLE_GENAI_MODEL, factory=lambda model: ChatGoogleGenerativeAI(
+                model=model, temperature=0, google_api_key=GOOGLE_API_KEY
+            ))
+            self.history = HistoryManager(summarizer=llm_summarizer(
+                lambda messages: self._invoke_llm('History', messages, with_tools=False)
+            ) if HISTORY_SUMMARY_MODE == "llm" else None)
+            self.snapshot_hash = None
+            self._revalidation_task = None
+            self.checkpointer_backend = checkpointer_backend
+            self.checkpointer = None
             self.graph = None
             logger.info("AgentGraph initialized successfully")
         except Exception as e:
@@ -75,17 +128,32 @@ class AgentGraph:
         """
         Fetch available tools and required prompts from the MCP layer.
         
+        When a valid local snapshot exists, tools and prompts are loaded from it
+        and revalidated against the MCP servers in the background; otherwise
+        they are fetched concurrently and a snapshot is written for the next
+        start.
+        
         Raises:
             PromptError: If prompt fetching fails
             ToolExecutionError: If tool fetching fails
         """
         try:
-            logger.info("Fetching tools and prompts from MCP")
-            self.tools = await self.mcp_client.fetch_tools()
-            self.llm_with_tools = self.llm.bind_tools(self.tools)
-            self.prompts = await self.mcp_client.fetch_prompts(
-                list(REQUIRED_PROMPT_NAMES.keys())
-            )
+            prompt_names = list(REQUIRED_PROMPT_NAMES.keys())
+            snapshot = load_snapshot() if MCP_SNAPSHOT_ENABLED else None
+            if snapshot is not None and set(prompt_names) <= set(snapshot["prompts"]):
+                logger.info("Loading tools and prompts from snapshot", extra={"content_hash": snapshot["content_hash"]})
+                self.mcp_client.load_snapshot(snapshot)
+                self.snapshot_hash = snapshot["content_hash"]
+                self._revalidation_task = asyncio.create_task(self.revalidate_snapshot())
+            else:
+                logger.info("Fetching tools and prompts from MCP")
+                await asyncio.gather(
+                    self.mcp_client.fetch_tools(),
+                    self.mcp_client.fetch_prompts(prompt_names),
+                )
+                if MCP_SNAPSHOT_ENABLED:
+                    self.snapshot_hash = save_snapshot(self.mcp_client.snapshot())["content_hash"]
+            self._apply_tools_and_prompts()
             logger.info(f"Successfully fetched {len(self.tools)} tools and {len(self.prompts)} prompts")
         except Exception as e:
             logger.error("Failed to fetch tools and prompts", exc_info=True)
@@ -95,9 +163,213 @@ class AgentGraph:
                 details={"error": str(e)}
             )
 
+    def _apply_tools_and_prompts(self):
+        """
+        Derive everything that depends on the MCP tools and prompts.
+        """
+        self.tools = self.mcp_client.tools
+        self.prompts = self.mcp_client.prompts
+        self.router.configure(self.llm, self.tools)
+        self.llm_with_tools = self.router.llm(GOOGLE_GENAI_MODEL)
+        self.validation_prompt = self.prompt_compiler.compile(
+            self.tools, self.prompts['query_validation_prompt'][0].content
+        )
+        self.fast_path = FastPathClassifier(self.tools)
+        self.semantic_cache = SemanticIntentCache(self.fast_path)
+        self.response_renderer = ResponseRenderer(self.tools)
+        self.clarifier = ClarificationGenerator(self.tools)
+        if self.tool_executor is None:
+            self.tool_executor = ParallelToolNode(self.tools)
+        else:
+            self.tool_executor.set_tools(self.tools)
+
+    async def revalidate_snapshot(self):
+        """
+        Compare the snapshot the agent booted from with the MCP servers.
+        
+        Runs in the background after a snapshot boot (which also warms up the
+        session pools). If the servers changed, the fresh tools and prompts are
+        applied, the graph is rebuilt and the snapshot is rewritten.
+        """
+        try:
+            fresh = await self.mcp_client.fetch_snapshot(list(REQUIRED_PROMPT_NAMES.keys()))
+            if snapshot_hash(fresh) == self.snapshot_hash:
+                logger.info("MCP snapshot is up to date", extra={"content_hash": self.snapshot_hash})
+                return
+            logger.warning("MCP snapshot is stale, applying fresh tools and prompts", extra={"old_hash": self.snapshot_hash})
+            self.snapshot_hash = save_snapshot(fresh)["content_hash"]
+            self.mcp_client.load_snapshot(fresh)
+            self._apply_tools_and_prompts()
+            if self.graph is not None:
+                self.graph = self._compile_graph()
+        except Exception:
+            logger.error("Failed to revalidate MCP snapshot", exc_info=True)
+
+    async def close(self):
+        """
+        Release the MCP session pools and their server processes, close the
+        checkpoint and LLM cache databases and dump the metrics (with
+        METRICS_DUMP_PATH).
+        
+        Must be awaited before the event loop shuts down; pooled sessions are
+        owned by background tasks that need an orderly exit.
+        """
+        if self._revalidation_task is not None and not self._revalidation_task.done():
+            self._revalidation_task.cancel()
+        await self.mcp_client.close()
+        if isinstance(self.checkpointer, SqliteCheckpointSaver):
+            self.checkpointer.close()
+        if METRICS_DUMP_PATH:
+            self.metrics.dump(METRICS_DUMP_PATH)
+        self.llm_cache.close()
+
+    async def _invoke_llm(
+        self,
+        node: str,
+        messages: List[Any],
+        with_tools: bool = True,
+        tool_results: int = 0,
+        validate: Optional[Callable[[AIMessage], bool]] = None,
+    ) -> AIMessage:
+        """
+        Call the model routed for the node (see `model_router`), escalating to
+        the node's stronger model when the response fails `validate`.
+        
+        Args:
+            node (str): Graph node (or component) making the call
+            messages (List[Any]): Prompt messages
+            with_tools (bool): Whether the model is bound to the MCP tools
+            tool_results (int): Tool results the call summarizes, which may
+                route it to the node's complex model
+            validate (Optional[Callable[[AIMessage], bool]]): Whether a
+                response is usable, e.g. parses as validation JSON
+
+        Returns:
+            AIMessage: The LLM response (possibly unusable when the node has
+            no escalation model)
+        """
+        model = self.router.route(node, tool_results)
+        response = await self._invoke_model(node, model, messages, with_tools, validate)
+        if validate is None or validate(response):
+            return response
+        escalate_to = self.router.escalation(node, model)
+        if escalate_to is None:
+            return response
+        self.router.record_escalation(node, model, escalate_to)
+        return await self._invoke_model(node, escalate_to, messages, with_tools, validate)
+
+    async def _invoke_model(
+        self,
+        node: str,
+        model: str,
+        messages: List[Any],
+        with_tools: bool,
+        validate: Optional[Callable[[AIMessage], bool]],
+    ) -> AIMessage:
+        """
+        Call one model, unless the response is cached or the identical call is
+        already in flight.
+        
+        The response cache is keyed by the model settings, bound tool schemas
+        and messages (see `llm_cache`); responses failing `validate` are not
+        cached. In-flight calls are identical when the node, model, tool
+        binding, tool and prompt version and normalized messages match; the
+        joined caller gets a copy of the leader's response and the call is
+        recorded (and cached) once.
+
+        Args:
+            node (str): Graph node (or component) making the call
+            model (str): Model name
+            messages (List[Any]): Prompt messages
+            with_tools (bool): Whether the model is bound to the MCP tools
+            validate (Optional[Callable[[AIMessage], bool]]): Whether a
+                response is usable
+
+        Returns:
+            AIMessage: The LLM response
+        """
+        llm = self.router.llm(model, with_tools)
+        cache_key = self.llm_cache.key(node, llm, messages)
+        if cache_key is not None:
+            cached = self.llm_cache.get(node, cache_key)
+            if cached is not None:
+                return cached
+        if not SINGLEFLIGHT_ENABLED:
+            response, shared = await self._call_llm(node, model, messages, llm), False
+        else:
+            key = request_key(
+                node,
+                model,
+                with_tools,
+                self.validation_prompt.source_fingerprint if self.validation_prompt else None,
+                normalize_messages(messages),
+            )
+            response, shared = await self.llm_flight.do(key, lambda: self._call_llm(node, model, messages, llm))
+        if shared:
+            return response.model_copy(deep=True)
+        if cache_key is not None and (validate is None or validate(response)):
+            self.llm_cache.put(node, cache_key, response)
+        return response
+
+    async def _call_llm(self, node: str, model: str, messages: List[Any], llm: Any) -> AIMessage:
+        """
+        Call the LLM (with retries, hedging and the circuit breaker of
+        `self.resilience`) and record the call in the metrics registry and
+        the metrics of its route.
+
+        An Agent answer that failed after streaming tokens is not retried,
+        so the user never receives the same tokens twice; the error is raised.
+
+        Args:
+            node (str): Graph node (or component) making the call
+            model (str): Model name
+            messages (List[Any]): Prompt messages
+            llm (Any): Chat model of `model`
+
+        Returns:
+            AIMessage: The LLM response
+            
+        Raises:
+            LLMUnavailableError: If the circuit breaker is open
+        """
+        with tracer.span(f"llm {node}", kind=SPAN_KIND_CLIENT, attributes={"gen_ai.request.model": model}) as span:
+            start = time.perf_counter()
+            response = None
+            # Only the answers of the Agent node are streamed; calls made inside it
+            # (clarification, history summary) reach the user in its final message
+            streamed = StreamedOutput()
+            if node == 'Agent':
+                runnable, config = llm, merge_configs(ensure_config(), {"callbacks": [streamed]})
+            else:
+                runnable, config = llm.with_config(tags=[TAG_NOSTREAM]), None
+            try:
+                if LLM_RESILIENCE_ENABLED:
+                    response = await self.resilience.call(
+                        node, lambda: runnable.ainvoke(messages, config), committed=lambda: streamed.started
+                    )
+                else:
+                    response = await runnable.ainvoke(messages, config)
+                return response
+            finally:
+                latency_ms = (time.perf_counter() - start) * 1000
+                # Route cost does not depend on METRICS_ENABLED
+                sample = self.metrics.record_call(node, messages, response, latency_ms) or call_sample(messages, response)
+                cost = self.router.record_call(node, model, sample, latency_ms, response is None)
+                if span is not None:
+                    span.set_attributes({
+                        "gen_ai.usage.input_tokens": sample.get("input_tokens"),
+                        "gen_ai.usage.output_tokens": sample.get("output_tokens"),
+                        "llm.prompt_bytes": sample.get("prompt_bytes"),
+                        "llm.message_count": len(messages),
+                        "llm.cost_usd": cost,
+                    })
+
     async def get_tool_descriptions(self) -> str:
         """
-        Generate formatted descriptions of tools fetched from MCP.
+        Get the formatted descriptions of tools fetched from MCP.
+        
+        The descriptions are rendered once per tool-set version when the
+        validation prompt is compiled in `fetch_tools_and_prompts`.
         
         Returns:
             str: A numbered list of tool descriptions
@@ -106,20 +378,7 @@ class AgentGraph:
             ToolExecutionError: If tool descriptions cannot be generated
         """
         try:
-            descriptions = []
-            for tool in self.tools:
-                tool_name = tool.name
-                description = tool.description.strip().split("\n")[0]
-                args = tool.args_schema.get('properties', {})
-                required_args = tool.args_schema.get('required', [])
-                arg_list = [
-                    f"{arg}: {args.get(arg, {}).get('type', 'string')}"
-                    for arg in required_args
-                ]
-                arg_string = ", ".join(arg_list)
-                full_description = f"{tool_name}({arg_string}) → {description}"
-                descriptions.append(full_description)
-            return "\n".join(f"{i+1}.{d}" for i, d in enumerate(descriptions))
+            return self.validation_prompt.tool_descriptions
         except Exception as e:
             logger.error("Failed to generate tool descriptions", exc_info=True)
             raise ToolExecutionError(
@@ -128,10 +387,63 @@ class AgentGraph:
                 details={"error": str(e)}
             )
 
+    async def fast_path_classifier(self, state: MessagesState) -> Dict[str, List[Any]]:
+        """
+        Classify the user query locally when the rule based classifier is confident.
+        
+        Intents awaiting clarification from the previous turn are completed
+        first when the user's answer provides every missing slot. A message
+        asking for other tools is a new query: the clarification is dropped
+        and the message is classified as usual.
+        
+        Args:
+            state (MessagesState): Current conversation state
+            
+        Returns:
+            Dict[str, List[Any]]: Validation JSON message on a hit, empty update
+            (or only the dropped clarification) on a miss
+        """
+        user_query = state['messages'][-1]
+        pending_intents = state.get('pending_intents')
+        update = {}
+        if PARTIAL_EXECUTION_ENABLED and pending_intents:
+            if self.fast_path.names_new_tools(pending_intents, user_query.content):
+                logger.info("New query while clarifying, pending intents dropped", extra={"query": user_query.content})
+                update = {'pending_intents': [], 'answered_intents': []}
+            else:
+                result = self.fast_path.fill_missing_arguments(pending_intents, user_query.content)
+                if result is not None:
+                    logger.info("Pending intents completed from user answer", extra={"query": user_query.content})
+                    return {'messages': [AIMessage(content=json.dumps(result))], 'answered_intents': []}
+        if not FAST_PATH_ENABLED:
+            return update
+        result = self.fast_path.classify(user_query.content)
+        if result is None:
+            return update
+        logger.info("Query classified by fast path", extra={"query": user_query.content, **self.fast_path.stats()})
+        return {'messages': [AIMessage(content=json.dumps(result))], **update}
+
+    def route_fast_path(self, state: MessagesState) -> str:
+        """
+        Route to the agent on a fast-path hit, otherwise to LLM validation.
+        
+        Args:
+            state (MessagesState): Current conversation state
+            
+        Returns:
+            str: Name of the next node
+        """
+        if isinstance(state['messages'][-1], AIMessage):
+            return 'Agent'
+        return 'Query_Validation'
+
     async def intent_and_slot_validator(self, state: MessagesState) -> Dict[str, List[Any]]:
         """
         Validate user query and extract intents and slots.
         
+        While the LLM circuit is open, the query is classified by the fast path
+        with the lower FAST_PATH_DEGRADED_MIN_CONFIDENCE instead.
+        
         Args:
             state (MessagesState): Current conversation state
             
@@ -140,18 +452,38 @@ class AgentGraph:
             
         Raises:
             ValidationError: If validation fails
+            LLMUnavailableError: If the LLM is unavailable and the fast path
+                cannot classify the query
         """
         try:
             user_query = state['messages'][-1]
-            tool_descriptions = await self.get_tool_descriptions()
-            validation_sys_message = SystemMessage(
-                content=self.prompts['query_validation_prompt'][0].content.format(
-                    tool_descriptions=tool_descriptions
-                )
-            )
+            first_turn = len(state['messages']) == 1 and not state.get('summary')
+            if SEMANTIC_CACHE_ENABLED:
+                self.semantic_cache.ensure_version(self.validation_prompt.content_hash)
+                cached = self.semantic_cache.lookup(user_query.content, first_turn=first_turn)
+                if cached is not None:
+                    logger.info("Query served from semantic cache", extra={"query": user_query.content, **self.semantic_cache.stats()})
+                    return {'messages': [AIMessage(content=json.dumps(cached))]}
+
+            validation_sys_message = self.validation_prompt.message
             logger.debug("Validating user query", extra={"query": user_query.content})
-            result = await self.llm_with_tools.ainvoke([validation_sys_message] + state['messages'])
+            try:
+                result = await self._invoke_llm(
+                    'Query_Validation',
+                    [validation_sys_message] + summary_message(state.get('summary')) + state['messages'],
+                    validate=self._is_validation_json,
+                )
+            except LLMUnavailableError:
+                degraded = self.fast_path.classify(user_query.content, min_confidence=FAST_PATH_DEGRADED_MIN_CONFIDENCE)
+                if degraded is None:
+                    raise
+                logger.warning("LLM unavailable, query classified by fast path", extra={"query": user_query.content})
+                return {'messages': [AIMessage(content=json.dumps(degraded))]}
+            if SEMANTIC_CACHE_ENABLED:
+                self.semantic_cache.store(user_query.content, result.content, first_turn=first_turn)
             return {'messages': [result]}
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error("Query validation failed", exc_info=True)
             raise ValidationError(
@@ -177,18 +509,27 @@ class AgentGraph:
             query = state['messages'][-1]
             if isinstance(query, ToolMessage):
                 logger.debug("Processing tool message", extra={"Query": query})
-                result = await self.llm_with_tools.ainvoke(state['messages'])
+                if RESPONSE_TEMPLATES_ENABLED:
+                    rendered = self.response_renderer.render(state['messages'])
+                    if rendered is not None:
+                        return {'messages': [AIMessage(content=rendered)]}
+                result = await self._invoke_llm(
+                    'Agent',
+                    summary_message(state.get('summary')) + state['messages'],
+                    tool_results=self._count_tool_results(state['messages']),
+                )
                 return {'messages': [result]}
 
             try:
-                query = query.content.strip('```json\n').strip('```')
-                query = json.loads(query)
+                query = self._parse_validation_json(query.content)
             except json.JSONDecodeError as e:
                 logger.error("Failed to decode JSON query", exc_info=True)
                 return {
                     'messages': [
                         AIMessage(content="Invalid query format. Please try again.")
-                    ]
+                    ],
+                    'pending_intents': [],
+                    'answered_intents': [],
                 }
 
             if query.get("unrelated", 'true'):
@@ -196,35 +537,31 @@ class AgentGraph:
                 return {
                     "messages": [
                         AIMessage(content="Sorry, the query seems unfamiliar. I am a construction assistant and I can only help with construction related tasks.")
-                    ]
+                    ],
+                    "pending_intents": [],
+                    "answered_intents": [],
                 }
 
-            intents = query.get("intents", [])
+            intents = self._drop_answered_intents(query.get("intents", []), state.get('answered_intents'))
             ambiguous_intents = [intent for intent in intents if intent["is_ambiguous"]]
+            clear_intents = [intent for intent in intents if not intent["is_ambiguous"]]
             
             if ambiguous_intents:
                 logger.info("Handling ambiguous intents", extra={"intents": ambiguous_intents})
-                clarification_prompt = SystemMessage(
-                    content=self.prompts['clarification_prompt'][0].content
-                )
-                human_message = HumanMessage(content=json.dumps(ambiguous_intents, indent=2))
-                clarification_response = await self.llm_with_tools.ainvoke(
-                    [clarification_prompt, human_message]
-                )
+                if PARTIAL_EXECUTION_ENABLED and clear_intents:
+                    return await self.answer_and_clarify(clear_intents, ambiguous_intents)
+                clarification_response = await self.request_clarification(ambiguous_intents)
+                if PARTIAL_EXECUTION_ENABLED:
+                    return {"messages": [clarification_response], "pending_intents": ambiguous_intents, "answered_intents": []}
                 return {"messages": [clarification_response]}
             
             # Execute tools for clear intents
             logger.info("Executing tools for clear intents", extra={"intents": intents})
-            tool_calls = [
-                ToolCall(
-                    id=f"call_{int(random.random() * 1e18)}",
-                    name=intent["tool"],
-                    args=intent["arguments"]
-                )
-                for intent in intents
-            ]
-            return {'messages': [AIMessage(content="", tool_calls=tool_calls)]}
+            tool_calls = self._build_tool_calls(intents)
+            return {'messages': [AIMessage(content="", tool_calls=tool_calls)], 'pending_intents': [], 'answered_intents': []}
             
+        except LLMUnavailableError:
+            raise
         except Exception as e:
             logger.error("Tool execution failed", exc_info=True)
             raise ToolExecutionError(
@@ -233,6 +570,195 @@ class AgentGraph:
                 details={"error": str(e)}
             )
 
+    @staticmethod
+    def _parse_validation_json(content: str) -> Dict[str, Any]:
+        """
+        Parse the validation JSON of a message, with or without a markdown fence.
+        
+        Args:
+            content (str): Message content
+            
+        Returns:
+            Dict[str, Any]: The validation result
+            
+        Raises:
+            json.JSONDecodeError: If the content is not JSON
+        """
+        return json.loads(content.strip('```json\n').strip('```'))
+
+    @classmethod
+    def _is_validation_json(cls, response: AIMessage) -> bool:
+        """Whether a validation response parses as a JSON object (else it is escalated)."""
+        try:
+            return isinstance(cls._parse_validation_json(response.text()), dict)
+        except json.JSONDecodeError:
+            return False
+
+    @staticmethod
+    def _count_tool_results(messages: List[Any]) -> int:
+        """Count the tool results at the end of the conversation, which the answer summarizes."""
+        count = 0
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage):
+                break
+            count += 1
+        return count
+
+    @staticmethod
+    def _build_tool_calls(intents: List[Dict[str, Any]]) -> List[ToolCall]:
+        """
+        Build one tool call per clear intent.
+        
+        Args:
+            intents (List[Dict[str, Any]]): Clear intents from the validation JSON
+            
+        Returns:
+            List[ToolCall]: Tool calls with unique ids
+        """
+        return [
+            ToolCall(
+                id=f"call_{int(random.random() * 1e18)}",
+                name=intent["tool"],
+                args=intent["arguments"]
+            )
+            for intent in intents
+        ]
+
+    @staticmethod
+    def _drop_answered_intents(intents: List[Dict[str, Any]], answered_intents: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+        """
+        Remove intents already answered in the previous (clarifying) turn.
+        
+        The LLM validation of a clarification answer sees the whole history and
+        may repeat the intents that were answered alongside the clarification.
+        
+        Args:
+            intents (List[Dict[str, Any]]): Intents from the validation JSON
+            answered_intents (Optional[List[Dict[str, Any]]]): Intents answered in the previous turn
+            
+        Returns:
+            List[Dict[str, Any]]: Intents still to be handled (all of them if none remain)
+        """
+        if not answered_intents:
+            return intents
+        answered = {(intent["tool"], json.dumps(intent["arguments"], sort_keys=True)) for intent in answered_intents}
+        remaining = [
+            intent for intent in intents
+            if (intent["tool"], json.dumps(intent.get("arguments"), sort_keys=True)) not in answered
+        ]
+        return remaining or intents
+
+    async def request_clarification(self, ambiguous_intents: List[Dict[str, Any]]) -> AIMessage:
+        """
+        Ask the user for the arguments missing from ambiguous intents.
+        
+        The question is generated locally from the tool schemas; with
+        CLARIFICATION_LLM_POLISH the LLM rephrases it, unless it is
+        unavailable.
+        
+        Args:
+            ambiguous_intents (List[Dict[str, Any]]): Ambiguous intents from the validation JSON
+            
+        Returns:
+            AIMessage: The clarification question
+        """
+        question = self.clarifier.generate(ambiguous_intents)
+        if not CLARIFICATION_LLM_POLISH:
+            return AIMessage(content=question)
+        clarification_prompt = SystemMessage(
+            content=self.prompts['clarification_prompt'][0].content
+        )
+        human_message = HumanMessage(
+            content=f"{json.dumps(ambiguous_intents, indent=2)}\n\nDraft question:\n{question}"
+        )
+        try:
+            return await self._invoke_llm('Clarification', [clarification_prompt, human_message])
+        except LLMUnavailableError:
+            return AIMessage(content=question)
+
+    async def answer_and_clarify(self, clear_intents: List[Dict[str, Any]], ambiguous_intents: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+        """
+        Answer the clear intents and clarify the ambiguous ones in one turn.
+        
+        The tools of the clear intents run concurrently with the clarification
+        LLM call and both are merged into a single response. The ambiguous
+        intents are kept in state so the follow-up turn only resolves their
+        missing slots.
+        
+        Args:
+            clear_intents (List[Dict[str, Any]]): Intents with every argument
+            ambiguous_intents (List[Dict[str, Any]]): Intents missing arguments
+            
+        Returns:
+            Dict[str, List[Any]]: Tool call, tool results and merged response,
+            plus the pending and answered intents
+        """
+        logger.info("Executing clear intents while clarifying", extra={"intents": clear_intents})
+        tool_calls = self._build_tool_calls(clear_intents)
+        clarification_response, *tool_messages = await asyncio.gather(
+            self.request_clarification(ambiguous_intents),
+            *(self.tool_executor.run_tool_call(call) for call in tool_calls),
+        )
+        answer = self.format_tool_results(clear_intents, tool_messages)
+        return {
+            "messages": [
+                AIMessage(content="", tool_calls=tool_calls),
+                *tool_messages,
+                AIMessage(content=f"{answer}\n\n{clarification_response.content}"),
+            ],
+            "pending_intents": ambiguous_intents,
+            "answered_intents": clear_intents,
+        }
+
+    def format_tool_results(self, intents: List[Dict[str, Any]], tool_messages: List[ToolMessage]) -> str:
+        """
+        Render tool results as a short plain-language summary.
+        
+        Results are phrased with the tool's response template when it has one.
+        
+        Args:
+            intents (List[Dict[str, Any]]): Intents the tools were called for
+            tool_messages (List[ToolMessage]): Tool results, in the same order
+            
+        Returns:
+            str: One line per intent
+        """
+        lines = []
+        for intent, message in zip(intents, tool_messages):
+            arguments = ", ".join(f"{name}: {value}" for name, value in intent["arguments"].items())
+            rendered = self.response_renderer.render_result(intent["tool"], intent["arguments"], message) if RESPONSE_TEMPLATES_ENABLED else None
+            if rendered is not None:
+                lines.append(f"- {rendered}")
+            elif message.status == "error":
+                lines.append(f"- {intent['tool']} ({arguments}): could not be retrieved ({message.text()})")
+            else:
+                lines.append(f"- {intent['tool']} ({arguments}): {message.text()}")
+        return "Here is what I found:\n" + "\n".join(lines)
+
+    def _compile_graph(self):
+        """
+        Wire the nodes and compile the graph with the agent's checkpointer.
+        
+        Returns:
+            CompiledStateGraph: The compiled graph
+        """
+        builder = StateGraph(MessagesState)
+        builder.add_node('History', traced_node('History', self.history))
+        builder.add_node('Fast_Path', traced_node('Fast_Path', self.fast_path_classifier))
+        builder.add_node('Query_Validation', traced_node('Query_Validation', self.intent_and_slot_validator))
+        builder.add_node('Agent', traced_node('Agent', self.agent_call))
+        builder.add_node('tools', traced_node('tools', self.tool_executor.execute))
+        
+        # Define graph flow
+        builder.add_edge(START, 'History')
+        builder.add_edge('History', 'Fast_Path')
+        builder.add_conditional_edges('Fast_Path', self.route_fast_path, ['Agent', 'Query_Validation'])
+        builder.add_edge('Query_Validation', 'Agent')
+        builder.add_conditional_edges('Agent', tools_condition)
+        builder.add_edge('tools', 'Agent')
+        
+        return builder.compile(checkpointer=self.checkpointer)
+
     async def build_graph(self):
         """
         Construct the agent's processing graph.
@@ -244,20 +770,9 @@ class AgentGraph:
             logger.info("Building agent graph")
             await self.fetch_tools_and_prompts()
             
-            builder = StateGraph(MessagesState)
-            builder.add_node('Query_Validation', self.intent_and_slot_validator)
-            builder.add_node('Agent', self.agent_call)
-            builder.add_node('tools', ToolNode(self.tools))
-            
-            # Define graph flow
-            builder.add_edge(START, 'Query_Validation')
-            builder.add_edge('Query_Validation', 'Agent')
-            builder.add_conditional_edges('Agent', tools_condition)
-            builder.add_edge('tools', 'Agent')
-            
-            # Set up state persistence (in Memory for now)
-            memory = MemorySaver()
-            self.graph = builder.compile(checkpointer=memory)
+            # Set up state persistence
+            self.checkpointer = create_checkpointer(self.checkpointer_backend)
+            self.graph = self._compile_graph()
             logger.info("Agent graph built successfully")
         except Exception as e:
             logger.error("Failed to build agent graph", exc_info=True)
@@ -265,4 +780,132 @@ class AgentGraph:
                 message="Failed to build agent graph",
                 error_code="GRAPH_BUILD_ERROR",
                 details={"error": str(e)}
-            )
\ No newline at end of file
+            )
+
+    @staticmethod
+    def _run_config(config: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Copy a run config and give it a run_id (kept if it has one).
+        
+        Args:
+            config (Optional[Dict[str, Any]]): Run config with the thread_id
+            
+        Returns:
+            Dict[str, Any]: The config with a UUID run_id
+        """
+        config = dict(config or {})
+        config["run_id"] = uuid.UUID(str(config.get("run_id") or uuid.uuid4()))
+        return config
+
+    def _turn_span(self, config: Dict[str, Any]):
+        """Open the `turn` tracing span of a run; its run_id is the trace id."""
+        run_id = config["run_id"]
+        thread_id = config.get("configurable", {}).get("thread_id")
+        return tracer.span("turn", attributes={"thread_id": thread_id, "run_id": str(run_id)}, trace_id=run_id.hex)
+
+    async def ainvoke(self, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Run one turn of the graph inside a `turn` tracing span.
+        
+        The run gets a run_id (kept if the config has one), which is also the
+        trace id, so the spans of the nodes, LLM calls and MCP calls of the
+        turn form one trace.
+        
+        Args:
+            inputs (Dict[str, Any]): Graph input, e.g. {"messages": [HumanMessage(...)]}
+            config (Optional[Dict[str, Any]]): Run config with the thread_id
+            
+        Returns:
+            Dict[str, Any]: The final state of the turn
+        """
+        config = self._run_config(config)
+        with self._turn_span(config):
+            return await self.graph.ainvoke(inputs, config=config)
+
+    @staticmethod
+    def _progress_event(task: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """
+        Describe a node that starts running.
+        
+        Args:
+            task (Dict[str, Any]): Payload of a debug `task` event (name, input)
+            
+        Returns:
+            Optional[Dict[str, Any]]: Progress event, None for internal nodes
+        """
+        node = task["name"]
+        if node == 'tools':
+            tool_calls = getattr(task["input"]["messages"][-1], "tool_calls", None) or []
+            message = "Running " + ", ".join(call["name"] for call in tool_calls)
+        elif node in NODE_PROGRESS:
+            message = NODE_PROGRESS[node]
+        else:
+            return None
+        return {"event": "progress", "node": node, "message": message}
+
+    async def astream(self, inputs: Dict[str, Any], config: Optional[Dict[str, Any]] = None) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Run one turn of the graph and stream its progress and answer.
+        
+        Events, in order of arrival:
+        - {"event": "progress", "node", "message"}: a node starts
+          ("Validating the query", "Running measure_area")
+        - {"event": "token", "text"}: a chunk of the answer; LLM answers arrive
+          token by token, template and clarification answers in one chunk
+          (the Clarification LLM call is not streamed, so a clarification
+          merged into an answer is only sent once)
+        - {"event": "answer", "text", "thread_id", "run_id"}: the complete
+          answer, last
+        
+        The graph runs in its own task inside the `turn` tracing span, so
+        closing the generator early cancels the run.
+        
+        Args:
+            inputs (Dict[str, Any]): Graph input, e.g. {"messages": [HumanMessage(...)]}
+            config (Optional[Dict[str, Any]]): Run config with the thread_id
+            
+        Yields:
+            Dict[str, Any]: Stream events
+            
+        Raises:
+            AgentError: If a node fails
+        """
+        config = self._run_config(config)
+        events: asyncio.Queue = asyncio.Queue()
+        done = object()
+
+        async def produce():
+            answer = ""
+            try:
+                with self._turn_span(config):
+                    async for mode, chunk in self.graph.astream(inputs, config=config, stream_mode=["debug", "messages"]):
+                        if mode == "messages":
+                            message, metadata = chunk
+                            if metadata.get("langgraph_node") == 'Agent' and isinstance(message, AIMessage) and message.text():
+                                await events.put({"event": "token", "text": message.text()})
+                        elif chunk["type"] == "task":
+                            progress = self._progress_event(chunk["payload"])
+                            if progress is not None:
+                                await events.put(progress)
+                        elif chunk["type"] == "task_result" and chunk["payload"]["name"] == 'Agent':
+                            for channel, value in chunk["payload"]["result"]:
+                                if channel == 'messages':
+                                    answer = next((message.text() for message in reversed(value)
+                                                   if isinstance(message, AIMessage) and not message.tool_calls), answer)
+                await events.put({"event": "answer", "text": answer,
+                                  "thread_id": config.get("configurable", {}).get("thread_id"), "run_id": str(config["run_id"])})
+                await events.put(done)
+            except BaseException as e:
+                await events.put(e)
+                raise
+
+        producer = asyncio.create_task(produce())
+        try:
+            while (event := await events.get()) is not done:
+                if isinstance(event, BaseException):
+                    raise event
+                yield event
+        finally:
+            if not producer.done():
+                producer.cancel()
+            await asyncio.gather(producer, return_exceptions=True)
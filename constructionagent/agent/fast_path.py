@@ -0,0 +1,425 @@
+"""
+Deterministic fast-path intent classifier for the construction agent.
+
+This module provides a rule based alternative to the LLM backed
+`Query_Validation` node. The classifier is built from the tools fetched over
+MCP (their names and `args_schema`) plus a small table of domain synonyms, and
+it emits exactly the same JSON shape as the `query_validation_prompt`:
+
+    {"unrelated": bool, "intents": [{"tool", "is_ambiguous", "ambiguous_reason",
+                                     "arguments", "missing_arguments"}]}
+
+It only answers when it is confident, i.e. every clause of the query maps to a
+single tool and every required argument is spelled out explicitly (Room A,
+Drawing 101, D-205...). In the conjunction form ("the area and the pipe info of
+Room 101") a clause naming only a tool shares the arguments of the next clause.
+Anything vague, deictic ("this drawing"), negated ("not the area"), asking why
+or how rather than for a value, mentioning a number or identifier that is not
+bound to an argument ("room 101, 102", "in drawing 5", "larger than 50"), or
+containing too many unknown words is left to the LLM.
+"""
+
+import os
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+from constructionagent.agent.logger import logger
+
+# Fast-path configuration
+FAST_PATH_ENABLED = os.getenv("FAST_PATH_ENABLED", "true").lower() == "true"
+FAST_PATH_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_MIN_CONFIDENCE", "0.8"))
+# Used instead of the LLM while it is unavailable (circuit breaker open)
+FAST_PATH_DEGRADED_MIN_CONFIDENCE = float(os.getenv("FAST_PATH_DEGRADED_MIN_CONFIDENCE", "0.5"))
+
+# Words of a tool name that carry no intent on their own (get_scale -> scale)
+GENERIC_TOOL_WORDS = {"get", "query", "fetch", "info", "information", "details", "data"}
+
+# Synonyms for the intent carrying words of tool names
+INTENT_SYNONYMS = {
+    "area": ["area", "square meters", "square metres", "square feet", "sq m", "sqm",
+             "sq ft", "size", "footprint", "surface", "how big"],
+    "measure": ["measure", "measurement", "calculate", "compute"],
+    "scale": ["scale", "scaled", "ratio"],
+    "pipe": ["pipe", "pipes", "pipeline", "piping", "water line", "water lines",
+             "water main", "plumbing"],
+}
+
+# Nouns that introduce an argument value in a query (region -> "Room 101")
+ARGUMENT_SYNONYMS = {
+    "region": ["region", "room", "zone", "area", "section", "space", "unit", "block",
+               "wing", "bay", "floor", "level"],
+    "drawing": ["drawing", "plan", "sheet", "blueprint", "dwg", "layout"],
+    "location": ["location", "point", "junction", "node", "room", "zone", "region",
+                 "section", "grid", "floor", "level"],
+}
+
+# Words that make a query depend on conversation history
+DEICTIC_WORDS = {"this", "that", "these", "those", "it", "its", "here", "there",
+                 "same", "above", "previous", "former", "latter"}
+
+# Words that negate the query, which the classifier cannot represent
+NEGATION_WORDS = {"not", "never", "without", "except", "excluding", "nor", "neither",
+                  "isn't", "aren't", "wasn't", "weren't", "doesn't", "don't", "didn't",
+                  "won't", "can't", "cannot", "shouldn't", "wouldn't"}
+
+# Words asking for an explanation rather than a field value ("why is the area ...")
+EXPLANATION_WORDS = {"why", "explain", "reason", "cause", "caused"}
+# "how" asks for a value only when followed by one of these ("how big", "how many")
+HOW_QUANTITY_WORDS = {"many", "much", "big", "large", "small", "long", "wide", "far"}
+
+# Words that never change the meaning of a field query
+FILLER_WORDS = {
+    "what", "whats", "what's", "is", "are", "was", "the", "of", "a", "an", "please",
+    "can", "could", "would", "you", "tell", "me", "give", "show", "find", "how",
+    "many", "much", "in", "at", "for", "on", "i", "need", "want", "to", "know",
+    "and", "also", "info", "information", "details", "detail", "about", "used",
+    "by", "with", "near", "my", "we", "us", "be", "do", "does", "provide",
+    "check", "get", "fetch", "look", "up", "kindly", "quick", "quickly", "no",
+}
+
+# Queries made only of these words are small talk and therefore unrelated
+SMALL_TALK_WORDS = {"hello", "hi", "hey", "hiya", "yo", "thanks", "thank", "you",
+                    "bye", "goodbye", "good", "morning", "afternoon", "evening",
+                    "ok", "okay", "cheers", "there"}
+
+# Specific identifiers: contain a digit, or are short upper-case labels (A, B2, WP)
+IDENTIFIER_PATTERN = r"(?:[A-Za-z]{0,3}[-#]?\d(?:[\w/-]|\.(?=\w))*|(?-i:[A-Z]{1,3}\d*)\b|[a-z](?![\w']))"
+COORDINATE_PATTERN = r"\(?\s*-?\d+(?:\.\d+)?(?:\s*,\s*-?\d+(?:\.\d+)?){1,2}\s*\)?"
+CLAUSE_SPLIT_PATTERN = re.compile(r"\s+and\s+|\s*;\s*|\s+also\s+", re.IGNORECASE)
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+(?:['-][a-z0-9]+)*")
+
+
+class FastPathClassifier:
+    """
+    Rule based intent and slot classifier built from MCP tool schemas.
+
+    The classifier:
+    1. Derives intent keywords for each tool from its name and INTENT_SYNONYMS
+    2. Derives argument extractors from the required arguments in `args_schema`
+    3. Classifies each clause of a query and scores the result by how much of
+       the query it understood
+    4. Keeps hit/miss counters so the share of queries skipping the LLM is
+       observable
+    5. Completes intents awaiting clarification from the user's answer
+    """
+
+    def __init__(self, tools: List[Any], min_confidence: float = FAST_PATH_MIN_CONFIDENCE):
+        """
+        Build keyword and argument tables from the given tools.
+
+        Args:
+            tools (List[Any]): Tools fetched from MCP (need name and args_schema)
+            min_confidence (float): Minimum confidence needed to answer locally
+        """
+        self.min_confidence = min_confidence
+        self.hits = 0
+        self.misses = 0
+        self.slot_fills = 0
+        self.tool_keywords: Dict[str, re.Pattern] = {}
+        self.tool_arguments: Dict[str, List[str]] = {}
+        self.argument_patterns: Dict[str, re.Pattern] = {}
+        self.vocabulary = set(FILLER_WORDS)
+
+        for tool in tools:
+            schema = tool.args_schema if isinstance(tool.args_schema, dict) else tool.args_schema.model_json_schema()
+            keywords = []
+            for word in tool.name.lower().split("_"):
+                if word in GENERIC_TOOL_WORDS:
+                    continue
+                keywords.extend(INTENT_SYNONYMS.get(word, [word]))
+            self.tool_keywords[tool.name] = re.compile(
+                r"\b(?:" + "|".join(re.escape(k) for k in sorted(set(keywords), key=len, reverse=True)) + r")\b",
+                re.IGNORECASE
+            )
+            self.tool_arguments[tool.name] = list(schema.get("required", []))
+            for arg in self.tool_arguments[tool.name]:
+                if arg not in self.argument_patterns:
+                    self.argument_patterns[arg] = self._build_argument_pattern(arg)
+                self.vocabulary.update(ARGUMENT_SYNONYMS.get(arg, [arg]))
+            for keyword in keywords:
+                self.vocabulary.update(keyword.split())
+
+    @staticmethod
+    def _build_argument_pattern(arg: str) -> re.Pattern:
+        """
+        Build the regex that extracts a value for an argument.
+
+        Args:
+            arg (str): Argument name from the tool schema
+
+        Returns:
+            re.Pattern: Pattern whose `value` group is the argument value
+        """
+        nouns = "|".join(re.escape(noun) for noun in ARGUMENT_SYNONYMS.get(arg, [arg]))
+        value = (
+            rf"(?P<value>\b(?:{nouns})s?\s+(?:no\.?\s*|number\s+|#\s*)?{IDENTIFIER_PATTERN})"
+        )
+        if arg == "location":
+            value = rf"(?P<value>{COORDINATE_PATTERN}|\b(?:{nouns})\s+(?:no\.?\s*|#\s*)?{IDENTIFIER_PATTERN})"
+        return re.compile(value, re.IGNORECASE)
+
+    def extract_argument(self, arg: str, text: str) -> List[str]:
+        """
+        Extract every explicit value of an argument from a piece of text.
+
+        Args:
+            arg (str): Argument name from the tool schema
+            text (str): Text to extract values from
+
+        Returns:
+            List[str]: Values in order of appearance (may be empty)
+        """
+        pattern = self.argument_patterns.get(arg) or self._build_argument_pattern(arg)
+        return [match.group("value").strip() for match in pattern.finditer(text)]
+
+    def _match_tools(self, clause: str) -> List[str]:
+        """Return the tools whose intent keywords appear in a clause."""
+        return [name for name, pattern in self.tool_keywords.items() if pattern.search(clause)]
+
+    def _confidence(self, text: str, values: List[str]) -> float:
+        """
+        Score how much of a query the classifier understood.
+
+        Args:
+            text (str): The full user query
+            values (List[str]): Argument values extracted from the query
+
+        Returns:
+            float: Share of tokens that are known vocabulary or argument values
+        """
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if not tokens:
+            return 0.0
+        known = set(self.vocabulary)
+        for value in values:
+            known.update(TOKEN_PATTERN.findall(value.lower()))
+        return sum(1 for token in tokens if token in known) / len(tokens)
+
+    @staticmethod
+    def _asks_explanation(tokens: List[str]) -> bool:
+        """
+        Check whether a query asks why or how rather than for a value.
+
+        Args:
+            tokens (List[str]): Lower-cased query tokens
+
+        Returns:
+            bool: True for why questions and how questions other than
+            quantities ("how many", "how big")
+        """
+        if EXPLANATION_WORDS.intersection(tokens):
+            return True
+        return any(
+            token == "how" and (index + 1 == len(tokens) or tokens[index + 1] not in HOW_QUANTITY_WORDS)
+            for index, token in enumerate(tokens)
+        )
+
+    def _has_unbound_values(self, text: str, values: List[str]) -> bool:
+        """
+        Check whether a query specifies more than the extracted arguments.
+
+        Args:
+            text (str): The full user query
+            values (List[str]): Argument values extracted from the query
+
+        Returns:
+            bool: True if, once the values are removed, the query still holds a
+            number or an argument noun with an identifier ("102", "in drawing 5",
+            "in 2019"), which the intents would silently drop
+        """
+        for value in values:
+            text = re.sub(re.escape(value), " ", text, flags=re.IGNORECASE)
+        if any(char.isdigit() for char in text):
+            return True
+        return any(pattern.search(text) for pattern in self.argument_patterns.values())
+
+    def _shared_arguments(self, arg: str, clauses: List[str]) -> List[str]:
+        """
+        Find the values of an argument in the clauses following a tool-only clause.
+
+        Args:
+            arg (str): Argument name from the tool schema
+            clauses (List[str]): Clauses after the tool-only clause, in order
+
+        Returns:
+            List[str]: Values of the nearest clause that has any (may be empty)
+        """
+        for clause in clauses:
+            found = self.extract_argument(arg, clause)
+            if found:
+                return found
+        return []
+
+    def _classify(self, text: str) -> Tuple[Optional[Dict[str, Any]], float]:
+        """
+        Classify a query without touching the hit/miss counters.
+
+        Args:
+            text (str): The user query
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], float]: Validation JSON (or None) and
+            its confidence
+        """
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if not tokens or DEICTIC_WORDS.intersection(tokens):
+            return None, 0.0
+        if NEGATION_WORDS.intersection(tokens) or self._asks_explanation(tokens):
+            return None, 0.0
+        if all(token in SMALL_TALK_WORDS for token in tokens):
+            return {"unrelated": True, "intents": []}, 1.0
+
+        intents = []
+        values = []
+        previous_tool = None
+        clauses = [clause for clause in CLAUSE_SPLIT_PATTERN.split(text) if clause.strip()]
+        for index, clause in enumerate(clauses):
+            tools = self._match_tools(clause)
+            if len(tools) > 1:
+                return None, 0.0
+            tool = tools[0] if tools else previous_tool
+            if tool is None:
+                return None, 0.0
+            # "the area and the pipe info of Room 101": a clause naming only a tool
+            # shares the arguments of the following clauses
+            tool_only = bool(tools) and not any(self.extract_argument(arg, clause) for arg in self.argument_patterns)
+            arguments = {}
+            for arg in self.tool_arguments[tool]:
+                found = self.extract_argument(arg, clause)
+                if not found and tool_only:
+                    found = self._shared_arguments(arg, clauses[index + 1:])
+                if len(found) != 1:
+                    return None, 0.0
+                arguments[arg] = found[0]
+                values.append(found[0])
+            intents.append({
+                "tool": tool,
+                "is_ambiguous": False,
+                "ambiguous_reason": "",
+                "arguments": arguments,
+                "missing_arguments": []
+            })
+            previous_tool = tool
+
+        if not intents or self._has_unbound_values(text, values):
+            return None, 0.0
+        return {"unrelated": False, "intents": intents}, self._confidence(text, values)
+
+    def classify(self, text: str, min_confidence: Optional[float] = None) -> Optional[Dict[str, Any]]:
+        """
+        Classify a query locally if the result is confident enough.
+
+        Args:
+            text (str): The user query
+            min_confidence (Optional[float]): Confidence required instead of
+                the classifier's own
+
+        Returns:
+            Optional[Dict[str, Any]]: Validation JSON in the same shape as the
+            `query_validation_prompt` output, or None to fall back to the LLM
+        """
+        result, confidence = self._classify(text)
+        if result is None or confidence < (self.min_confidence if min_confidence is None else min_confidence):
+            self.misses += 1
+            logger.debug("Fast path miss", extra={"query": text, "confidence": confidence})
+            return None
+        self.hits += 1
+        logger.debug("Fast path hit", extra={"query": text, "confidence": confidence})
+        return result
+
+    def names_new_tools(self, pending_intents: List[Dict[str, Any]], text: str) -> bool:
+        """
+        Check whether a message asks for tools other than the pending ones.
+
+        Such a message is a new query rather than the answer to the
+        clarification, e.g. "What is the pipe info at room 4?" while the scale
+        of a drawing is pending.
+
+        Args:
+            pending_intents (List[Dict[str, Any]]): Ambiguous intents from the
+                previous turn
+            text (str): The user's message
+
+        Returns:
+            bool: True if the message names a tool that is not pending
+        """
+        pending_tools = {intent.get("tool") for intent in pending_intents}
+        return bool(set(self._match_tools(text)) - pending_tools)
+
+    def fill_missing_arguments(self, pending_intents: List[Dict[str, Any]], text: str) -> Optional[Dict[str, Any]]:
+        """
+        Complete intents awaiting clarification with the user's answer.
+
+        Args:
+            pending_intents (List[Dict[str, Any]]): Ambiguous intents from the
+                previous turn
+            text (str): The user's answer, e.g. "Room 101" or "D-205"
+
+        Returns:
+            Optional[Dict[str, Any]]: Validation JSON with every pending intent
+            completed, or None if the answer does not resolve all missing slots
+            or is a new query (see `names_new_tools`)
+        """
+        tokens = TOKEN_PATTERN.findall(text.lower())
+        if not tokens or DEICTIC_WORDS.intersection(tokens) or self.names_new_tools(pending_intents, text):
+            return None
+        missing = []
+        for index, intent in enumerate(pending_intents):
+            required = self.tool_arguments.get(intent.get("tool"))
+            if required is None:
+                return None
+            arguments = intent.get("arguments") or {}
+            for arg in required:
+                value = arguments.get(arg)
+                if arg in (intent.get("missing_arguments") or []) or not value or str(value).lower() == "null":
+                    missing.append((index, arg))
+        if not missing:
+            return None
+
+        values = {arg: self.extract_argument(arg, text) for _, arg in missing}
+        bare_value = text.strip(" .!?")
+        if (
+            len(missing) == 1
+            and not values[missing[0][1]]
+            and not all(token in SMALL_TALK_WORDS for token in tokens)
+            and re.fullmatch(IDENTIFIER_PATTERN, bare_value, re.IGNORECASE)
+        ):
+            values[missing[0][1]] = [bare_value]
+
+        intents = [
+            {
+                "tool": intent["tool"],
+                "is_ambiguous": False,
+                "ambiguous_reason": "",
+                "arguments": {arg: (intent.get("arguments") or {}).get(arg) for arg in self.tool_arguments[intent["tool"]]},
+                "missing_arguments": []
+            }
+            for intent in pending_intents
+        ]
+        for arg, found in values.items():
+            slots = [index for index, missing_arg in missing if missing_arg == arg]
+            if len(found) == 1:
+                found = found * len(slots)
+            if len(found) != len(slots):
+                return None
+            for index, value in zip(slots, found):
+                intents[index]["arguments"][arg] = value
+
+        self.slot_fills += 1
+        logger.debug("Pending intents completed by fast path", extra={"query": text, "intents": intents})
+        return {"unrelated": False, "intents": intents}
+
+    @property
+    def hit_rate(self) -> float:
+        """Share of classified queries that skipped the LLM."""
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the fast-path counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, hit rate and completed clarifications
+        """
+        return {"hits": self.hits, "misses": self.misses, "hit_rate": self.hit_rate, "slot_fills": self.slot_fills}
@@ -0,0 +1,294 @@
+"""
+Conversation history windowing and summarization.
+
+Every LLM call of the agent sends the conversation history, so prompt size and
+latency grow with the length of a conversation. This module keeps the history
+bounded before each turn. It includes:
+- Turn segmentation (a turn starts at a user message)
+- A window of the last K turns kept verbatim
+- A rolling summary of the older turns (extractive, or written by the LLM)
+- Removal of tool calls and tool payloads that have already been answered
+- A token budget that folds more turns into the summary when exceeded
+"""
+
+import os
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+
+from constructionagent.agent.logger import logger
+from constructionagent.agent.semantic_cache import parse_validation_json
+from constructionagent.utils.tokens import estimate_tokens
+
+# History configuration
+HISTORY_WINDOW_ENABLED = os.getenv("HISTORY_WINDOW_ENABLED", "true").lower() == "true"
+HISTORY_WINDOW_TURNS = int(os.getenv("HISTORY_WINDOW_TURNS", "4"))
+HISTORY_TOKEN_BUDGET = int(os.getenv("HISTORY_TOKEN_BUDGET", "2000"))
+HISTORY_SUMMARY_MAX_TOKENS = int(os.getenv("HISTORY_SUMMARY_MAX_TOKENS", "400"))
+# extractive | llm
+HISTORY_SUMMARY_MODE = os.getenv("HISTORY_SUMMARY_MODE", "extractive")
+
+# Characters kept from a question or answer in the extractive summary
+SUMMARY_LINE_CHARS = 160
+
+SUMMARY_PROMPT = (
+    "You maintain a running summary of a conversation between a user and a construction "
+    "drawing assistant. Update the summary with the new turns. Keep the drawings, regions, "
+    "locations and results that were mentioned; be concise. Reply with the summary only."
+)
+
+# Summarizes (previous summary, transcript of the folded turns) into a new summary
+Summarizer = Callable[[str, str], Awaitable[str]]
+
+
+def split_turns(messages: List[BaseMessage]) -> List[List[BaseMessage]]:
+    """
+    Split a conversation into turns, each starting with a user message.
+
+    Args:
+        messages (List[BaseMessage]): Conversation history
+
+    Returns:
+        List[List[BaseMessage]]: Turns in order (messages before the first
+        user message form their own turn)
+    """
+    turns: List[List[BaseMessage]] = []
+    for message in messages:
+        if isinstance(message, HumanMessage) or not turns:
+            turns.append([])
+        turns[-1].append(message)
+    return turns
+
+
+def message_text(message: BaseMessage) -> str:
+    """Plain text of a message, whatever the shape of its content."""
+    return message.content if isinstance(message.content, str) else message.text()
+
+
+def messages_tokens(messages: List[BaseMessage]) -> int:
+    """
+    Estimate the tokens of a list of messages.
+
+    Args:
+        messages (List[BaseMessage]): Messages to measure
+
+    Returns:
+        int: Estimated token count, including tool call arguments
+    """
+    return sum(
+        estimate_tokens(message_text(message)) + estimate_tokens(str(getattr(message, "tool_calls", "") or ""))
+        for message in messages
+    )
+
+
+def final_answer(turn: List[BaseMessage]) -> Optional[AIMessage]:
+    """
+    Find the answer given to the user in a turn.
+
+    Args:
+        turn (List[BaseMessage]): Messages of one turn
+
+    Returns:
+        Optional[AIMessage]: The last AI message that is neither a tool call
+        nor validation JSON, or None if the turn is unanswered
+    """
+    for message in reversed(turn):
+        if isinstance(message, AIMessage) and not message.tool_calls and message_text(message).strip():
+            if parse_validation_json(message_text(message)) is None:
+                return message
+    return None
+
+
+def shorten(text: str, limit: int = SUMMARY_LINE_CHARS) -> str:
+    """Collapse whitespace and truncate a text."""
+    text = " ".join(text.split())
+    return text if len(text) <= limit else text[:limit - 3].rstrip() + "..."
+
+
+class HistoryManager:
+    """
+    Keeps the conversation history within a window and a token budget.
+
+    Before each turn, the manager decides which messages to remove from state
+    and what the new rolling summary is:
+    1. Turns older than the last `window_turns` are folded into the summary
+    2. While the remaining history exceeds `token_budget`, the oldest turns are
+       folded too (the current turn is always kept)
+    3. In the kept turns, answered tool calls and their tool results are dropped
+    """
+
+    def __init__(
+        self,
+        window_turns: int = HISTORY_WINDOW_TURNS,
+        token_budget: int = HISTORY_TOKEN_BUDGET,
+        summary_max_tokens: int = HISTORY_SUMMARY_MAX_TOKENS,
+        summarizer: Optional[Summarizer] = None,
+    ):
+        """
+        Initialize the manager.
+
+        Args:
+            window_turns (int): Previous turns kept verbatim
+            token_budget (int): Maximum estimated tokens of the kept history
+            summary_max_tokens (int): Maximum estimated tokens of the extractive summary
+            summarizer (Optional[Summarizer]): LLM summarizer, extractive summary if None
+        """
+        self.window_turns = window_turns
+        self.token_budget = token_budget
+        self.summary_max_tokens = summary_max_tokens
+        self.summarizer = summarizer
+        self.metrics = {"folded_turns": 0, "dropped_tool_messages": 0, "removed_tokens": 0}
+
+    @staticmethod
+    def _drop_answered_tool_messages(turn: List[BaseMessage]) -> List[BaseMessage]:
+        """Return the tool calls and tool results of a turn that was answered."""
+        if final_answer(turn) is None:
+            return []
+        return [
+            message for message in turn
+            if isinstance(message, ToolMessage) or (isinstance(message, AIMessage) and message.tool_calls)
+        ]
+
+    def extractive_summary(self, previous: str, turns: List[List[BaseMessage]]) -> str:
+        """
+        Append one line per folded turn to the summary.
+
+        Args:
+            previous (str): Current summary
+            turns (List[List[BaseMessage]]): Turns to fold, oldest first
+
+        Returns:
+            str: The new summary, trimmed to its oldest lines beyond the budget
+        """
+        lines = [line for line in previous.splitlines() if line.strip()]
+        for turn in turns:
+            question = next((message_text(message) for message in turn if isinstance(message, HumanMessage)), "")
+            answer = final_answer(turn)
+            line = f"- User: {shorten(question)}"
+            line += f" | Assistant: {shorten(message_text(answer))}" if answer is not None else " | (unanswered)"
+            lines.append(line)
+        while len(lines) > 1 and estimate_tokens("\n".join(lines)) > self.summary_max_tokens:
+            lines.pop(0)
+        return "\n".join(lines)
+
+    async def _summarize(self, previous: str, turns: List[List[BaseMessage]]) -> str:
+        """Fold turns into the summary with the configured summarizer."""
+        if self.summarizer is None:
+            return self.extractive_summary(previous, turns)
+        transcript = "\n".join(
+            f"{message.type}: {shorten(message_text(message), 1000)}"
+            for turn in turns
+            for message in turn
+            if not isinstance(message, ToolMessage) and message_text(message).strip()
+        )
+        try:
+            return await self.summarizer(previous, transcript)
+        except Exception:
+            logger.warning("LLM summarization failed, using extractive summary", exc_info=True)
+            return self.extractive_summary(previous, turns)
+
+    async def window(self, messages: List[BaseMessage], summary: str = "") -> Tuple[List[BaseMessage], str]:
+        """
+        Decide which messages to keep for the turn that just started.
+
+        Args:
+            messages (List[BaseMessage]): Conversation history, ending with the
+                new user message
+            summary (str): Current rolling summary
+
+        Returns:
+            Tuple[List[BaseMessage], str]: Messages to remove from state and the
+            new summary
+        """
+        turns = split_turns(messages)
+        current, previous_turns = turns[-1], turns[:-1]
+        fold_count = max(0, len(previous_turns) - self.window_turns)
+        kept = previous_turns[fold_count:]
+
+        dropped = [message for turn in kept for message in self._drop_answered_tool_messages(turn)]
+        dropped_ids = {id(message) for message in dropped}
+        kept_tokens = messages_tokens([m for turn in kept + [current] for m in turn if id(m) not in dropped_ids])
+        while kept and kept_tokens > self.token_budget:
+            turn = kept.pop(0)
+            kept_tokens -= messages_tokens([m for m in turn if id(m) not in dropped_ids])
+            fold_count += 1
+
+        folded = previous_turns[:fold_count]
+        removed = [message for turn in folded for message in turn]
+        folded_ids = {id(message) for message in removed}
+        removed += [message for message in dropped if id(message) not in folded_ids]
+        if not removed:
+            return [], summary
+
+        if folded:
+            summary = await self._summarize(summary, folded)
+        self.metrics["folded_turns"] += len(folded)
+        self.metrics["dropped_tool_messages"] += len(removed) - len(folded_ids)
+        self.metrics["removed_tokens"] += messages_tokens(removed)
+        return removed, summary
+
+    async def __call__(self, state: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Graph node applying the window to the conversation state.
+
+        Args:
+            state (Dict[str, Any]): Current conversation state
+
+        Returns:
+            Dict[str, Any]: RemoveMessage updates and the new summary, or an
+            empty update if nothing changes
+        """
+        if not HISTORY_WINDOW_ENABLED:
+            return {}
+        removed, summary = await self.window(state["messages"], state.get("summary") or "")
+        if not removed:
+            return {}
+        logger.debug("History windowed", extra={"removed_messages": len(removed), **self.metrics})
+        return {
+            "messages": [RemoveMessage(id=message.id) for message in removed],
+            "summary": summary,
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the windowing counters.
+
+        Returns:
+            Dict[str, Any]: Folded turns, dropped tool messages and removed tokens
+        """
+        return dict(self.metrics)
+
+
+def summary_message(summary: Optional[str]) -> List[SystemMessage]:
+    """
+    Build the system message carrying the conversation summary.
+
+    Args:
+        summary (Optional[str]): Rolling summary from state
+
+    Returns:
+        List[SystemMessage]: One message, or none without a summary
+    """
+    if not summary:
+        return []
+    return [SystemMessage(content=f"Summary of the earlier conversation:\n{summary}")]
+
+
+def llm_summarizer(invoke: Callable[[List[BaseMessage]], Awaitable[AIMessage]]) -> Summarizer:
+    """
+    Build a summarizer backed by a chat model.
+
+    Args:
+        invoke (Callable[[List[BaseMessage]], Awaitable[AIMessage]]): Coroutine
+            function sending messages to the LLM
+
+    Returns:
+        Summarizer: Coroutine function updating a summary with a transcript
+    """
+    async def summarize(previous: str, transcript: str) -> str:
+        response = await invoke([
+            SystemMessage(content=SUMMARY_PROMPT),
+            HumanMessage(content=f"Current summary:\n{previous or '(empty)'}\n\nNew turns:\n{transcript}"),
+        ])
+        return message_text(response).strip()
+    return summarize
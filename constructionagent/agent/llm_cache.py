@@ -0,0 +1,367 @@
+"""
+Response cache for LLM calls.
+
+The LLM runs at temperature 0, so the same prompt to the same model with the
+same tools gets the same answer; evaluation runs and repeated production
+queries pay for it again on every call. This module caches responses under a
+content-addressed key. It includes:
+- llm_cache_key: hash of the model settings, bound tool schemas and messages
+- MemoryCacheTier: in-process LRU bounded by entries and bytes
+- SqliteCacheTier: optional on-disk tier shared by processes and restarts
+- LLMResponseCache: the tiers in front of the LLM, with TTL, per-node bypass
+  and hit/miss counters
+
+Responses are stored serialized, so every hit returns a fresh message.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, message_to_dict, messages_from_dict
+from langgraph.config import get_config
+
+from constructionagent.agent.logger import logger
+from constructionagent.agent.singleflight import normalize_messages, request_key
+
+# LLM cache configuration
+LLM_CACHE_ENABLED = os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true"
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "3600"))
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1024"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(32 * 1024 * 1024)))
+LLM_CACHE_SQLITE_PATH = os.getenv("LLM_CACHE_SQLITE_PATH", "")
+LLM_CACHE_SQLITE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_SQLITE_MAX_ENTRIES", "100000"))
+LLM_CACHE_BYPASS_NODES = [
+    node.strip() for node in os.getenv("LLM_CACHE_BYPASS_NODES", "").split(",") if node.strip()
+]
+
+# Sets between purges of the expired rows of the SQLite tier
+SQLITE_PURGE_EVERY = 256
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_last_used ON llm_cache (last_used);
+"""
+
+
+def llm_cache_key(llm: Any, messages: Sequence[BaseMessage]) -> str:
+    """
+    Hash what determines an LLM response.
+
+    Args:
+        llm (Any): Chat model, or a binding of one (e.g. with bound tools)
+        messages (Sequence[BaseMessage]): Prompt messages
+
+    Returns:
+        str: SHA-256 hex digest of the model, its sampling settings, the
+        bound tool schemas and the normalized messages
+    """
+    model = getattr(llm, "bound", llm)
+    bound = getattr(llm, "kwargs", None) or {}
+    return request_key(
+        type(model).__name__,
+        getattr(model, "model", None),
+        getattr(model, "temperature", None),
+        bound.get("tools"),
+        bound.get("tool_choice"),
+        normalize_messages(messages),
+    )
+
+
+def run_bypasses_cache() -> bool:
+    """Whether the running graph's config asks for fresh LLM answers ("llm_cache": False)."""
+    try:
+        return get_config().get("configurable", {}).get("llm_cache") is False
+    except RuntimeError:
+        return False
+
+
+class MemoryCacheTier:
+    """
+    In-process LRU of serialized responses.
+    """
+
+    def __init__(self, max_entries: int = LLM_CACHE_MAX_ENTRIES, max_bytes: int = LLM_CACHE_MAX_BYTES):
+        """
+        Initialize an empty tier.
+
+        Args:
+            max_entries (int): Entries kept
+            max_bytes (int): Total size of the values kept
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self.evictions = 0
+        # key -> (value, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, float]]" = OrderedDict()
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a live value, dropping it if it expired."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry[1] <= time.time():
+            self.delete(key)
+            return None
+        self._entries.move_to_end(key)
+        return entry[0]
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        """Store a value, evicting the least recently used ones beyond the limits."""
+        self.delete(key)
+        self._entries[key] = (value, expires_at)
+        self.bytes += len(value)
+        while self._entries and (len(self._entries) > self.max_entries or self.bytes > self.max_bytes):
+            _, (evicted, _) = self._entries.popitem(last=False)
+            self.bytes -= len(evicted)
+            self.evictions += 1
+
+    def delete(self, key: str) -> None:
+        """Drop a value."""
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= len(entry[0])
+
+    def clear(self) -> None:
+        """Drop every value."""
+        self._entries.clear()
+        self.bytes = 0
+
+    def close(self) -> None:
+        """Nothing to release."""
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the size and eviction counters."""
+        return {"entries": len(self._entries), "bytes": self.bytes, "evictions": self.evictions}
+
+
+class SqliteCacheTier:
+    """
+    On-disk tier of serialized responses in a SQLite database.
+
+    Expired rows are purged every SQLITE_PURGE_EVERY sets, and the least
+    recently used rows beyond `max_entries` are deleted at the same time.
+    """
+
+    def __init__(self, path: str = LLM_CACHE_SQLITE_PATH, max_entries: int = LLM_CACHE_SQLITE_MAX_ENTRIES):
+        """
+        Open (or create) the database.
+
+        Args:
+            path (str): Database file, ":memory:" for a throwaway database
+            max_entries (int): Rows kept
+        """
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.max_entries = max_entries
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+        self._sets = 0
+        self.evictions = 0
+
+    def get(self, key: str) -> Optional[str]:
+        """Get a live value and mark it used."""
+        now = time.time()
+        with self._lock:
+            row = self.conn.execute("SELECT value, expires_at FROM llm_cache WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                return None
+            if row[1] <= now:
+                self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                return None
+            self.conn.execute("UPDATE llm_cache SET last_used = ? WHERE key = ?", (now, key))
+            return row[0]
+
+    def set(self, key: str, value: str, expires_at: float) -> None:
+        """Store a value, purging expired and surplus rows from time to time."""
+        with self._lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, value, expires_at, last_used) VALUES (?, ?, ?, ?)",
+                (key, value, expires_at, time.time()),
+            )
+            self._sets += 1
+            if self._sets % SQLITE_PURGE_EVERY == 0:
+                self._purge()
+
+    def _purge(self) -> None:
+        """Delete expired rows, then the least recently used rows beyond the limit."""
+        self.conn.execute("DELETE FROM llm_cache WHERE expires_at <= ?", (time.time(),))
+        surplus = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0] - self.max_entries
+        if surplus > 0:
+            self.conn.execute(
+                "DELETE FROM llm_cache WHERE key IN (SELECT key FROM llm_cache ORDER BY last_used LIMIT ?)", (surplus,)
+            )
+            self.evictions += surplus
+
+    def delete(self, key: str) -> None:
+        """Drop a value."""
+        with self._lock:
+            self.conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+
+    def clear(self) -> None:
+        """Drop every value."""
+        with self._lock:
+            self.conn.execute("DELETE FROM llm_cache")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self.conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the size and eviction counters."""
+        with self._lock:
+            entries = self.conn.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        return {"entries": entries, "path": self.path, "evictions": self.evictions}
+
+
+class LLMResponseCache:
+    """
+    Tiered cache of LLM responses.
+
+    Tiers are looked up in order; a hit in a later tier is copied into the
+    earlier ones. Only complete answers are stored (text or well-formed tool
+    calls).
+    """
+
+    def __init__(
+        self,
+        tiers: Optional[List[Any]] = None,
+        ttl_seconds: float = LLM_CACHE_TTL_SECONDS,
+        bypass_nodes: Sequence[str] = LLM_CACHE_BYPASS_NODES,
+        enabled: bool = LLM_CACHE_ENABLED,
+    ):
+        """
+        Initialize the cache.
+
+        Args:
+            tiers (Optional[List[Any]]): Cache tiers (get/set/delete/clear/
+                close/stats), by default memory then SQLite when
+                LLM_CACHE_SQLITE_PATH is set
+            ttl_seconds (float): Lifetime of an entry
+            bypass_nodes (Sequence[str]): Nodes whose calls always go to the LLM
+            enabled (bool): Whether lookups and stores happen at all
+        """
+        if tiers is None:
+            tiers = [MemoryCacheTier()]
+            if LLM_CACHE_SQLITE_PATH:
+                tiers.append(SqliteCacheTier())
+        self.tiers = tiers
+        self.ttl_seconds = ttl_seconds
+        self.bypass_nodes = set(bypass_nodes)
+        self.enabled = enabled
+        # node -> {"hits", "misses", "stores", "bypassed"}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, node: str, counter: str) -> None:
+        """Increment a per-node counter."""
+        counters = self.counters.setdefault(node, {"hits": 0, "misses": 0, "stores": 0, "bypassed": 0})
+        counters[counter] += 1
+
+    def key(self, node: str, llm: Any, messages: Sequence[BaseMessage]) -> Optional[str]:
+        """
+        Get the cache key of a call.
+
+        Args:
+            node (str): Graph node (or component) making the call
+            llm (Any): Model to call
+            messages (Sequence[BaseMessage]): Prompt messages
+
+        Returns:
+            Optional[str]: The key, None if the call bypasses the cache
+        """
+        if not self.enabled:
+            return None
+        if node in self.bypass_nodes or run_bypasses_cache():
+            self._count(node, "bypassed")
+            return None
+        return llm_cache_key(llm, messages)
+
+    def get(self, node: str, key: str) -> Optional[AIMessage]:
+        """
+        Look up a response.
+
+        Args:
+            node (str): Graph node (or component) making the call
+            key (str): Cache key of the call
+
+        Returns:
+            Optional[AIMessage]: A fresh copy of the cached response, or None
+        """
+        for index, tier in enumerate(self.tiers):
+            value = tier.get(key)
+            if value is None:
+                continue
+            if index:
+                expires_at = time.time() + self.ttl_seconds
+                for earlier in self.tiers[:index]:
+                    earlier.set(key, value, expires_at)
+            self._count(node, "hits")
+            logger.debug("LLM cache hit", extra={"node": node, "tier": type(tier).__name__})
+            message = messages_from_dict([json.loads(value)])[0]
+            # A new id, so the message is not merged with an earlier one of the thread
+            message.id = None
+            return message
+        self._count(node, "misses")
+        return None
+
+    def put(self, node: str, key: str, response: AIMessage) -> None:
+        """
+        Store a response.
+
+        Args:
+            node (str): Graph node (or component) that made the call
+            key (str): Cache key of the call
+            response (AIMessage): LLM response
+        """
+        if getattr(response, "invalid_tool_calls", None) or not (response.content or response.tool_calls):
+            return
+        value = json.dumps(message_to_dict(response))
+        expires_at = time.time() + self.ttl_seconds
+        for tier in self.tiers:
+            tier.set(key, value, expires_at)
+        self._count(node, "stores")
+
+    def clear(self) -> None:
+        """Drop every response of every tier."""
+        for tier in self.tiers:
+            tier.clear()
+
+    def close(self) -> None:
+        """Release the tiers."""
+        for tier in self.tiers:
+            tier.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, Any]: Totals and hit ratio, per-node counters and tier sizes
+        """
+        totals = {"hits": 0, "misses": 0, "stores": 0, "bypassed": 0}
+        for counters in self.counters.values():
+            for name, value in counters.items():
+                totals[name] += value
+        lookups = totals["hits"] + totals["misses"]
+        return {
+            **totals,
+            "hit_ratio": totals["hits"] / lookups if lookups else 0.0,
+            "nodes": self.counters,
+            "tiers": {type(tier).__name__: tier.stats() for tier in self.tiers},
+        }
@@ -4,21 +4,47 @@ Logging and error handling for the construction agent.
 This module provides structured logging and custom exceptions for the agent.
 It includes:
 - Structured logging setup
+- A non-blocking logging pipeline: records are enqueued on the hot path and
+  formatted and written in batches by a background thread, with size and
+  time based rotation and optional gzip of rotated segments
 - Custom exception classes
 - Logging utilities
 """
 
+import atexit
+import copy
+import gzip
 import logging
+import logging.handlers
+import queue
+import shutil
 import sys
 import json
 import os
-from typing import Any, Dict, Optional
+import threading
+import time
+import traceback
+from typing import Any, Dict, List, Optional, TextIO
 from datetime import datetime
 from pathlib import Path
 
 # Logging configuration
 LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO")
 LOG_FILE_PATH = os.getenv("LOG_FILE_PATH", "logs/agent.log")
+# Write logs from a background thread (false restores synchronous handlers)
+LOG_ASYNC = os.getenv("LOG_ASYNC", "true").lower() == "true"
+LOG_CONSOLE = os.getenv("LOG_CONSOLE", "true").lower() == "true"
+LOG_QUEUE_SIZE = int(os.getenv("LOG_QUEUE_SIZE", "10000"))
+LOG_BATCH_SIZE = int(os.getenv("LOG_BATCH_SIZE", "256"))
+LOG_FLUSH_INTERVAL = float(os.getenv("LOG_FLUSH_INTERVAL", "0.5"))
+# Rotation of the log file, 0 disables the size or time trigger
+LOG_MAX_BYTES = int(os.getenv("LOG_MAX_BYTES", str(50 * 1024 * 1024)))
+LOG_ROTATE_INTERVAL = float(os.getenv("LOG_ROTATE_INTERVAL", "86400"))
+LOG_BACKUP_COUNT = int(os.getenv("LOG_BACKUP_COUNT", "10"))
+LOG_COMPRESS = os.getenv("LOG_COMPRESS", "true").lower() == "true"
+
+# Attributes every LogRecord has; anything else was passed with `extra=`
+RESERVED_RECORD_ATTRS = frozenset(vars(logging.LogRecord("", 0, "", 0, "", None, None))) | {"message", "asctime", "taskName"}
 
 class AgentError(Exception):
     """Base exception class for agent errors."""
@@ -45,13 +71,32 @@ class ConfigurationError(AgentError):
     """Raised when there's a configuration error."""
     pass
 
+class OverloadedError(AgentError):
+    """Raised when a request is shed because the agent is saturated."""
+    pass
+
+class LLMUnavailableError(AgentError):
+    """Raised when the LLM provider is failing and calls fail fast."""
+    pass
+
+def exception_fields(exc_info) -> Dict[str, Any]:
+    """Describe a logged exception: type, message, traceback and AgentError code."""
+    fields = {
+        "type": exc_info[0].__name__,
+        "message": str(exc_info[1]),
+        "traceback": "".join(traceback.format_exception(*exc_info)).rstrip("\n")
+    }
+    if isinstance(exc_info[1], AgentError):
+        fields["error_code"] = exc_info[1].error_code
+    return fields
+
 class JSONLogFormatter(logging.Formatter):
     """Custom formatter that outputs logs in JSON format."""
     
     def format(self, record: logging.LogRecord) -> str:
         """Format the log record as JSON."""
         log_data = {
-            "timestamp": datetime.utcnow().isoformat(),
+            "timestamp": datetime.utcfromtimestamp(record.created).isoformat(),
             "level": record.levelname,
             "logger": record.name,
             "message": record.getMessage(),
@@ -60,25 +105,296 @@ class JSONLogFormatter(logging.Formatter):
             "line": record.lineno
         }
         
-        # Add exception info if present
+        # Add exception info if present (BoundedQueueHandler resolves it
+        # before enqueueing, so it then arrives as an `exception` field)
         if record.exc_info:
-            log_data["exception"] = {
-                "type": record.exc_info[0].__name__,
-                "message": str(record.exc_info[1]),
-                "traceback": self.formatException(record.exc_info)
-            }
+            log_data["exception"] = exception_fields(record.exc_info)
         
-        # Add extra fields if present
-        if hasattr(record, "extra"):
-            log_data.update(record.extra)
+        # Add the fields passed with `extra=`, which logging sets as record attributes
+        for key, value in record.__dict__.items():
+            if key not in RESERVED_RECORD_ATTRS and key not in log_data:
+                log_data[key] = value
             
-        return json.dumps(log_data)
+        return json.dumps(log_data, default=str)
+
+class BoundedQueueHandler(logging.handlers.QueueHandler):
+    """
+    Handler enqueuing records for the background writer.
+    
+    Formatting is deferred to the writer thread; the hot path only resolves the
+    message and exception, snapshots the extras and puts the record on a
+    bounded queue. When the queue is full the
+    record is dropped and counted instead of blocking the event loop.
+    """
+    
+    def __init__(self, record_queue: queue.Queue):
+        """
+        Initialize the handler.
+        
+        Args:
+            record_queue (queue.Queue): Bounded queue read by the writer
+        """
+        super().__init__(record_queue)
+        self.enqueued = 0
+        self.dropped = 0
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        Freeze what the writer thread formats later.
+
+        The message and exception are resolved now, and dict, list and set
+        extras are copied, so values the caller mutates after logging (or an
+        exception it re-raises with another message) are logged as they were.
+        The record is copied, so other handlers of the record (e.g. pytest's
+        log capture) still see its exc_info.
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        for key, value in list(record.__dict__.items()):
+            if key not in RESERVED_RECORD_ATTRS and isinstance(value, (dict, list, set)):
+                record.__dict__[key] = copy.copy(value)
+        if record.exc_info:
+            record.exception = exception_fields(record.exc_info)
+            record.exc_info = record.exc_text = None
+        return record
+    
+    def enqueue(self, record: logging.LogRecord) -> None:
+        """Put the record on the queue, dropping it if the queue is full."""
+        try:
+            self.queue.put_nowait(record)
+            self.enqueued += 1
+        except queue.Full:
+            self.dropped += 1
+
+class RotatingLogFile:
+    """
+    Log file rotated by size and age.
+    
+    A rotated segment is renamed with its rotation time
+    (`agent.log.20250101-120000`), gzipped when `compress` is set, and the
+    oldest segments beyond `backup_count` are deleted.
+    """
+    
+    def __init__(self, path: str, max_bytes: int = LOG_MAX_BYTES, interval: float = LOG_ROTATE_INTERVAL,
+                 backup_count: int = LOG_BACKUP_COUNT, compress: bool = LOG_COMPRESS):
+        """
+        Open the log file for appending.
+        
+        Args:
+            path (str): Log file
+            max_bytes (int): Size that triggers a rotation, 0 disables
+            interval (float): Age in seconds that triggers a rotation, 0 disables
+            backup_count (int): Rotated segments kept
+            compress (bool): Whether rotated segments are gzipped
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.interval = interval
+        self.backup_count = backup_count
+        self.compress = compress
+        self.rotations = 0
+        self._open()
+    
+    def _open(self) -> None:
+        """Open the current segment and note its on-disk size and start time."""
+        self.stream = open(self.path, "a", encoding="utf-8")
+        self.size = self.path.stat().st_size
+        self.opened_at = time.time()
+    
+    def _should_rotate(self, pending: int, incoming: int) -> bool:
+        """
+        Whether `incoming` bytes must go to a new segment.
+        
+        Args:
+            pending (int): Bytes of the batch not yet written to the segment
+            incoming (int): Bytes of the next line
+        
+        Returns:
+            bool: True if the segment (with the pending bytes) is not empty and
+            a limit is reached
+        """
+        current = self.size + pending
+        if current == 0:
+            return False
+        if self.max_bytes and current + incoming > self.max_bytes:
+            return True
+        return bool(self.interval) and time.time() - self.opened_at >= self.interval
+    
+    def rotate(self) -> None:
+        """Close the current segment, archive it and open a new one."""
+        self.stream.close()
+        stamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+        target = self.path.with_name(f"{self.path.name}.{stamp}")
+        suffix = 1
+        while target.exists() or target.with_name(target.name + ".gz").exists():
+            target = self.path.with_name(f"{self.path.name}.{stamp}-{suffix}")
+            suffix += 1
+        self.path.rename(target)
+        if self.compress:
+            with open(target, "rb") as source, gzip.open(f"{target}.gz", "wb") as archive:
+                shutil.copyfileobj(source, archive)
+            target.unlink()
+        segments = sorted(self.path.parent.glob(f"{self.path.name}.*"), key=lambda segment: segment.stat().st_mtime)
+        for segment in segments[:max(0, len(segments) - self.backup_count)]:
+            segment.unlink(missing_ok=True)
+        self.rotations += 1
+        self._open()
+    
+    def write(self, text: str) -> None:
+        """
+        Append log lines, rotating between lines when a limit is reached.
+        
+        Args:
+            text (str): Complete log lines
+        """
+        chunk: List[str] = []
+        chunk_size = 0
+        for line in text.splitlines(keepends=True):
+            size = len(line.encode("utf-8"))
+            if self._should_rotate(chunk_size, size):
+                if chunk:
+                    self.stream.write("".join(chunk))
+                    self.size += chunk_size
+                    chunk, chunk_size = [], 0
+                self.rotate()
+            chunk.append(line)
+            chunk_size += size
+        self.stream.write("".join(chunk))
+        self.stream.flush()
+        self.size += chunk_size
+    
+    def close(self) -> None:
+        """Close the current segment."""
+        self.stream.close()
+
+class LogWriter(threading.Thread):
+    """
+    Background thread formatting and writing queued records in batches.
+    
+    The writer blocks until a record arrives, drains up to `batch_size`
+    records, and writes them with one call per sink. Dropped records are
+    reported with a warning line once the queue has room again.
+    """
+    
+    def __init__(self, record_queue: queue.Queue, handler: BoundedQueueHandler, formatter: logging.Formatter,
+                 log_file: Optional[RotatingLogFile], console: Optional[TextIO],
+                 batch_size: int = LOG_BATCH_SIZE, flush_interval: float = LOG_FLUSH_INTERVAL):
+        """
+        Initialize the writer.
+        
+        Args:
+            record_queue (queue.Queue): Queue filled by the handler
+            handler (BoundedQueueHandler): Handler whose drop counter is reported
+            formatter (logging.Formatter): Formatter of the records
+            log_file (Optional[RotatingLogFile]): File sink
+            console (Optional[TextIO]): Console sink
+            batch_size (int): Maximum records per write
+            flush_interval (float): Seconds waited for a record before checking for shutdown
+        """
+        super().__init__(name="log-writer", daemon=True)
+        self.queue = record_queue
+        self.handler = handler
+        self.formatter = formatter
+        self.log_file = log_file
+        self.console = console
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.written = 0
+        self.batches = 0
+        self.reported_drops = 0
+        self._stopping = threading.Event()
+    
+    def _format(self, record: logging.LogRecord) -> str:
+        """Format a record, never letting a bad record kill the writer."""
+        try:
+            return self.formatter.format(record)
+        except Exception as e:
+            return json.dumps({"level": "ERROR", "logger": __name__, "message": "Failed to format log record",
+                               "record": str(record.msg), "error": str(e)})
+    
+    def _write(self, records: List[logging.LogRecord]) -> None:
+        """Format and write one batch."""
+        lines = [self._format(record) for record in records]
+        dropped = self.handler.dropped
+        if dropped > self.reported_drops:
+            lines.append(json.dumps({
+                "timestamp": datetime.utcnow().isoformat(), "level": "WARNING", "logger": __name__,
+                "message": "Log records dropped, queue full", "dropped": dropped - self.reported_drops, "dropped_total": dropped,
+            }))
+            self.reported_drops = dropped
+        text = "\n".join(lines) + "\n"
+        for sink in (self.log_file, self.console):
+            if sink is None:
+                continue
+            try:
+                sink.write(text)
+                if sink is self.console:
+                    sink.flush()
+            except Exception:
+                pass
+        self.written += len(records)
+        self.batches += 1
+    
+    def run(self) -> None:
+        """Drain the queue until stopped and empty."""
+        while not (self._stopping.is_set() and self.queue.empty()):
+            try:
+                records = [self.queue.get(timeout=self.flush_interval)]
+            except queue.Empty:
+                continue
+            while len(records) < self.batch_size:
+                try:
+                    records.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+            self._write(records)
+    
+    def stop(self, timeout: float = 5.0) -> None:
+        """
+        Write the queued records and stop.
+        
+        Args:
+            timeout (float): Seconds to wait for the queue to drain
+        """
+        self._stopping.set()
+        self.join(timeout)
+        if self.log_file is not None:
+            self.log_file.close()
+
+_writer: Optional[LogWriter] = None
+
+def logging_stats() -> Dict[str, Any]:
+    """
+    Get the counters of the logging pipeline.
+    
+    Returns:
+        Dict[str, Any]: Enqueued, dropped and written records, batches,
+        rotations and current queue depth (empty with synchronous logging)
+    """
+    if _writer is None:
+        return {}
+    return {
+        "enqueued": _writer.handler.enqueued,
+        "dropped": _writer.handler.dropped,
+        "written": _writer.written,
+        "batches": _writer.batches,
+        "queue_depth": _writer.queue.qsize(),
+        "rotations": _writer.log_file.rotations if _writer.log_file else 0,
+    }
+
+def shutdown_logging() -> None:
+    """Flush and stop the background writer; called at interpreter exit."""
+    global _writer
+    if _writer is not None:
+        _writer.stop()
+        _writer = None
 
 def setup_logging() -> None:
     """Set up logging configuration for the application."""
-    # Create logs directory if it doesn't exist
-    log_dir = Path("logs")
-    log_dir.mkdir(exist_ok=True)
+    global _writer
+    shutdown_logging()
     
     # Configure root logger
     root_logger = logging.getLogger()
@@ -86,18 +402,29 @@ def setup_logging() -> None:
     
     # Clear existing handlers
     root_logger.handlers = []
+    formatter = JSONLogFormatter()
     
-    # Console handler with JSON formatting
-    console_handler = logging.StreamHandler(sys.stdout)
-    console_handler.setFormatter(JSONLogFormatter())
-    root_logger.addHandler(console_handler)
-    
-    # File handler for persistent logging
-    log_file = Path(LOG_FILE_PATH)
-    log_file.parent.mkdir(parents=True, exist_ok=True)
-    file_handler = logging.FileHandler(log_file)
-    file_handler.setFormatter(JSONLogFormatter())
-    root_logger.addHandler(file_handler)
+    if LOG_ASYNC:
+        # Enqueue on the hot path, format and write from the background thread
+        record_queue = queue.Queue(maxsize=LOG_QUEUE_SIZE)
+        handler = BoundedQueueHandler(record_queue)
+        _writer = LogWriter(record_queue, handler, formatter, RotatingLogFile(LOG_FILE_PATH),
+                            sys.stdout if LOG_CONSOLE else None)
+        _writer.start()
+        root_logger.addHandler(handler)
+    else:
+        # Console handler with JSON formatting
+        if LOG_CONSOLE:
+            console_handler = logging.StreamHandler(sys.stdout)
+            console_handler.setFormatter(formatter)
+            root_logger.addHandler(console_handler)
+        
+        # File handler for persistent logging
+        log_file = Path(LOG_FILE_PATH)
+        log_file.parent.mkdir(parents=True, exist_ok=True)
+        file_handler = logging.FileHandler(log_file)
+        file_handler.setFormatter(formatter)
+        root_logger.addHandler(file_handler)
     
     # Set logging levels for third-party libraries
     logging.getLogger("urllib3").setLevel(logging.WARNING)
@@ -117,6 +444,7 @@ def get_logger(name: str) -> logging.Logger:
 
 
 setup_logging()
+atexit.register(shutdown_logging)
 
 
 logger = get_logger(__name__) 
\ No newline at end of file
@@ -4,9 +4,17 @@ Configuration settings for the Model Context Protocol (MCP) client.
 This module defines the configuration constants used by the MCP client to connect
 to and interact with the tools and prompts servers. It includes:
 - Server configurations for tools and prompts
+- The transport mode of the bundled servers (stdio or in-process)
+- Session pool sizes per server
 - Required prompt names for the construction agent
 """
 
+import os
+
+# "stdio" runs the bundled servers as subprocesses, "in_process" mounts their
+# FastMCP apps in the agent's event loop (single-node deployments)
+MCP_TRANSPORT_MODE = os.getenv("MCP_TRANSPORT_MODE", "stdio")
+
 # Configuration for MCP client to connect to various servers
 MCP_CLIENT_CONFIG = {
     # Configuration for the tools server
@@ -22,6 +30,24 @@ MCP_CLIENT_CONFIG = {
     }
 }
 
+# FastMCP apps ("module:attribute") of the servers bundled in constructionagent/server
+IN_PROCESS_APPS = {
+    "tools_server": "constructionagent.server.tools:mcp",
+    "prompt_server": "constructionagent.server.prompts:mcp"
+}
+
+# In-process mode keeps the same server names (and MCP interfaces) but swaps the
+# transport of the bundled servers; any other (remote) server keeps its own
+if MCP_TRANSPORT_MODE == "in_process":
+    for _server_name, _app in IN_PROCESS_APPS.items():
+        MCP_CLIENT_CONFIG[_server_name] = {"transport": "in_process", "app": _app}
+
+# Number of warm sessions kept per server; servers not listed use MCP_POOL_SIZE
+# Prompts are only fetched at startup, so a single session is enough for them
+MCP_POOL_SIZES = {
+    "prompt_server": 1
+}
+
 # Dictionary mapping internal prompt names to their server-side names
 # These prompts are required for the construction agent to function properly
 REQUIRED_PROMPT_NAMES = {
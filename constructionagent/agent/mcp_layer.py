@@ -5,12 +5,74 @@ This module provides an interface to interact with the MCP server, which manages
 the tools and prompts used by the construction agent. It handles:
 - Tool retrieval and caching
 - Prompt management and caching
-- Server communication through MultiServerMCPClient
+- Snapshots of tool definitions and prompts for fast start-up
+- Server communication through pooled, long-lived MultiServerMCPClient sessions
+- Single-flight coalescing of identical concurrent calls to read-only tools
+- A TTL cache of read-only tool results, invalidated by drawing id
 """
 
 import asyncio
+import copy
+import importlib
+from typing import Any, Dict, List
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.tools import BaseTool, StructuredTool, ToolException
 from langchain_mcp_adapters.client import MultiServerMCPClient
-from constructionagent.agent.mcp_config import MCP_CLIENT_CONFIG
+from mcp.shared.memory import create_connected_server_and_client_session
+from mcp.types import CallToolResult, TextContent
+from constructionagent.agent.mcp_config import MCP_CLIENT_CONFIG, MCP_POOL_SIZES
+from constructionagent.agent.mcp_pool import MCPSessionPool, SessionFactory, MCP_POOL_SIZE
+from constructionagent.agent.logger import ConfigurationError
+from constructionagent.agent.tracing import tracer, SPAN_KIND_CLIENT
+from constructionagent.agent.singleflight import SingleFlight, request_key, SINGLEFLIGHT_ENABLED
+from constructionagent.agent.tool_cache import ToolResultCache
+
+
+def load_in_process_app(spec: str):
+    """
+    Import the FastMCP app of an in-process server.
+    
+    Args:
+        spec (str): "module:attribute" path of the FastMCP instance
+        
+    Returns:
+        FastMCP: The imported app
+        
+    Raises:
+        ConfigurationError: If the app cannot be imported
+    """
+    module_name, _, attribute = spec.partition(":")
+    try:
+        return getattr(importlib.import_module(module_name), attribute or "mcp")
+    except (ImportError, AttributeError) as e:
+        raise ConfigurationError(
+            message=f"Failed to load in-process MCP app '{spec}'",
+            error_code="MCP_IN_PROCESS_ERROR",
+            details={"error": str(e)}
+        )
+
+
+def convert_call_tool_result(result: CallToolResult):
+    """
+    Convert an MCP tool result to LangChain's content and artifact pair.
+    
+    Args:
+        result (CallToolResult): Raw MCP tool result
+        
+    Returns:
+        tuple: Text content (a string, or a list for several text blocks) and
+        the non-text contents (or None)
+        
+    Raises:
+        ToolException: If the server reported a tool error
+    """
+    texts = [content.text for content in result.content if isinstance(content, TextContent)]
+    others = [content for content in result.content if not isinstance(content, TextContent)]
+    tool_content = texts[0] if len(texts) == 1 else (texts or "")
+    if result.isError:
+        raise ToolException(tool_content)
+    return tool_content, others or None
+
 
 class MCPLayer:
     """
@@ -21,8 +83,9 @@ class MCPLayer:
     2. Manage and cache prompts
     3. Provide easy access to tools and prompts by name
     
-    The layer implements caching to minimize server requests and improve
-    performance.
+    The layer implements caching to minimize server requests and keeps a pool
+    of warm sessions per server, so a tool call costs an IPC round trip instead
+    of a server process start.
     """
 
     def __init__(self):
@@ -30,13 +93,166 @@ class MCPLayer:
         Initialize the MCP layer with a client connection.
         
         Sets up:
-        - MCP client connection using configuration
-        - Tools cache (initialized as None)
+        - MCP client connection using configuration (remote servers)
+        - Session pools per server (started on first use)
+        - Tools cache (initialized as None) and the MCP definitions behind it
         - Prompts cache (initialized as empty dict)
+        - Single-flight table of the tool calls in flight
+        - Result cache of the read-only tools
         """
-        self.client = MultiServerMCPClient(MCP_CLIENT_CONFIG)
+        self.client = MultiServerMCPClient({
+            name: connection for name, connection in MCP_CLIENT_CONFIG.items()
+            if connection["transport"] != "in_process"
+        })
+        self.pools: Dict[str, MCPSessionPool] = {}
+        # One lock per server, so servers start concurrently
+        self._pool_locks: Dict[str, asyncio.Lock] = {}
         self.tools = None
+        self.tool_definitions = []
         self.prompts = {}
+        self.tool_flight = SingleFlight("tools")
+        self.tool_cache = ToolResultCache()
+
+    def session_factory(self, server_name: str) -> SessionFactory:
+        """
+        Get the function opening new sessions to a server.
+        
+        In-process servers are connected through in-memory streams to their
+        FastMCP app running in the current event loop; every other server goes
+        through MultiServerMCPClient (stdio, SSE, streamable HTTP...).
+        
+        Args:
+            server_name (str): Name of the MCP server
+            
+        Returns:
+            SessionFactory: Function returning a session context manager
+        """
+        connection = MCP_CLIENT_CONFIG[server_name]
+        if connection["transport"] == "in_process":
+            app = load_in_process_app(connection["app"])
+            return lambda: create_connected_server_and_client_session(app._mcp_server)
+        return lambda: self.client.session(server_name)
+
+    async def get_pool(self, server_name: str) -> MCPSessionPool:
+        """
+        Get the session pool of a server, starting it on first use.
+        
+        A pool that fails to start closes itself and is not kept, so the next
+        call starts a fresh one. Pools of different servers start
+        concurrently; a slow server only holds up the calls to itself.
+        
+        Args:
+            server_name (str): Name of the MCP server
+            
+        Returns:
+            MCPSessionPool: The started pool
+        """
+        async with self._pool_locks.setdefault(server_name, asyncio.Lock()):
+            if server_name not in self.pools:
+                pool = MCPSessionPool(
+                    self.session_factory(server_name),
+                    server_name,
+                    size=MCP_POOL_SIZES.get(server_name, MCP_POOL_SIZE),
+                )
+                await pool.start()
+                self.pools[server_name] = pool
+            return self.pools[server_name]
+
+    def _to_langchain_tool(self, definition: Dict[str, Any]) -> BaseTool:
+        """
+        Convert an MCP tool definition to a LangChain tool backed by a pool.
+        
+        The pool is looked up on every call (and started if needed), so tools
+        restored from a snapshot work before any server was contacted. Calls
+        to tools annotated read-only or idempotent join an identical call in
+        flight instead of running again, and the results of read-only tools
+        are served from the tool cache while fresh.
+        
+        Args:
+            definition (Dict[str, Any]): Tool definition (server, name,
+                description, input_schema, annotations)
+            
+        Returns:
+            BaseTool: LangChain tool dispatching calls through the pool
+        """
+        server_name = definition["server"]
+        tool_name = definition["name"]
+        annotations = definition.get("annotations") or {}
+        # Only calls without side effects may be shared, and only reads
+        # cached; the definition hash keeps versions of a tool apart
+        coalesce = SINGLEFLIGHT_ENABLED and bool(annotations.get("readOnlyHint") or annotations.get("idempotentHint"))
+        cacheable = bool(annotations.get("readOnlyHint"))
+        version = request_key(definition)
+
+        async def execute(arguments: Dict[str, Any]):
+            with tracer.span(f"mcp.call_tool {tool_name}", kind=SPAN_KIND_CLIENT, attributes={"mcp.server": server_name, "mcp.tool": tool_name}):
+                pool = self.pools.get(server_name) or await self.get_pool(server_name)
+                result = await pool.call_tool(tool_name, arguments)
+                return convert_call_tool_result(result)
+
+        async def call_tool(**arguments: Dict[str, Any]):
+            cache_key = None
+            if cacheable and self.tool_cache.ttl(tool_name) > 0:
+                cache_key = self.tool_cache.key(tool_name, version, arguments)
+                cached = self.tool_cache.get(tool_name, cache_key)
+                if cached is not None:
+                    return cached
+            generation = self.tool_cache.generation
+            if not coalesce:
+                result, shared = await execute(arguments), False
+            else:
+                result, shared = await self.tool_flight.do(
+                    request_key(server_name, tool_name, version, arguments), lambda: execute(arguments)
+                )
+            if shared:
+                return copy.deepcopy(result)
+            if cache_key is not None:
+                self.tool_cache.put(tool_name, cache_key, arguments, result, generation)
+            return result
+
+        return StructuredTool(
+            name=tool_name,
+            description=definition["description"] or "",
+            args_schema=definition["input_schema"],
+            coroutine=call_tool,
+            response_format="content_and_artifact",
+            metadata=definition.get("annotations"),
+        )
+
+    async def list_tool_definitions(self) -> List[Dict[str, Any]]:
+        """
+        List the tool definitions of every server concurrently.
+        
+        Returns:
+            List[Dict[str, Any]]: JSON serializable tool definitions
+        """
+        async def _server_tools(server_name: str) -> list:
+            with tracer.span("mcp.list_tools", kind=SPAN_KIND_CLIENT, attributes={"mcp.server": server_name}):
+                pool = await self.get_pool(server_name)
+                tools = await pool.list_tools()
+            return [
+                {
+                    "server": server_name,
+                    "name": tool.name,
+                    "description": tool.description,
+                    "input_schema": tool.inputSchema,
+                    "annotations": tool.annotations.model_dump() if tool.annotations else None,
+                }
+                for tool in tools
+            ]
+
+        per_server = await asyncio.gather(*(_server_tools(name) for name in MCP_CLIENT_CONFIG))
+        return [definition for definitions in per_server for definition in definitions]
+
+    def set_tool_definitions(self, definitions: List[Dict[str, Any]]):
+        """
+        Replace the cached tools with the given definitions.
+        
+        Args:
+            definitions (List[Dict[str, Any]]): Tool definitions
+        """
+        self.tool_definitions = definitions
+        self.tools = [self._to_langchain_tool(definition) for definition in definitions]
 
     async def fetch_tools(self):
         """
@@ -49,7 +265,7 @@ class MCPLayer:
             Tools are cached after first fetch to minimize server requests
         """
         if not self.tools:
-            self.tools = await self.client.get_tools()
+            self.set_tool_definitions(await self.list_tool_definitions())
         return self.tools
 
     async def fetch_prompt(self, prompt_name: str, server_name: str = "prompt_server"):
@@ -66,7 +282,9 @@ class MCPLayer:
         Note:
             Fetched prompts are cached in the prompts dictionary
         """
-        prompt = await self.client.get_prompt(server_name=server_name, prompt_name=prompt_name)
+        with tracer.span(f"mcp.get_prompt {prompt_name}", kind=SPAN_KIND_CLIENT, attributes={"mcp.server": server_name, "mcp.prompt": prompt_name}):
+            pool = await self.get_pool(server_name)
+            prompt = await pool.get_prompt(prompt_name)
         self.prompts[prompt_name] = prompt
         return prompt
 
@@ -83,12 +301,13 @@ class MCPLayer:
             
         Note:
             - Prompts are fetched only if not already cached
+            - Prompts are fetched concurrently
             - All fetched prompts are cached for future use
         """
         if not self.prompts:
-            for name in prompt_names:
-                prompt = await self.fetch_prompt(name, server_name=server_name)
-                self.prompts[name] = prompt
+            await asyncio.gather(*(
+                self.fetch_prompt(name, server_name=server_name) for name in prompt_names
+            ))
         return self.prompts
 
     def get_tool(self, name: str):
@@ -122,3 +341,92 @@ class MCPLayer:
             Prompt or None: The requested prompt if found, None otherwise
         """
         return self.prompts.get(name) 
+
+    @staticmethod
+    def _serialize_prompts(prompts: Dict[str, list]) -> Dict[str, list]:
+        """Convert prompts (lists of LangChain messages) to JSON serializable dicts."""
+        return {
+            name: [
+                {"role": "assistant" if isinstance(message, AIMessage) else "user", "content": message.content}
+                for message in messages
+            ]
+            for name, messages in prompts.items()
+        }
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Export the cached tool definitions and prompts.
+        
+        Returns:
+            Dict[str, Any]: JSON serializable "tools" and "prompts"
+        """
+        return {"tools": self.tool_definitions, "prompts": self._serialize_prompts(self.prompts)}
+
+    def load_snapshot(self, snapshot: Dict[str, Any]):
+        """
+        Restore the tools and prompts caches from a snapshot.
+        
+        Args:
+            snapshot (Dict[str, Any]): Snapshot as produced by `snapshot`
+        """
+        self.set_tool_definitions(snapshot["tools"])
+        self.prompts = {
+            name: [
+                AIMessage(content=message["content"]) if message["role"] == "assistant"
+                else HumanMessage(content=message["content"])
+                for message in messages
+            ]
+            for name, messages in snapshot["prompts"].items()
+        }
+
+    async def fetch_snapshot(self, prompt_names: list[str], server_name: str = "prompt_server") -> Dict[str, Any]:
+        """
+        Fetch fresh tool definitions and prompts, bypassing the caches.
+        
+        Args:
+            prompt_names (list[str]): List of prompt names to fetch
+            server_name (str, optional): Name of the prompts MCP server. Defaults to "prompt_server"
+            
+        Returns:
+            Dict[str, Any]: Snapshot of the servers' current tools and prompts
+        """
+        async def _prompt(name: str):
+            with tracer.span(f"mcp.get_prompt {name}", kind=SPAN_KIND_CLIENT, attributes={"mcp.server": server_name, "mcp.prompt": name}):
+                pool = await self.get_pool(server_name)
+                return name, await pool.get_prompt(name)
+
+        definitions, prompts = await asyncio.gather(
+            self.list_tool_definitions(),
+            asyncio.gather(*(_prompt(name) for name in prompt_names)),
+        )
+        return {"tools": definitions, "prompts": self._serialize_prompts(dict(prompts))}
+
+    def invalidate_drawing(self, drawing_id: str) -> int:
+        """
+        Drop the cached tool results that may depend on a drawing.
+        
+        Call it when a drawing is re-uploaded.
+        
+        Args:
+            drawing_id (str): Drawing id as passed to the tools
+            
+        Returns:
+            int: Number of cached results dropped
+        """
+        return self.tool_cache.invalidate_drawing(drawing_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the session pool counters of every started server.
+        
+        Returns:
+            Dict[str, Any]: Pool statistics keyed by server name
+        """
+        return {name: pool.stats() for name, pool in self.pools.items()}
+
+    async def close(self):
+        """
+        Close every session pool and its server processes.
+        """
+        await asyncio.gather(*(pool.close() for pool in self.pools.values()))
+        self.pools = {}
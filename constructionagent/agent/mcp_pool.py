@@ -0,0 +1,376 @@
+"""
+Pool of long-lived MCP client sessions.
+
+Without a held session, every tool call made through `MultiServerMCPClient`
+opens a new session, which for stdio servers means spawning `uv run ...` and a
+fresh Python interpreter. This module keeps warm sessions instead, whatever the
+transport (stdio, HTTP or in-process). It includes:
+- PooledSession: one session (and server process) owned by a dedicated task
+- MCPSessionPool: N sessions per server with round-robin or least-busy
+  dispatch, periodic health checks and automatic restart on crash
+"""
+
+import asyncio
+import itertools
+import os
+from typing import Any, AsyncContextManager, Awaitable, Callable, Dict, List, Optional, TypeVar
+
+import anyio
+from langchain_mcp_adapters.prompts import load_mcp_prompt
+from mcp import ClientSession
+from mcp.shared.exceptions import McpError
+from mcp.types import CONNECTION_CLOSED
+
+from constructionagent.agent.logger import logger, ConfigurationError
+
+# Pool configuration
+MCP_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "2"))
+MCP_DISPATCH_POLICY = os.getenv("MCP_DISPATCH_POLICY", "least_busy")
+MCP_HEALTH_CHECK_INTERVAL = float(os.getenv("MCP_HEALTH_CHECK_INTERVAL", "30"))
+MCP_HEALTH_CHECK_TIMEOUT = float(os.getenv("MCP_HEALTH_CHECK_TIMEOUT", "5"))
+MCP_SESSION_START_TIMEOUT = float(os.getenv("MCP_SESSION_START_TIMEOUT", "60"))
+MCP_RESTART_BACKOFF = float(os.getenv("MCP_RESTART_BACKOFF", "1"))
+
+DISPATCH_POLICIES = ("least_busy", "round_robin")
+
+T = TypeVar("T")
+
+# Opens (and initializes) a new session to a server
+SessionFactory = Callable[[], AsyncContextManager[ClientSession]]
+
+
+def is_connection_error(error: BaseException) -> bool:
+    """
+    Check whether an error means the session (or its server process) is gone.
+
+    Args:
+        error (BaseException): Error raised by an MCP call
+
+    Returns:
+        bool: True if the session should be restarted
+    """
+    if isinstance(error, McpError):
+        return error.error.code == CONNECTION_CLOSED
+    return isinstance(
+        error,
+        (anyio.ClosedResourceError, anyio.BrokenResourceError, anyio.EndOfStream, ConnectionError),
+    )
+
+
+class PooledSession:
+    """
+    A single warm MCP session.
+
+    The session is opened and closed by a dedicated owner task because the
+    transports are built on anyio task groups, which must be exited by the task
+    that entered them. Restarts are requested by waking the owner task.
+    """
+
+    def __init__(self, session_factory: SessionFactory, server_name: str, index: int):
+        """
+        Initialize the pooled session (not started yet).
+
+        Args:
+            session_factory (SessionFactory): Opens an initialized session
+            server_name (str): Name of the server in the client configuration
+            index (int): Position of the session in its pool
+        """
+        self.session_factory = session_factory
+        self.server_name = server_name
+        self.index = index
+        self.session: Optional[ClientSession] = None
+        self.in_flight = 0
+        self.calls = 0
+        self.failures = 0
+        self.restarts = 0
+        self._ready = asyncio.Event()
+        self._wake = asyncio.Event()
+        self._restart_lock = asyncio.Lock()
+        self._stopping = False
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def healthy(self) -> bool:
+        """Whether the session is currently open."""
+        return self.session is not None
+
+    async def start(self, timeout: float = MCP_SESSION_START_TIMEOUT) -> None:
+        """
+        Start the owner task and wait until the session is initialized.
+
+        If the session does not come up in time, the owner task is cancelled
+        so it stops respawning the server.
+
+        Args:
+            timeout (float): Seconds to wait for the session to come up
+
+        Raises:
+            asyncio.TimeoutError: If the session did not come up in time
+        """
+        self._task = asyncio.create_task(self._run(), name=f"mcp-{self.server_name}-{self.index}")
+        try:
+            await asyncio.wait_for(self._ready.wait(), timeout)
+        except BaseException:
+            await self.cancel()
+            raise
+
+    async def _run(self) -> None:
+        """Open the session, hold it until woken, and reopen it until stopped."""
+        while not self._stopping:
+            try:
+                async with self.session_factory() as session:
+                    self.session = session
+                    self._ready.set()
+                    await self._wake.wait()
+            except Exception:
+                logger.warning(
+                    "MCP session terminated",
+                    exc_info=True,
+                    extra={"server": self.server_name, "session_index": self.index},
+                )
+                if not self._stopping:
+                    await asyncio.sleep(MCP_RESTART_BACKOFF)
+            finally:
+                self.session = None
+                self._wake.clear()
+
+    async def restart(self, timeout: float = MCP_SESSION_START_TIMEOUT) -> None:
+        """
+        Replace the session with a fresh one (and a fresh server process).
+
+        Concurrent callers share a single restart.
+
+        Args:
+            timeout (float): Seconds to wait for the new session to come up
+        """
+        if self._restart_lock.locked():
+            async with self._restart_lock:
+                return
+        async with self._restart_lock:
+            logger.info("Restarting MCP session", extra={"server": self.server_name, "session_index": self.index})
+            self.session = None
+            self._ready.clear()
+            self._wake.set()
+            self.restarts += 1
+            await asyncio.wait_for(self._ready.wait(), timeout)
+
+    async def check_health(self, timeout: float = MCP_HEALTH_CHECK_TIMEOUT) -> bool:
+        """
+        Ping the server.
+
+        Args:
+            timeout (float): Seconds to wait for the ping response
+
+        Returns:
+            bool: True if the server answered in time
+        """
+        session = self.session
+        if session is None:
+            return False
+        try:
+            await asyncio.wait_for(session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    async def stop(self) -> None:
+        """Close the session and stop the owner task."""
+        self._stopping = True
+        self._wake.set()
+        if self._task is not None and not self._task.done():
+            await self._task
+
+    async def cancel(self) -> None:
+        """Stop the owner task without waiting for a session being opened."""
+        self._stopping = True
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPSessionPool:
+    """
+    Pool of warm sessions to one MCP server.
+
+    Calls are dispatched to the least busy (or next, for round-robin) healthy
+    session. A call failing because its session died restarts that session and
+    is retried once; a background task pings every idle session and restarts
+    the ones that stopped answering.
+    """
+
+    def __init__(
+        self,
+        session_factory: SessionFactory,
+        server_name: str,
+        size: int = MCP_POOL_SIZE,
+        policy: str = MCP_DISPATCH_POLICY,
+        health_check_interval: float = MCP_HEALTH_CHECK_INTERVAL,
+        start_timeout: float = MCP_SESSION_START_TIMEOUT,
+    ):
+        """
+        Initialize the pool (not started yet).
+
+        Args:
+            session_factory (SessionFactory): Opens an initialized session
+            server_name (str): Name of the server in the client configuration
+            size (int): Number of warm sessions
+            policy (str): Dispatch policy, "least_busy" or "round_robin"
+            health_check_interval (float): Seconds between health checks
+            start_timeout (float): Seconds to wait for each session to come up
+
+        Raises:
+            ConfigurationError: If the dispatch policy is unknown
+        """
+        if policy not in DISPATCH_POLICIES:
+            raise ConfigurationError(
+                message=f"Unknown MCP dispatch policy '{policy}'",
+                error_code="MCP_POOL_CONFIG_ERROR",
+                details={"policy": policy, "expected": list(DISPATCH_POLICIES)}
+            )
+        self.server_name = server_name
+        self.policy = policy
+        self.health_check_interval = health_check_interval
+        self.start_timeout = start_timeout
+        self.sessions = [PooledSession(session_factory, server_name, i) for i in range(max(1, size))]
+        self._round_robin = itertools.cycle(range(len(self.sessions)))
+        self._health_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """
+        Start every session concurrently and the health check loop.
+
+        If a session fails to start, the pool is closed (no owner task or
+        server process is left behind) and the first error is raised.
+        """
+        results = await asyncio.gather(*(session.start(self.start_timeout) for session in self.sessions), return_exceptions=True)
+        errors = [result for result in results if isinstance(result, BaseException)]
+        if errors:
+            await self.close()
+            raise errors[0]
+        if self.health_check_interval > 0:
+            self._health_task = asyncio.create_task(
+                self._health_loop(), name=f"mcp-health-{self.server_name}"
+            )
+        logger.info("MCP session pool started", extra={"server": self.server_name, "size": len(self.sessions)})
+
+    async def _health_loop(self) -> None:
+        """Periodically ping every session and restart the unresponsive ones."""
+        while True:
+            await asyncio.sleep(self.health_check_interval)
+            for session in self.sessions:
+                if session.in_flight == 0 and not await session.check_health():
+                    try:
+                        await session.restart()
+                    except Exception:
+                        logger.error("Failed to restart MCP session", exc_info=True, extra={"server": self.server_name})
+
+    def _select(self) -> PooledSession:
+        """Pick a session according to the dispatch policy."""
+        healthy = [session for session in self.sessions if session.healthy]
+        candidates = healthy or self.sessions
+        if self.policy == "round_robin":
+            for _ in range(len(self.sessions)):
+                session = self.sessions[next(self._round_robin)]
+                if session in candidates:
+                    return session
+        return min(candidates, key=lambda session: session.in_flight)
+
+    async def run(self, operation: Callable[[ClientSession], Awaitable[T]]) -> T:
+        """
+        Run an operation on a pooled session.
+
+        Args:
+            operation (Callable[[ClientSession], Awaitable[T]]): Coroutine
+                function receiving the session to use
+
+        Returns:
+            T: Result of the operation
+        """
+        for attempt in range(2):
+            pooled = self._select()
+            if not pooled.healthy:
+                await pooled.restart()
+            pooled.in_flight += 1
+            pooled.calls += 1
+            try:
+                return await operation(pooled.session)
+            except Exception as e:
+                if not is_connection_error(e) or attempt:
+                    raise
+                pooled.failures += 1
+                logger.warning("MCP session lost, retrying call", extra={"server": self.server_name, "session_index": pooled.index})
+                await pooled.restart()
+            finally:
+                pooled.in_flight -= 1
+
+    async def call_tool(self, name: str, arguments: Dict[str, Any]):
+        """
+        Call a tool on the server.
+
+        Args:
+            name (str): Tool name
+            arguments (Dict[str, Any]): Tool arguments
+
+        Returns:
+            CallToolResult: Raw MCP tool result
+        """
+        return await self.run(lambda session: session.call_tool(name, arguments))
+
+    async def list_tools(self) -> List[Any]:
+        """
+        List every tool exposed by the server.
+
+        Returns:
+            List[Any]: MCP tool definitions
+        """
+        async def _list(session: ClientSession) -> List[Any]:
+            tools, cursor = [], None
+            while True:
+                page = await session.list_tools(cursor=cursor)
+                tools.extend(page.tools)
+                cursor = page.nextCursor
+                if cursor is None:
+                    return tools
+        return await self.run(_list)
+
+    async def get_prompt(self, name: str, arguments: Optional[Dict[str, Any]] = None):
+        """
+        Fetch a prompt from the server as LangChain messages.
+
+        Args:
+            name (str): Prompt name
+            arguments (Optional[Dict[str, Any]]): Prompt arguments
+
+        Returns:
+            list: LangChain messages of the prompt
+        """
+        return await self.run(lambda session: load_mcp_prompt(session, name, arguments=arguments))
+
+    async def close(self) -> None:
+        """Stop the health check loop and every session."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+        await asyncio.gather(*(session.stop() for session in self.sessions), return_exceptions=True)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get per-session counters.
+
+        Returns:
+            Dict[str, Any]: Calls, failures, restarts and in-flight calls per session
+        """
+        return {
+            "server": self.server_name,
+            "policy": self.policy,
+            "sessions": [
+                {
+                    "index": session.index,
+                    "healthy": session.healthy,
+                    "in_flight": session.in_flight,
+                    "calls": session.calls,
+                    "failures": session.failures,
+                    "restarts": session.restarts,
+                }
+                for session in self.sessions
+            ],
+        }
@@ -0,0 +1,327 @@
+"""
+Token and prompt-size accounting for the agent's LLM calls.
+
+Every LLM call of `AgentGraph` goes through `AgentGraph._invoke_llm`, which
+records one sample in the agent's `MetricsRegistry`. Samples are aggregated
+per graph node and per conversation thread:
+- Input and output tokens (provider usage metadata, local estimate otherwise)
+- Prompt bytes and message count, to catch prompt bloat regressions
+- Latency (mean, percentiles, max) and errors
+
+The registry is in-process; `snapshot` returns it as a dict and `dump` writes
+it as JSON (automatically on `AgentGraph.close` when METRICS_DUMP_PATH is set).
+"""
+
+import json
+import os
+import threading
+import time
+from collections import OrderedDict, deque
+from pathlib import Path
+from typing import Any, Dict, Optional, Sequence
+
+from langchain_core.messages import BaseMessage
+from langgraph.config import get_config
+
+from constructionagent.agent.logger import logger
+from constructionagent.utils.stats import percentile
+from constructionagent.utils.tokens import estimate_tokens
+
+# Metrics configuration
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "true").lower() == "true"
+METRICS_DUMP_PATH = os.getenv("METRICS_DUMP_PATH", "")
+# Threads with per-thread counters, least recently active threads are dropped beyond it
+METRICS_MAX_THREADS = int(os.getenv("METRICS_MAX_THREADS", "10000"))
+
+# Number of recent latencies kept per node for percentiles
+LATENCY_WINDOW = 1024
+# Thread id of calls made outside a graph run
+NO_THREAD = "-"
+
+
+def current_thread_id() -> str:
+    """
+    Get the conversation thread of the running graph.
+
+    Returns:
+        str: The thread_id of the current run's config, or "-" outside a run
+    """
+    try:
+        return str(get_config().get("configurable", {}).get("thread_id", NO_THREAD))
+    except RuntimeError:
+        return NO_THREAD
+
+
+def prompt_bytes(messages: Sequence[BaseMessage]) -> int:
+    """
+    Measure the size of a prompt as sent to the provider.
+
+    Args:
+        messages (Sequence[BaseMessage]): Prompt messages
+
+    Returns:
+        int: UTF-8 bytes of the message contents and tool call arguments
+    """
+    size = 0
+    for message in messages:
+        content = message.content if isinstance(message.content, str) else json.dumps(message.content)
+        size += len(content.encode("utf-8"))
+        tool_calls = getattr(message, "tool_calls", None)
+        if tool_calls:
+            size += len(json.dumps(tool_calls, default=str).encode("utf-8"))
+    return size
+
+
+def call_sample(messages: Sequence[BaseMessage], response: Optional[BaseMessage]) -> Dict[str, Any]:
+    """
+    Measure one LLM call.
+
+    Token counts come from the response's usage metadata when the provider
+    returns it and are estimated locally otherwise.
+
+    Args:
+        messages (Sequence[BaseMessage]): Prompt messages
+        response (Optional[BaseMessage]): LLM response, None if the call failed
+
+    Returns:
+        Dict[str, Any]: Input and output tokens, prompt bytes and message count
+    """
+    usage = getattr(response, "usage_metadata", None) or {}
+    input_tokens = usage.get("input_tokens") or sum(
+        estimate_tokens(message.content if isinstance(message.content, str) else json.dumps(message.content))
+        for message in messages
+    )
+    output_tokens = usage.get("output_tokens")
+    if output_tokens is None:
+        output_tokens = estimate_tokens(response.text()) if response is not None else 0
+    return {"input_tokens": input_tokens, "output_tokens": output_tokens,
+            "prompt_bytes": prompt_bytes(messages), "message_count": len(messages)}
+
+
+class LLMCallStats:
+    """
+    Counters of the LLM calls made by one node (or one node of one thread).
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        Initialize empty counters.
+
+        Args:
+            window (int): Number of recent latencies kept for percentiles
+        """
+        self.calls = 0
+        self.errors = 0
+        self.input_tokens = 0
+        self.output_tokens = 0
+        self.prompt_bytes = 0
+        self.messages = 0
+        self.max_input_tokens = 0
+        self.max_prompt_bytes = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, input_tokens: int, output_tokens: int, size: int, message_count: int, latency_ms: float, error: bool) -> None:
+        """
+        Record one call.
+
+        Args:
+            input_tokens (int): Prompt tokens
+            output_tokens (int): Completion tokens
+            size (int): Prompt bytes
+            message_count (int): Prompt messages
+            latency_ms (float): Call latency in milliseconds
+            error (bool): Whether the call raised
+        """
+        self.calls += 1
+        self.errors += int(error)
+        self.input_tokens += input_tokens
+        self.output_tokens += output_tokens
+        self.prompt_bytes += size
+        self.messages += message_count
+        self.max_input_tokens = max(self.max_input_tokens, input_tokens)
+        self.max_prompt_bytes = max(self.max_prompt_bytes, size)
+        self.total_ms += latency_ms
+        self.max_ms = max(self.max_ms, latency_ms)
+        self.latencies.append(latency_ms)
+
+    def percentile(self, q: float) -> float:
+        """
+        Get a latency percentile over the recent window.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in milliseconds (0.0 without data)
+        """
+        return percentile(self.latencies, q)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the counters.
+
+        Returns:
+            Dict[str, Any]: Totals, per-call means and latency percentiles
+        """
+        calls = self.calls or 1
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "input_tokens": self.input_tokens,
+            "output_tokens": self.output_tokens,
+            "prompt_bytes": self.prompt_bytes,
+            "mean_input_tokens": self.input_tokens / calls,
+            "mean_output_tokens": self.output_tokens / calls,
+            "mean_prompt_bytes": self.prompt_bytes / calls,
+            "mean_messages": self.messages / calls,
+            "max_input_tokens": self.max_input_tokens,
+            "max_prompt_bytes": self.max_prompt_bytes,
+            "mean_ms": self.total_ms / calls,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "max_ms": self.max_ms,
+        }
+
+
+class MetricsRegistry:
+    """
+    In-process registry of LLM call metrics, per node and per thread.
+
+    Per-thread counters are kept for the `max_threads` most recently active
+    threads so a long running server does not grow without bound.
+    """
+
+    def __init__(self, max_threads: int = METRICS_MAX_THREADS, enabled: bool = METRICS_ENABLED):
+        """
+        Initialize an empty registry.
+
+        Args:
+            max_threads (int): Threads with per-thread counters
+            enabled (bool): Whether samples are recorded
+        """
+        self.enabled = enabled
+        self.max_threads = max_threads
+        self.started_at = time.time()
+        self.nodes: Dict[str, LLMCallStats] = {}
+        self.threads: "OrderedDict[str, Dict[str, LLMCallStats]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def record_call(
+        self,
+        node: str,
+        messages: Sequence[BaseMessage],
+        response: Optional[BaseMessage],
+        latency_ms: float,
+        thread_id: Optional[str] = None,
+    ) -> Dict[str, Any]:
+        """
+        Record one LLM call (measured with `call_sample`).
+
+        Args:
+            node (str): Graph node (or component) that made the call
+            messages (Sequence[BaseMessage]): Prompt messages
+            response (Optional[BaseMessage]): LLM response, None if the call failed
+            latency_ms (float): Call latency in milliseconds
+            thread_id (Optional[str]): Conversation thread, the current run's thread if None
+
+        Returns:
+            Dict[str, Any]: The recorded sample (tokens, prompt bytes, message
+            count), empty when metrics are disabled
+        """
+        if not self.enabled:
+            return {}
+        thread_id = thread_id or current_thread_id()
+        measured = call_sample(messages, response)
+        input_tokens, output_tokens = measured["input_tokens"], measured["output_tokens"]
+        sample = (input_tokens, output_tokens, measured["prompt_bytes"], len(messages), latency_ms, response is None)
+
+        with self._lock:
+            self.nodes.setdefault(node, LLMCallStats()).record(*sample)
+            thread = self.threads.pop(thread_id, None) or {}
+            thread.setdefault(node, LLMCallStats()).record(*sample)
+            self.threads[thread_id] = thread
+            while len(self.threads) > self.max_threads:
+                self.threads.popitem(last=False)
+        logger.info("LLM call", extra={
+            "node": node, "thread_id": thread_id, "input_tokens": input_tokens, "output_tokens": output_tokens,
+            "prompt_bytes": sample[2], "message_count": len(messages), "latency_ms": round(latency_ms, 1),
+        })
+        return measured
+
+    def node_stats(self, node: str) -> Dict[str, Any]:
+        """
+        Get the counters of one node.
+
+        Args:
+            node (str): Graph node
+
+        Returns:
+            Dict[str, Any]: Counters, empty if the node made no call
+        """
+        with self._lock:
+            stats = self.nodes.get(node)
+            return stats.to_dict() if stats else {}
+
+    def thread_stats(self, thread_id: str) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the per-node counters of one thread.
+
+        Args:
+            thread_id (str): Conversation thread
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Counters per node, empty if unknown
+        """
+        with self._lock:
+            return {node: stats.to_dict() for node, stats in self.threads.get(thread_id, {}).items()}
+
+    def snapshot(self, include_threads: bool = True) -> Dict[str, Any]:
+        """
+        Export the registry.
+
+        Args:
+            include_threads (bool): Whether per-thread counters are included
+
+        Returns:
+            Dict[str, Any]: Totals, per-node and optionally per-thread counters
+        """
+        with self._lock:
+            nodes = {node: stats.to_dict() for node, stats in self.nodes.items()}
+            threads = {
+                thread_id: {node: stats.to_dict() for node, stats in thread.items()}
+                for thread_id, thread in self.threads.items()
+            } if include_threads else None
+        totals = {
+            key: sum(stats[key] for stats in nodes.values())
+            for key in ("calls", "errors", "input_tokens", "output_tokens", "prompt_bytes")
+        }
+        snapshot = {"started_at": self.started_at, "uptime_s": time.time() - self.started_at, "totals": totals, "nodes": nodes}
+        if threads is not None:
+            snapshot["threads"] = threads
+        return snapshot
+
+    def dump(self, path: str = METRICS_DUMP_PATH, include_threads: bool = True) -> Path:
+        """
+        Write the registry as JSON.
+
+        Args:
+            path (str): Output file
+            include_threads (bool): Whether per-thread counters are included
+
+        Returns:
+            Path: The written file
+        """
+        output = Path(path)
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(self.snapshot(include_threads), indent=2))
+        logger.info("Metrics dumped", extra={"path": str(output)})
+        return output
+
+    def reset(self) -> None:
+        """Drop every counter."""
+        with self._lock:
+            self.nodes.clear()
+            self.threads.clear()
+            self.started_at = time.time()
@@ -0,0 +1,296 @@
+"""
+Per-node model routing for the agent's LLM calls.
+
+Every node used to call the one GOOGLE_GENAI_MODEL. With MODEL_ROUTES each
+node gets its own model, declared as JSON:
+    {
+        "Query_Validation": {"model": "gemini-2.0-flash-lite", "escalate_to": "gemini-2.0-flash"},
+        "Agent": {"model": "gemini-2.0-flash", "complex_model": "gemini-2.5-pro", "complex_min_tools": 2},
+        "History": "gemini-2.0-flash-lite"
+    }
+- model: model of the node's calls (GOOGLE_GENAI_MODEL when the node has no route)
+- complex_model: model of the calls summarizing at least complex_min_tools
+  tool results (multi-tool answers)
+- escalate_to: model the call is repeated with when the response is unusable,
+  e.g. validation JSON that does not parse
+
+It includes:
+- ModelRoute: the parsed route of one node
+- RouteStats: LLM call counters of one (node, model) route with cost and escalations
+- ModelRouter: model selection, lazily built (and tool-bound) models and route metrics
+
+Cost is computed from MODEL_PRICES, USD per million input and output tokens,
+e.g. {"gemini-2.0-flash": [0.10, 0.40]}; models without a price cost 0.
+"""
+
+import json
+import os
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional, Sequence, Tuple
+
+from constructionagent.agent.logger import logger
+from constructionagent.agent.metrics import LLMCallStats
+
+# Model routing configuration
+MODEL_ROUTES = json.loads(os.getenv("MODEL_ROUTES", "{}"))
+MODEL_PRICES = json.loads(os.getenv("MODEL_PRICES", "{}"))
+# Tool results an answer summarizes before it is routed to the node's complex_model
+MODEL_COMPLEX_MIN_TOOLS = int(os.getenv("MODEL_COMPLEX_MIN_TOOLS", "2"))
+
+
+@dataclass(frozen=True)
+class ModelRoute:
+    """
+    Models of one node.
+    """
+
+    model: Optional[str] = None
+    complex_model: Optional[str] = None
+    complex_min_tools: int = MODEL_COMPLEX_MIN_TOOLS
+    escalate_to: Optional[str] = None
+
+    @classmethod
+    def parse(cls, spec: Any) -> "ModelRoute":
+        """
+        Parse a MODEL_ROUTES entry.
+
+        Args:
+            spec (Any): Model name, or dict with model, complex_model,
+                complex_min_tools and escalate_to
+
+        Returns:
+            ModelRoute: The route
+
+        Raises:
+            ValueError: If the entry is neither a string nor a dict of known keys
+        """
+        if isinstance(spec, str):
+            return cls(model=spec)
+        if isinstance(spec, dict) and set(spec) <= set(cls.__dataclass_fields__):
+            return cls(**spec)
+        raise ValueError(f"Invalid model route: {spec!r}")
+
+
+class RouteStats(LLMCallStats):
+    """
+    Counters of the LLM calls of one (node, model) route.
+    """
+
+    def __init__(self, price: Optional[Sequence[float]] = None):
+        """
+        Initialize empty counters.
+
+        Args:
+            price (Optional[Sequence[float]]): USD per million input and
+                output tokens, None if unknown
+        """
+        super().__init__()
+        self.price = price
+        self.cost_usd = 0.0
+        self.escalations = 0
+
+    def record_cost(self, input_tokens: int, output_tokens: int) -> float:
+        """
+        Add the cost of one call.
+
+        Args:
+            input_tokens (int): Prompt tokens
+            output_tokens (int): Completion tokens
+
+        Returns:
+            float: Cost of the call in USD (0.0 without a price)
+        """
+        if not self.price:
+            return 0.0
+        cost = (input_tokens * self.price[0] + output_tokens * self.price[1]) / 1_000_000
+        self.cost_usd += cost
+        return cost
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the counters.
+
+        Returns:
+            Dict[str, Any]: LLM call counters plus cost, mean cost per call and
+            the responses escalated to another model
+        """
+        return {
+            **super().to_dict(),
+            "cost_usd": self.cost_usd,
+            "mean_cost_usd": self.cost_usd / (self.calls or 1),
+            "escalations": self.escalations,
+            "priced": bool(self.price),
+        }
+
+
+class ModelRouter:
+    """
+    Picks the model of each LLM call and keeps the metrics of every route.
+
+    The default model (GOOGLE_GENAI_MODEL) is the agent's own `llm`; the other
+    models are built on first use with `factory` and bound to the agent's tools.
+    """
+
+    def __init__(
+        self,
+        default_model: str,
+        factory: Callable[[str], Any],
+        routes: Optional[Dict[str, Any]] = None,
+        prices: Optional[Dict[str, Sequence[float]]] = None,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            default_model (str): Name of the default model
+            factory (Callable[[str], Any]): Builds a chat model from its name
+            routes (Optional[Dict[str, Any]]): Routes per node (defaults to MODEL_ROUTES)
+            prices (Optional[Dict[str, Sequence[float]]]): Prices per model
+                (defaults to MODEL_PRICES)
+
+        Raises:
+            ValueError: If a route is invalid
+        """
+        self.default_model = default_model
+        self.factory = factory
+        self.routes = {node: ModelRoute.parse(spec) for node, spec in (MODEL_ROUTES if routes is None else routes).items()}
+        self.prices = MODEL_PRICES if prices is None else prices
+        self.default_llm = None
+        self.tools = None
+        # model -> chat model, (model, with tools) -> chat model as called
+        self._models: Dict[str, Any] = {}
+        self._bound: Dict[Tuple[str, bool], Any] = {}
+        # (node, model) -> counters
+        self.stats_by_route: Dict[Tuple[str, str], RouteStats] = {}
+        self._lock = threading.Lock()
+
+    def configure(self, default_llm: Any, tools: Optional[Sequence[Any]]) -> None:
+        """
+        Set the default model and the tools bound to every model.
+
+        Called whenever the agent's tools change; models are rebound on next use.
+
+        Args:
+            default_llm (Any): Chat model of `default_model`
+            tools (Optional[Sequence[Any]]): Tools the models are bound to
+        """
+        self.default_llm = default_llm
+        self.tools = tools
+        self._bound.clear()
+
+    def route(self, node: str, tool_results: int = 0) -> str:
+        """
+        Pick the model of a call.
+
+        Args:
+            node (str): Graph node (or component) making the call
+            tool_results (int): Tool results the call summarizes
+
+        Returns:
+            str: Model name
+        """
+        route = self.routes.get(node)
+        if route is None:
+            return self.default_model
+        if route.complex_model and tool_results >= route.complex_min_tools:
+            return route.complex_model
+        return route.model or self.default_model
+
+    def escalation(self, node: str, model: str) -> Optional[str]:
+        """
+        Get the model an unusable response of `model` is escalated to.
+
+        Args:
+            node (str): Graph node (or component) that made the call
+            model (str): Model that answered
+
+        Returns:
+            Optional[str]: Model name, None when the node does not escalate
+            or `model` already is its escalation model
+        """
+        route = self.routes.get(node)
+        if route is None or not route.escalate_to or route.escalate_to == model:
+            return None
+        return route.escalate_to
+
+    def llm(self, model: str, with_tools: bool = True) -> Any:
+        """
+        Get a chat model, bound to the tools if asked.
+
+        Args:
+            model (str): Model name
+            with_tools (bool): Whether the model is bound to the agent's tools
+
+        Returns:
+            Any: The chat model
+        """
+        with_tools = with_tools and self.tools is not None
+        bound = self._bound.get((model, with_tools))
+        if bound is None:
+            if model == self.default_model:
+                base = self.default_llm
+            else:
+                base = self._models.get(model)
+                if base is None:
+                    logger.info("Building routed model", extra={"model": model})
+                    base = self._models[model] = self.factory(model)
+            bound = self._bound[(model, with_tools)] = base.bind_tools(self.tools) if with_tools else base
+        return bound
+
+    def _stats(self, node: str, model: str) -> RouteStats:
+        """Get (or create) the counters of a route."""
+        stats = self.stats_by_route.get((node, model))
+        if stats is None:
+            stats = self.stats_by_route[(node, model)] = RouteStats(self.prices.get(model))
+        return stats
+
+    def record_call(self, node: str, model: str, sample: Dict[str, Any], latency_ms: float, error: bool) -> float:
+        """
+        Record one LLM call of a route.
+
+        Args:
+            node (str): Graph node (or component) that made the call
+            model (str): Model called
+            sample (Dict[str, Any]): Sample recorded by the `MetricsRegistry`
+                (input and output tokens, prompt bytes, message count)
+            latency_ms (float): Call latency in milliseconds
+            error (bool): Whether the call raised
+
+        Returns:
+            float: Cost of the call in USD
+        """
+        input_tokens, output_tokens = sample.get("input_tokens", 0), sample.get("output_tokens", 0)
+        with self._lock:
+            stats = self._stats(node, model)
+            stats.record(input_tokens, output_tokens, sample.get("prompt_bytes", 0), sample.get("message_count", 0), latency_ms, error)
+            return stats.record_cost(input_tokens, output_tokens)
+
+    def record_escalation(self, node: str, model: str, escalate_to: str) -> None:
+        """
+        Count a response of `model` escalated to another model.
+
+        Args:
+            node (str): Graph node (or component) that made the call
+            model (str): Model whose response was unusable
+            escalate_to (str): Model the call is repeated with
+        """
+        with self._lock:
+            self._stats(node, model).escalations += 1
+        logger.warning("Escalating LLM call", extra={"node": node, "model": model, "escalate_to": escalate_to})
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the route counters.
+
+        Returns:
+            Dict[str, Any]: Total cost and escalations, and the counters per
+            node and model
+        """
+        with self._lock:
+            routes: Dict[str, Dict[str, Any]] = {}
+            for (node, model), stats in self.stats_by_route.items():
+                routes.setdefault(node, {})[model] = stats.to_dict()
+            cost = sum(stats.cost_usd for stats in self.stats_by_route.values())
+            escalations = sum(stats.escalations for stats in self.stats_by_route.values())
+        return {"default_model": self.default_model, "cost_usd": cost, "escalations": escalations, "routes": routes}
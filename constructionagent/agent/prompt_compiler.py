@@ -0,0 +1,134 @@
+"""
+Compilation of the validation system prompt.
+
+The `Query_Validation` node needs the `query_validation_prompt` rendered with a
+numbered description of every MCP tool. Both inputs only change when the MCP
+servers change, so this module renders the prompt once per tool-set/prompt
+version and hands the same artifact to every turn and thread. It includes:
+- Tool description rendering from tool names, docstrings and `args_schema`
+- The CompiledPrompt artifact (message, content hash, token count)
+- A compiler that recompiles only when its inputs' fingerprint changes
+"""
+
+import hashlib
+import json
+from dataclasses import dataclass
+from typing import Any, List, Optional
+
+from langchain_core.messages import SystemMessage
+
+from constructionagent.agent.logger import logger
+from constructionagent.utils.tokens import estimate_tokens
+
+
+def _schema_dict(tool: Any) -> dict:
+    """Return a tool's `args_schema` as a JSON schema dictionary."""
+    if isinstance(tool.args_schema, dict):
+        return tool.args_schema
+    return tool.args_schema.model_json_schema()
+
+
+def render_tool_descriptions(tools: List[Any]) -> str:
+    """
+    Render the numbered tool list used in the validation prompt.
+
+    Args:
+        tools (List[Any]): Tools fetched from MCP
+
+    Returns:
+        str: A numbered list of tool descriptions
+    """
+    descriptions = []
+    for tool in tools:
+        description = tool.description.strip().split("\n")[0]
+        schema = _schema_dict(tool)
+        args = schema.get('properties', {})
+        arg_list = [
+            f"{arg}: {args.get(arg, {}).get('type', 'string')}"
+            for arg in schema.get('required', [])
+        ]
+        descriptions.append(f"{tool.name}({', '.join(arg_list)}) → {description}")
+    return "\n".join(f"{i+1}.{d}" for i, d in enumerate(descriptions))
+
+
+def tools_fingerprint(tools: List[Any]) -> str:
+    """
+    Hash the parts of the tools that end up in prompts.
+
+    Args:
+        tools (List[Any]): Tools fetched from MCP
+
+    Returns:
+        str: SHA-256 hex digest of names, descriptions and argument schemas
+    """
+    payload = json.dumps(
+        [[tool.name, tool.description, _schema_dict(tool)] for tool in tools],
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+@dataclass(frozen=True)
+class CompiledPrompt:
+    """
+    Immutable, fully rendered system prompt.
+
+    Attributes:
+        message: The rendered SystemMessage, shared by every turn
+        tool_descriptions: The numbered tool list rendered into the prompt
+        content_hash: SHA-256 of the rendered content
+        token_count: Estimated number of tokens of the rendered content
+        source_fingerprint: Hash of the tools and template it was built from
+    """
+    message: SystemMessage
+    tool_descriptions: str
+    content_hash: str
+    token_count: int
+    source_fingerprint: str
+
+
+class PromptCompiler:
+    """
+    Compiles the validation prompt and caches the result.
+
+    `compile` is cheap to call repeatedly: it only fingerprints its inputs and
+    re-renders when the tools or the template actually changed.
+    """
+
+    def __init__(self):
+        """Initialize the compiler with no compiled prompt."""
+        self.compiled: Optional[CompiledPrompt] = None
+        self.compilations = 0
+
+    def compile(self, tools: List[Any], template: str) -> CompiledPrompt:
+        """
+        Return the compiled validation prompt for the given tools and template.
+
+        Args:
+            tools (List[Any]): Tools fetched from MCP
+            template (str): The `query_validation_prompt` content
+
+        Returns:
+            CompiledPrompt: The (possibly cached) compiled prompt
+        """
+        fingerprint = hashlib.sha256(
+            (tools_fingerprint(tools) + template).encode("utf-8")
+        ).hexdigest()
+        if self.compiled is not None and self.compiled.source_fingerprint == fingerprint:
+            return self.compiled
+
+        tool_descriptions = render_tool_descriptions(tools)
+        content = template.format(tool_descriptions=tool_descriptions)
+        self.compiled = CompiledPrompt(
+            message=SystemMessage(content=content),
+            tool_descriptions=tool_descriptions,
+            content_hash=hashlib.sha256(content.encode("utf-8")).hexdigest(),
+            token_count=estimate_tokens(content),
+            source_fingerprint=fingerprint,
+        )
+        self.compilations += 1
+        logger.info(
+            "Compiled validation prompt",
+            extra={"content_hash": self.compiled.content_hash, "token_count": self.compiled.token_count},
+        )
+        return self.compiled
@@ -0,0 +1,395 @@
+"""
+Resilient LLM calls.
+
+One slow or failing Gemini response used to stall or sink the whole turn.
+This module wraps every LLM call of `AgentGraph` with:
+- Retries with jittered exponential backoff for retryable errors (timeouts,
+  connection errors, 408/429/5xx, Google's ResourceExhausted and friends)
+- Hedging: a duplicate request is sent when the first one is slower than the
+  recent p95 of its node; the first answer wins and the other is cancelled
+- A circuit breaker: when too many recent calls failed, calls fail fast with
+  LLMUnavailableError until a cool-down passes and a probe call succeeds
+
+Hedging is limited to LLM_HEDGE_NODES (the Agent answer is streamed to users,
+so duplicating it would duplicate tokens) and to LLM_HEDGE_MAX_RATIO of the
+calls, so a provider that is slow for everyone does not get twice the load.
+For the same reason a streamed call is neither retried nor hedged once its
+first token went out (see StreamedOutput): the error is raised instead.
+"""
+
+import asyncio
+import os
+import random
+import time
+from collections import deque
+from typing import Any, Awaitable, Callable, Deque, Dict, Optional, TypeVar
+
+from langchain_core.callbacks import AsyncCallbackHandler
+
+from constructionagent.agent.logger import logger, LLMUnavailableError
+from constructionagent.utils.stats import percentile
+
+# Resilience configuration
+LLM_RESILIENCE_ENABLED = os.getenv("LLM_RESILIENCE_ENABLED", "true").lower() == "true"
+LLM_CALL_TIMEOUT = float(os.getenv("LLM_CALL_TIMEOUT", "60"))
+LLM_RETRY_ATTEMPTS = int(os.getenv("LLM_RETRY_ATTEMPTS", "3"))
+LLM_RETRY_BASE_DELAY = float(os.getenv("LLM_RETRY_BASE_DELAY", "0.5"))
+LLM_RETRY_MAX_DELAY = float(os.getenv("LLM_RETRY_MAX_DELAY", "8"))
+LLM_HEDGE_NODES = [
+    node.strip() for node in os.getenv("LLM_HEDGE_NODES", "Query_Validation,Clarification,History").split(",") if node.strip()
+]
+LLM_HEDGE_PERCENTILE = float(os.getenv("LLM_HEDGE_PERCENTILE", "95"))
+LLM_HEDGE_MIN_DELAY = float(os.getenv("LLM_HEDGE_MIN_DELAY", "0.5"))
+LLM_HEDGE_MIN_SAMPLES = int(os.getenv("LLM_HEDGE_MIN_SAMPLES", "20"))
+LLM_HEDGE_MAX_RATIO = float(os.getenv("LLM_HEDGE_MAX_RATIO", "0.1"))
+LLM_BREAKER_WINDOW = int(os.getenv("LLM_BREAKER_WINDOW", "20"))
+LLM_BREAKER_MIN_CALLS = int(os.getenv("LLM_BREAKER_MIN_CALLS", "10"))
+LLM_BREAKER_FAILURE_RATE = float(os.getenv("LLM_BREAKER_FAILURE_RATE", "0.5"))
+LLM_BREAKER_COOLDOWN = float(os.getenv("LLM_BREAKER_COOLDOWN", "30"))
+
+# Successful latencies kept per node for the hedge delay
+LATENCY_WINDOW = 200
+
+RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+RETRYABLE_ERROR_NAMES = frozenset({
+    "ResourceExhausted", "ServiceUnavailable", "DeadlineExceeded", "InternalServerError",
+    "TooManyRequests", "BadGateway", "GatewayTimeout", "Aborted",
+})
+
+BREAKER_CLOSED = "closed"
+BREAKER_OPEN = "open"
+BREAKER_HALF_OPEN = "half_open"
+
+T = TypeVar("T")
+
+
+def is_retryable(error: BaseException) -> bool:
+    """
+    Check whether an LLM error is transient.
+
+    The error and its causes are inspected, since client libraries wrap the
+    transport errors in their own types.
+
+    Args:
+        error (BaseException): Error raised by an LLM call
+
+    Returns:
+        bool: True for timeouts, connection errors, retryable HTTP statuses
+        and Google's transient API errors
+    """
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, (TimeoutError, ConnectionError)):
+            return True
+        for attribute in ("code", "status_code"):
+            code = getattr(error, attribute, None)
+            if isinstance(code, int) and code in RETRYABLE_STATUS_CODES:
+                return True
+        if any(cls.__name__ in RETRYABLE_ERROR_NAMES for cls in type(error).__mro__):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
+
+
+def backoff_delay(attempt: int, base: float = LLM_RETRY_BASE_DELAY, maximum: float = LLM_RETRY_MAX_DELAY) -> float:
+    """
+    Get the wait before a retry ("equal jitter" exponential backoff).
+
+    Args:
+        attempt (int): Number of the failed attempt, from 1
+        base (float): Wait after the first attempt, in seconds
+        maximum (float): Cap of the wait, in seconds
+
+    Returns:
+        float: Seconds, between half and all of min(maximum, base * 2^(attempt - 1))
+    """
+    ceiling = min(maximum, base * 2 ** (attempt - 1))
+    return ceiling / 2 + random.uniform(0, ceiling / 2)
+
+
+class StreamedOutput(AsyncCallbackHandler):
+    """
+    Callback handler noting whether a call streamed tokens.
+
+    Passed with the callbacks of a streamed LLM call, its `started` is the
+    `committed` check of `ResilientCaller.call`: tokens that reached the user
+    cannot be taken back, so the call must not be repeated.
+    """
+
+    def __init__(self):
+        """Initialize the handler before any token."""
+        self.started = False
+
+    async def on_llm_new_token(self, token: str, **kwargs: Any) -> None:
+        """Note the first token."""
+        self.started = True
+
+
+class CircuitBreaker:
+    """
+    Failure-rate circuit breaker over the most recent calls.
+
+    closed -> open when at least `min_calls` of the last `window` calls were
+    made and `failure_rate` of them failed; open -> half_open after
+    `cooldown` seconds; half_open lets one probe through, which closes the
+    circuit on success and opens it again on failure.
+    """
+
+    def __init__(self, window: int = LLM_BREAKER_WINDOW, min_calls: int = LLM_BREAKER_MIN_CALLS,
+                 failure_rate: float = LLM_BREAKER_FAILURE_RATE, cooldown: float = LLM_BREAKER_COOLDOWN):
+        """
+        Initialize a closed breaker.
+
+        Args:
+            window (int): Recent call outcomes considered
+            min_calls (int): Outcomes needed before the breaker can open
+            failure_rate (float): Share of failures that opens the breaker
+            cooldown (float): Seconds the breaker stays open
+        """
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.cooldown = cooldown
+        self.state = BREAKER_CLOSED
+        self.opened_at = 0.0
+        self.opened = 0
+        self.rejected = 0
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._probing = False
+
+    def retry_after(self) -> float:
+        """Seconds until the breaker lets a probe through (0 unless open)."""
+        if self.state != BREAKER_OPEN:
+            return 0.0
+        return max(0.0, self.opened_at + self.cooldown - time.monotonic())
+
+    def allow(self) -> None:
+        """
+        Let a call through, or fail fast.
+
+        Raises:
+            LLMUnavailableError: If the breaker is open, or half open with its
+                probe in flight
+        """
+        if self.state == BREAKER_OPEN and self.retry_after() <= 0:
+            self.state = BREAKER_HALF_OPEN
+            logger.info("LLM circuit half open, probing")
+        if self.state == BREAKER_CLOSED:
+            return
+        if self.state == BREAKER_HALF_OPEN and not self._probing:
+            self._probing = True
+            return
+        self.rejected += 1
+        raise LLMUnavailableError(
+            message="LLM provider is unavailable",
+            error_code="LLM_CIRCUIT_OPEN",
+            details={"state": self.state, "retry_after": max(1, round(self.retry_after()))},
+        )
+
+    def record(self, success: bool) -> None:
+        """
+        Record the outcome of a call that was let through.
+
+        Args:
+            success (bool): False for a provider failure
+        """
+        if self.state == BREAKER_HALF_OPEN:
+            self._probing = False
+            if success:
+                self.state = BREAKER_CLOSED
+                self._outcomes.clear()
+                logger.info("LLM circuit closed")
+            else:
+                self._open()
+            return
+        self._outcomes.append(success)
+        failures = self._outcomes.count(False)
+        if (self.state == BREAKER_CLOSED and len(self._outcomes) >= self.min_calls
+                and failures >= self.failure_rate * len(self._outcomes)):
+            self._open()
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled; a cancelled probe frees the probe slot."""
+        if self.state == BREAKER_HALF_OPEN:
+            self._probing = False
+
+    def _open(self) -> None:
+        """Open the circuit for a cool-down."""
+        self.state = BREAKER_OPEN
+        self.opened_at = time.monotonic()
+        self.opened += 1
+        logger.warning("LLM circuit opened", extra={"cooldown": self.cooldown, "recent_failures": self._outcomes.count(False)})
+
+    def stats(self) -> Dict[str, Any]:
+        """Get the state and counters."""
+        return {
+            "state": self.state,
+            "recent_calls": len(self._outcomes),
+            "recent_failures": self._outcomes.count(False),
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "retry_after_s": self.retry_after(),
+        }
+
+
+class ResilientCaller:
+    """
+    Runs LLM calls with retries, hedging and a circuit breaker.
+    """
+
+    def __init__(
+        self,
+        breaker: Optional[CircuitBreaker] = None,
+        attempts: int = LLM_RETRY_ATTEMPTS,
+        call_timeout: float = LLM_CALL_TIMEOUT,
+        hedge_nodes: Optional[list] = None,
+        hedge_percentile: float = LLM_HEDGE_PERCENTILE,
+        hedge_min_delay: float = LLM_HEDGE_MIN_DELAY,
+        hedge_min_samples: int = LLM_HEDGE_MIN_SAMPLES,
+        hedge_max_ratio: float = LLM_HEDGE_MAX_RATIO,
+    ):
+        """
+        Initialize the caller.
+
+        Args:
+            breaker (Optional[CircuitBreaker]): Circuit breaker of the provider
+            attempts (int): Attempts per call, retries included
+            call_timeout (float): Seconds before an attempt is abandoned
+            hedge_nodes (Optional[list]): Nodes whose calls may be hedged
+                (defaults to LLM_HEDGE_NODES)
+            hedge_percentile (float): Latency percentile after which a hedge is sent
+            hedge_min_delay (float): Shortest wait before a hedge, in seconds
+            hedge_min_samples (int): Latencies needed before a node is hedged
+            hedge_max_ratio (float): Largest share of calls that get a hedge
+        """
+        self.breaker = breaker or CircuitBreaker()
+        self.attempts = max(1, attempts)
+        self.call_timeout = call_timeout
+        self.hedge_nodes = set(LLM_HEDGE_NODES if hedge_nodes is None else hedge_nodes)
+        self.hedge_percentile = hedge_percentile
+        self.hedge_min_delay = hedge_min_delay
+        self.hedge_min_samples = hedge_min_samples
+        self.hedge_max_ratio = hedge_max_ratio
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.counters = {
+            "calls": 0, "attempts": 0, "retries": 0, "failures": 0, "hedges": 0, "hedge_wins": 0, "streamed_failures": 0,
+        }
+
+    def hedge_delay(self, node: str) -> Optional[float]:
+        """
+        Get the wait before a node's call is hedged.
+
+        Args:
+            node (str): Graph node (or component) making the call
+
+        Returns:
+            Optional[float]: Seconds, None if the call is not hedged
+        """
+        latencies = self._latencies.get(node)
+        if node not in self.hedge_nodes or latencies is None or len(latencies) < self.hedge_min_samples:
+            return None
+        return max(self.hedge_min_delay, percentile(latencies, self.hedge_percentile))
+
+    async def _leg(self, node: str, fn: Callable[[], Awaitable[T]]) -> T:
+        """Run one request with the attempt timeout and record its outcome."""
+        self.counters["attempts"] += 1
+        start = time.perf_counter()
+        try:
+            result = await asyncio.wait_for(fn(), self.call_timeout)
+        except asyncio.CancelledError:
+            self.breaker.abandon()
+            raise
+        except Exception as e:
+            # An error that is not transient still means the provider answered
+            self.breaker.record(not is_retryable(e))
+            raise
+        self._latencies.setdefault(node, deque(maxlen=LATENCY_WINDOW)).append(time.perf_counter() - start)
+        self.breaker.record(True)
+        return result
+
+    async def _attempt(self, node: str, fn: Callable[[], Awaitable[T]], committed: Callable[[], bool]) -> T:
+        """Run one attempt, sending a hedge if the first request is slow (and has not streamed)."""
+        legs = [asyncio.ensure_future(self._leg(node, fn))]
+        try:
+            delay = self.hedge_delay(node)
+            if delay is not None:
+                await asyncio.wait(legs, timeout=delay)
+                if (not legs[0].done() and not committed()
+                        and self.counters["hedges"] < self.hedge_max_ratio * self.counters["calls"]):
+                    self.counters["hedges"] += 1
+                    logger.info("Hedging slow LLM call", extra={"node": node, "hedge_delay": delay})
+                    legs.append(asyncio.ensure_future(self._leg(node, fn)))
+            pending, error = set(legs), None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for leg in done:
+                    if leg.exception() is None:
+                        if leg is not legs[0]:
+                            self.counters["hedge_wins"] += 1
+                        return leg.result()
+                    error = leg.exception()
+                    if not is_retryable(error):
+                        raise error
+            raise error
+        finally:
+            for leg in legs:
+                if not leg.done():
+                    leg.cancel()
+
+    async def call(self, node: str, fn: Callable[[], Awaitable[T]],
+                   committed: Optional[Callable[[], bool]] = None) -> T:
+        """
+        Run an LLM call.
+
+        Args:
+            node (str): Graph node (or component) making the call
+            fn (Callable[[], Awaitable[T]]): Starts one request
+            committed (Optional[Callable[[], bool]]): Whether output of the
+                call already reached the user (e.g. `StreamedOutput.started`);
+                a committed call is not hedged or retried
+
+        Returns:
+            T: The first successful response
+
+        Raises:
+            LLMUnavailableError: If the circuit is open
+            Exception: The last error once the attempts are exhausted, the
+                first error that is not retryable, or the error of a
+                committed call
+        """
+        committed = committed or (lambda: False)
+        self.counters["calls"] += 1
+        for attempt in range(1, self.attempts + 1):
+            self.breaker.allow()
+            try:
+                return await self._attempt(node, fn, committed)
+            except Exception as e:
+                if committed():
+                    self.counters["failures"] += 1
+                    self.counters["streamed_failures"] += 1
+                    logger.warning("Streamed LLM call failed, not retrying", extra={
+                        "node": node, "attempt": attempt, "error": f"{type(e).__name__}: {e}",
+                    })
+                    raise
+                if attempt == self.attempts or not is_retryable(e):
+                    self.counters["failures"] += 1
+                    raise
+                delay = backoff_delay(attempt)
+                self.counters["retries"] += 1
+                logger.warning("LLM call failed, retrying", extra={
+                    "node": node, "attempt": attempt, "delay": delay, "error": f"{type(e).__name__}: {e}",
+                })
+                await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the retry, hedging and breaker counters.
+
+        Returns:
+            Dict[str, Any]: Counters, current hedge delay per node and breaker state
+        """
+        return {
+            **self.counters,
+            "hedge_delay_s": {node: self.hedge_delay(node) for node in sorted(self._latencies)},
+            "breaker": self.breaker.stats(),
+        }
@@ -0,0 +1,131 @@
+"""
+Template based rendering of tool results.
+
+After the `tools` node, the agent used to make a full LLM call over the whole
+history just to phrase results like "100". Tools can instead declare a
+`responseTemplate` annotation (see `server/tools.py`), which this module
+formats with the tool arguments and result. It includes:
+- Parsing of tool outputs (JSON when possible, raw text otherwise)
+- Per-tool templates read from the MCP tool annotations
+- Fallback to the LLM for multi-tool turns, failed calls, tools without a
+  template (or forced to the LLM) and results that do not fit their template
+"""
+
+import json
+import os
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolMessage
+
+from constructionagent.agent.logger import logger
+
+# Response rendering configuration
+RESPONSE_TEMPLATES_ENABLED = os.getenv("RESPONSE_TEMPLATES_ENABLED", "true").lower() == "true"
+# Comma separated tools whose results are always phrased by the LLM
+RESPONSE_LLM_TOOLS = {name.strip() for name in os.getenv("RESPONSE_LLM_TOOLS", "").split(",") if name.strip()}
+
+# Tool annotation holding the response template
+TEMPLATE_ANNOTATION = "responseTemplate"
+
+
+def parse_tool_output(content: str) -> Any:
+    """
+    Parse a tool output for template formatting.
+
+    Args:
+        content (str): Text content of a ToolMessage
+
+    Returns:
+        Any: The decoded JSON value, or the stripped text if it is not JSON
+    """
+    try:
+        return json.loads(content)
+    except (json.JSONDecodeError, TypeError):
+        return content.strip()
+
+
+class ResponseRenderer:
+    """
+    Renders tool results from per-tool templates.
+
+    Templates use `str.format` syntax with the tool arguments and `result`,
+    e.g. "The area of {region} is {result}." or "{result[diameter]}" for
+    dictionary results.
+    """
+
+    def __init__(self, tools: List[Any], llm_tools: Optional[set] = None):
+        """
+        Collect the templates of the given tools.
+
+        Args:
+            tools (List[Any]): LangChain tools (templates are read from metadata)
+            llm_tools (Optional[set]): Tools always left to the LLM (defaults to
+                RESPONSE_LLM_TOOLS)
+        """
+        llm_tools = RESPONSE_LLM_TOOLS if llm_tools is None else llm_tools
+        self.templates: Dict[str, str] = {
+            tool.name: (tool.metadata or {})[TEMPLATE_ANNOTATION]
+            for tool in tools
+            if (tool.metadata or {}).get(TEMPLATE_ANNOTATION) and tool.name not in llm_tools
+        }
+        self.rendered = 0
+        self.fallbacks = 0
+
+    def render_result(self, tool_name: str, arguments: Dict[str, Any], message: ToolMessage) -> Optional[str]:
+        """
+        Render the result of a single tool call.
+
+        Args:
+            tool_name (str): Name of the called tool
+            arguments (Dict[str, Any]): Arguments of the call
+            message (ToolMessage): Result of the call
+
+        Returns:
+            Optional[str]: The rendered text, or None if the tool has no
+            template, the call failed or the result does not fit the template
+        """
+        template = self.templates.get(tool_name)
+        if template is None or message.status == "error":
+            return None
+        try:
+            return template.format(**arguments, result=parse_tool_output(message.text()))
+        except (KeyError, IndexError, TypeError, ValueError, AttributeError):
+            logger.debug("Tool result does not fit its template", extra={"tool": tool_name})
+            return None
+
+    def render(self, messages: List[Any]) -> Optional[str]:
+        """
+        Render the answer to the tool results at the end of the history.
+
+        Args:
+            messages (List[Any]): Conversation history ending with ToolMessages
+
+        Returns:
+            Optional[str]: The rendered answer, or None to fall back to the LLM
+        """
+        tool_messages = []
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage):
+                break
+            tool_messages.append(message)
+        request = messages[-len(tool_messages) - 1] if len(tool_messages) < len(messages) else None
+
+        rendered = None
+        if len(tool_messages) == 1 and isinstance(request, AIMessage):
+            call = next((call for call in request.tool_calls if call["id"] == tool_messages[0].tool_call_id), None)
+            if call is not None:
+                rendered = self.render_result(call["name"], call["args"], tool_messages[0])
+        if rendered is None:
+            self.fallbacks += 1
+            return None
+        self.rendered += 1
+        return rendered
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the rendering counters.
+
+        Returns:
+            Dict[str, Any]: Rendered answers, LLM fallbacks and templated tools
+        """
+        return {"rendered": self.rendered, "fallbacks": self.fallbacks, "templated_tools": sorted(self.templates)}
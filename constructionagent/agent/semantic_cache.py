@@ -0,0 +1,346 @@
+"""
+Semantic cache for validated intents.
+
+Users ask the same handful of questions in many phrasings ("How many square
+meters is Room A?" / "area of room A?"). This module caches the JSON produced by
+the `Query_Validation` node and serves it again for semantically equivalent
+queries, without an LLM round trip. It includes:
+- Query normalization (synonyms mapped to tool keywords, slot values masked)
+- A local, offline hashed n-gram embedding
+- A NumPy nearest-neighbour index with size-bounded LRU eviction
+- Slot re-extraction so "area of Room B" reuses the "area of Room A" entry
+- Invalidation when the tool descriptions or validation prompt change
+"""
+
+import json
+import os
+import re
+import time
+import zlib
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from constructionagent.agent.fast_path import (
+    DEICTIC_WORDS,
+    FILLER_WORDS,
+    INTENT_SYNONYMS,
+    TOKEN_PATTERN,
+    FastPathClassifier,
+)
+from constructionagent.agent.logger import logger
+
+# Semantic cache configuration
+SEMANTIC_CACHE_ENABLED = os.getenv("SEMANTIC_CACHE_ENABLED", "true").lower() == "true"
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", "0.9"))
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", "1024"))
+SEMANTIC_CACHE_DIM = int(os.getenv("SEMANTIC_CACHE_DIM", "1024"))
+
+SLOT_TOKEN = "slot"
+
+
+def parse_validation_json(content: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse the JSON emitted by the validation node.
+
+    Args:
+        content (str): Message content, optionally wrapped in a ```json fence
+
+    Returns:
+        Optional[Dict[str, Any]]: Parsed JSON, or None if it is not valid JSON
+    """
+    try:
+        parsed = json.loads(content.strip('```json\n').strip('```'))
+    except (json.JSONDecodeError, AttributeError):
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+
+class HashedNgramEmbedder:
+    """
+    Local embedding based on the hashing trick.
+
+    Word unigrams, word bigrams and character n-grams are hashed (crc32, so the
+    vectors are stable across processes) into a fixed size signed vector which
+    is then L2 normalized, making a dot product a cosine similarity.
+    """
+
+    def __init__(self, dim: int = SEMANTIC_CACHE_DIM, ngram_range: Tuple[int, int] = (3, 5)):
+        """
+        Initialize the embedder.
+
+        Args:
+            dim (int): Dimension of the embedding
+            ngram_range (Tuple[int, int]): Inclusive range of character n-gram sizes
+        """
+        self.dim = dim
+        self.ngram_range = ngram_range
+
+    def _features(self, text: str) -> List[str]:
+        """Extract the hashed features of a normalized text."""
+        words = text.split()
+        features = [f"w:{word}" for word in words]
+        features.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+        padded = f" {text} "
+        low, high = self.ngram_range
+        for n in range(low, high + 1):
+            features.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+        return features
+
+    def embed(self, text: str) -> np.ndarray:
+        """
+        Embed a normalized text.
+
+        Args:
+            text (str): Normalized text
+
+        Returns:
+            np.ndarray: L2 normalized float32 vector of size `dim`
+        """
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for feature in self._features(text):
+            digest = zlib.crc32(feature.encode("utf-8"))
+            vector[digest % self.dim] += 1.0 if digest & 0x80000000 else -1.0
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+class SemanticIntentCache:
+    """
+    Nearest-neighbour cache of validated intents.
+
+    Entries are stored as templates: every argument value of the cached intents
+    is replaced with a reference to the slot it was extracted from, so a hit
+    re-extracts the slot values from the new query. Only self-contained results
+    are stored (no ambiguous intents, every argument found in the query itself)
+    so a cached answer never depends on conversation history.
+    """
+
+    def __init__(
+        self,
+        classifier: FastPathClassifier,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+        embedder: Optional[HashedNgramEmbedder] = None,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            classifier (FastPathClassifier): Provides the slot extractors
+            threshold (float): Minimum cosine similarity for a hit
+            max_entries (int): Maximum number of cached queries
+            embedder (Optional[HashedNgramEmbedder]): Embedding used for lookups
+        """
+        self.classifier = classifier
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self.embedder = embedder or HashedNgramEmbedder()
+        self.version = None
+        self.synonyms = sorted(
+            ((phrase, canonical) for canonical, phrases in INTENT_SYNONYMS.items() for phrase in phrases),
+            key=lambda item: len(item[0]),
+            reverse=True,
+        )
+        self.metrics = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0, "invalidations": 0}
+        self.clear()
+
+    def clear(self) -> None:
+        """Drop every cached entry."""
+        self.vectors = np.zeros((self.max_entries, self.embedder.dim), dtype=np.float32)
+        self.entries: List[Optional[Dict[str, Any]]] = [None] * self.max_entries
+        self.last_used = np.zeros(self.max_entries, dtype=np.float64)
+        self.index: Dict[str, int] = {}
+
+    def ensure_version(self, version: str) -> None:
+        """
+        Invalidate the cache when the tools or validation prompt changed.
+
+        Args:
+            version (str): Hash of the tool descriptions and validation prompt
+        """
+        if version == self.version:
+            return
+        if self.version is not None:
+            self.metrics["invalidations"] += 1
+            logger.info("Semantic cache invalidated", extra={"old_version": self.version, "new_version": version})
+        self.clear()
+        self.version = version
+
+    def _extract_slots(self, query: str) -> Dict[str, List[str]]:
+        """Extract every slot value for every argument known to the classifier."""
+        return {
+            arg: self.classifier.extract_argument(arg, query)
+            for arg in self.classifier.argument_patterns
+        }
+
+    def normalize(self, query: str, slots: Dict[str, List[str]]) -> str:
+        """
+        Normalize a query for embedding.
+
+        Slot values are masked, intent synonyms are mapped to their canonical
+        keyword and filler words are dropped, so phrasings of the same question
+        normalize to (nearly) the same text.
+
+        Args:
+            query (str): The user query
+            slots (Dict[str, List[str]]): Slot values extracted from the query
+
+        Returns:
+            str: Normalized text
+        """
+        text = query.lower()
+        for value in sorted({v.lower() for values in slots.values() for v in values}, key=len, reverse=True):
+            text = text.replace(value, f" {SLOT_TOKEN} ")
+        for phrase, canonical in self.synonyms:
+            text = re.sub(rf"\b{re.escape(phrase)}\b", canonical, text)
+        tokens = [token for token in TOKEN_PATTERN.findall(text) if token not in FILLER_WORDS]
+        return " ".join(tokens)
+
+    def _is_self_contained(self, query: str) -> bool:
+        """Check the query does not refer to earlier turns."""
+        return not DEICTIC_WORDS.intersection(TOKEN_PATTERN.findall(query.lower()))
+
+    def lookup(self, query: str, first_turn: bool) -> Optional[Dict[str, Any]]:
+        """
+        Look up the validation JSON for a query.
+
+        Args:
+            query (str): The user query
+            first_turn (bool): Whether the query is the first of its thread
+
+        Returns:
+            Optional[Dict[str, Any]]: Validation JSON with slot values re-extracted
+            from the query, or None on a miss
+        """
+        if not self.index or not self._is_self_contained(query):
+            self.metrics["misses"] += 1
+            return None
+        slots = self._extract_slots(query)
+        vector = self.embedder.embed(self.normalize(query, slots))
+        similarities = self.vectors @ vector
+        best = int(np.argmax(similarities))
+        entry = self.entries[best]
+        if (
+            entry is None
+            or similarities[best] < self.threshold
+            or (entry["template"].get("unrelated") and not first_turn)
+        ):
+            self.metrics["misses"] += 1
+            return None
+
+        result = self._fill(entry, slots)
+        if result is None:
+            self.metrics["misses"] += 1
+            return None
+        self.last_used[best] = time.monotonic()
+        self.metrics["hits"] += 1
+        logger.debug("Semantic cache hit", extra={"query": query, "similarity": float(similarities[best])})
+        return result
+
+    @staticmethod
+    def _fill(entry: Dict[str, Any], slots: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+        """Instantiate a cached template with the slot values of a new query."""
+        if {arg: len(values) for arg, values in slots.items() if values} != entry["slot_counts"]:
+            return None
+        result = json.loads(json.dumps(entry["template"]))
+        for intent in result["intents"]:
+            for arg, ref in intent["arguments"].items():
+                value = slots[ref["slot"]][ref["index"]]
+                if ref["form"] == "identifier":
+                    value = value.split(None, 1)[-1]
+                intent["arguments"][arg] = value
+        return result
+
+    def _template(self, result: Dict[str, Any], slots: Dict[str, List[str]]) -> Optional[Dict[str, Any]]:
+        """Replace argument values with slot references, or None if not possible."""
+        template = json.loads(json.dumps(result))
+        for intent in template.get("intents", []):
+            if intent.get("is_ambiguous") or intent.get("missing_arguments"):
+                return None
+            for arg, value in intent.get("arguments", {}).items():
+                ref = self._find_slot(str(value), slots, preferred=arg)
+                if ref is None:
+                    return None
+                intent["arguments"][arg] = ref
+        return template
+
+    @staticmethod
+    def _find_slot(value: str, slots: Dict[str, List[str]], preferred: str) -> Optional[Dict[str, Any]]:
+        """Find the slot an argument value was taken from."""
+        value = value.strip().lower()
+        ordered = [preferred] + [arg for arg in slots if arg != preferred]
+        for arg in ordered:
+            for index, candidate in enumerate(slots.get(arg, [])):
+                candidate = candidate.lower()
+                if value == candidate:
+                    return {"slot": arg, "index": index, "form": "full"}
+                if value == candidate.split(None, 1)[-1]:
+                    return {"slot": arg, "index": index, "form": "identifier"}
+        return None
+
+    def store(self, query: str, content: str, first_turn: bool) -> bool:
+        """
+        Store the validation JSON of a query if it is safe to reuse.
+
+        Args:
+            query (str): The user query
+            content (str): Validation node output
+            first_turn (bool): Whether the query was the first of its thread
+
+        Returns:
+            bool: True if the result was cached
+        """
+        result = parse_validation_json(content)
+        if result is None or not self._is_self_contained(query):
+            return False
+        if result.get("unrelated") and not first_turn:
+            return False
+        slots = self._extract_slots(query)
+        template = self._template(result, slots)
+        if template is None:
+            return False
+
+        key = self.normalize(query, slots)
+        slot = self.index.get(key)
+        if slot is None:
+            slot = self._free_slot()
+        previous = self.entries[slot]
+        if previous is not None:
+            self.index.pop(previous["key"], None)
+        self.vectors[slot] = self.embedder.embed(key)
+        self.entries[slot] = {
+            "key": key,
+            "template": template,
+            "slot_counts": {arg: len(values) for arg, values in slots.items() if values},
+        }
+        self.last_used[slot] = time.monotonic()
+        self.index[key] = slot
+        self.metrics["stores"] += 1
+        return True
+
+    def _free_slot(self) -> int:
+        """Return an empty slot, evicting the least recently used entry if full."""
+        if len(self.index) < self.max_entries:
+            return self.entries.index(None)
+        slot = int(np.argmin(self.last_used))
+        self.index.pop(self.entries[slot]["key"], None)
+        self.entries[slot] = None
+        self.vectors[slot] = 0.0
+        self.metrics["evictions"] += 1
+        return slot
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, Any]: Hits, misses, stores, evictions, invalidations,
+            size and hit rate
+        """
+        lookups = self.metrics["hits"] + self.metrics["misses"]
+        return {
+            **self.metrics,
+            "size": len(self.index),
+            "hit_rate": self.metrics["hits"] / lookups if lookups else 0.0,
+        }
@@ -0,0 +1,151 @@
+"""
+Single-flight coalescing of identical concurrent calls.
+
+When many users send the same query at once ("What is the scale of Drawing
+101?"), every turn would make the same LLM and tool calls. A SingleFlight
+runs the first call for a key (the leader) and hands its result, or error, to
+every identical call that arrives while it is in flight (the followers). It
+includes:
+- request_key: stable hash of a call's normalized input and version
+- normalize_messages: prompt messages without run specific ids or spacing
+- SingleFlight: the in-flight table and its collapse counters
+
+Results are never kept once the call completes; this only merges calls that
+overlap in time.
+"""
+
+import asyncio
+import hashlib
+import json
+import os
+import re
+from typing import Any, Awaitable, Callable, Dict, List, Tuple, TypeVar
+
+from langchain_core.messages import BaseMessage
+
+from constructionagent.agent.logger import logger
+
+# Single-flight configuration
+SINGLEFLIGHT_ENABLED = os.getenv("SINGLEFLIGHT_ENABLED", "true").lower() == "true"
+
+T = TypeVar("T")
+
+
+def request_key(*parts: Any) -> str:
+    """
+    Hash the parts identifying a call.
+
+    Args:
+        *parts (Any): JSON serializable parts (name, version, input...)
+
+    Returns:
+        str: SHA-256 hex digest
+    """
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+def normalize_text(text: str) -> str:
+    """Collapse whitespace, so spacing differences do not split keys."""
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def normalize_messages(messages: List[BaseMessage]) -> List[List[Any]]:
+    """
+    Reduce prompt messages to what the model sees.
+
+    Message ids and tool call ids differ between runs of the same
+    conversation, so they are left out; tool call names and arguments stay.
+
+    Args:
+        messages (List[BaseMessage]): Prompt messages
+
+    Returns:
+        List[List[Any]]: [type, text, tool calls] per message
+    """
+    return [
+        [
+            message.type,
+            normalize_text(message.content) if isinstance(message.content, str) else message.content,
+            [[call["name"], call["args"]] for call in getattr(message, "tool_calls", None) or []],
+        ]
+        for message in messages
+    ]
+
+
+class SingleFlight:
+    """
+    Table of in-flight calls keyed by request key.
+
+    The leader's call runs in its own task, so a cancelled caller does not
+    fail the others; the task is cancelled only when every caller is gone.
+    """
+
+    def __init__(self, name: str):
+        """
+        Initialize an empty table.
+
+        Args:
+            name (str): Name in logs and stats ("llm", "tools")
+        """
+        self.name = name
+        self._calls: Dict[str, Tuple[asyncio.Task, List[int]]] = {}
+        self.counters = {"calls": 0, "executed": 0, "collapsed": 0, "errors": 0}
+
+    async def do(self, key: str, fn: Callable[[], Awaitable[T]]) -> Tuple[T, bool]:
+        """
+        Run a call, or join the identical call in flight.
+
+        Args:
+            key (str): Request key of the call
+            fn (Callable[[], Awaitable[T]]): Starts the call (only run by the leader)
+
+        Returns:
+            Tuple[T, bool]: The result and whether it is shared with a
+            leader (the caller must not mutate a shared result)
+
+        Raises:
+            Exception: Whatever the call raised, for every caller
+        """
+        self.counters["calls"] += 1
+        shared = key in self._calls
+        if shared:
+            task, callers = self._calls[key]
+            callers[0] += 1
+            self.counters["collapsed"] += 1
+            logger.debug("Call joined in-flight call", extra={"singleflight": self.name, "callers": callers[0]})
+        else:
+            task, callers = asyncio.ensure_future(fn()), [1]
+            self._calls[key] = (task, callers)
+            self.counters["executed"] += 1
+            task.add_done_callback(lambda done: self._finish(key, done))
+        try:
+            return await asyncio.shield(task), shared
+        except asyncio.CancelledError:
+            callers[0] -= 1
+            if not callers[0] and not task.done():
+                task.cancel()
+                # Calls arriving before the task has finished start over
+                del self._calls[key]
+            raise
+
+    def _finish(self, key: str, task: asyncio.Task) -> None:
+        """Remove a completed call from the table."""
+        if self._calls.get(key, (None,))[0] is task:
+            del self._calls[key]
+        if not task.cancelled() and task.exception() is not None:
+            self.counters["errors"] += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the collapse counters.
+
+        Returns:
+            Dict[str, Any]: Calls, executed and collapsed calls, errors,
+            calls in flight and the collapsed share of all calls
+        """
+        calls = self.counters["calls"]
+        return {
+            **self.counters,
+            "in_flight": len(self._calls),
+            "collapse_ratio": self.counters["collapsed"] / calls if calls else 0.0,
+        }
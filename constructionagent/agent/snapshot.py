@@ -0,0 +1,96 @@
+"""
+Local snapshot of the MCP tools and prompts.
+
+Fetching tools and prompts from the MCP servers dominates the agent's start-up
+time. This module persists what was fetched (tool schemas, prompt bodies and a
+content hash) so `build_graph` can boot from disk instantly and revalidate
+against the servers in the background. It includes:
+- Snapshot hashing
+- Versioned, atomic snapshot persistence
+"""
+
+import hashlib
+import json
+import os
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from constructionagent.agent.logger import logger
+
+# Snapshot configuration
+MCP_SNAPSHOT_ENABLED = os.getenv("MCP_SNAPSHOT_ENABLED", "true").lower() == "true"
+MCP_SNAPSHOT_PATH = os.getenv("MCP_SNAPSHOT_PATH", "cache/mcp_snapshot.json")
+
+# Bumped whenever the snapshot layout changes; older snapshots are ignored
+SNAPSHOT_FORMAT_VERSION = 1
+
+
+def snapshot_hash(snapshot: Dict[str, Any]) -> str:
+    """
+    Hash the content of a snapshot.
+
+    Args:
+        snapshot (Dict[str, Any]): Snapshot with "tools" and "prompts"
+
+    Returns:
+        str: SHA-256 hex digest of the tools and prompts
+    """
+    payload = json.dumps(
+        {"tools": snapshot["tools"], "prompts": snapshot["prompts"]},
+        sort_keys=True,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def load_snapshot(path: str = MCP_SNAPSHOT_PATH) -> Optional[Dict[str, Any]]:
+    """
+    Load a snapshot from disk.
+
+    Args:
+        path (str): Snapshot file path
+
+    Returns:
+        Optional[Dict[str, Any]]: The snapshot, or None if it is missing, of an
+        older format or corrupted
+    """
+    snapshot_file = Path(path)
+    if not snapshot_file.exists():
+        return None
+    try:
+        snapshot = json.loads(snapshot_file.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        logger.warning("Failed to read MCP snapshot", exc_info=True, extra={"path": path})
+        return None
+    if snapshot.get("format_version") != SNAPSHOT_FORMAT_VERSION:
+        return None
+    if snapshot.get("content_hash") != snapshot_hash(snapshot):
+        logger.warning("Ignoring corrupted MCP snapshot", extra={"path": path})
+        return None
+    return snapshot
+
+
+def save_snapshot(snapshot: Dict[str, Any], path: str = MCP_SNAPSHOT_PATH) -> Dict[str, Any]:
+    """
+    Persist a snapshot atomically.
+
+    Args:
+        snapshot (Dict[str, Any]): Snapshot with "tools" and "prompts"
+        path (str): Snapshot file path
+
+    Returns:
+        Dict[str, Any]: The snapshot with its format version, hash and
+        creation time filled in
+    """
+    snapshot = {
+        **snapshot,
+        "format_version": SNAPSHOT_FORMAT_VERSION,
+        "content_hash": snapshot_hash(snapshot),
+        "created_at": datetime.utcnow().isoformat(),
+    }
+    snapshot_file = Path(path)
+    snapshot_file.parent.mkdir(parents=True, exist_ok=True)
+    tmp_file = snapshot_file.with_suffix(snapshot_file.suffix + ".tmp")
+    tmp_file.write_text(json.dumps(snapshot, indent=2), encoding="utf-8")
+    os.replace(tmp_file, snapshot_file)
+    return snapshot
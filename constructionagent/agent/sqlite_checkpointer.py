@@ -0,0 +1,641 @@
+"""
+Durable SQLite checkpointer for the agent graph.
+
+Conversations survive restarts without a remote database. The saver is built
+on the standard library `sqlite3` module and includes:
+- WAL journaling with `synchronous=NORMAL` (one fsync per WAL checkpoint, not
+  per commit)
+- Write batching per super-step: pending writes are buffered and committed in
+  the same transaction as the checkpoint that follows them
+- Append-only deltas for list channels (`messages`): a new version stores only
+  the messages appended since the previous version, chained to it
+- A compaction job that prunes old checkpoints, their writes and the channel
+  values (and delta ancestors) nothing references anymore
+"""
+
+import asyncio
+import os
+import random
+import sqlite3
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+
+from constructionagent.agent.logger import logger
+
+# SQLite checkpointer configuration
+SQLITE_CHECKPOINT_PATH = os.getenv("SQLITE_CHECKPOINT_PATH", "cache/checkpoints.sqlite")
+# Comma separated list channels stored as append-only deltas
+SQLITE_DELTA_CHANNELS = tuple(
+    channel.strip() for channel in os.getenv("SQLITE_DELTA_CHANNELS", "messages").split(",") if channel.strip()
+)
+SQLITE_MAX_DELTA_CHAIN = int(os.getenv("SQLITE_MAX_DELTA_CHAIN", "64"))
+SQLITE_COMPACTION_INTERVAL = float(os.getenv("SQLITE_COMPACTION_INTERVAL", "300"))
+SQLITE_COMPACTION_KEEP = int(os.getenv("SQLITE_COMPACTION_KEEP", "20"))
+
+# Number of (thread, namespace, channel) list values kept to compute deltas
+DELTA_CACHE_SIZE = 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE TABLE IF NOT EXISTS blobs (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    channel TEXT NOT NULL,
+    version TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB NOT NULL,
+    base_version TEXT,
+    PRIMARY KEY (thread_id, checkpoint_ns, channel, version)
+);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL,
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    blob BLOB NOT NULL,
+    task_path TEXT NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+# Walks a delta chain from a version back to its full value
+CHAIN_QUERY = """
+WITH RECURSIVE chain(type, blob, base_version, depth) AS (
+    SELECT type, blob, base_version, 0 FROM blobs
+    WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?
+    UNION ALL
+    SELECT b.type, b.blob, b.base_version, chain.depth + 1 FROM blobs b JOIN chain
+    ON b.thread_id = ? AND b.checkpoint_ns = ? AND b.channel = ? AND b.version = chain.base_version
+)
+SELECT type, blob, base_version FROM chain ORDER BY depth DESC
+"""
+
+
+class SqliteCheckpointSaver(BaseCheckpointSaver[str]):
+    """
+    Checkpointer persisting to a local SQLite database.
+
+    Pending writes are only durable once the checkpoint of their super-step is
+    committed; after a crash, the tasks of an unfinished super-step run again.
+    A single connection is shared behind a lock, so the saver can be used from
+    the event loop and worker threads alike.
+    """
+
+    def __init__(
+        self,
+        path: str = SQLITE_CHECKPOINT_PATH,
+        delta_channels: Sequence[str] = SQLITE_DELTA_CHANNELS,
+        max_delta_chain: int = SQLITE_MAX_DELTA_CHAIN,
+        compaction_interval: float = SQLITE_COMPACTION_INTERVAL,
+        compaction_keep: int = SQLITE_COMPACTION_KEEP,
+        **kwargs: Any,
+    ):
+        """
+        Open (or create) the database.
+
+        Args:
+            path (str): Database file, ":memory:" for a throwaway database
+            delta_channels (Sequence[str]): List channels stored as deltas
+            max_delta_chain (int): Deltas after which a full value is written again
+            compaction_interval (float): Seconds between compactions, 0 disables
+            compaction_keep (int): Checkpoints kept per thread by compaction
+            **kwargs: Passed to BaseCheckpointSaver (e.g. serde)
+        """
+        super().__init__(**kwargs)
+        if path != ":memory:":
+            Path(path).parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.delta_channels = set(delta_channels)
+        self.max_delta_chain = max_delta_chain
+        self.compaction_interval = compaction_interval
+        self.compaction_keep = compaction_keep
+        self.conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.conn.execute("PRAGMA auto_vacuum=INCREMENTAL")
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.conn.executescript(SCHEMA)
+        self._lock = threading.RLock()
+        self._buffered_writes: List[Tuple[Any, ...]] = []
+        # (thread ID, checkpoint NS, channel) -> (version, list value, delta depth)
+        self._latest: "OrderedDict[Tuple[str, str, str], Tuple[str, list, int]]" = OrderedDict()
+        self._compaction_task: Optional[asyncio.Task] = None
+        self.metrics = {
+            "checkpoints": 0, "writes": 0, "transactions": 0, "full_blobs": 0,
+            "delta_blobs": 0, "bytes_written": 0, "compactions": 0,
+        }
+
+    # Writing
+
+    def _remember(self, key: Tuple[str, str, str], version: str, value: list, depth: int) -> None:
+        """Cache the latest list value of a channel to compute the next delta."""
+        self._latest[key] = (version, list(value), depth)
+        self._latest.move_to_end(key)
+        while len(self._latest) > DELTA_CACHE_SIZE:
+            self._latest.popitem(last=False)
+
+    def _blob_row(self, thread_id: str, checkpoint_ns: str, channel: str, version: str, values: Dict[str, Any]) -> Tuple[Any, ...]:
+        """Serialize a channel value, as a delta of the previous version when possible."""
+        if channel not in values:
+            return (thread_id, checkpoint_ns, channel, version, "empty", b"", None)
+        value = values[channel]
+        if channel in self.delta_channels and isinstance(value, list):
+            key = (thread_id, checkpoint_ns, channel)
+            previous = self._latest.get(key)
+            if previous is not None:
+                base_version, base, depth = previous
+                if (
+                    depth < self.max_delta_chain
+                    and len(base) <= len(value)
+                    and value[:len(base)] == base
+                ):
+                    value_type, payload = self.serde.dumps_typed(value[len(base):])
+                    self._remember(key, version, value, depth + 1)
+                    self.metrics["delta_blobs"] += 1
+                    return (thread_id, checkpoint_ns, channel, version, value_type, payload, base_version)
+            self._remember(key, version, value, 0)
+        value_type, payload = self.serde.dumps_typed(value)
+        self.metrics["full_blobs"] += 1
+        return (thread_id, checkpoint_ns, channel, version, value_type, payload, None)
+
+    def _flush(self) -> None:
+        """Commit the buffered writes (caller holds the lock)."""
+        if not self._buffered_writes:
+            return
+        self.conn.execute("BEGIN")
+        try:
+            self._insert_writes()
+            self.conn.execute("COMMIT")
+        except Exception:
+            self.conn.execute("ROLLBACK")
+            raise
+        self.metrics["transactions"] += 1
+
+    def _insert_writes(self) -> None:
+        """Insert the buffered writes in the current transaction."""
+        for row in self._buffered_writes:
+            # Regular writes are written once per task, special ones (errors,
+            # interrupts) replace the previous value
+            verb = "INSERT OR REPLACE" if row[4] < 0 else "INSERT OR IGNORE"
+            self.conn.execute(f"{verb} INTO writes VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)", row)
+            self.metrics["bytes_written"] += len(row[7])
+        self._buffered_writes = []
+
+    def flush(self) -> None:
+        """Commit the buffered writes without waiting for the next checkpoint."""
+        with self._lock:
+            self._flush()
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint together with the writes buffered since the last one.
+
+        Args:
+            config (RunnableConfig): Config of the checkpoint
+            checkpoint (Checkpoint): The checkpoint to save
+            metadata (CheckpointMetadata): Checkpoint metadata
+            new_versions (ChannelVersions): Channel versions written by this checkpoint
+
+        Returns:
+            RunnableConfig: Config of the saved checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        checkpoint_copy = checkpoint.copy()
+        values = checkpoint_copy.pop("channel_values")
+        checkpoint_type, checkpoint_blob = self.serde.dumps_typed(checkpoint_copy)
+        metadata_type, metadata_blob = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+        with self._lock:
+            blob_rows = [
+                self._blob_row(thread_id, checkpoint_ns, channel, version, values)
+                for channel, version in new_versions.items()
+            ]
+            self.conn.execute("BEGIN")
+            try:
+                self._insert_writes()
+                self.conn.executemany("INSERT OR REPLACE INTO blobs VALUES (?, ?, ?, ?, ?, ?, ?)", blob_rows)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO checkpoints VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (thread_id, checkpoint_ns, checkpoint["id"], config["configurable"].get("checkpoint_id"),
+                     checkpoint_type, checkpoint_blob, metadata_type, metadata_blob),
+                )
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                # Deltas computed for this checkpoint were never stored
+                for row in blob_rows:
+                    self._latest.pop((thread_id, checkpoint_ns, row[2]), None)
+                raise
+            self.metrics["checkpoints"] += 1
+            self.metrics["transactions"] += 1
+            self.metrics["bytes_written"] += len(checkpoint_blob) + len(metadata_blob) + sum(len(row[5]) for row in blob_rows)
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """
+        Buffer the writes of a task until the checkpoint of its super-step.
+
+        Args:
+            config (RunnableConfig): Config of the checkpoint the writes belong to
+            writes (Sequence[Tuple[str, Any]]): (channel, value) pairs
+            task_id (str): ID of the task creating the writes
+            task_path (str): Path of the task creating the writes
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            value_type, payload = self.serde.dumps_typed(value)
+            rows.append((thread_id, checkpoint_ns, checkpoint_id, task_id,
+                         WRITES_IDX_MAP.get(channel, idx), channel, value_type, payload, task_path))
+        with self._lock:
+            self._buffered_writes.extend(rows)
+            self.metrics["writes"] += len(rows)
+
+    # Reading
+
+    def _load_value(self, thread_id: str, checkpoint_ns: str, channel: str, version: str) -> Tuple[bool, Any, int]:
+        """
+        Load a channel value, folding its delta chain.
+
+        Returns:
+            Tuple[bool, Any, int]: Whether a value exists, the value and the
+            length of its delta chain
+        """
+        rows = self.conn.execute(
+            CHAIN_QUERY,
+            (thread_id, checkpoint_ns, channel, version, thread_id, checkpoint_ns, channel),
+        ).fetchall()
+        if not rows or rows[0][0] == "empty":
+            return False, None, 0
+        value = self.serde.loads_typed((rows[0][0], rows[0][1]))
+        for value_type, payload, _ in rows[1:]:
+            value = value + self.serde.loads_typed((value_type, payload))
+        return True, value, len(rows) - 1
+
+    def _build_tuple(self, thread_id: str, checkpoint_ns: str, row: Tuple[Any, ...], latest: bool) -> CheckpointTuple:
+        """Build a checkpoint tuple from a checkpoints row (caller holds the lock)."""
+        checkpoint_id, parent_checkpoint_id, checkpoint_type, checkpoint_blob, metadata_type, metadata_blob = row
+        checkpoint = self.serde.loads_typed((checkpoint_type, checkpoint_blob))
+        channel_values = {}
+        for channel, version in checkpoint["channel_versions"].items():
+            found, value, depth = self._load_value(thread_id, checkpoint_ns, channel, version)
+            if not found:
+                continue
+            channel_values[channel] = value
+            if latest and channel in self.delta_channels and isinstance(value, list):
+                # Resumed threads keep appending deltas to the loaded version
+                self._remember((thread_id, checkpoint_ns, channel), version, value, depth)
+        writes = self.conn.execute(
+            "SELECT task_id, channel, type, blob FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={**checkpoint, "channel_values": channel_values},
+            metadata=self.serde.loads_typed((metadata_type, metadata_blob)),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((value_type, payload)))
+                for task_id, channel, value_type, payload in writes
+            ],
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Get a checkpoint tuple, the latest of the thread if no ID is given.
+
+        Args:
+            config (RunnableConfig): Config with the thread (and checkpoint) ID
+
+        Returns:
+            Optional[CheckpointTuple]: The checkpoint, or None
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        columns = "checkpoint_id, parent_checkpoint_id, type, checkpoint, metadata_type, metadata"
+        with self._lock:
+            self._flush()
+            if checkpoint_id := get_checkpoint_id(config):
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).fetchone()
+            else:
+                row = self.conn.execute(
+                    f"SELECT {columns} FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? "
+                    "ORDER BY checkpoint_id DESC LIMIT 1",
+                    (thread_id, checkpoint_ns),
+                ).fetchone()
+            if row is None:
+                return None
+            return self._build_tuple(thread_id, checkpoint_ns, row, latest=checkpoint_id is None)
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        List checkpoints, newest first.
+
+        Args:
+            config (Optional[RunnableConfig]): Thread (namespace, checkpoint) to list
+            filter (Optional[Dict[str, Any]]): Metadata values to match
+            before (Optional[RunnableConfig]): Only checkpoints older than this one
+            limit (Optional[int]): Maximum number of checkpoints
+
+        Yields:
+            CheckpointTuple: Matching checkpoints
+        """
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if config["configurable"].get("checkpoint_ns") is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(config["configurable"]["checkpoint_ns"])
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        with self._lock:
+            self._flush()
+            rows = self.conn.execute(
+                "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, type, checkpoint, "
+                f"metadata_type, metadata FROM checkpoints {where} ORDER BY checkpoint_id DESC",
+                params,
+            ).fetchall()
+        for thread_id, checkpoint_ns, *row in rows:
+            if filter:
+                metadata = self.serde.loads_typed((row[4], row[5]))
+                if not all(metadata.get(key) == value for key, value in filter.items()):
+                    continue
+            if limit is not None:
+                if limit <= 0:
+                    break
+                limit -= 1
+            with self._lock:
+                item = self._build_tuple(thread_id, checkpoint_ns, tuple(row), latest=False)
+            yield item
+
+    def delete_thread(self, thread_id: str) -> None:
+        """
+        Delete every checkpoint, write and channel value of a thread.
+
+        Args:
+            thread_id (str): The thread to delete
+        """
+        with self._lock:
+            self._flush()
+            self.conn.execute("BEGIN")
+            for table in ("checkpoints", "blobs", "writes"):
+                self.conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            self.conn.execute("COMMIT")
+            for key in [key for key in self._latest if key[0] == thread_id]:
+                del self._latest[key]
+
+    # Async interface
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Asynchronous version of get_tuple (runs in a worker thread)."""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Asynchronous version of list (runs in a worker thread)."""
+        items = await asyncio.to_thread(lambda: list(self.list(config, filter=filter, before=before, limit=limit)))
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Asynchronous version of put (runs in a worker thread)."""
+        self._ensure_compaction_task()
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+        task_path: str = "",
+    ) -> None:
+        """Asynchronous version of put_writes (only buffers, no I/O)."""
+        self.put_writes(config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        """Asynchronous version of delete_thread (runs in a worker thread)."""
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def get_next_version(self, current: Optional[str], channel: None) -> str:
+        """
+        Generate the next version of a channel (same scheme as InMemorySaver).
+
+        Args:
+            current (Optional[str]): Current version
+            channel (None): Unused
+
+        Returns:
+            str: The next version, sortable as a string
+        """
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    # Compaction
+
+    def compact(self, keep: Optional[int] = None) -> Dict[str, int]:
+        """
+        Prune old checkpoints and everything only they reference.
+
+        For every thread and namespace, the `keep` latest checkpoints are kept
+        with their pending writes, the channel values they reference and the
+        delta ancestors of those values. The freed pages are then returned to
+        the file system.
+
+        Args:
+            keep (Optional[int]): Checkpoints kept per thread (defaults to compaction_keep)
+
+        Returns:
+            Dict[str, int]: Deleted checkpoints, writes and blobs
+        """
+        # The latest checkpoint is always kept, deltas are computed against it
+        keep = max(1, self.compaction_keep if keep is None else keep)
+        deleted = {"checkpoints": 0, "writes": 0, "blobs": 0}
+        with self._lock:
+            self._flush()
+            namespaces = self.conn.execute(
+                "SELECT thread_id, checkpoint_ns FROM checkpoints GROUP BY thread_id, checkpoint_ns HAVING COUNT(*) > ?",
+                (keep,),
+            ).fetchall()
+            self.conn.execute("BEGIN")
+            try:
+                for thread_id, checkpoint_ns in namespaces:
+                    rows = self.conn.execute(
+                        "SELECT checkpoint_id, type, checkpoint FROM checkpoints "
+                        "WHERE thread_id = ? AND checkpoint_ns = ? ORDER BY checkpoint_id DESC",
+                        (thread_id, checkpoint_ns),
+                    ).fetchall()
+                    kept, pruned = rows[:keep], rows[keep:]
+                    referenced = {
+                        (channel, version)
+                        for _, checkpoint_type, checkpoint_blob in kept
+                        for channel, version in self.serde.loads_typed((checkpoint_type, checkpoint_blob))["channel_versions"].items()
+                    }
+                    bases = {
+                        (channel, version): base_version
+                        for channel, version, base_version in self.conn.execute(
+                            "SELECT channel, version, base_version FROM blobs WHERE thread_id = ? AND checkpoint_ns = ?",
+                            (thread_id, checkpoint_ns),
+                        )
+                    }
+                    needed = set()
+                    for channel, version in referenced:
+                        while version is not None and (channel, version) not in needed and (channel, version) in bases:
+                            needed.add((channel, version))
+                            version = bases[(channel, version)]
+                    for checkpoint_id, _, _ in pruned:
+                        deleted["checkpoints"] += self.conn.execute(
+                            "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                            (thread_id, checkpoint_ns, checkpoint_id),
+                        ).rowcount
+                        deleted["writes"] += self.conn.execute(
+                            "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                            (thread_id, checkpoint_ns, checkpoint_id),
+                        ).rowcount
+                    for channel, version in set(bases) - needed:
+                        deleted["blobs"] += self.conn.execute(
+                            "DELETE FROM blobs WHERE thread_id = ? AND checkpoint_ns = ? AND channel = ? AND version = ?",
+                            (thread_id, checkpoint_ns, channel, version),
+                        ).rowcount
+                self.conn.execute("COMMIT")
+            except Exception:
+                self.conn.execute("ROLLBACK")
+                raise
+            self.conn.execute("PRAGMA incremental_vacuum")
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.metrics["compactions"] += 1
+        logger.info("Compacted checkpoint database", extra={"path": self.path, **deleted})
+        return deleted
+
+    async def _compaction_loop(self) -> None:
+        """Run the compaction periodically in a worker thread."""
+        while True:
+            await asyncio.sleep(self.compaction_interval)
+            try:
+                await asyncio.to_thread(self.compact)
+            except Exception:
+                logger.error("Checkpoint compaction failed", exc_info=True, extra={"path": self.path})
+
+    def _ensure_compaction_task(self) -> None:
+        """Start the compaction job in the running event loop, once."""
+        if self.compaction_interval > 0 and self._compaction_task is None:
+            self._compaction_task = asyncio.get_running_loop().create_task(
+                self._compaction_loop(), name="checkpoint-compaction"
+            )
+
+    def close(self) -> None:
+        """Stop the compaction job, commit the buffered writes and close the database."""
+        if self._compaction_task is not None:
+            self._compaction_task.cancel()
+            self._compaction_task = None
+        with self._lock:
+            self._flush()
+            self.conn.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get write counters and the database size.
+
+        Returns:
+            Dict[str, Any]: Checkpoints, writes, transactions, full and delta
+            blobs, serialized bytes written and compactions
+        """
+        stats = dict(self.metrics)
+        if self.path != ":memory:" and os.path.exists(self.path):
+            stats["db_bytes"] = os.path.getsize(self.path)
+        return stats
@@ -18,8 +18,13 @@ class MessagesState(TypedDict):
     - messages: A list of conversation messages, annotated with LangGraph's
                 message tracking system
     - summary: A string containing a summary of the conversation
+    - pending_intents: Ambiguous intents awaiting the user's clarification
+    - answered_intents: Clear intents already answered while clarifying
     
     The messages field uses LangGraph's add_messages annotation to enable
     proper message tracking and state management in the conversation graph.
     """
-    messages: Annotated[list[str], add_messages]
\ No newline at end of file
+    messages: Annotated[list[str], add_messages]
+    summary: str
+    pending_intents: list[dict]
+    answered_intents: list[dict]
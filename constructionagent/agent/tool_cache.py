@@ -0,0 +1,231 @@
+"""
+Result cache for MCP tool calls.
+
+`measure_area`, `get_scale` and `query_pipe_info` are pure functions of the
+drawing data, so a repeated call returns what the server returned last time
+until a drawing changes. This module caches the results of read-only tools.
+It includes:
+- canonical_arguments: arguments with sorted keys and normalized spacing
+- ToolResultCache: LRU of results with per-tool TTL, invalidation by drawing
+  id (or whole tool), and hit rates per tool
+
+An entry is tagged with the drawing ids among its arguments (TOOL_CACHE_DRAWING_ARGS).
+Invalidating a drawing drops its entries and every entry without a drawing
+tag, since those may read any drawing. A call that was running during an
+invalidation does not store its result.
+"""
+
+import copy
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Optional, Set, Tuple
+
+from constructionagent.agent.logger import logger
+from constructionagent.agent.singleflight import normalize_text, request_key
+
+# Tool cache configuration
+TOOL_CACHE_ENABLED = os.getenv("TOOL_CACHE_ENABLED", "true").lower() == "true"
+TOOL_CACHE_TTL_SECONDS = float(os.getenv("TOOL_CACHE_TTL_SECONDS", "300"))
+# Per-tool TTL overrides in seconds (0 disables caching), e.g. '{"get_scale": 3600, "query_pipe_info": 60}'
+TOOL_CACHE_TTLS = json.loads(os.getenv("TOOL_CACHE_TTLS", "{}"))
+TOOL_CACHE_MAX_ENTRIES = int(os.getenv("TOOL_CACHE_MAX_ENTRIES", "4096"))
+TOOL_CACHE_DRAWING_ARGS = [
+    name.strip() for name in os.getenv("TOOL_CACHE_DRAWING_ARGS", "drawing,drawing_id").split(",") if name.strip()
+]
+
+
+def canonical_arguments(arguments: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Canonicalize tool arguments, so equivalent calls share a key.
+
+    Args:
+        arguments (Dict[str, Any]): Tool call arguments
+
+    Returns:
+        Dict[str, Any]: Arguments with sorted keys, None values dropped and
+        string values stripped of redundant whitespace
+    """
+    return {
+        name: normalize_text(value) if isinstance(value, str) else value
+        for name, value in sorted(arguments.items())
+        if value is not None
+    }
+
+
+class ToolResultCache:
+    """
+    LRU cache of tool results with TTL and drawing based invalidation.
+    """
+
+    def __init__(
+        self,
+        default_ttl: float = TOOL_CACHE_TTL_SECONDS,
+        ttls: Optional[Dict[str, float]] = None,
+        max_entries: int = TOOL_CACHE_MAX_ENTRIES,
+        drawing_args: Iterable[str] = TOOL_CACHE_DRAWING_ARGS,
+        enabled: bool = TOOL_CACHE_ENABLED,
+    ):
+        """
+        Initialize an empty cache.
+
+        Args:
+            default_ttl (float): Lifetime of an entry in seconds
+            ttls (Optional[Dict[str, float]]): Per-tool lifetimes (defaults to
+                TOOL_CACHE_TTLS), 0 disables caching of a tool
+            max_entries (int): Entries kept
+            drawing_args (Iterable[str]): Argument names holding a drawing id
+            enabled (bool): Whether lookups and stores happen at all
+        """
+        self.default_ttl = default_ttl
+        self.ttls = TOOL_CACHE_TTLS if ttls is None else ttls
+        self.max_entries = max_entries
+        self.drawing_args = list(drawing_args)
+        self.enabled = enabled
+        # Bumped by every invalidation; calls started before it do not store
+        self.generation = 0
+        # key -> (tool, drawing ids, result, expires_at)
+        self._entries: "OrderedDict[str, Tuple[str, Set[str], Any, float]]" = OrderedDict()
+        # tool -> {"hits", "misses", "stores", "expired", "evicted", "invalidated"}
+        self.counters: Dict[str, Dict[str, int]] = {}
+
+    def _count(self, tool: str, counter: str, amount: int = 1) -> None:
+        """Increment a per-tool counter."""
+        counters = self.counters.setdefault(
+            tool, {"hits": 0, "misses": 0, "stores": 0, "expired": 0, "evicted": 0, "invalidated": 0}
+        )
+        counters[counter] += amount
+
+    def ttl(self, tool: str) -> float:
+        """Lifetime of the entries of a tool, 0 when it is not cached."""
+        return float(self.ttls.get(tool, self.default_ttl)) if self.enabled else 0.0
+
+    def key(self, tool: str, version: str, arguments: Dict[str, Any]) -> str:
+        """
+        Get the cache key of a call.
+
+        Args:
+            tool (str): Tool name
+            version (str): Hash of the tool definition
+            arguments (Dict[str, Any]): Call arguments
+
+        Returns:
+            str: SHA-256 hex digest of the tool, its version and the
+            canonical arguments
+        """
+        return request_key(tool, version, canonical_arguments(arguments))
+
+    def get(self, tool: str, key: str) -> Optional[Any]:
+        """
+        Look up a result.
+
+        Args:
+            tool (str): Tool name
+            key (str): Cache key of the call
+
+        Returns:
+            Optional[Any]: A copy of the cached result, or None
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[3] <= time.time():
+            del self._entries[key]
+            self._count(tool, "expired")
+            entry = None
+        if entry is None:
+            self._count(tool, "misses")
+            return None
+        self._entries.move_to_end(key)
+        self._count(tool, "hits")
+        return copy.deepcopy(entry[2])
+
+    def put(self, tool: str, key: str, arguments: Dict[str, Any], result: Any, generation: int) -> None:
+        """
+        Store a result.
+
+        Args:
+            tool (str): Tool name
+            key (str): Cache key of the call
+            arguments (Dict[str, Any]): Call arguments (for the drawing tags)
+            result (Any): Tool result
+            generation (int): `generation` when the call started
+        """
+        ttl = self.ttl(tool)
+        if ttl <= 0 or generation != self.generation:
+            return
+        drawings = {normalize_text(str(arguments[name])) for name in self.drawing_args if arguments.get(name) is not None}
+        self._entries[key] = (tool, drawings, copy.deepcopy(result), time.time() + ttl)
+        self._entries.move_to_end(key)
+        self._count(tool, "stores")
+        while len(self._entries) > self.max_entries:
+            _, (evicted_tool, _, _, _) = self._entries.popitem(last=False)
+            self._count(evicted_tool, "evicted")
+
+    def _drop(self, keys: Iterable[str]) -> int:
+        """Drop entries as invalidated and start a new generation."""
+        self.generation += 1
+        dropped = 0
+        for key in list(keys):
+            tool = self._entries.pop(key)[0]
+            self._count(tool, "invalidated")
+            dropped += 1
+        return dropped
+
+    def invalidate_drawing(self, drawing_id: str) -> int:
+        """
+        Drop the results that may depend on a drawing, e.g. after a re-upload.
+
+        Args:
+            drawing_id (str): Drawing id as passed to the tools
+
+        Returns:
+            int: Number of entries dropped (the drawing's and the untagged ones)
+        """
+        drawing_id = normalize_text(drawing_id)
+        dropped = self._drop(
+            key for key, (_, drawings, _, _) in self._entries.items() if not drawings or drawing_id in drawings
+        )
+        logger.info("Tool cache invalidated for drawing", extra={"drawing_id": drawing_id, "dropped": dropped})
+        return dropped
+
+    def invalidate_tool(self, tool: str) -> int:
+        """
+        Drop every result of a tool.
+
+        Args:
+            tool (str): Tool name
+
+        Returns:
+            int: Number of entries dropped
+        """
+        dropped = self._drop(key for key, entry in self._entries.items() if entry[0] == tool)
+        logger.info("Tool cache invalidated for tool", extra={"tool": tool, "dropped": dropped})
+        return dropped
+
+    def clear(self) -> int:
+        """Drop every result; returns the number of entries dropped."""
+        return self._drop(self._entries.keys())
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the cache counters.
+
+        Returns:
+            Dict[str, Any]: Entries, generation, totals with the hit ratio and
+            counters per tool with their hit ratio
+        """
+        tools = {
+            tool: {**counters, "hit_ratio": counters["hits"] / (counters["hits"] + counters["misses"])
+                   if counters["hits"] + counters["misses"] else 0.0}
+            for tool, counters in self.counters.items()
+        }
+        hits = sum(counters["hits"] for counters in self.counters.values())
+        lookups = hits + sum(counters["misses"] for counters in self.counters.values())
+        return {
+            "entries": len(self._entries),
+            "generation": self.generation,
+            "hits": hits,
+            "lookups": lookups,
+            "hit_ratio": hits / lookups if lookups else 0.0,
+            "tools": tools,
+        }
@@ -0,0 +1,231 @@
+"""
+Parallel tool execution for the construction agent.
+
+This module provides the replacement for LangGraph's prebuilt `ToolNode` used
+by the `tools` node. Multi-intent queries ("What's the area and the pipe info
+of Room 101?") produce several tool calls in one AIMessage; they are executed
+concurrently with:
+- Per-tool concurrency limits (semaphores)
+- Per-call timeouts
+- Partial results: a failed or timed out call becomes an error ToolMessage
+  and does not sink the other calls
+- Latency metrics per tool name
+"""
+
+import asyncio
+import json
+import os
+import time
+from collections import deque
+from typing import Any, Dict, List, Optional
+
+from langchain_core.messages import AIMessage, ToolCall, ToolMessage
+
+from constructionagent.agent.logger import logger
+from constructionagent.agent.metrics import current_thread_id
+from constructionagent.agent.state import MessagesState
+from constructionagent.utils.stats import percentile
+
+# Tool execution configuration
+TOOL_TIMEOUT = float(os.getenv("TOOL_TIMEOUT", "30"))
+TOOL_MAX_CONCURRENCY = int(os.getenv("TOOL_MAX_CONCURRENCY", "4"))
+# Per-tool overrides, e.g. '{"query_pipe_info": {"timeout": 10, "max_concurrency": 2}}'
+TOOL_LIMITS = json.loads(os.getenv("TOOL_LIMITS", "{}"))
+
+# Number of recent latencies kept per tool for percentiles
+LATENCY_WINDOW = 1024
+
+
+class ToolLatencyStats:
+    """
+    Latency and outcome counters of a single tool.
+
+    Percentiles are computed over a sliding window of the most recent calls.
+    """
+
+    def __init__(self, window: int = LATENCY_WINDOW):
+        """
+        Initialize empty counters.
+
+        Args:
+            window (int): Number of recent latencies kept for percentiles
+        """
+        self.calls = 0
+        self.errors = 0
+        self.timeouts = 0
+        self.total_ms = 0.0
+        self.latencies = deque(maxlen=window)
+
+    def record(self, latency_ms: float, status: str) -> None:
+        """
+        Record one call.
+
+        Args:
+            latency_ms (float): Call latency in milliseconds
+            status (str): "success", "error" or "timeout"
+        """
+        self.calls += 1
+        self.total_ms += latency_ms
+        self.latencies.append(latency_ms)
+        if status == "error":
+            self.errors += 1
+        elif status == "timeout":
+            self.timeouts += 1
+
+    def percentile(self, q: float) -> float:
+        """
+        Get a latency percentile over the recent window.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Latency in milliseconds (0.0 without data)
+        """
+        return percentile(self.latencies, q)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Export the counters.
+
+        Returns:
+            Dict[str, Any]: Calls, errors, timeouts, mean and percentile latencies
+        """
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "timeouts": self.timeouts,
+            "mean_ms": self.total_ms / self.calls if self.calls else 0.0,
+            "p50_ms": self.percentile(50),
+            "p95_ms": self.percentile(95),
+            "p99_ms": self.percentile(99),
+        }
+
+
+class ParallelToolNode:
+    """
+    Graph node executing the tool calls of the last AIMessage concurrently.
+
+    Every tool gets its own semaphore (`max_concurrency`) and timeout, taken
+    from TOOL_LIMITS or the global defaults. The node always returns one
+    ToolMessage per tool call, in the order of the calls.
+    """
+
+    def __init__(
+        self,
+        tools: List[Any],
+        limits: Optional[Dict[str, Dict[str, Any]]] = None,
+        default_timeout: float = TOOL_TIMEOUT,
+        default_max_concurrency: int = TOOL_MAX_CONCURRENCY,
+    ):
+        """
+        Initialize the node.
+
+        Args:
+            tools (List[Any]): LangChain tools that can be called
+            limits (Optional[Dict[str, Dict[str, Any]]]): Per-tool "timeout"
+                and "max_concurrency" overrides (defaults to TOOL_LIMITS)
+            default_timeout (float): Timeout in seconds for tools without override
+            default_max_concurrency (int): Concurrency for tools without override
+        """
+        self.limits = TOOL_LIMITS if limits is None else limits
+        self.default_timeout = default_timeout
+        self.default_max_concurrency = default_max_concurrency
+        self.semaphores: Dict[str, asyncio.Semaphore] = {}
+        self.metrics: Dict[str, ToolLatencyStats] = {}
+        self.set_tools(tools)
+
+    def set_tools(self, tools: List[Any]) -> None:
+        """
+        Replace the tools that can be called.
+
+        Args:
+            tools (List[Any]): LangChain tools
+        """
+        self.tools_by_name = {tool.name: tool for tool in tools}
+
+    def _timeout(self, tool_name: str) -> float:
+        """Get the timeout of a tool."""
+        return self.limits.get(tool_name, {}).get("timeout", self.default_timeout)
+
+    def _semaphore(self, tool_name: str) -> asyncio.Semaphore:
+        """Get (or create) the semaphore of a tool."""
+        if tool_name not in self.semaphores:
+            limit = self.limits.get(tool_name, {}).get("max_concurrency", self.default_max_concurrency)
+            self.semaphores[tool_name] = asyncio.Semaphore(limit)
+        return self.semaphores[tool_name]
+
+    async def run_tool_call(self, call: ToolCall) -> ToolMessage:
+        """
+        Execute a single tool call.
+
+        Args:
+            call (ToolCall): The tool call to execute
+
+        Returns:
+            ToolMessage: The tool output, or an error message (status "error")
+        """
+        name = call["name"]
+        tool = self.tools_by_name.get(name)
+        if tool is None:
+            return ToolMessage(
+                content=f"Error: {name} is not a valid tool, try one of [{', '.join(self.tools_by_name)}].",
+                name=name,
+                tool_call_id=call["id"],
+                status="error",
+            )
+
+        timeout = self._timeout(name)
+        status = "success"
+        start = time.perf_counter()
+        try:
+            async with self._semaphore(name):
+                message = await asyncio.wait_for(
+                    tool.ainvoke({**call, "type": "tool_call"}),
+                    timeout,
+                )
+        except asyncio.TimeoutError:
+            status = "timeout"
+            message = ToolMessage(
+                content=f"Error: {name} timed out after {timeout:g}s.",
+                name=name,
+                tool_call_id=call["id"],
+                status="error",
+            )
+        except Exception as e:
+            status = "error"
+            logger.error("Tool call failed", exc_info=True, extra={"tool": name, "arguments": call["args"], "thread_id": current_thread_id()})
+            message = ToolMessage(
+                content=f"Error: {repr(e)}\n Please fix your mistakes.",
+                name=name,
+                tool_call_id=call["id"],
+                status="error",
+            )
+        latency_ms = (time.perf_counter() - start) * 1000
+        self.metrics.setdefault(name, ToolLatencyStats()).record(latency_ms, status)
+        logger.info("Tool call finished", extra={"tool": name, "status": status, "latency_ms": latency_ms, "thread_id": current_thread_id()})
+        return message
+
+    async def execute(self, state: MessagesState) -> Dict[str, List[Any]]:
+        """
+        Execute the tool calls of the last message concurrently.
+
+        Args:
+            state (MessagesState): Current conversation state
+
+        Returns:
+            Dict[str, List[Any]]: One ToolMessage per tool call
+        """
+        last_message = state['messages'][-1]
+        tool_calls = last_message.tool_calls if isinstance(last_message, AIMessage) else []
+        results = await asyncio.gather(*(self.run_tool_call(call) for call in tool_calls))
+        return {'messages': list(results)}
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Get the latency metrics of every tool called so far.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Metrics keyed by tool name
+        """
+        return {name: stats.to_dict() for name, stats in self.metrics.items()}
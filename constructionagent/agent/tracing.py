@@ -0,0 +1,404 @@
+"""
+Span based tracing for the construction agent.
+
+LangSmith cannot be reached from air-gapped sites, so the agent records its
+own spans and exports them locally in the OpenTelemetry (OTLP/JSON) format:
+- `AgentGraph.ainvoke` opens a `turn` span per user query
+- Every graph node (`History`, `Fast_Path`, `Query_Validation`, `Agent`,
+  `tools`), LLM call and MCP tool/prompt call opens a child span
+- Spans carry the thread_id and run_id of the turn; the current span is held
+  in a context variable, so it follows the graph into node tasks
+
+Exporters:
+- none: spans are not recorded (default)
+- memory: the last spans are kept in process (tests, the CLI)
+- file: OTLP/JSON lines appended to TRACE_FILE_PATH by a background thread,
+  readable by an OpenTelemetry collector's file receiver
+"""
+
+import atexit
+import contextvars
+import json
+import os
+import queue
+import secrets
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Dict, Iterator, List, Optional
+
+from langgraph.config import get_config
+
+from constructionagent.agent.logger import logger, ConfigurationError
+
+# Tracing configuration
+# none | memory | file
+TRACE_EXPORTER = os.getenv("TRACE_EXPORTER", "none")
+TRACE_FILE_PATH = os.getenv("TRACE_FILE_PATH", "logs/traces.jsonl")
+TRACE_SERVICE_NAME = os.getenv("TRACE_SERVICE_NAME", "constructionagent")
+TRACE_MEMORY_MAX_SPANS = int(os.getenv("TRACE_MEMORY_MAX_SPANS", "10000"))
+# Seconds between writes of the file exporter
+TRACE_FLUSH_INTERVAL = float(os.getenv("TRACE_FLUSH_INTERVAL", "1.0"))
+
+# OTLP span kinds and status codes
+SPAN_KIND_INTERNAL = 1
+SPAN_KIND_CLIENT = 3
+STATUS_UNSET = 0
+STATUS_OK = 1
+STATUS_ERROR = 2
+
+INSTRUMENTATION_SCOPE = "constructionagent.agent.tracing"
+
+_current_span: contextvars.ContextVar[Optional["Span"]] = contextvars.ContextVar("current_span", default=None)
+
+
+class Span:
+    """
+    A timed operation of a trace.
+
+    Attributes:
+        trace_id (str): 32 hex characters shared by the spans of a turn
+        span_id (str): 16 hex characters
+        parent_span_id (Optional[str]): Span this one is nested in
+    """
+
+    def __init__(self, name: str, trace_id: str, parent_span_id: Optional[str], kind: int, attributes: Dict[str, Any]):
+        self.name = name
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_span_id = parent_span_id
+        self.kind = kind
+        self.attributes = attributes
+        self.events: List[Dict[str, Any]] = []
+        self.status_code = STATUS_UNSET
+        self.status_message = ""
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        """Set an attribute (str, bool, int, float or a list of them)."""
+        self.attributes[key] = value
+
+    def set_attributes(self, attributes: Dict[str, Any]) -> None:
+        """Set several attributes."""
+        self.attributes.update(attributes)
+
+    def record_exception(self, error: BaseException) -> None:
+        """Mark the span as failed and add an OpenTelemetry exception event."""
+        self.status_code = STATUS_ERROR
+        self.status_message = str(error)
+        attributes = {"exception.type": type(error).__name__, "exception.message": str(error)}
+        if getattr(error, "error_code", None):
+            attributes["exception.error_code"] = error.error_code
+        self.events.append({"name": "exception", "time_ns": time.time_ns(), "attributes": attributes})
+
+    @property
+    def duration_ms(self) -> float:
+        """Duration in milliseconds (up to now while the span is open)."""
+        return ((self.end_ns or time.time_ns()) - self.start_ns) / 1e6
+
+    def to_otlp(self) -> Dict[str, Any]:
+        """
+        Convert the span to its OTLP/JSON representation.
+
+        Returns:
+            Dict[str, Any]: Span object of an OTLP ExportTraceServiceRequest
+        """
+        span = {
+            "traceId": self.trace_id,
+            "spanId": self.span_id,
+            "name": self.name,
+            "kind": self.kind,
+            "startTimeUnixNano": str(self.start_ns),
+            "endTimeUnixNano": str(self.end_ns or time.time_ns()),
+            "attributes": otlp_attributes(self.attributes),
+            "status": {"code": self.status_code, **({"message": self.status_message} if self.status_message else {})},
+        }
+        if self.parent_span_id:
+            span["parentSpanId"] = self.parent_span_id
+        if self.events:
+            span["events"] = [
+                {"name": event["name"], "timeUnixNano": str(event["time_ns"]), "attributes": otlp_attributes(event["attributes"])}
+                for event in self.events
+            ]
+        return span
+
+
+def otlp_value(value: Any) -> Dict[str, Any]:
+    """Convert a Python value to an OTLP AnyValue."""
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    if isinstance(value, (list, tuple)):
+        return {"arrayValue": {"values": [otlp_value(item) for item in value]}}
+    return {"stringValue": str(value)}
+
+
+def otlp_attributes(attributes: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Convert attributes to OTLP KeyValues, skipping None values."""
+    return [{"key": key, "value": otlp_value(value)} for key, value in attributes.items() if value is not None]
+
+
+def otlp_request(spans: List[Span], service_name: str = TRACE_SERVICE_NAME) -> Dict[str, Any]:
+    """
+    Wrap spans in an OTLP/JSON ExportTraceServiceRequest.
+
+    Args:
+        spans (List[Span]): Finished spans
+        service_name (str): service.name resource attribute
+
+    Returns:
+        Dict[str, Any]: The request, one line of the file exporter
+    """
+    return {"resourceSpans": [{
+        "resource": {"attributes": otlp_attributes({"service.name": service_name})},
+        "scopeSpans": [{"scope": {"name": INSTRUMENTATION_SCOPE}, "spans": [span.to_otlp() for span in spans]}],
+    }]}
+
+
+class InMemorySpanExporter:
+    """
+    Keeps the most recent finished spans in process.
+    """
+
+    def __init__(self, max_spans: int = TRACE_MEMORY_MAX_SPANS):
+        """
+        Initialize an empty sink.
+
+        Args:
+            max_spans (int): Spans kept, oldest dropped first
+        """
+        self._spans: deque = deque(maxlen=max_spans)
+        self._lock = threading.Lock()
+
+    def export(self, span: Span) -> None:
+        """Store a finished span."""
+        with self._lock:
+            self._spans.append(span)
+
+    def spans(self, trace_id: Optional[str] = None) -> List[Span]:
+        """
+        Get the stored spans.
+
+        Args:
+            trace_id (Optional[str]): Only the spans of this trace
+
+        Returns:
+            List[Span]: Spans in the order they finished
+        """
+        with self._lock:
+            return [span for span in self._spans if trace_id is None or span.trace_id == trace_id]
+
+    def clear(self) -> None:
+        """Drop the stored spans."""
+        with self._lock:
+            self._spans.clear()
+
+    def shutdown(self) -> None:
+        """Nothing to flush."""
+
+
+class FileSpanExporter:
+    """
+    Appends finished spans to a JSONL file of OTLP requests.
+
+    Spans are queued on the hot path and written in batches by a background
+    thread, like the log writer, so exporting never blocks the event loop.
+    """
+
+    def __init__(self, path: str = TRACE_FILE_PATH, flush_interval: float = TRACE_FLUSH_INTERVAL,
+                 service_name: str = TRACE_SERVICE_NAME):
+        """
+        Start the writer thread.
+
+        Args:
+            path (str): Output file
+            flush_interval (float): Seconds between writes
+            service_name (str): service.name resource attribute
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.flush_interval = flush_interval
+        self.service_name = service_name
+        self.exported = 0
+        self._queue: queue.SimpleQueue = queue.SimpleQueue()
+        self._stopping = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="span-writer", daemon=True)
+        self._thread.start()
+
+    def export(self, span: Span) -> None:
+        """Queue a finished span."""
+        self._queue.put(span)
+
+    def _drain(self) -> None:
+        """Write the queued spans as one OTLP request."""
+        spans = []
+        while True:
+            try:
+                spans.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if not spans:
+            return
+        try:
+            with open(self.path, "a", encoding="utf-8") as output:
+                output.write(json.dumps(otlp_request(spans, self.service_name)) + "\n")
+            self.exported += len(spans)
+        except OSError:
+            logger.warning("Failed to export spans", exc_info=True, extra={"path": str(self.path), "spans": len(spans)})
+
+    def _run(self) -> None:
+        """Write batches until stopped."""
+        while not self._stopping.wait(self.flush_interval):
+            self._drain()
+        self._drain()
+
+    def shutdown(self) -> None:
+        """Write the queued spans and stop the thread."""
+        self._stopping.set()
+        self._thread.join(timeout=5)
+
+
+def create_exporter(kind: str = TRACE_EXPORTER):
+    """
+    Create the span exporter selected by TRACE_EXPORTER.
+
+    Args:
+        kind (str): "none", "memory" or "file"
+
+    Returns:
+        Optional exporter, None when tracing is disabled
+
+    Raises:
+        ConfigurationError: If the exporter is unknown
+    """
+    if kind == "none":
+        return None
+    if kind == "memory":
+        return InMemorySpanExporter()
+    if kind == "file":
+        return FileSpanExporter()
+    raise ConfigurationError(
+        message=f"Unknown trace exporter: {kind}",
+        error_code="TRACING_CONFIG_ERROR",
+        details={"exporter": kind, "supported": ["none", "memory", "file"]},
+    )
+
+
+class Tracer:
+    """
+    Creates spans and hands the finished ones to the exporter.
+    """
+
+    def __init__(self, exporter=None):
+        """
+        Initialize the tracer.
+
+        Args:
+            exporter: InMemorySpanExporter, FileSpanExporter, or None to disable tracing
+        """
+        self.exporter = exporter
+
+    @property
+    def enabled(self) -> bool:
+        return self.exporter is not None
+
+    @contextmanager
+    def span(self, name: str, kind: int = SPAN_KIND_INTERNAL, attributes: Optional[Dict[str, Any]] = None,
+             trace_id: Optional[str] = None) -> Iterator[Optional[Span]]:
+        """
+        Open a span nested in the current one.
+
+        A span without parent starts a new trace. The thread_id and run_id
+        attributes are inherited from the parent, or taken from the running
+        graph's config.
+
+        Args:
+            name (str): Span name
+            kind (int): SPAN_KIND_INTERNAL or SPAN_KIND_CLIENT
+            attributes (Optional[Dict[str, Any]]): Initial attributes
+            trace_id (Optional[str]): Trace of a root span, random if None
+
+        Yields:
+            Optional[Span]: The open span, None when tracing is disabled
+        """
+        if self.exporter is None:
+            yield None
+            return
+        parent = _current_span.get()
+        span_attributes = {}
+        if parent is not None:
+            span_attributes = {key: parent.attributes[key] for key in ("thread_id", "run_id") if key in parent.attributes}
+        else:
+            span_attributes = run_attributes()
+        span_attributes.update(attributes or {})
+        span = Span(
+            name,
+            parent.trace_id if parent is not None else trace_id or secrets.token_hex(16),
+            parent.span_id if parent is not None else None,
+            kind,
+            span_attributes,
+        )
+        token = _current_span.set(span)
+        try:
+            yield span
+        except BaseException as error:
+            span.record_exception(error)
+            raise
+        finally:
+            _current_span.reset(token)
+            span.end_ns = time.time_ns()
+            if span.status_code == STATUS_UNSET:
+                span.status_code = STATUS_OK
+            self.exporter.export(span)
+
+    def shutdown(self) -> None:
+        """Flush the exporter."""
+        if self.exporter is not None:
+            self.exporter.shutdown()
+
+
+def run_attributes() -> Dict[str, Any]:
+    """
+    Get the thread_id and run_id of the running graph.
+
+    Returns:
+        Dict[str, Any]: The ids found in the run's config (the LangGraph server
+        sets run_id), empty outside a graph run
+    """
+    try:
+        configurable = get_config().get("configurable", {})
+    except RuntimeError:
+        return {}
+    return {key: str(configurable[key]) for key in ("thread_id", "run_id") if configurable.get(key) is not None}
+
+
+def current_span() -> Optional[Span]:
+    """Get the span open in the current context, if any."""
+    return _current_span.get()
+
+
+def traced_node(name: str, node: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]:
+    """
+    Wrap a graph node so each execution is a span.
+
+    Args:
+        name (str): Node name
+        node (Callable): Async node function taking the state
+
+    Returns:
+        Callable: Async node function with the same behavior
+    """
+    async def run(state: Dict[str, Any]) -> Dict[str, Any]:
+        with tracer.span(name, attributes={"langgraph.node": name}):
+            return await node(state)
+    return run
+
+
+tracer = Tracer(create_exporter())
+atexit.register(tracer.shutdown)
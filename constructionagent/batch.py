@@ -0,0 +1,244 @@
+"""
+Batch query runner.
+
+Pushes a file of queries through the agent graph, e.g. nightly re-checks over a
+drawing set:
+- Input: JSONL ({"query": ..., "id": ..., "thread_id": ...}) or CSV with the
+  same columns; only `query` is required. Read lazily, so inputs of any size
+  are streamed.
+- Queries run concurrently up to `--concurrency`, each on its own thread id
+  unless the input gives one; queries sharing a thread id run in input order.
+- Results are appended to the output JSONL as they complete, so a crashed
+  batch keeps its results and `--resume` skips the ids already answered.
+- Throughput and latency percentiles are printed at the end.
+
+Usage:
+    python -m constructionagent.batch queries.jsonl --output results.jsonl --concurrency 8
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import time
+import uuid
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set
+
+from langchain_core.messages import HumanMessage
+
+from constructionagent.agent.core import AgentGraph
+from constructionagent.agent.logger import logger
+from constructionagent.utils.stats import percentile
+
+
+def read_queries(path: Path) -> Iterator[Dict[str, Any]]:
+    """
+    Stream the queries of a JSONL or CSV file.
+
+    Args:
+        path (Path): Input file (.csv is read as CSV, anything else as JSONL)
+
+    Yields:
+        Dict[str, Any]: Query records with an `id` (line number if missing)
+    """
+    with open(path, newline="", encoding="utf-8") as source:
+        rows = csv.DictReader(source) if path.suffix.lower() == ".csv" else (
+            json.loads(line) for line in source if line.strip()
+        )
+        for number, row in enumerate(rows, start=1):
+            if not row.get("query"):
+                logger.warning("Skipping input row without query", extra={"row": number})
+                continue
+            row["id"] = str(row.get("id") or number)
+            yield row
+
+
+def answered_ids(path: Path) -> Set[str]:
+    """
+    Ids of the successful results already in an output file.
+
+    A batch killed mid-write leaves a truncated last line; lines that do not
+    parse are skipped, so their queries run again.
+    """
+    answered: Set[str] = set()
+    if not path.exists():
+        return answered
+    with open(path, encoding="utf-8") as results:
+        for number, line in enumerate(results, start=1):
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                logger.warning("Skipping unreadable result line", extra={"line": number})
+                continue
+            if record.get("status") == "ok":
+                answered.add(record["id"])
+    return answered
+
+
+def ends_with_newline(path: Path) -> bool:
+    """Whether a file is empty or its last line is complete."""
+    with open(path, "rb") as source:
+        if not source.seek(0, 2):
+            return True
+        source.seek(-1, 2)
+        return source.read(1) == b"\n"
+
+
+class BatchRunner:
+    """
+    Runs queries through an AgentGraph with bounded concurrency.
+    """
+
+    def __init__(self, agent: AgentGraph, output: Path, concurrency: int = 8, timeout: Optional[float] = None,
+                 batch_id: Optional[str] = None, progress_every: int = 100):
+        """
+        Initialize the runner.
+
+        Args:
+            agent (AgentGraph): Agent whose graph is built
+            output (Path): Results JSONL, appended to
+            concurrency (int): Queries in flight
+            timeout (Optional[float]): Seconds before a query is abandoned
+            batch_id (Optional[str]): Prefix of the generated thread ids
+            progress_every (int): Results between progress logs
+        """
+        self.agent = agent
+        self.output = output
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.batch_id = batch_id or uuid.uuid4().hex[:8]
+        self.progress_every = progress_every
+        self.latencies: List[float] = []
+        self.errors: Dict[str, int] = {}
+        self._thread_locks: Dict[str, asyncio.Lock] = {}
+        self._thread_users: Dict[str, int] = {}
+
+    async def run_query(self, row: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Run one query.
+
+        Args:
+            row (Dict[str, Any]): Query record
+
+        Returns:
+            Dict[str, Any]: Result record (answer or error, latency)
+        """
+        thread_id = str(row.get("thread_id") or f"batch-{self.batch_id}-{row['id']}")
+        config = {"configurable": {"thread_id": thread_id}}
+        lock = self._thread_locks.setdefault(thread_id, asyncio.Lock())
+        self._thread_users[thread_id] = self._thread_users.get(thread_id, 0) + 1
+        result = {"id": row["id"], "thread_id": thread_id, "query": row["query"]}
+        try:
+            async with lock:
+                start = time.perf_counter()
+                try:
+                    state = await asyncio.wait_for(
+                        self.agent.ainvoke({"messages": [HumanMessage(content=row["query"])]}, config=config),
+                        self.timeout,
+                    )
+                    result.update(status="ok", answer=state["messages"][-1].content)
+                except asyncio.TimeoutError:
+                    result.update(status="error", error_code="TIMEOUT", error=f"No answer after {self.timeout:g}s")
+                except Exception as e:
+                    result.update(status="error", error_code=getattr(e, "error_code", type(e).__name__), error=str(e))
+                result["latency_ms"] = (time.perf_counter() - start) * 1000
+        finally:
+            self._thread_users[thread_id] -= 1
+            if not self._thread_users[thread_id]:
+                del self._thread_users[thread_id], self._thread_locks[thread_id]
+        return result
+
+    async def run(self, rows: Iterator[Dict[str, Any]]) -> Dict[str, Any]:
+        """
+        Run every query and append the results as they complete.
+
+        Args:
+            rows (Iterator[Dict[str, Any]]): Query records
+
+        Returns:
+            Dict[str, Any]: Summary (counts, throughput, latency percentiles)
+        """
+        pending: asyncio.Queue = asyncio.Queue(maxsize=self.concurrency * 2)
+        completed = 0
+        start = time.perf_counter()
+
+        async def worker(output) -> None:
+            nonlocal completed
+            while (row := await pending.get()) is not None:
+                result = await self.run_query(row)
+                output.write(json.dumps(result) + "\n")
+                output.flush()
+                completed += 1
+                self.latencies.append(result["latency_ms"])
+                if result["status"] != "ok":
+                    self.errors[result["error_code"]] = self.errors.get(result["error_code"], 0) + 1
+                if completed % self.progress_every == 0:
+                    logger.info("Batch progress", extra={"completed": completed, "errors": sum(self.errors.values()),
+                                                         "queries_per_s": completed / (time.perf_counter() - start)})
+
+        self.output.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.output, "a", encoding="utf-8") as output:
+            if not ends_with_newline(self.output):
+                # Start on a new line after a truncated last result
+                output.write("\n")
+            workers = [asyncio.create_task(worker(output)) for _ in range(self.concurrency)]
+            try:
+                for row in rows:
+                    await pending.put(row)
+                for _ in workers:
+                    await pending.put(None)
+                await asyncio.gather(*workers)
+            finally:
+                for task in workers:
+                    task.cancel()
+
+        elapsed = time.perf_counter() - start
+        ordered = sorted(self.latencies)
+        return {
+            "queries": completed,
+            "ok": completed - sum(self.errors.values()),
+            "errors": self.errors,
+            "elapsed_s": elapsed,
+            "queries_per_s": completed / elapsed if elapsed else 0.0,
+            "latency_ms": {
+                "mean": sum(ordered) / len(ordered) if ordered else 0.0,
+                "p50": percentile(ordered, 50),
+                "p90": percentile(ordered, 90),
+                "p99": percentile(ordered, 99),
+                "max": ordered[-1] if ordered else 0.0,
+            },
+        }
+
+
+async def main(args: argparse.Namespace) -> Dict[str, Any]:
+    """Build the agent, run the batch and return its summary."""
+    skip = answered_ids(args.output) if args.resume else set()
+    rows = (row for row in read_queries(args.input) if row["id"] not in skip)
+    agent = AgentGraph()
+    try:
+        await agent.build_graph()
+        runner = BatchRunner(agent, args.output, args.concurrency, args.timeout, progress_every=args.progress_every)
+        summary = await runner.run(rows)
+        summary["skipped"] = len(skip)
+        summary["llm"] = agent.metrics.snapshot(include_threads=False)["totals"]
+        summary["singleflight"] = {"llm": agent.llm_flight.stats(), "tools": agent.mcp_client.tool_flight.stats()}
+        summary["llm_cache"] = {name: value for name, value in agent.llm_cache.stats().items() if name != "nodes"}
+        summary["llm_resilience"] = {name: value for name, value in agent.resilience.stats().items() if name != "hedge_delay_s"}
+        summary["model_routes"] = {name: value for name, value in agent.router.stats().items() if name != "routes"}
+        summary["tool_cache"] = {name: value for name, value in agent.mcp_client.tool_cache.stats().items() if name != "tools"}
+        return summary
+    finally:
+        await agent.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", type=Path, help="Queries, JSONL or CSV")
+    parser.add_argument("--output", type=Path, default=Path("results.jsonl"), help="Results JSONL, appended to")
+    parser.add_argument("--concurrency", type=int, default=8, help="Queries in flight")
+    parser.add_argument("--timeout", type=float, default=None, help="Seconds before a query is abandoned")
+    parser.add_argument("--resume", action="store_true", help="Skip the ids already answered in the output")
+    parser.add_argument("--progress-every", type=int, default=100, help="Results between progress logs")
+    summary = asyncio.run(main(parser.parse_args()))
+    print(json.dumps(summary, indent=2))
@@ -0,0 +1,87 @@
+"""
+Streaming command line chat with the agent.
+
+Prints the progress of each turn ("Validating the query", "Running
+measure_area") and the answer as it streams from `AgentGraph.astream`, then
+the time to first byte and the total time of the turn.
+
+Usage:
+    python -m constructionagent.chat "What is the area of Room 101?"
+    python -m constructionagent.chat --thread-id site-42      (interactive)
+"""
+
+import argparse
+import asyncio
+import sys
+import time
+import uuid
+from typing import Optional
+
+from langchain_core.messages import HumanMessage
+
+from constructionagent.agent.core import AgentGraph
+from constructionagent.agent.logger import AgentError
+
+
+async def ask(agent: AgentGraph, question: str, thread_id: str, show_progress: bool = True) -> None:
+    """
+    Stream one turn to the terminal.
+
+    Args:
+        agent (AgentGraph): Agent whose graph is built
+        question (str): User query
+        thread_id (str): Conversation thread
+        show_progress (bool): Whether progress events are printed (to stderr)
+    """
+    start = time.perf_counter()
+    first_byte: Optional[float] = None
+    streamed = False
+    config = {"configurable": {"thread_id": thread_id}}
+    try:
+        async for event in agent.astream({"messages": [HumanMessage(content=question)]}, config=config):
+            if event["event"] == "progress":
+                if show_progress:
+                    print(f"... {event['message']}", file=sys.stderr, flush=True)
+                continue
+            if first_byte is None:
+                first_byte = time.perf_counter() - start
+            if event["event"] == "token":
+                streamed = True
+                print(event["text"], end="", flush=True)
+            elif event["event"] == "answer" and not streamed:
+                print(event["text"], end="", flush=True)
+    except AgentError as e:
+        # A streamed answer that failed midway is not retried; end it with the error
+        print(file=sys.stderr)
+        print(f"Error: {e.message} ({e.error_code})", file=sys.stderr, flush=True)
+        return
+    print()
+    if show_progress:
+        print(f"(first byte {first_byte * 1000:.0f} ms, total {(time.perf_counter() - start) * 1000:.0f} ms)", file=sys.stderr)
+
+
+async def main(args: argparse.Namespace) -> None:
+    """Build the agent and answer the question, or chat until EOF."""
+    agent = AgentGraph()
+    try:
+        await agent.build_graph()
+        if args.question:
+            await ask(agent, args.question, args.thread_id, not args.quiet)
+            return
+        while True:
+            try:
+                question = await asyncio.to_thread(input, "> ")
+            except EOFError:
+                break
+            if question.strip():
+                await ask(agent, question, args.thread_id, not args.quiet)
+    finally:
+        await agent.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("question", nargs="?", help="Question to answer; interactive chat if omitted")
+    parser.add_argument("--thread-id", default=f"chat-{uuid.uuid4().hex[:8]}", help="Conversation thread")
+    parser.add_argument("--quiet", action="store_true", help="Print only the answer")
+    asyncio.run(main(parser.parse_args()))
@@ -4,12 +4,13 @@ from langchain_core.messages import HumanMessage
 
 async def run():
     agent_graph = AgentGraph()
-    await agent_graph.build_graph()
-    graph = agent_graph.graph
-
-    thread_config = {'configurable': {'thread_id': '1'}}
-    result = await graph.ainvoke({'messages':[HumanMessage(content="What is the area of region A and scale of drawing B?")]}, config=thread_config)
-    print(result)
+    try:
+        await agent_graph.build_graph()
+        thread_config = {'configurable': {'thread_id': '1'}}
+        result = await agent_graph.ainvoke({'messages':[HumanMessage(content="What is the area of region A and scale of drawing B?")]}, config=thread_config)
+        print(result)
+    finally:
+        await agent_graph.close()
 
 
 
@@ -1,8 +1,12 @@
 from mcp.server.fastmcp import FastMCP
+from mcp.types import ToolAnnotations
 
 mcp = FastMCP('Static_Server')
 
-@mcp.tool()
+# responseTemplate: how the agent phrases a tool result without an LLM call.
+# Formatted with the tool arguments and `result` (parsed from JSON when possible).
+# readOnlyHint: identical concurrent calls may share one execution.
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, responseTemplate="The area of {region} is {result}."))
 async def measure_area(region):
     ''' Measures area of a specified region
     Args:
@@ -12,7 +16,7 @@ async def measure_area(region):
     '''
     return f"100"
 
-@mcp.tool()
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, responseTemplate="The scale used in {drawing} is {result}."))
 async def get_scale(drawing):
     ''' Fetches the scale used in a drawing
     Args:
@@ -24,7 +28,11 @@ async def get_scale(drawing):
     scale = 'meter'
     return scale
 
-@mcp.tool()
+@mcp.tool(annotations=ToolAnnotations(readOnlyHint=True, responseTemplate=(
+    "The water pipe at {location} is {result[pipe_id]}: {result[diameter]} in diameter, "
+    "{result[length]} long, installed on {result[installation_date]}, last inspected on "
+    "{result[last_inspection_date]}, condition: {result[condition]}."
+)))
 async def query_pipe_info(location):
     '''
     Returns information about a water pipe at a specified location.
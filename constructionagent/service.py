@@ -0,0 +1,305 @@
+"""
+HTTP service around one shared AgentGraph.
+
+Endpoints:
+- POST /v1/query: {"query", "thread_id"?, "timeout"?} -> the answer
+- POST /v1/query/stream: same body -> Server-Sent Events (progress, token,
+  answer, error) from `AgentGraph.astream`
+- POST /v1/drawings/{drawing_id}/invalidate: drop the cached tool results of
+  a re-uploaded drawing
+- GET /healthz: 200 once the graph is built, 503 before
+- GET /metrics: per-endpoint latencies and status codes, admission state,
+  LLM and tool metrics, single-flight, LLM cache, tool cache and LLM
+  retry/hedging/circuit breaker counters, latency and cost per model route
+
+Requests beyond SERVICE_MAX_IN_FLIGHT wait in a bounded queue and are shed
+with 429 (queue full) or 503 (deadline) and a Retry-After header, see
+`constructionagent.agent.admission`; while the LLM circuit breaker is open,
+queries the fast path cannot answer get 503 as well. Turns of one thread should be sent one
+at a time.
+
+Usage:
+    python -m constructionagent.service
+    uvicorn constructionagent.service:app --port 8000
+"""
+
+import asyncio
+import json
+import os
+import time
+import uuid
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Optional
+
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+from langchain_core.messages import HumanMessage
+from pydantic import BaseModel, Field
+
+from constructionagent.agent.admission import AdmissionController
+from constructionagent.agent.core import AgentGraph
+from constructionagent.agent.logger import logger, AgentError, LLMUnavailableError, OverloadedError
+from constructionagent.agent.tool_executor import ToolLatencyStats
+
+# Service configuration
+SERVICE_HOST = os.getenv("SERVICE_HOST", "0.0.0.0")
+SERVICE_PORT = int(os.getenv("SERVICE_PORT", "8000"))
+SERVICE_REQUEST_TIMEOUT = float(os.getenv("SERVICE_REQUEST_TIMEOUT", "120"))
+
+# HTTP status of each shedding reason
+OVERLOAD_STATUS = {"OVERLOADED_QUEUE_FULL": 429, "OVERLOADED_DEADLINE": 503}
+
+
+class QueryRequest(BaseModel):
+    """Body of the query endpoints."""
+    query: str = Field(min_length=1)
+    thread_id: Optional[str] = None
+    timeout: Optional[float] = Field(default=None, gt=0, description="Seconds for the whole request, queueing included")
+
+
+class EndpointStats(ToolLatencyStats):
+    """
+    Latency and status code counters of one endpoint.
+
+    Shed requests (429, 503) are counted apart and kept out of the latency
+    window, so percentiles describe the requests that were served. Other 5xx
+    responses count as errors, 504 as timeouts. A stream ending with an error
+    event is sent with 200 but counted with the status `/v1/query` would
+    have returned (504 for TIMEOUT, 503 while the LLM is unavailable, 500
+    otherwise).
+    """
+
+    def __init__(self):
+        """Initialize empty counters."""
+        super().__init__()
+        self.shed = 0
+        self.status_codes: Dict[int, int] = {}
+
+    def record_response(self, latency_ms: float, status_code: int) -> None:
+        """
+        Record one response.
+
+        Args:
+            latency_ms (float): Time until the last byte, in milliseconds
+            status_code (int): HTTP status
+        """
+        self.status_codes[status_code] = self.status_codes.get(status_code, 0) + 1
+        if status_code in OVERLOAD_STATUS.values():
+            self.shed += 1
+            return
+        status = "timeout" if status_code == 504 else "error" if status_code >= 500 else "success"
+        self.record(latency_ms, status)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Export the counters with the shed requests and status codes."""
+        return {**super().to_dict(), "shed": self.shed, "status_codes": dict(sorted(self.status_codes.items()))}
+
+
+class LatencyMiddleware:
+    """
+    ASGI middleware recording the latency of every request per route.
+
+    Latency runs until the response is complete, so streams count in full.
+    Streams set the status they are counted with in the request state
+    (`stream_status`) when they end with an error event.
+    """
+
+    def __init__(self, app, endpoints: Dict[str, EndpointStats]):
+        """
+        Initialize the middleware.
+
+        Args:
+            app: ASGI application
+            endpoints (Dict[str, EndpointStats]): Stats per "METHOD /route"
+        """
+        self.app = app
+        self.endpoints = endpoints
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        start = time.perf_counter()
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            # Unmatched paths share one entry so scanners cannot grow the dict
+            route = getattr(scope.get("route"), "path", "unmatched")
+            stats = self.endpoints.setdefault(f"{scope['method']} {route}", EndpointStats())
+            status_code = scope.get("state", {}).get("stream_status", status_code)
+            stats.record_response((time.perf_counter() - start) * 1000, status_code)
+
+
+class AdmittedStreamingResponse(StreamingResponse):
+    """
+    Streaming response holding an admission slot until it is done.
+
+    The slot is released once the response is sent, cancelled or fails,
+    including when the body is never iterated (client gone before the
+    first byte).
+    """
+
+    def __init__(self, content: AsyncIterator[str], release: Callable[[], None], **kwargs: Any):
+        """
+        Initialize the response.
+
+        Args:
+            content (AsyncIterator[str]): Body chunks
+            release (Callable[[], None]): Releases the admission slot
+            **kwargs: `StreamingResponse` arguments
+        """
+        super().__init__(content, **kwargs)
+        self.release = release
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await super().__call__(scope, receive, send)
+        finally:
+            self.release()
+
+
+def error_response(status_code: int, error_code: str, message: str, headers: Optional[Dict[str, str]] = None) -> JSONResponse:
+    """Build the JSON body of an error."""
+    return JSONResponse({"error_code": error_code, "message": message}, status_code=status_code, headers=headers)
+
+
+def sse(event: Dict[str, Any]) -> str:
+    """Encode a stream event as a Server-Sent Event."""
+    return f"event: {event['event']}\ndata: {json.dumps(event)}\n\n"
+
+
+def create_app(agent: Optional[AgentGraph] = None, admission: Optional[AdmissionController] = None) -> FastAPI:
+    """
+    Create the service.
+
+    Args:
+        agent (Optional[AgentGraph]): Agent shared by all requests, built and
+            closed with the app (a new one by default)
+        admission (Optional[AdmissionController]): Admission control
+            (configured from the environment by default)
+
+    Returns:
+        FastAPI: The application
+    """
+    agent = agent or AgentGraph()
+    admission = admission or AdmissionController()
+    endpoints: Dict[str, EndpointStats] = {}
+
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await agent.build_graph()
+        logger.info("Service ready", extra={"max_in_flight": admission.max_in_flight, "max_queue": admission.max_queue})
+        try:
+            yield
+        finally:
+            await agent.close()
+
+    app = FastAPI(title="Construction Agent", lifespan=lifespan)
+    app.add_middleware(LatencyMiddleware, endpoints=endpoints)
+    app.state.agent = agent
+    app.state.admission = admission
+
+    @app.exception_handler(OverloadedError)
+    async def overloaded(request: Request, error: OverloadedError) -> JSONResponse:
+        return error_response(OVERLOAD_STATUS.get(error.error_code, 503), error.error_code, error.message,
+                              headers={"Retry-After": str(error.details.get("retry_after", 1))})
+
+    @app.exception_handler(LLMUnavailableError)
+    async def llm_unavailable(request: Request, error: LLMUnavailableError) -> JSONResponse:
+        return error_response(503, error.error_code, error.message,
+                              headers={"Retry-After": str(error.details.get("retry_after", 1))})
+
+    @app.exception_handler(AgentError)
+    async def agent_error(request: Request, error: AgentError) -> JSONResponse:
+        return error_response(500, error.error_code, error.message)
+
+    def turn(body: QueryRequest) -> tuple:
+        """Graph input and run config of a request."""
+        config = {"configurable": {"thread_id": body.thread_id or f"api-{uuid.uuid4().hex}"}, "run_id": uuid.uuid4()}
+        return {"messages": [HumanMessage(content=body.query)]}, config
+
+    @app.post("/v1/query")
+    async def query(body: QueryRequest):
+        budget = body.timeout or SERVICE_REQUEST_TIMEOUT
+        deadline = time.perf_counter() + budget
+        inputs, config = turn(body)
+        async with admission.admit(budget) as waited:
+            try:
+                state = await asyncio.wait_for(agent.ainvoke(inputs, config=config), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                return error_response(504, "TIMEOUT", f"No answer after {budget:g}s")
+        return {
+            "answer": state["messages"][-1].content,
+            "thread_id": config["configurable"]["thread_id"],
+            "run_id": str(config["run_id"]),
+            "queue_ms": waited * 1000,
+        }
+
+    @app.post("/v1/query/stream")
+    async def query_stream(body: QueryRequest, request: Request):
+        budget = body.timeout or SERVICE_REQUEST_TIMEOUT
+        deadline = time.perf_counter() + budget
+        inputs, config = turn(body)
+        # Shed before the response starts, so overload is an HTTP status
+        await admission.acquire(budget)
+        start = time.perf_counter()
+
+        def release() -> None:
+            admission.release((time.perf_counter() - start) * 1000)
+
+        async def events() -> AsyncIterator[str]:
+            try:
+                async with asyncio.timeout(deadline - time.perf_counter()):
+                    async for event in agent.astream(inputs, config=config):
+                        yield sse(event)
+            except TimeoutError:
+                request.state.stream_status = 504
+                yield sse({"event": "error", "error_code": "TIMEOUT", "message": f"No answer after {budget:g}s"})
+            except AgentError as e:
+                request.state.stream_status = 503 if isinstance(e, LLMUnavailableError) else 500
+                yield sse({"event": "error", "error_code": e.error_code, "message": e.message})
+
+        return AdmittedStreamingResponse(events(), release, media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
+    @app.post("/v1/drawings/{drawing_id}/invalidate")
+    async def invalidate_drawing(drawing_id: str):
+        return {"drawing_id": drawing_id, "dropped": agent.mcp_client.invalidate_drawing(drawing_id)}
+
+    @app.get("/healthz")
+    async def healthz():
+        if agent.graph is None:
+            return error_response(503, "NOT_READY", "Graph is not built")
+        return {"status": "ok", "in_flight": admission.in_flight, "waiting": admission.waiting}
+
+    @app.get("/metrics")
+    async def metrics():
+        return {
+            "endpoints": {name: stats.to_dict() for name, stats in sorted(endpoints.items())},
+            "admission": admission.stats(),
+            "llm": agent.metrics.snapshot(include_threads=False),
+            "tools": agent.tool_executor.stats() if agent.tool_executor else {},
+            "singleflight": {"llm": agent.llm_flight.stats(), "tools": agent.mcp_client.tool_flight.stats()},
+            "llm_cache": agent.llm_cache.stats(),
+            "tool_cache": agent.mcp_client.tool_cache.stats(),
+            "llm_resilience": agent.resilience.stats(),
+            "model_routes": agent.router.stats(),
+        }
+
+    return app
+
+
+app = create_app()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    uvicorn.run(app, host=SERVICE_HOST, port=SERVICE_PORT)
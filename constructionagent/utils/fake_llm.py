@@ -0,0 +1,122 @@
+"""
+Local chat model with injected latency and errors.
+
+Stands in for Gemini when exercising the resilience of `AgentGraph` (retries,
+hedging, circuit breaker) without network access or API cost:
+- Latency: a base delay with a share of slow responses (the tail)
+- Errors: a share of calls raising InjectedProviderError with an HTTP status,
+  the first `failures` calls, or a scripted outage during which every call fails
+- Answers: canned responses cycled in order, or those of a wrapped model
+- Streaming: answers stream word by word; with `stream_error_after` an
+  injected error is raised after that many chunks instead of before any output
+
+Usage:
+    agent = AgentGraph()
+    agent.llm = FaultInjectingChatModel(responses=[...], slow_rate=0.05, slow_latency=5, error_rate=0.1)
+"""
+
+import asyncio
+import itertools
+import random
+import re
+import time
+from typing import Any, AsyncIterator, Iterator, List, Optional, Sequence, Tuple
+
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from langchain_core.utils.function_calling import convert_to_openai_tool
+from pydantic import Field, PrivateAttr
+
+
+class InjectedProviderError(Exception):
+    """Error raised by the fake provider, carrying an HTTP status like client errors do."""
+
+    def __init__(self, code: int):
+        self.code = code
+        super().__init__(f"Injected provider error {code}")
+
+
+class FaultInjectingChatModel(BaseChatModel):
+    """
+    Chat model answering canned responses (or a wrapped model's) with
+    injected latency and errors.
+    """
+
+    responses: List[str] = Field(default_factory=lambda: ["OK"])
+    inner: Optional[BaseChatModel] = None
+    latency: float = 0.05
+    slow_rate: float = 0.0
+    slow_latency: float = 2.0
+    error_rate: float = 0.0
+    error_code: int = 503
+    failures: int = 0
+    stream_error_after: Optional[int] = None
+    seed: Optional[int] = None
+    _random: random.Random = PrivateAttr()
+    _responses: Iterator[str] = PrivateAttr()
+    _outage_until: float = PrivateAttr(default=0.0)
+
+    def model_post_init(self, context: Any) -> None:
+        """Seed the fault generator and start the response cycle."""
+        self._random = random.Random(self.seed)
+        self._responses = itertools.cycle(self.responses)
+
+    @property
+    def _llm_type(self) -> str:
+        return "fault-injecting"
+
+    def outage(self, seconds: float) -> None:
+        """Fail every call for the next `seconds`."""
+        self._outage_until = time.monotonic() + seconds
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Bind tools like a provider model does (the fake ignores them)."""
+        return self.bind(tools=[convert_to_openai_tool(tool) for tool in tools], **kwargs)
+
+    def _draw(self) -> Tuple[float, Optional[Exception]]:
+        """Draw the latency of a call and its error, if it fails."""
+        if self.failures > 0:
+            self.failures -= 1
+            return self.latency, InjectedProviderError(self.error_code)
+        if time.monotonic() < self._outage_until or self._random.random() < self.error_rate:
+            return self.latency, InjectedProviderError(self.error_code)
+        return (self.slow_latency if self._random.random() < self.slow_rate else self.latency), None
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None,
+                  **kwargs: Any) -> ChatResult:
+        latency, error = self._draw()
+        time.sleep(latency)
+        if error is not None:
+            raise error
+        if self.inner is not None:
+            return self.inner._generate(messages, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=next(self._responses)))])
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None,
+                         **kwargs: Any) -> ChatResult:
+        latency, error = self._draw()
+        await asyncio.sleep(latency)
+        if error is not None:
+            raise error
+        if self.inner is not None:
+            return await self.inner._agenerate(messages, stop=stop, **kwargs)
+        return ChatResult(generations=[ChatGeneration(message=AIMessage(content=next(self._responses)))])
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None, run_manager: Any = None,
+                       **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        latency, error = self._draw()
+        await asyncio.sleep(latency)
+        if error is not None and self.stream_error_after is None:
+            raise error
+        if self.inner is not None:
+            content = (await self.inner._agenerate(messages, stop=stop, **kwargs)).generations[0].message.content
+        else:
+            content = next(self._responses)
+        for index, word in enumerate(re.findall(r"\S+\s*", content)):
+            if error is not None and index == self.stream_error_after:
+                raise error
+            yield ChatGenerationChunk(message=AIMessageChunk(content=word))
+            await asyncio.sleep(0)
+        if error is not None:
+            raise error
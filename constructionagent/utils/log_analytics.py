@@ -0,0 +1,576 @@
+"""
+Latency and error reports from the agent's JSON logs.
+
+Stream-parses the JSONL files written by `JSONLogFormatter` (plain or gzipped
+rotated segments) line by line in constant memory and reports:
+- Per-node latency percentiles: LLM calls (`node`), tool calls (`tool`) and
+  LangGraph server runs (`run:exec`, `run:queue`)
+- Error counts by `AgentError.error_code` (exception type otherwise)
+- Throughput over time windows (records, errors, latency samples)
+- Records correlated by thread id (runs, errors, time spent)
+
+Records of the LangGraph server, whose message is a dict repr, are flattened so
+their `run_id`/`thread_id` and timings are used too.
+
+An offset index (`--state`) remembers how far every file was read, keyed by a
+fingerprint of its first line so a rotated segment is recognized after it was
+renamed or gzipped. Re-runs only parse the new bytes and report the
+accumulated totals; a gzipped segment read to its end is marked complete and
+not decompressed again. Entries of segments that were deleted are pruned.
+
+Usage:
+    python -m constructionagent.utils.log_analytics logs/agent.log*
+    python -m constructionagent.utils.log_analytics logs/agent.log --window 300 --json
+"""
+
+import argparse
+import ast
+import gzip
+import hashlib
+import json
+import math
+import sys
+from collections import OrderedDict
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+from constructionagent.utils.stats import percentile_index
+
+DEFAULT_STATE_PATH = "logs/.log_analytics.json"
+STATE_VERSION = 1
+# Relative width of the latency histogram buckets (5% error on percentiles)
+BUCKET_GROWTH = 1.05
+ERROR_LEVELS = {"ERROR", "CRITICAL"}
+# Timings reported by the LangGraph server for each run
+RUN_TIMINGS = {"run_exec_ms": "run:exec", "run_queue_ms": "run:queue"}
+
+
+class LatencyHistogram:
+    """
+    Log-bucketed latency histogram.
+
+    Constant memory whatever the number of samples, mergeable and JSON
+    serializable, which lets the offset index carry it between runs.
+    """
+
+    def __init__(self, buckets: Optional[Dict[int, int]] = None, count: int = 0, total: float = 0.0, maximum: float = 0.0):
+        """
+        Initialize the histogram, empty or from saved counters.
+
+        Args:
+            buckets (Optional[Dict[int, int]]): Samples per log bucket
+            count (int): Samples recorded
+            total (float): Sum of the latencies in milliseconds
+            maximum (float): Largest latency in milliseconds
+        """
+        self.buckets = buckets or {}
+        self.count = count
+        self.total = total
+        self.maximum = maximum
+
+    def add(self, ms: float) -> None:
+        """Record one latency in milliseconds."""
+        bucket = math.floor(math.log(ms, BUCKET_GROWTH)) if ms >= 1 else 0
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += ms
+        self.maximum = max(self.maximum, ms)
+
+    def percentile(self, q: float) -> float:
+        """
+        Get a latency percentile.
+
+        Args:
+            q (float): Percentile between 0 and 100
+
+        Returns:
+            float: Upper bound of the bucket holding the percentile, in milliseconds
+        """
+        if not self.count:
+            return 0.0
+        rank = percentile_index(self.count, q) + 1
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.maximum, BUCKET_GROWTH ** (bucket + 1))
+        return self.maximum
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the histogram.
+
+        Returns:
+            Dict[str, Any]: Buckets (string keys, for JSON), count, total and maximum
+        """
+        return {"buckets": {str(bucket): n for bucket, n in self.buckets.items()}, "count": self.count,
+                "total": self.total, "maximum": self.maximum}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "LatencyHistogram":
+        """
+        Restore a histogram saved by `to_dict`.
+
+        Args:
+            data (Dict[str, Any]): Serialized histogram
+
+        Returns:
+            LatencyHistogram: The histogram
+        """
+        return cls({int(bucket): n for bucket, n in data["buckets"].items()}, data["count"], data["total"], data["maximum"])
+
+
+class LogReport:
+    """
+    Aggregates of the parsed records.
+
+    Per-thread correlation keeps the `max_threads` most recently seen threads
+    so memory stays bounded on long logs.
+    """
+
+    def __init__(self, window: int = 60, max_windows: int = 1440, max_threads: int = 10000):
+        """
+        Initialize empty aggregates.
+
+        Args:
+            window (int): Throughput window in seconds
+            max_windows (int): Most recent windows kept
+            max_threads (int): Most recently seen threads kept
+        """
+        self.window = window
+        self.max_windows = max_windows
+        self.max_threads = max_threads
+        self.records = 0
+        self.invalid = 0
+        self.levels: Dict[str, int] = {}
+        self.latencies: Dict[str, LatencyHistogram] = {}
+        self.error_codes: Dict[str, int] = {}
+        self.windows: "OrderedDict[int, Dict[str, int]]" = OrderedDict()
+        self.threads: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self.first_ts: Optional[float] = None
+        self.last_ts: Optional[float] = None
+
+    def _thread(self, thread_id: str) -> Dict[str, Any]:
+        """Get the correlation entry of a thread, evicting the least recent one."""
+        entry = self.threads.pop(thread_id, None) or {"records": 0, "errors": 0, "runs": [], "latency_ms": 0.0,
+                                                       "first_ts": None, "last_ts": None}
+        self.threads[thread_id] = entry
+        while len(self.threads) > self.max_threads:
+            self.threads.popitem(last=False)
+        return entry
+
+    def add(self, record: Dict[str, Any]) -> None:
+        """
+        Aggregate one parsed log record.
+
+        Args:
+            record (Dict[str, Any]): Record flattened by `parse_line`
+        """
+        self.records += 1
+        level = record.get("level", "UNKNOWN")
+        self.levels[level] = self.levels.get(level, 0) + 1
+        ts = record.get("_ts")
+        samples = latency_samples(record)
+        for name, ms in samples:
+            self.latencies.setdefault(name, LatencyHistogram()).add(ms)
+
+        error = level in ERROR_LEVELS
+        if error:
+            code = error_code(record)
+            self.error_codes[code] = self.error_codes.get(code, 0) + 1
+
+        if ts is not None:
+            self.first_ts = ts if self.first_ts is None else min(self.first_ts, ts)
+            self.last_ts = ts if self.last_ts is None else max(self.last_ts, ts)
+            start = int(ts // self.window * self.window)
+            bucket = self.windows.get(start)
+            if bucket is None:
+                bucket = self.windows[start] = {"records": 0, "errors": 0, "latency_samples": 0}
+                if len(self.windows) > self.max_windows:
+                    self.windows.pop(min(self.windows))
+            bucket["records"] += 1
+            bucket["errors"] += int(error)
+            bucket["latency_samples"] += len(samples)
+
+        thread_id = record.get("thread_id")
+        if thread_id:
+            entry = self._thread(str(thread_id))
+            entry["records"] += 1
+            entry["errors"] += int(error)
+            entry["latency_ms"] += sum(ms for name, ms in samples if not name.startswith("run:"))
+            run_id = record.get("run_id")
+            if run_id and run_id not in entry["runs"]:
+                entry["runs"].append(run_id)
+            if ts is not None:
+                entry["first_ts"] = entry["first_ts"] or ts
+                entry["last_ts"] = ts
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        Serialize the aggregates for the offset index.
+
+        Returns:
+            Dict[str, Any]: Counters, histograms, windows and threads as JSON
+            compatible values
+        """
+        return {
+            "window": self.window, "records": self.records, "invalid": self.invalid, "levels": self.levels,
+            "latencies": {name: histogram.to_dict() for name, histogram in self.latencies.items()},
+            "error_codes": self.error_codes, "windows": [[start, counts] for start, counts in self.windows.items()],
+            "threads": [[thread_id, entry] for thread_id, entry in self.threads.items()],
+            "first_ts": self.first_ts, "last_ts": self.last_ts,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], max_windows: int, max_threads: int) -> "LogReport":
+        """
+        Restore aggregates saved by `to_dict`.
+
+        Args:
+            data (Dict[str, Any]): Serialized aggregates
+            max_windows (int): Most recent windows kept
+            max_threads (int): Most recently seen threads kept
+
+        Returns:
+            LogReport: The aggregates, with the limits of this run
+        """
+        report = cls(data["window"], max_windows, max_threads)
+        report.records, report.invalid, report.levels = data["records"], data["invalid"], data["levels"]
+        report.latencies = {name: LatencyHistogram.from_dict(h) for name, h in data["latencies"].items()}
+        report.error_codes = data["error_codes"]
+        report.windows = OrderedDict((start, counts) for start, counts in data["windows"])
+        report.threads = OrderedDict((thread_id, entry) for thread_id, entry in data["threads"])
+        report.first_ts, report.last_ts = data["first_ts"], data["last_ts"]
+        return report
+
+    def summary(self, top: int = 10) -> Dict[str, Any]:
+        """
+        Build the report.
+
+        Args:
+            top (int): Threads listed in the correlation section
+
+        Returns:
+            Dict[str, Any]: Totals, latency percentiles, error codes, throughput
+            windows and the busiest threads
+        """
+        span = (self.last_ts - self.first_ts) if self.first_ts is not None else 0.0
+        threads = sorted(self.threads.items(), key=lambda item: (item[1]["errors"], item[1]["latency_ms"]), reverse=True)
+        return {
+            "records": self.records,
+            "invalid_lines": self.invalid,
+            "levels": self.levels,
+            "from": iso(self.first_ts),
+            "to": iso(self.last_ts),
+            "records_per_s": self.records / span if span else 0.0,
+            "latency_ms": {
+                name: {"count": h.count, "mean": h.total / h.count, "p50": h.percentile(50), "p90": h.percentile(90),
+                       "p99": h.percentile(99), "max": h.maximum}
+                for name, h in sorted(self.latencies.items())
+            },
+            "error_codes": dict(sorted(self.error_codes.items(), key=lambda item: -item[1])),
+            "throughput": [
+                {"window_start": iso(start), **counts, "records_per_s": counts["records"] / self.window}
+                for start, counts in self.windows.items()
+            ],
+            "threads": [
+                {"thread_id": thread_id, "records": entry["records"], "errors": entry["errors"], "runs": len(entry["runs"]),
+                 "latency_ms": entry["latency_ms"], "from": iso(entry["first_ts"]), "to": iso(entry["last_ts"])}
+                for thread_id, entry in threads[:top]
+            ],
+        }
+
+
+def iso(ts: Optional[float]) -> Optional[str]:
+    """Format an epoch timestamp as UTC ISO 8601."""
+    return datetime.fromtimestamp(ts, timezone.utc).isoformat(timespec="seconds") if ts is not None else None
+
+
+def parse_timestamp(value: Any) -> Optional[float]:
+    """Parse an ISO 8601 timestamp (naive timestamps are UTC) into epoch seconds."""
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed.timestamp()
+
+
+def parse_line(line: str) -> Optional[Dict[str, Any]]:
+    """
+    Parse one log line.
+
+    Args:
+        line (str): JSON log line
+
+    Returns:
+        Optional[Dict[str, Any]]: The record, with the fields of a LangGraph
+        server message merged in and `_ts` set, or None if the line is invalid
+    """
+    try:
+        record = json.loads(line)
+    except ValueError:
+        return None
+    if not isinstance(record, dict):
+        return None
+    message = record.get("message")
+    if isinstance(message, str) and message.startswith("{'") and str(record.get("logger", "")).startswith("langgraph"):
+        try:
+            fields = ast.literal_eval(message)
+        except (ValueError, SyntaxError):
+            fields = None
+        if isinstance(fields, dict):
+            record["message"] = fields.pop("event", message)
+            for key, value in fields.items():
+                record.setdefault(key, value)
+    record["_ts"] = parse_timestamp(record.get("timestamp"))
+    return record
+
+
+def latency_samples(record: Dict[str, Any]) -> List[Tuple[str, float]]:
+    """
+    Extract the latencies carried by a record.
+
+    Args:
+        record (Dict[str, Any]): Parsed record
+
+    Returns:
+        List[Tuple[str, float]]: (node, milliseconds) pairs
+    """
+    samples = []
+    latency = record.get("latency_ms")
+    if isinstance(latency, (int, float)):
+        if record.get("node"):
+            name = str(record["node"])
+        elif record.get("tool"):
+            name = f"tool:{record['tool']}"
+        else:
+            name = str(record.get("message", "unknown"))
+        samples.append((name, float(latency)))
+    for field, name in RUN_TIMINGS.items():
+        if isinstance(record.get(field), (int, float)):
+            samples.append((name, float(record[field])))
+    return samples
+
+
+def error_code(record: Dict[str, Any]) -> str:
+    """
+    Classify an error record.
+
+    Args:
+        record (Dict[str, Any]): Parsed ERROR or CRITICAL record
+
+    Returns:
+        str: The AgentError code, else the exception type, else "NO_EXCEPTION"
+    """
+    exception = record.get("exception") if isinstance(record.get("exception"), dict) else {}
+    return str(exception.get("error_code") or record.get("error_code") or exception.get("type") or "NO_EXCEPTION")
+
+
+def open_log(path: Path):
+    """Open a log file or gzipped segment for binary reading."""
+    return gzip.open(path, "rb") if path.suffix == ".gz" else open(path, "rb")
+
+
+def fingerprint(path: Path) -> Optional[str]:
+    """
+    Identify a log file by its first line.
+
+    The first record's timestamp has microseconds, so the hash survives the
+    rename and gzip of a rotated segment.
+
+    Args:
+        path (Path): Log file
+
+    Returns:
+        Optional[str]: SHA-1 of the first line, None while it is incomplete
+    """
+    with open_log(path) as stream:
+        first = stream.readline()
+    if not first.endswith(b"\n"):
+        return None
+    return hashlib.sha1(first).hexdigest()
+
+
+def read_new_lines(path: Path, offset: int) -> Iterator[Tuple[int, Optional[str]]]:
+    """
+    Stream the complete lines of a file after an offset.
+
+    Args:
+        path (Path): Log file
+        offset (int): Bytes (uncompressed) already processed
+
+    Yields:
+        Tuple[int, Optional[str]]: Offset after the line, and the line; the
+        line is None once the end of the file is reached after a complete line
+        (not after a partially written line or a gzip still being written)
+    """
+    with open_log(path) as stream:
+        try:
+            stream.seek(offset)
+            for raw in stream:
+                if not raw.endswith(b"\n"):
+                    # Partially written line, read again on the next run
+                    return
+                offset += len(raw)
+                yield offset, raw.decode("utf-8", errors="replace")
+        except EOFError:
+            # Segment still being gzipped by the rotation
+            return
+    yield offset, None
+
+
+def analyze(paths: List[Path], report: LogReport, index: Dict[str, Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Parse the new bytes of the log files into a report.
+
+    Args:
+        paths (List[Path]): Log files and rotated segments
+        report (LogReport): Aggregates to update
+        index (Dict[str, Dict[str, Any]]): Offset index by fingerprint, updated in place
+
+    Returns:
+        Dict[str, int]: Files and bytes processed in this run, and index
+        entries pruned
+    """
+    processed = {"files": 0, "bytes": 0, "pruned": 0}
+    seen = set()
+    for path in sorted(paths, key=lambda p: p.stat().st_mtime):
+        try:
+            key = fingerprint(path)
+        except EOFError:
+            # Segment still being gzipped by the rotation
+            continue
+        if key is None:
+            continue
+        seen.add(key)
+        entry = index.setdefault(key, {"path": str(path), "offset": 0})
+        entry["path"] = str(path)
+        if entry.get("complete"):
+            continue
+        start = offset = entry["offset"]
+        for offset, line in read_new_lines(path, start):
+            if line is None:
+                # A gzipped segment is never appended to once written
+                entry["complete"] = path.suffix == ".gz"
+                continue
+            record = parse_line(line)
+            if record is None:
+                report.invalid += 1
+                continue
+            report.add(record)
+        entry["offset"] = offset
+        processed["files"] += int(offset > start)
+        processed["bytes"] += offset - start
+    processed["pruned"] = prune_index(index, seen)
+    return processed
+
+
+def prune_index(index: Dict[str, Dict[str, Any]], seen: Set[str]) -> int:
+    """
+    Drop the index entries of deleted segments.
+
+    An entry not processed in this run is dropped when its last known path is
+    gone or now holds another file (the segment was rotated away and deleted
+    unseen).
+
+    Args:
+        index (Dict[str, Dict[str, Any]]): Offset index by fingerprint, updated in place
+        seen (Set[str]): Fingerprints of the files processed in this run
+
+    Returns:
+        int: Entries dropped
+    """
+    stale = []
+    for key, entry in index.items():
+        if key in seen:
+            continue
+        path = Path(entry["path"])
+        try:
+            if path.exists() and fingerprint(path) == key:
+                continue
+        except EOFError:
+            continue
+        stale.append(key)
+    for key in stale:
+        del index[key]
+    return len(stale)
+
+
+def format_text(summary: Dict[str, Any], processed: Dict[str, int]) -> str:
+    """Render the report as text."""
+    lines = [
+        f"Processed {processed['bytes']} new bytes in {processed['files']} file(s)",
+        f"Records: {summary['records']} ({summary['invalid_lines']} invalid lines) from {summary['from']} to {summary['to']}",
+        "Levels: " + ", ".join(f"{level}={n}" for level, n in sorted(summary["levels"].items())),
+        "",
+        "Latency (ms)",
+        f"  {'node':32} {'count':>7} {'mean':>9} {'p50':>9} {'p90':>9} {'p99':>9} {'max':>9}",
+    ]
+    for name, stats in summary["latency_ms"].items():
+        lines.append(f"  {name[:32]:32} {stats['count']:>7} {stats['mean']:>9.1f} {stats['p50']:>9.1f} "
+                     f"{stats['p90']:>9.1f} {stats['p99']:>9.1f} {stats['max']:>9.1f}")
+    lines += ["", "Errors by code"]
+    lines += [f"  {code:32} {n:>7}" for code, n in summary["error_codes"].items()] or ["  none"]
+    lines += ["", "Throughput", f"  {'window start (UTC)':26} {'records':>8} {'errors':>7} {'rec/s':>8}"]
+    lines += [f"  {w['window_start']:26} {w['records']:>8} {w['errors']:>7} {w['records_per_s']:>8.2f}"
+              for w in summary["throughput"] if w["records"]]
+    lines += ["", "Threads (most errors, then most time)",
+              f"  {'thread_id':38} {'records':>8} {'errors':>7} {'runs':>5} {'latency_ms':>11}"]
+    lines += [f"  {t['thread_id'][:38]:38} {t['records']:>8} {t['errors']:>7} {t['runs']:>5} {t['latency_ms']:>11.1f}"
+              for t in summary["threads"]]
+    return "\n".join(lines)
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    """
+    Analyze log files and print the report.
+
+    New lines are added to the totals kept in the offset index (--state),
+    unless --no-state is given.
+
+    Args:
+        argv (Optional[List[str]]): Command line arguments, sys.argv if None
+    """
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", type=Path, help="Log files or rotated segments (.gz)")
+    parser.add_argument("--state", default=DEFAULT_STATE_PATH, help="Offset index and accumulated totals")
+    parser.add_argument("--no-state", action="store_true", help="Process the files from the start without an index")
+    parser.add_argument("--reset", action="store_true", help="Discard the index before processing")
+    parser.add_argument("--window", type=int, default=60, help="Throughput window in seconds")
+    parser.add_argument("--max-windows", type=int, default=1440, help="Most recent windows kept")
+    parser.add_argument("--max-threads", type=int, default=10000, help="Most recently seen threads kept for correlation")
+    parser.add_argument("--top", type=int, default=10, help="Threads listed in the report")
+    parser.add_argument("--json", action="store_true", help="Print the report as JSON")
+    args = parser.parse_args(argv)
+
+    state_path = Path(args.state)
+    index: Dict[str, Dict[str, Any]] = {}
+    report = None
+    if not args.no_state and not args.reset and state_path.exists():
+        state = json.loads(state_path.read_text())
+        if state.get("version") == STATE_VERSION and state["report"]["window"] == args.window:
+            index = state["files"]
+            report = LogReport.from_dict(state["report"], args.max_windows, args.max_threads)
+        else:
+            print("Index built with other settings, processing from the start", file=sys.stderr)
+    report = report or LogReport(args.window, args.max_windows, args.max_threads)
+
+    missing = [path for path in args.paths if not path.exists()]
+    if missing:
+        parser.error(f"not found: {', '.join(map(str, missing))}")
+    processed = analyze(args.paths, report, index)
+    if not args.no_state:
+        state_path.parent.mkdir(parents=True, exist_ok=True)
+        state_path.write_text(json.dumps({"version": STATE_VERSION, "files": index, "report": report.to_dict()}))
+
+    summary = report.summary(args.top)
+    print(json.dumps({"processed": processed, **summary}, indent=2) if args.json else format_text(summary, processed))
+
+
+if __name__ == "__main__":
+    main()
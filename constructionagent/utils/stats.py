@@ -0,0 +1,40 @@
+"""
+Percentile helpers.
+
+Every latency report of the agent (tool, LLM call and endpoint stats, the
+hedge delay, batch summaries and the log analytics histograms) uses the same
+nearest-rank percentile, so their p50/p95/p99 can be compared directly.
+"""
+
+from typing import Iterable
+
+
+def percentile_index(count: int, q: float) -> int:
+    """
+    Get the position of a percentile in an ascending sequence.
+
+    Args:
+        count (int): Length of the sequence (at least 1)
+        q (float): Percentile between 0 and 100
+
+    Returns:
+        int: Zero-based index of the percentile
+    """
+    return min(count - 1, int(count * q / 100))
+
+
+def percentile(values: Iterable[float], q: float) -> float:
+    """
+    Get a percentile of some values.
+
+    Args:
+        values (Iterable[float]): Values in any order, e.g. a latency window
+        q (float): Percentile between 0 and 100
+
+    Returns:
+        float: The percentile (0.0 without values)
+    """
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[percentile_index(len(ordered), q)]
@@ -0,0 +1,29 @@
+"""
+Token estimation helpers.
+
+Provider tokenizers are remote (Gemini) or heavyweight, so the agent uses a
+local approximation wherever it only needs an order of magnitude, e.g. for
+prompt size accounting and history budgets.
+"""
+
+import math
+import re
+
+TOKEN_PIECE_PATTERN = re.compile(r"\w+|[^\w\s]")
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens of a text.
+
+    Punctuation counts as one token and words as one token per four
+    characters, which is close to what sentencepiece style tokenizers
+    produce for English prose and JSON.
+
+    Args:
+        text (str): Text to measure
+
+    Returns:
+        int: Estimated token count
+    """
+    return sum(math.ceil(len(piece) / 4) for piece in TOKEN_PIECE_PATTERN.findall(text or ""))
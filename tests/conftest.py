@@ -0,0 +1,84 @@
+"""
+Shared fixtures of the test suite.
+
+The environment is set before any `constructionagent` import so the tests
+neither write to logs/agent.log nor send traces to LangSmith.
+"""
+
+import os
+import tempfile
+
+os.environ.setdefault("LOG_FILE_PATH", os.path.join(tempfile.gettempdir(), "constructionagent-tests.log"))
+os.environ.setdefault("LOG_CONSOLE", "false")
+os.environ.setdefault("LANGCHAIN_TRACING_V2", "false")
+os.environ.setdefault("MCP_SNAPSHOT_ENABLED", "false")
+
+import pytest
+from langchain_core.tools import StructuredTool
+
+
+def make_tool(name: str, argument: str, description: str) -> StructuredTool:
+    """
+    Build a tool with the shape of those fetched over MCP.
+
+    Args:
+        name (str): Tool name
+        argument (str): Its single required argument
+        description (str): Tool description (docstring)
+
+    Returns:
+        StructuredTool: Tool with a JSON schema `args_schema`
+    """
+    async def run(**kwargs):
+        return "ok"
+
+    return StructuredTool(
+        name=name,
+        description=description,
+        args_schema={"type": "object", "properties": {argument: {"type": "string"}}, "required": [argument]},
+        coroutine=run,
+    )
+
+
+@pytest.fixture
+def tools():
+    """The bundled MCP tools (server/tools.py), without their server."""
+    return [
+        make_tool("measure_area", "region", "Measures area of a specified region\nArgs:\nRegion: A region from the drawing"),
+        make_tool("get_scale", "drawing", "Fetches the scale used in a drawing\nArgs:\ndrawing: A drawing object"),
+        make_tool("query_pipe_info", "location", "Returns information about a water pipe at a specified location."),
+    ]
+
+
+@pytest.fixture
+def agent(tools):
+    """An `AgentGraph` with the bundled tools and prompts applied, without MCP servers or a graph."""
+    from langchain_core.messages import SystemMessage
+
+    from constructionagent.agent.core import AgentGraph
+
+    agent = AgentGraph()
+    agent.mcp_client.tools = tools
+    agent.mcp_client.prompts = {
+        "query_validation_prompt": [SystemMessage(content="Classify the query for these tools:\n{tool_descriptions}")],
+        "clarification_prompt": [SystemMessage(content="Ask for the missing arguments.")],
+    }
+    agent._apply_tools_and_prompts()
+    return agent
+
+
+@pytest.fixture
+def echo_graph():
+    """Compile a one-node graph that answers every message, with the given checkpointer."""
+    from langchain_core.messages import AIMessage
+    from langgraph.graph import START, StateGraph
+
+    from constructionagent.agent.state import MessagesState
+
+    def compile(checkpointer):
+        builder = StateGraph(MessagesState)
+        builder.add_node("echo", lambda state: {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]})
+        builder.add_edge(START, "echo")
+        return builder.compile(checkpointer=checkpointer)
+
+    return compile
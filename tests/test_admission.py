@@ -0,0 +1,93 @@
+import asyncio
+
+import pytest
+
+from constructionagent.agent.admission import AdmissionController
+from constructionagent.agent.logger import OverloadedError
+
+
+def test_waiters_get_slots_in_arrival_order():
+    async def run():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        await admission.acquire()
+        order = []
+
+        async def wait(name):
+            await admission.acquire()
+            order.append(name)
+
+        waiters = [asyncio.create_task(wait(name)) for name in "abc"]
+        await asyncio.sleep(0)
+        assert admission.waiting == 3
+        for _ in range(3):
+            admission.release(10)
+            await asyncio.sleep(0)
+        await asyncio.gather(*waiters)
+        return admission, order
+
+    admission, order = asyncio.run(run())
+    assert order == ["a", "b", "c"]
+    assert admission.in_flight == 1 and admission.waiting == 0
+    assert admission.stats()["admitted"] == 4 and admission.stats()["queued"] == 3
+
+
+def test_full_queue_is_rejected_at_once():
+    async def run():
+        admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=5)
+        await admission.acquire()
+        waiter = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(OverloadedError) as error:
+            await admission.acquire()
+        waiter.cancel()
+        return admission, error.value
+
+    admission, error = asyncio.run(run())
+    assert error.error_code == "OVERLOADED_QUEUE_FULL"
+    assert admission.counters["rejected_queue_full"] == 1
+
+
+def test_waiter_is_shed_at_its_deadline():
+    async def run():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        await admission.acquire()
+        with pytest.raises(OverloadedError) as error:
+            await admission.acquire(timeout=0.02)
+        return admission, error.value
+
+    admission, error = asyncio.run(run())
+    assert error.error_code == "OVERLOADED_DEADLINE"
+    assert admission.counters["shed_timeout"] == 1 and admission.waiting == 0
+
+
+def test_expected_wait_beyond_the_deadline_is_shed_with_retry_after():
+    async def run():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        await admission.acquire()
+        admission.release(3000)
+        await admission.acquire()
+        with pytest.raises(OverloadedError) as error:
+            await admission.acquire(timeout=1)
+        return admission, error.value
+
+    admission, error = asyncio.run(run())
+    assert error.error_code == "OVERLOADED_DEADLINE"
+    assert error.details["retry_after"] == 3
+    assert admission.counters["shed_expected_wait"] == 1
+
+
+def test_cancelled_waiter_passes_its_slot_on():
+    async def run():
+        admission = AdmissionController(max_in_flight=1, max_queue=4, queue_timeout=5)
+        await admission.acquire()
+        first = asyncio.create_task(admission.acquire())
+        second = asyncio.create_task(admission.acquire())
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        admission.release()
+        await second
+        return admission
+
+    admission = asyncio.run(run())
+    assert admission.in_flight == 1 and admission.waiting == 0
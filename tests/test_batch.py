@@ -0,0 +1,88 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage
+
+from constructionagent.batch import BatchRunner, answered_ids, read_queries
+
+
+class FakeAgent:
+    """Answers each query after the delay it names ("sleep 0.05"), recording the order per thread."""
+
+    def __init__(self):
+        self.calls = []
+
+    async def ainvoke(self, state, config):
+        query = state["messages"][-1].content
+        self.calls.append((config["configurable"]["thread_id"], query))
+        if query.startswith("sleep"):
+            await asyncio.sleep(float(query.split()[1]))
+        if query == "fail":
+            raise ValueError("no drawing")
+        return {"messages": [AIMessage(content=f"answer: {query}")]}
+
+
+def run(rows, output, **kwargs):
+    agent = FakeAgent()
+    runner = BatchRunner(agent, output, **kwargs)
+    summary = asyncio.run(runner.run(iter(rows)))
+    results = [json.loads(line) for line in output.read_text().splitlines()[-len(rows):]]
+    return agent, summary, results
+
+
+def test_queries_are_read_from_jsonl_and_csv(tmp_path):
+    jsonl = tmp_path / "queries.jsonl"
+    jsonl.write_text('{"query": "Scale of drawing 7?", "id": "a"}\n\n{"id": "b"}\n{"query": "Area of room 101?", "thread_id": "t1"}\n')
+    csv = tmp_path / "queries.csv"
+    csv.write_text("id,query,thread_id\na,Scale of drawing 7?,\n,Area of room 101?,t1\n")
+    for path in (jsonl, csv):
+        rows = list(read_queries(path))
+        assert [row["query"] for row in rows] == ["Scale of drawing 7?", "Area of room 101?"]
+        assert rows[0]["id"] == "a" and rows[1]["thread_id"] == "t1"
+    assert [row["id"] for row in read_queries(jsonl)] == ["a", "3"]
+
+
+def test_resume_skips_answered_ids_after_a_truncated_line(tmp_path):
+    output = tmp_path / "results.jsonl"
+    output.write_text(
+        json.dumps({"id": "1", "status": "ok"}) + "\n"
+        + json.dumps({"id": "2", "status": "error"}) + "\n"
+        + '{"id": "3", "sta'
+    )
+    assert answered_ids(output) == {"1"}
+    assert answered_ids(tmp_path / "missing.jsonl") == set()
+
+    _, _, results = run([{"id": "3", "query": "Scale of drawing 7?"}], output)
+    assert answered_ids(output) == {"1", "3"}
+    assert results[-1]["answer"] == "answer: Scale of drawing 7?"
+
+
+def test_queries_of_a_thread_run_in_input_order(tmp_path):
+    rows = [
+        {"id": "1", "query": "sleep 0.05", "thread_id": "t"},
+        {"id": "2", "query": "second", "thread_id": "t"},
+        {"id": "3", "query": "other"},
+    ]
+    agent, summary, results = run(rows, tmp_path / "results.jsonl", concurrency=3)
+    assert [query for thread, query in agent.calls if thread == "t"] == ["sleep 0.05", "second"]
+    # The other thread was not held up
+    assert [result["id"] for result in results] == ["3", "1", "2"]
+    assert summary["queries"] == summary["ok"] == 3
+
+
+def test_timeouts_and_errors_are_recorded(tmp_path):
+    rows = [{"id": "1", "query": "sleep 1"}, {"id": "2", "query": "fail"}, {"id": "3", "query": "ok"}]
+    _, summary, results = run(rows, tmp_path / "results.jsonl", timeout=0.05)
+    by_id = {result["id"]: result for result in results}
+    assert by_id["1"]["status"] == "error" and by_id["1"]["error_code"] == "TIMEOUT"
+    assert by_id["2"]["error_code"] == "ValueError" and by_id["2"]["error"] == "no drawing"
+    assert summary["ok"] == 1 and summary["errors"] == {"TIMEOUT": 1, "ValueError": 1}
+
+
+def test_summary_of_a_run(tmp_path):
+    rows = [{"id": str(number), "query": f"sleep {number / 100}"} for number in range(1, 5)]
+    _, summary, _ = run(rows, tmp_path / "results.jsonl", concurrency=4)
+    latency = summary["latency_ms"]
+    assert summary["queries"] == 4
+    assert latency["p50"] <= latency["p90"] <= latency["p99"] == latency["max"]
+    assert latency["max"] >= 40
@@ -0,0 +1,72 @@
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from constructionagent.agent.checkpointer import BoundedMemorySaver, create_checkpointer
+from constructionagent.agent.logger import ConfigurationError
+
+
+def turn(graph, thread_id, text):
+    config = {"configurable": {"thread_id": thread_id}}
+    return graph.invoke({"messages": [HumanMessage(content=text)]}, config)
+
+
+def test_conversation_is_resumed(echo_graph):
+    graph = echo_graph(BoundedMemorySaver())
+    turn(graph, "t1", "first")
+    state = turn(graph, "t1", "second")
+    assert [message.content for message in state["messages"]] == ["first", "echo: first", "second", "echo: second"]
+
+
+def test_checkpoints_per_thread_are_capped(echo_graph):
+    saver = BoundedMemorySaver(max_checkpoints_per_thread=2)
+    graph = echo_graph(saver)
+    for i in range(5):
+        turn(graph, "t1", f"message {i}")
+    assert len(saver.storage["t1"][""]) == 2
+    assert saver.stats()["pruned_checkpoints"] > 0
+    # The latest state is intact after pruning
+    assert len(turn(graph, "t1", "last")["messages"]) == 12
+
+
+def test_budget_evicts_least_recently_used_thread(echo_graph):
+    saver = BoundedMemorySaver(max_bytes=0)
+    graph = echo_graph(saver)
+    turn(graph, "t1", "x" * 1000)
+    one_thread = saver.stats()["bytes"]
+    saver.max_bytes = int(one_thread * 2.5)
+    turn(graph, "t2", "x" * 1000)
+    turn(graph, "t1", "again")
+    turn(graph, "t3", "x" * 1000)
+    stats = saver.stats()
+    assert stats["lru_evictions"] >= 1
+    assert stats["bytes"] <= saver.max_bytes
+    assert saver.get_tuple({"configurable": {"thread_id": "t2"}}) is None
+    assert saver.get_tuple({"configurable": {"thread_id": "t3"}}) is not None
+
+
+def test_idle_threads_expire(echo_graph):
+    saver = BoundedMemorySaver(ttl_seconds=0.05)
+    graph = echo_graph(saver)
+    turn(graph, "t1", "hello")
+    time.sleep(0.1)
+    assert saver.get_tuple({"configurable": {"thread_id": "t1"}}) is None
+    assert saver.stats()["ttl_evictions"] == 1
+    assert saver.stats()["bytes"] == 0
+
+
+def test_deleted_thread_releases_its_bytes(echo_graph):
+    saver = BoundedMemorySaver()
+    graph = echo_graph(saver)
+    turn(graph, "t1", "hello")
+    saver.delete_thread("t1")
+    assert saver.stats()["bytes"] == 0 and saver.stats()["threads"] == 0
+
+
+def test_create_checkpointer_backends():
+    assert isinstance(create_checkpointer("bounded_memory"), BoundedMemorySaver)
+    assert type(create_checkpointer("memory")) is InMemorySaver
+    with pytest.raises(ConfigurationError):
+        create_checkpointer("redis")
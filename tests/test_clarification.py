@@ -0,0 +1,70 @@
+import asyncio
+import time
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from constructionagent.agent.clarification import ClarificationGenerator, parse_docstring_arguments
+from constructionagent.agent.resilience import BREAKER_OPEN
+
+AREA = {"tool": "measure_area", "is_ambiguous": True, "ambiguous_reason": "Missing region",
+        "arguments": {"region": None}, "missing_arguments": ["region"]}
+SCALE = {"tool": "get_scale", "is_ambiguous": True, "ambiguous_reason": "Missing drawing",
+         "arguments": {"drawing": "null"}, "missing_arguments": []}
+PIPE = {"tool": "query_pipe_info", "is_ambiguous": True, "ambiguous_reason": "Which pipe.",
+        "arguments": {"location": "north side"}, "missing_arguments": []}
+
+
+def test_question_for_one_intent(tools):
+    clarifier = ClarificationGenerator(tools)
+    assert clarifier.generate([AREA]) == (
+        "I need a bit more information. To measure the area, please tell me "
+        "which region (a region from the drawing), e.g. Room 101."
+    )
+    assert clarifier.stats() == {"generated": 1}
+
+
+def test_question_for_several_intents(tools):
+    question = ClarificationGenerator(tools).generate([AREA, SCALE, PIPE])
+    assert question.splitlines() == [
+        "I need a bit more information:",
+        "- To measure the area, please tell me which region (a region from the drawing), e.g. Room 101.",
+        # A "null" value counts as missing, though the validator did not list it
+        "- For the scale, please tell me which drawing (a drawing object), e.g. Drawing D-205.",
+        # Nothing missing: the validator's reason is given
+        "- For the pipe info, could you be more specific? (Which pipe)",
+    ]
+
+
+def test_schema_descriptions_complete_the_docstring(tools):
+    tools[0].args_schema = {"type": "object", "required": ["region", "level"], "properties": {
+        "region": {"type": "string", "description": "Ignored, the docstring has one"},
+        "level": {"type": "string", "description": "Floor of the building."},
+    }}
+    question = ClarificationGenerator(tools).generate([{**AREA, "arguments": {"region": "room 5"}, "missing_arguments": []}])
+    assert question == "I need a bit more information. To measure the area, please tell me which level (floor of the building)."
+
+
+def test_docstring_arguments():
+    docstring = "Measures a region.\n\nArgs:\n    region (str): A region.\n    Drawing: The drawing\n\nReturns:\n    area: Square meters"
+    assert parse_docstring_arguments(docstring) == {"region": "A region.", "drawing": "The drawing"}
+    assert parse_docstring_arguments(None) == {}
+
+
+@pytest.fixture
+def polish(agent, monkeypatch):
+    monkeypatch.setattr("constructionagent.agent.core.CLARIFICATION_LLM_POLISH", True)
+    return agent
+
+
+def test_polish_rephrases_the_question(polish):
+    polish.router.configure(GenericFakeChatModel(messages=iter([AIMessage(content="Which room?")])), None)
+    assert asyncio.run(polish.request_clarification([AREA])).content == "Which room?"
+
+
+def test_polish_falls_back_to_the_question_when_the_llm_is_unavailable(polish):
+    polish.router.configure(GenericFakeChatModel(messages=iter([AIMessage(content="Which room?")])), None)
+    polish.resilience.breaker.state, polish.resilience.breaker.opened_at = BREAKER_OPEN, time.monotonic()
+    message = asyncio.run(polish.request_clarification([AREA]))
+    assert message.content == polish.clarifier.generate([AREA])
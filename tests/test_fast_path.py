@@ -0,0 +1,79 @@
+import pytest
+
+from constructionagent.agent.fast_path import FastPathClassifier, FAST_PATH_DEGRADED_MIN_CONFIDENCE
+
+
+@pytest.fixture
+def classifier(tools):
+    return FastPathClassifier(tools)
+
+
+def intents(result):
+    return [(intent["tool"], intent["arguments"]) for intent in result["intents"]]
+
+
+def test_explicit_query_is_classified(classifier):
+    result = classifier.classify("Scale of plan D-205 please.")
+    assert result["unrelated"] is False
+    assert intents(result) == [("get_scale", {"drawing": "plan D-205"})]
+    assert classifier.stats()["hits"] == 1
+
+
+def test_small_talk_is_unrelated(classifier):
+    assert classifier.classify("Hello?") == {"unrelated": True, "intents": []}
+
+
+def test_one_intent_per_clause(classifier):
+    result = classifier.classify("What is the area of room 5 and the scale of drawing 7?")
+    assert intents(result) == [("measure_area", {"region": "room 5"}), ("get_scale", {"drawing": "drawing 7"})]
+
+
+def test_conjunction_shares_arguments(classifier):
+    result = classifier.classify("What's the area and the pipe info of Room 101?")
+    assert intents(result) == [("measure_area", {"region": "Room 101"}), ("query_pipe_info", {"location": "Room 101"})]
+
+
+@pytest.mark.parametrize("query", [
+    "What's the scale and the area of Room 101?",  # no drawing for get_scale
+    "What is the area of room 5 and the scale",
+    "What is the scale of this drawing?",
+    "What is the area?",
+    "What is the area of the big room on the left?",
+])
+def test_incomplete_or_vague_queries_fall_back(classifier, query):
+    assert classifier.classify(query) is None
+    assert classifier.stats()["misses"] == 1
+
+
+@pytest.mark.parametrize("query", [
+    "What is not the area of room A",
+    "Give me the area of room A except the scale",
+    "why is the area of room A 100?",
+    "How is the area of room A computed?",
+])
+def test_negated_and_explanation_queries_fall_back(classifier, query):
+    assert classifier.classify(query) is None
+    assert classifier.classify(query, min_confidence=FAST_PATH_DEGRADED_MIN_CONFIDENCE) is None
+
+
+@pytest.mark.parametrize("query", [
+    "What is the area of room 101, 102?",
+    "What is the area of Room 101 in drawing 5?",
+    "What is the area of room 101 in 2019?",
+    "What is the area of Room A in block C?",
+    "Is the area of room 101 larger than 50?",
+])
+def test_unbound_values_fall_back(classifier, query):
+    assert classifier.classify(query) is None
+    assert classifier.classify(query, min_confidence=FAST_PATH_DEGRADED_MIN_CONFIDENCE) is None
+
+
+def test_how_quantity_questions_are_classified(classifier):
+    assert intents(classifier.classify("How big is room 5?")) == [("measure_area", {"region": "room 5"})]
+
+
+def test_fill_missing_arguments_from_bare_answer(classifier):
+    pending = [{"tool": "get_scale", "is_ambiguous": True, "arguments": {"drawing": None}, "missing_arguments": ["drawing"]}]
+    result = classifier.fill_missing_arguments(pending, "D-205")
+    assert intents(result) == [("get_scale", {"drawing": "D-205"})]
+    assert classifier.stats()["slot_fills"] == 1
@@ -0,0 +1,81 @@
+import asyncio
+
+from langchain_core.messages import AIMessage, HumanMessage, RemoveMessage, SystemMessage, ToolMessage
+
+from constructionagent.agent.history import HistoryManager, llm_summarizer, split_turns, summary_message
+
+
+def answered_turn(number, with_tool=True):
+    messages = [HumanMessage(content=f"What is the area of room {number}?", id=f"h{number}")]
+    if with_tool:
+        messages += [
+            AIMessage(content="", tool_calls=[{"id": f"c{number}", "name": "measure_area", "args": {"region": f"room {number}"}}], id=f"c{number}"),
+            ToolMessage(content="100", tool_call_id=f"c{number}", id=f"t{number}"),
+        ]
+    return messages + [AIMessage(content=f"The area of room {number} is 100.", id=f"a{number}")]
+
+
+def conversation(turns, **kwargs):
+    messages = [message for number in range(turns) for message in answered_turn(number, **kwargs)]
+    return messages + [HumanMessage(content="And the scale of drawing 7?", id="current")]
+
+
+def ids(messages):
+    return {message.id for message in messages}
+
+
+def test_split_turns_starts_at_user_messages():
+    turns = split_turns(conversation(2))
+    assert [turn[0].id for turn in turns] == ["h0", "h1", "current"]
+
+
+def test_old_turns_are_folded_into_the_summary():
+    manager = HistoryManager(window_turns=2, token_budget=10_000)
+    removed, summary = asyncio.run(manager.window(conversation(4, with_tool=False)))
+    assert ids(removed) == {"h0", "a0", "h1", "a1"}
+    assert summary.splitlines() == [
+        "- User: What is the area of room 0? | Assistant: The area of room 0 is 100.",
+        "- User: What is the area of room 1? | Assistant: The area of room 1 is 100.",
+    ]
+    assert manager.stats()["folded_turns"] == 2
+
+
+def test_answered_tool_messages_are_dropped_from_kept_turns():
+    manager = HistoryManager(window_turns=4, token_budget=10_000)
+    removed, summary = asyncio.run(manager.window(conversation(1)))
+    assert ids(removed) == {"c0", "t0"}
+    assert summary == ""
+
+
+def test_token_budget_folds_more_turns_but_keeps_the_current_one():
+    manager = HistoryManager(window_turns=10, token_budget=1)
+    removed, _ = asyncio.run(manager.window(conversation(3, with_tool=False)))
+    assert "current" not in ids(removed)
+    assert manager.stats()["folded_turns"] == 3
+
+
+def test_node_returns_remove_messages():
+    manager = HistoryManager(window_turns=1, token_budget=10_000)
+    update = asyncio.run(manager({"messages": conversation(2, with_tool=False), "summary": ""}))
+    assert all(isinstance(message, RemoveMessage) for message in update["messages"])
+    assert {message.id for message in update["messages"]} == {"h0", "a0"}
+    assert asyncio.run(manager({"messages": conversation(0)})) == {}
+
+
+def test_llm_summarizer_and_fallback():
+    async def invoke(messages):
+        return AIMessage(content=f"  summary of {len(messages)} messages  ")
+
+    async def failing(messages):
+        raise RuntimeError("LLM down")
+
+    conversation_messages = conversation(2, with_tool=False)
+    _, summary = asyncio.run(HistoryManager(window_turns=1, summarizer=llm_summarizer(invoke)).window(conversation_messages))
+    assert summary == "summary of 2 messages"
+    _, summary = asyncio.run(HistoryManager(window_turns=1, summarizer=llm_summarizer(failing)).window(conversation_messages))
+    assert summary.startswith("- User: What is the area of room 0?")
+
+
+def test_summary_message():
+    assert summary_message("") == []
+    assert isinstance(summary_message("- User: hi")[0], SystemMessage)
@@ -0,0 +1,79 @@
+import time
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from constructionagent.agent.llm_cache import LLMResponseCache, MemoryCacheTier, SqliteCacheTier, llm_cache_key
+from constructionagent.utils.fake_llm import FaultInjectingChatModel
+
+PROMPT = [SystemMessage(content="Answer briefly."), HumanMessage(content="What is the scale of drawing 7?")]
+
+
+def test_response_is_returned_as_a_fresh_message():
+    cache = LLMResponseCache(tiers=[MemoryCacheTier()])
+    cache.put("Agent", "k", AIMessage(content="1:100", id="run-1"))
+    first, second = cache.get("Agent", "k"), cache.get("Agent", "k")
+    assert first.content == "1:100" and first.id is None
+    assert first is not second
+    assert cache.get("Agent", "other") is None
+    assert cache.stats()["hits"] == 2 and cache.stats()["misses"] == 1
+
+
+def test_key_depends_on_tools_and_normalized_messages(tools):
+    llm = FaultInjectingChatModel()
+    spaced = [SystemMessage(content="Answer  briefly."), HumanMessage(content="What is the scale of drawing 7? ")]
+    assert llm_cache_key(llm, PROMPT) == llm_cache_key(llm, spaced)
+    assert llm_cache_key(llm, PROMPT) != llm_cache_key(llm.bind_tools(tools), PROMPT)
+    assert llm_cache_key(llm, PROMPT) != llm_cache_key(llm, PROMPT[:1])
+
+
+def test_unusable_responses_are_not_stored():
+    cache = LLMResponseCache(tiers=[MemoryCacheTier()])
+    cache.put("Agent", "empty", AIMessage(content=""))
+    cache.put("Agent", "broken", AIMessage(content="", invalid_tool_calls=[
+        {"name": "get_scale", "args": "{", "id": "call-1", "error": "bad json", "type": "invalid_tool_call"},
+    ]))
+    assert cache.get("Agent", "empty") is None and cache.get("Agent", "broken") is None
+    assert cache.stats()["stores"] == 0
+
+
+def test_bypassed_and_disabled_calls_have_no_key():
+    llm = FaultInjectingChatModel()
+    cache = LLMResponseCache(tiers=[MemoryCacheTier()], bypass_nodes=["History"])
+    assert cache.key("History", llm, PROMPT) is None
+    assert cache.key("Agent", llm, PROMPT) is not None
+    assert cache.stats()["bypassed"] == 1
+    assert LLMResponseCache(tiers=[MemoryCacheTier()], enabled=False).key("Agent", llm, PROMPT) is None
+
+
+def test_memory_tier_evicts_least_recently_used_and_expired():
+    tier = MemoryCacheTier(max_entries=2, max_bytes=10)
+    expires_at = time.time() + 60
+    tier.set("a", "1111", expires_at)
+    tier.set("b", "2222", expires_at)
+    tier.get("a")
+    tier.set("c", "3333", expires_at)
+    assert tier.get("b") is None and tier.get("a") == "1111"
+    tier.set("d", "44444444", expires_at)
+    assert tier.stats() == {"entries": 1, "bytes": 8, "evictions": 3}
+    tier.set("e", "5", time.time() - 1)
+    assert tier.get("e") is None
+
+
+def test_sqlite_tier_is_shared_and_fills_the_memory_tier(tmp_path):
+    path = str(tmp_path / "llm_cache.db")
+    writer = LLMResponseCache(tiers=[MemoryCacheTier(), SqliteCacheTier(path)])
+    writer.put("Agent", "k", AIMessage(content="1:100"))
+    writer.close()
+
+    memory = MemoryCacheTier()
+    reader = LLMResponseCache(tiers=[memory, SqliteCacheTier(path)])
+    assert reader.get("Agent", "k").content == "1:100"
+    assert memory.get("k") is not None
+    reader.close()
+
+
+def test_sqlite_tier_drops_expired_rows(tmp_path):
+    tier = SqliteCacheTier(str(tmp_path / "llm_cache.db"))
+    tier.set("k", "value", time.time() - 1)
+    assert tier.get("k") is None and tier.stats()["entries"] == 0
+    tier.close()
@@ -0,0 +1,95 @@
+import gzip
+import json
+import shutil
+
+from constructionagent.utils import log_analytics
+from constructionagent.utils.log_analytics import LogReport, analyze, main
+
+
+def line(number, **fields):
+    record = {"timestamp": f"2025-01-01T12:00:{number:02d}.{number:06d}+00:00", "level": "INFO",
+              "message": "LLM call", "node": "Agent", "latency_ms": 10.0 * number, **fields}
+    return json.dumps(record) + "\n"
+
+
+def write(path, *lines, mode="a"):
+    with open(path, mode) as stream:
+        stream.write("".join(lines))
+
+
+def rotate(path, target):
+    """Rename and gzip a segment like `RotatingLogFile` does."""
+    path.rename(target)
+    with open(target, "rb") as source, gzip.open(f"{target}.gz", "wb") as archive:
+        shutil.copyfileobj(source, archive)
+    target.unlink()
+    return target.with_name(target.name + ".gz")
+
+
+def test_offsets_survive_rename_and_gzip(tmp_path, monkeypatch):
+    log = tmp_path / "agent.log"
+    report, index = LogReport(), {}
+    write(log, line(1), line(2))
+    assert analyze([log], report, index)["bytes"] == len(line(1) + line(2))
+
+    # A partially written line is left for the next run
+    write(log, line(3), line(4)[:20])
+    analyze([log], report, index)
+    assert report.records == 3
+    write(log, line(4)[20:])
+
+    segment = rotate(log, tmp_path / "agent.log.1")
+    write(log, line(5))
+    processed = analyze([segment, log], report, index)
+    assert report.records == 5 and report.invalid == 0
+    assert processed["files"] == 2
+    assert [entry.get("complete") for entry in index.values()] == [True, False]
+
+    # Complete segments are not decompressed again
+    reads = []
+    read_new_lines = log_analytics.read_new_lines
+    monkeypatch.setattr(log_analytics, "read_new_lines", lambda path, offset: reads.append(path) or read_new_lines(path, offset))
+    processed = analyze([segment, log], report, index)
+    assert processed["bytes"] == 0 and reads == [log]
+    assert report.summary()["latency_ms"]["Agent"]["count"] == 5
+
+
+def test_segment_being_gzipped_is_read_later(tmp_path):
+    segment = tmp_path / "agent.log.1.gz"
+    data = gzip.compress((line(1) + line(2)).encode())
+    segment.write_bytes(data[:len(data) - 12])
+    report, index = LogReport(), {}
+    analyze([segment], report, index)
+    assert not any(entry.get("complete") for entry in index.values())
+
+    segment.write_bytes(data)
+    analyze([segment], report, index)
+    assert report.records == 2
+    assert all(entry["complete"] for entry in index.values())
+
+
+def test_entries_of_deleted_segments_are_pruned(tmp_path):
+    log = tmp_path / "agent.log"
+    write(log, line(1))
+    report, index = LogReport(), {}
+    analyze([log], report, index)
+    segment = rotate(log, tmp_path / "agent.log.1")
+    write(log, line(2))
+    analyze([log, segment], report, index)
+    assert len(index) == 2
+
+    segment.unlink()
+    assert analyze([log], report, index)["pruned"] == 1
+    assert [entry["path"] for entry in index.values()] == [str(log)]
+
+
+def test_main_accumulates_totals_between_runs(tmp_path, capsys):
+    log, state = tmp_path / "agent.log", tmp_path / "state.json"
+    write(log, line(1), line(2, level="ERROR", message="Tool call failed", exception={"type": "TimeoutError"}))
+    main([str(log), "--state", str(state), "--json"])
+    write(log, line(3))
+    capsys.readouterr()
+    main([str(log), "--state", str(state), "--json"])
+    summary = json.loads(capsys.readouterr().out)
+    assert summary["processed"]["bytes"] == len(line(3))
+    assert summary["records"] == 3 and summary["error_codes"] == {"TimeoutError": 1}
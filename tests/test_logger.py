@@ -0,0 +1,89 @@
+import gzip
+import json
+import logging
+import queue
+import sys
+
+from constructionagent.agent.logger import BoundedQueueHandler, JSONLogFormatter, RotatingLogFile, ValidationError
+
+
+def segments(path):
+    return sorted(path.parent.glob(f"{path.name}.*"))
+
+
+def lines(count, width=50):
+    return "".join(f"{index:04} {'x' * (width - 6)}\n" for index in range(count))
+
+
+def test_rotates_by_size_between_lines(tmp_path):
+    path = tmp_path / "agent.log"
+    log = RotatingLogFile(str(path), max_bytes=200, interval=0, compress=False)
+    for _ in range(3):
+        log.write(lines(2))
+    log.close()
+    assert log.rotations == 1
+    assert [len(segment.read_text().splitlines()) for segment in segments(path)] == [4]
+    assert len(path.read_text().splitlines()) == 2
+
+
+def test_batch_larger_than_the_limit_is_split(tmp_path):
+    path = tmp_path / "agent.log"
+    log = RotatingLogFile(str(path), max_bytes=200, interval=0, compress=False)
+    log.write(lines(10))
+    log.close()
+    assert log.rotations == 2
+    assert all(segment.stat().st_size <= 200 for segment in segments(path))
+    assert path.stat().st_size <= 200
+
+
+def test_oversized_file_is_rotated_after_restart(tmp_path):
+    path = tmp_path / "agent.log"
+    path.write_text(lines(10))
+    log = RotatingLogFile(str(path), max_bytes=200, interval=0, compress=True)
+    log.write(lines(1))
+    log.close()
+    archived = segments(path)
+    assert log.rotations == 1 and len(archived) == 1
+    assert gzip.open(archived[0], "rt").read() == lines(10)
+    assert path.read_text() == lines(1)
+
+
+def test_line_longer_than_the_limit_does_not_loop(tmp_path):
+    path = tmp_path / "agent.log"
+    log = RotatingLogFile(str(path), max_bytes=10, interval=0, compress=False)
+    log.write(lines(1) + lines(1))
+    log.close()
+    assert log.rotations == 1
+
+
+def test_old_segments_are_deleted(tmp_path):
+    path = tmp_path / "agent.log"
+    log = RotatingLogFile(str(path), max_bytes=60, interval=0, backup_count=2, compress=False)
+    for _ in range(6):
+        log.write(lines(1))
+    log.close()
+    assert log.rotations == 5
+    assert len(segments(path)) == 2
+
+
+def test_queued_record_keeps_the_values_it_was_logged_with():
+    record_queue = queue.Queue()
+    handler = BoundedQueueHandler(record_queue)
+    details = {"missing": ["drawing"]}
+    try:
+        raise ValidationError(message="Ambiguous query", error_code="AMBIGUOUS", details=details)
+    except ValidationError as e:
+        record = logging.LogRecord("agent", logging.ERROR, __file__, 1, "Query %s rejected", ("q1",), sys.exc_info())
+        record.details, record.intents = e.details, ["measure_area"]
+        handler.handle(record)
+        e.args = ("Drawing D-205 not found",)
+    details["missing"] = ["region"]
+    record.intents.append("get_scale")
+
+    logged = json.loads(JSONLogFormatter().format(record_queue.get_nowait()))
+    assert logged["message"] == "Query q1 rejected"
+    assert logged["details"] == {"missing": ["drawing"]} and logged["intents"] == ["measure_area"]
+    assert logged["exception"]["message"] == "Ambiguous query" and logged["exception"]["error_code"] == "AMBIGUOUS"
+    assert logged["exception"]["traceback"].startswith("Traceback") and "ValidationError: Ambiguous query" in logged["exception"]["traceback"]
+    # Other handlers still receive the exception
+    assert record.exc_info is not None
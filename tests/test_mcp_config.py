@@ -0,0 +1,52 @@
+import asyncio
+import importlib
+
+import pytest
+
+from constructionagent.agent import mcp_config, mcp_layer
+from constructionagent.agent.mcp_layer import MCPLayer
+
+
+@pytest.fixture
+def reload_config(monkeypatch):
+    """Re-read mcp_config under the given transport mode, restoring it afterwards."""
+    def reload(mode=None):
+        if mode is None:
+            monkeypatch.delenv("MCP_TRANSPORT_MODE", raising=False)
+        else:
+            monkeypatch.setenv("MCP_TRANSPORT_MODE", mode)
+        return importlib.reload(mcp_config)
+
+    yield reload
+    monkeypatch.delenv("MCP_TRANSPORT_MODE", raising=False)
+    importlib.reload(mcp_config)
+
+
+def test_stdio_config_is_kept_by_default(reload_config):
+    config = reload_config().MCP_CLIENT_CONFIG
+    assert config["tools_server"] == {"command": "uv", "args": ["run", "constructionagent/server/tools.py"], "transport": "stdio"}
+    assert config["prompt_server"] == {"command": "uv", "args": ["run", "constructionagent/server/prompts.py"], "transport": "stdio"}
+
+
+def test_in_process_mode_rewrites_the_bundled_servers(reload_config):
+    config = reload_config("in_process").MCP_CLIENT_CONFIG
+    assert config == {
+        "tools_server": {"transport": "in_process", "app": "constructionagent.server.tools:mcp"},
+        "prompt_server": {"transport": "in_process", "app": "constructionagent.server.prompts:mcp"},
+    }
+
+
+def test_in_process_servers_answer_without_subprocesses(reload_config, monkeypatch):
+    monkeypatch.setattr(mcp_layer, "MCP_CLIENT_CONFIG", reload_config("in_process").MCP_CLIENT_CONFIG)
+
+    async def fetch():
+        layer = MCPLayer()
+        try:
+            return await layer.list_tool_definitions(), await layer.fetch_prompt("clarification_prompt")
+        finally:
+            await layer.close()
+
+    definitions, prompt = asyncio.run(fetch())
+    assert {definition["name"] for definition in definitions} == {"measure_area", "get_scale", "query_pipe_info"}
+    assert {definition["server"] for definition in definitions} == {"tools_server"}
+    assert prompt and prompt[0].content
@@ -0,0 +1,148 @@
+import asyncio
+import time
+from contextlib import asynccontextmanager
+
+import anyio
+import pytest
+
+from constructionagent.agent import mcp_pool
+from constructionagent.agent.logger import ConfigurationError
+from constructionagent.agent.mcp_layer import MCPLayer
+from constructionagent.agent.mcp_pool import MCPSessionPool
+
+
+class FakeSession:
+    """Stands in for an initialized `ClientSession`."""
+
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+
+    async def call_tool(self, name, arguments):
+        if self.closed:
+            raise anyio.ClosedResourceError()
+        await asyncio.sleep(0)
+        return (self.number, name, arguments)
+
+    async def send_ping(self):
+        return None
+
+
+class FakeServer:
+    """Session factory counting the sessions (server processes) it opened."""
+
+    def __init__(self, fail=False):
+        self.fail = fail
+        self.opened = 0
+        self.open_now = 0
+        self.sessions = []
+
+    @asynccontextmanager
+    async def __call__(self):
+        self.opened += 1
+        if self.fail:
+            raise ConnectionError("server did not start")
+        session = FakeSession(self.opened)
+        self.sessions.append(session)
+        self.open_now += 1
+        try:
+            yield session
+        finally:
+            self.open_now -= 1
+
+
+@pytest.fixture(autouse=True)
+def fast_restarts(monkeypatch):
+    monkeypatch.setattr(mcp_pool, "MCP_RESTART_BACKOFF", 0.01)
+
+
+def test_sessions_are_reused_and_closed():
+    async def scenario():
+        server = FakeServer()
+        pool = MCPSessionPool(server, "tools", size=2, health_check_interval=0)
+        await pool.start()
+        results = await asyncio.gather(*(pool.call_tool("get_scale", {"drawing": str(i)}) for i in range(10)))
+        assert server.opened == 2
+        assert {number for number, _, _ in results} == {1, 2}
+        await pool.close()
+        assert server.open_now == 0
+    asyncio.run(scenario())
+
+
+def test_round_robin_alternates_sessions():
+    async def scenario():
+        pool = MCPSessionPool(FakeServer(), "tools", size=2, policy="round_robin", health_check_interval=0)
+        await pool.start()
+        numbers = [(await pool.call_tool("get_scale", {}))[0] for _ in range(4)]
+        await pool.close()
+        assert numbers == [1, 2, 1, 2]
+    asyncio.run(scenario())
+
+
+def test_lost_session_is_restarted_and_call_retried():
+    async def scenario():
+        server = FakeServer()
+        pool = MCPSessionPool(server, "tools", size=1, health_check_interval=0)
+        await pool.start()
+        server.sessions[0].closed = True
+        number, _, _ = await pool.call_tool("get_scale", {})
+        stats = pool.stats()["sessions"][0]
+        await pool.close()
+        assert number == 2
+        assert (stats["failures"], stats["restarts"]) == (1, 1)
+    asyncio.run(scenario())
+
+
+def test_failed_start_leaves_no_task_behind():
+    async def scenario():
+        server = FakeServer(fail=True)
+        pool = MCPSessionPool(server, "tools", size=2, health_check_interval=0, start_timeout=0.05)
+        with pytest.raises(asyncio.TimeoutError):
+            await pool.start()
+        opened = server.opened
+        await asyncio.sleep(0.1)
+        assert server.opened == opened
+        assert all(session._task.done() for session in pool.sessions)
+        assert [task for task in asyncio.all_tasks() if task is not asyncio.current_task()] == []
+    asyncio.run(scenario())
+
+
+def test_unknown_policy_is_rejected():
+    with pytest.raises(ConfigurationError):
+        MCPSessionPool(FakeServer(), "tools", policy="random")
+
+
+class SlowServer(FakeServer):
+    """Server whose sessions take `delay` seconds to start."""
+
+    def __init__(self, delay):
+        super().__init__()
+        self.delay = delay
+
+    @asynccontextmanager
+    async def __call__(self):
+        await asyncio.sleep(self.delay)
+        async with super().__call__() as session:
+            yield session
+
+
+def test_servers_start_concurrently(monkeypatch):
+    monkeypatch.setattr("constructionagent.agent.mcp_layer.MCP_POOL_SIZE", 1)
+    servers = {"drawings": SlowServer(0.2), "pipes": SlowServer(0.2), "hung": SlowServer(30)}
+    layer = MCPLayer()
+    monkeypatch.setattr(layer, "session_factory", lambda name: servers[name])
+
+    async def scenario():
+        hung = asyncio.create_task(layer.get_pool("hung"))
+        await asyncio.sleep(0)
+        start = time.perf_counter()
+        pools = await asyncio.wait_for(asyncio.gather(layer.get_pool("drawings"), layer.get_pool("pipes")), 1)
+        elapsed = time.perf_counter() - start
+        hung.cancel()
+        await asyncio.gather(hung, return_exceptions=True)
+        await layer.close()
+        return pools, elapsed
+
+    pools, elapsed = asyncio.run(scenario())
+    assert [pool.server_name for pool in pools] == ["drawings", "pipes"]
+    assert elapsed < 0.35
@@ -0,0 +1,85 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.graph import START, StateGraph
+
+from constructionagent.agent.metrics import NO_THREAD, MetricsRegistry, call_sample, prompt_bytes
+from constructionagent.agent.state import MessagesState
+
+PROMPT = [SystemMessage(content="Answer briefly."), HumanMessage(content="Area of room 101?")]
+
+
+def answer(text, input_tokens=100, output_tokens=20):
+    return AIMessage(content=text, usage_metadata={
+        "input_tokens": input_tokens, "output_tokens": output_tokens, "total_tokens": input_tokens + output_tokens,
+    })
+
+
+def test_calls_are_aggregated_per_node_and_thread():
+    registry = MetricsRegistry()
+    registry.record_call("Agent", PROMPT, answer("20 m2"), 100.0, thread_id="t1")
+    registry.record_call("Agent", PROMPT, answer("30 m2", 300, 40), 300.0, thread_id="t2")
+    registry.record_call("Query_Validation", PROMPT, None, 50.0, thread_id="t1")
+
+    agent = registry.node_stats("Agent")
+    assert (agent["calls"], agent["errors"], agent["input_tokens"], agent["output_tokens"]) == (2, 0, 400, 60)
+    assert (agent["mean_input_tokens"], agent["max_input_tokens"], agent["mean_messages"]) == (200, 300, 2)
+    assert agent["prompt_bytes"] == 2 * prompt_bytes(PROMPT)
+    assert (agent["mean_ms"], agent["p50_ms"], agent["max_ms"]) == (200.0, 300.0, 300.0)
+
+    validation = registry.node_stats("Query_Validation")
+    assert validation["errors"] == 1 and validation["output_tokens"] == 0
+    assert set(registry.thread_stats("t1")) == {"Agent", "Query_Validation"}
+    assert registry.thread_stats("t2")["Agent"]["input_tokens"] == 300
+    assert registry.node_stats("History") == {} and registry.thread_stats("t3") == {}
+    assert registry.snapshot()["totals"] == {"calls": 3, "errors": 1, "input_tokens": 400 + call_sample(PROMPT, None)["input_tokens"],
+                                             "output_tokens": 60, "prompt_bytes": 3 * prompt_bytes(PROMPT)}
+
+
+def test_tokens_are_estimated_without_usage_metadata():
+    sample = call_sample(PROMPT, AIMessage(content="Room 101 is 20 m2"))
+    assert sample == {"input_tokens": 10, "output_tokens": 5, "prompt_bytes": prompt_bytes(PROMPT), "message_count": 2}
+    assert call_sample(PROMPT, None)["output_tokens"] == 0
+
+
+def test_least_recently_active_threads_are_evicted():
+    registry = MetricsRegistry(max_threads=2)
+    for thread_id in ("t1", "t2", "t1", "t3"):
+        registry.record_call("Agent", PROMPT, answer("ok"), 10.0, thread_id=thread_id)
+    assert list(registry.snapshot()["threads"]) == ["t1", "t3"]
+    # Node totals keep the calls of evicted threads
+    assert registry.node_stats("Agent")["calls"] == 4
+
+
+def test_thread_is_taken_from_the_running_graph():
+    registry = MetricsRegistry()
+
+    async def call(state):
+        registry.record_call("Agent", state["messages"], answer("ok"), 10.0)
+        return {}
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("Agent", call)
+    builder.add_edge(START, "Agent")
+    asyncio.run(builder.compile().ainvoke({"messages": PROMPT}, {"configurable": {"thread_id": "site-7"}}))
+    registry.record_call("History", PROMPT, answer("ok"), 10.0)
+    assert set(registry.snapshot()["threads"]) == {"site-7", NO_THREAD}
+
+
+def test_disabled_registry_records_nothing():
+    registry = MetricsRegistry(enabled=False)
+    assert registry.record_call("Agent", PROMPT, answer("ok"), 10.0, thread_id="t1") == {}
+    assert registry.snapshot()["nodes"] == {}
+
+
+def test_dump(tmp_path):
+    registry = MetricsRegistry()
+    registry.record_call("Agent", PROMPT, answer("ok"), 10.0, thread_id="t1")
+    path = registry.dump(str(tmp_path / "metrics" / "llm.json"))
+    dumped = json.loads(path.read_text())
+    assert dumped["nodes"]["Agent"]["calls"] == 1 and dumped["threads"]["t1"]["Agent"]["calls"] == 1
+    assert "threads" not in json.loads(registry.dump(str(path), include_threads=False).read_text())
+
+    registry.reset()
+    assert registry.snapshot()["totals"]["calls"] == 0
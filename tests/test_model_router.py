@@ -0,0 +1,100 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+
+from constructionagent.agent.model_router import ModelRoute, ModelRouter
+from constructionagent.utils.fake_llm import FaultInjectingChatModel
+
+ROUTES = {
+    "Query_Validation": {"model": "lite", "escalate_to": "flash"},
+    "Agent": {"complex_model": "pro", "complex_min_tools": 2},
+    "History": "lite",
+}
+
+
+def router(built=None, **kwargs):
+    def factory(model):
+        if built is not None:
+            built.append(model)
+        return FaultInjectingChatModel(responses=[model], latency=0)
+
+    return ModelRouter("flash", factory, **{"routes": ROUTES, "prices": {}, **kwargs})
+
+
+def test_route_picks_the_model_of_the_node():
+    models = router()
+    assert models.route("History") == "lite"
+    assert models.route("Clarification") == "flash"
+    assert models.route("Agent", tool_results=1) == "flash"
+    assert models.route("Agent", tool_results=2) == "pro"
+    assert models.escalation("Query_Validation", "lite") == "flash"
+    assert models.escalation("Query_Validation", "flash") is None
+    assert models.escalation("Agent", "flash") is None
+
+
+def test_route_entries_are_parsed():
+    assert ModelRoute.parse("lite") == ModelRoute(model="lite")
+    assert ModelRoute.parse({"model": "lite", "escalate_to": "flash"}).escalate_to == "flash"
+    for spec in ({"model": "lite", "fallback": "flash"}, ["lite"]):
+        with pytest.raises(ValueError):
+            ModelRoute.parse(spec)
+    with pytest.raises(ValueError):
+        router(routes={"Agent": 3})
+
+
+def test_models_are_built_once_and_rebound_on_new_tools(tools):
+    built = []
+    models = router(built)
+    default = FaultInjectingChatModel(latency=0)
+    models.configure(default, tools)
+    lite = models.llm("lite")
+    assert models.llm("lite") is lite and models.llm("lite", with_tools=False) is not lite
+    assert models.llm("flash", with_tools=False) is default
+    models.configure(default, tools[:1])
+    assert models.llm("lite") is not lite
+    assert built == ["lite"]
+    assert len(models.llm("lite").kwargs["tools"]) == 1
+
+
+def test_cost_and_escalations_per_route():
+    models = router(prices={"lite": [0.1, 0.4]})
+    sample = {"input_tokens": 1_000_000, "output_tokens": 500_000, "prompt_bytes": 10, "message_count": 2}
+    assert models.record_call("History", "lite", sample, 20.0, False) == pytest.approx(0.3)
+    assert models.record_call("Agent", "flash", sample, 20.0, False) == 0.0
+    models.record_escalation("Query_Validation", "lite", "flash")
+    stats = models.stats()
+    assert stats["cost_usd"] == pytest.approx(0.3) and stats["escalations"] == 1
+    assert stats["routes"]["History"]["lite"]["priced"] is True
+    assert stats["routes"]["Agent"]["flash"]["priced"] is False
+
+
+def test_unusable_validation_is_escalated(agent):
+    valid = json.dumps({"unrelated": False, "intents": []})
+    models = ModelRouter("flash", lambda model: FaultInjectingChatModel(
+        responses=["not json" if model == "lite" else valid], latency=0,
+    ), routes=ROUTES, prices={})
+    models.configure(FaultInjectingChatModel(responses=[valid], latency=0), agent.tools)
+    agent.router = models
+    prompt = [SystemMessage(content="Classify."), HumanMessage(content="Hello there")]
+
+    response = asyncio.run(agent._invoke_llm("Query_Validation", prompt, validate=agent._is_validation_json))
+    assert response.content == valid
+    routes = models.stats()["routes"]["Query_Validation"]
+    assert routes["lite"]["escalations"] == 1 and routes["flash"]["calls"] == 1
+
+
+@pytest.mark.parametrize("metrics_enabled", [True, False])
+def test_route_cost_does_not_depend_on_metrics(agent, metrics_enabled):
+    usage = {"input_tokens": 1_000_000, "output_tokens": 1_000_000, "total_tokens": 2_000_000}
+    models = ModelRouter("flash", lambda model: None, routes={}, prices={"flash": [5.0, 10.0]})
+    models.configure(GenericFakeChatModel(messages=iter([AIMessage(content="20 m2", usage_metadata=usage)])), None)
+    agent.router = models
+    agent.metrics.enabled = metrics_enabled
+
+    asyncio.run(agent._invoke_llm("Agent", [HumanMessage(content="Area of room 101?")], with_tools=False))
+    stats = models.stats()["routes"]["Agent"]["flash"]
+    assert stats["cost_usd"] == pytest.approx(15.0)
+    assert (stats["input_tokens"], stats["output_tokens"]) == (1_000_000, 1_000_000)
@@ -0,0 +1,46 @@
+import asyncio
+import json
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+PENDING_SCALE = [{"tool": "get_scale", "is_ambiguous": True, "ambiguous_reason": "Missing drawing",
+                  "arguments": {"drawing": None}, "missing_arguments": ["drawing"]}]
+
+
+def fast_path(agent, text, **state):
+    return asyncio.run(agent.fast_path_classifier({"messages": [HumanMessage(content=text)], **state}))
+
+
+def tools_of(update):
+    return [intent["tool"] for intent in json.loads(update["messages"][-1].content)["intents"]]
+
+
+def test_answer_completes_pending_intents(agent):
+    update = fast_path(agent, "drawing 7", pending_intents=PENDING_SCALE)
+    intent = json.loads(update["messages"][-1].content)["intents"][0]
+    assert (intent["tool"], intent["arguments"]) == ("get_scale", {"drawing": "drawing 7"})
+
+
+def test_new_query_is_not_taken_as_the_answer(agent):
+    update = fast_path(agent, "What is the pipe info at junction J-4?", pending_intents=PENDING_SCALE)
+    assert update["pending_intents"] == []
+    assert tools_of(update) == ["query_pipe_info"]
+
+
+def test_new_query_with_pending_tool_is_classified_whole(agent):
+    update = fast_path(agent, "What is the area of room 5 and the scale of drawing 7?", pending_intents=PENDING_SCALE)
+    assert update["pending_intents"] == []
+    assert tools_of(update) == ["measure_area", "get_scale"]
+
+
+def test_new_query_falls_through_without_fast_path(agent, monkeypatch):
+    monkeypatch.setattr("constructionagent.agent.core.FAST_PATH_ENABLED", False)
+    update = fast_path(agent, "What is the area of room 5 and the scale of drawing 7?", pending_intents=PENDING_SCALE)
+    assert update == {"pending_intents": [], "answered_intents": []}
+
+
+def test_unrelated_and_invalid_answers_clear_pending_intents(agent):
+    for content in ('{"unrelated": true, "intents": []}', "not json"):
+        state = {"messages": [HumanMessage(content="hi"), AIMessage(content=content)], "pending_intents": PENDING_SCALE}
+        update = asyncio.run(agent.agent_call(state))
+        assert update["pending_intents"] == [] and update["answered_intents"] == []
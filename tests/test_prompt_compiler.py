@@ -0,0 +1,67 @@
+import pytest
+
+from constructionagent.agent.prompt_compiler import PromptCompiler, render_tool_descriptions, tools_fingerprint
+from constructionagent.utils.tokens import estimate_tokens
+from tests.conftest import make_tool
+
+TEMPLATE = "Classify the query for these tools:\n{tool_descriptions}"
+
+
+def test_tool_descriptions(tools):
+    assert render_tool_descriptions(tools) == (
+        "1.measure_area(region: string) → Measures area of a specified region\n"
+        "2.get_scale(drawing: string) → Fetches the scale used in a drawing\n"
+        "3.query_pipe_info(location: string) → Returns information about a water pipe at a specified location."
+    )
+
+
+def test_prompt_is_compiled_once_per_tool_set(tools):
+    compiler = PromptCompiler()
+    compiled = compiler.compile(tools, TEMPLATE)
+    assert compiled.message.content == TEMPLATE.format(tool_descriptions=compiled.tool_descriptions)
+    assert compiled.token_count == estimate_tokens(compiled.message.content)
+    # Equal tools fetched again (e.g. after a reconnect) reuse the artifact
+    refetched = [make_tool(tool.name, next(iter(tool.args_schema["properties"])), tool.description) for tool in tools]
+    assert compiler.compile(refetched, TEMPLATE) is compiled
+    assert compiler.compilations == 1
+
+
+@pytest.mark.parametrize("change", [
+    lambda tools, template: (tools[:2], template),
+    lambda tools, template: (tools + [make_tool("list_drawings", "project", "Lists drawings")], template),
+    lambda tools, template: ([make_tool("measure_area", "area", tools[0].description)] + tools[1:], template),
+    lambda tools, template: ([make_tool("measure_area", "region", "Measures floor area")] + tools[1:], template),
+    lambda tools, template: (tools, "Tools:\n{tool_descriptions}\nAnswer in JSON."),
+])
+def test_prompt_is_recompiled_when_its_inputs_change(tools, change):
+    compiler = PromptCompiler()
+    compiled = compiler.compile(tools, TEMPLATE)
+    recompiled = compiler.compile(*change(tools, TEMPLATE))
+    assert recompiled.source_fingerprint != compiled.source_fingerprint
+    assert recompiled.content_hash != compiled.content_hash
+    assert compiler.compilations == 2
+
+
+def test_source_fingerprint_is_stable(tools):
+    fingerprint = PromptCompiler().compile(tools, TEMPLATE).source_fingerprint
+    assert PromptCompiler().compile(list(tools), TEMPLATE).source_fingerprint == fingerprint
+    assert tools_fingerprint(tools) == tools_fingerprint(list(tools))
+    # Same across processes and hash seeds: single-flight keys include it
+    assert fingerprint == "dbcc712f4d55e1a6c373628feba313588b9b40ee5bbc53646c334a97097c6f7c"
+
+
+def test_agent_reuses_the_compiled_prompt(agent):
+    compiled = agent.validation_prompt
+    agent._apply_tools_and_prompts()
+    assert agent.validation_prompt is compiled
+    assert agent.prompt_compiler.compilations == 1
+
+
+@pytest.mark.parametrize("text, tokens", [
+    ("", 0),
+    ("room 101", 2),
+    ("measurements", 3),
+    ('{"region": "room 5"}', 11),
+])
+def test_token_estimate(text, tokens):
+    assert estimate_tokens(text) == tokens
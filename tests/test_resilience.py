@@ -0,0 +1,131 @@
+import asyncio
+import json
+import time
+
+import pytest
+from langchain_core.messages import HumanMessage
+
+from constructionagent.agent.logger import LLMUnavailableError
+from constructionagent.agent.resilience import (
+    BREAKER_CLOSED, BREAKER_HALF_OPEN, BREAKER_OPEN, CircuitBreaker, ResilientCaller,
+)
+from constructionagent.utils.fake_llm import FaultInjectingChatModel, InjectedProviderError
+
+PROMPT = [HumanMessage(content="What is the scale of drawing 7?")]
+
+
+@pytest.fixture(autouse=True)
+def short_backoff(monkeypatch):
+    monkeypatch.setattr("constructionagent.agent.resilience.backoff_delay", lambda attempt: 0.02)
+
+
+def test_rate_limited_call_is_retried():
+    limited = FaultInjectingChatModel(latency=0, error_rate=1.0, error_code=429)
+    model = FaultInjectingChatModel(responses=["1:100"], latency=0)
+    models = iter([limited, model])
+    caller = ResilientCaller(attempts=3, hedge_nodes=[])
+
+    response = asyncio.run(caller.call("Agent", lambda: next(models).ainvoke(PROMPT)))
+    assert response.content == "1:100"
+    assert caller.counters["retries"] == 1 and caller.counters["attempts"] == 2
+
+
+def test_timed_out_attempts_are_retried_until_exhausted():
+    model = FaultInjectingChatModel(latency=1)
+    caller = ResilientCaller(attempts=3, call_timeout=0.02, hedge_nodes=[])
+    with pytest.raises(TimeoutError):
+        asyncio.run(caller.call("Agent", lambda: model.ainvoke(PROMPT)))
+    assert caller.counters["attempts"] == 3 and caller.counters["failures"] == 1
+
+
+def test_non_retryable_error_is_raised_at_once():
+    model = FaultInjectingChatModel(latency=0, error_rate=1.0, error_code=400)
+    caller = ResilientCaller(attempts=3, hedge_nodes=[])
+    with pytest.raises(InjectedProviderError):
+        asyncio.run(caller.call("Agent", lambda: model.ainvoke(PROMPT)))
+    assert caller.counters["attempts"] == 1 and caller.counters["retries"] == 0
+    # The provider answered, so the breaker counts it as healthy
+    assert caller.breaker.stats()["recent_failures"] == 0
+
+
+def test_slow_call_is_hedged_and_the_loser_cancelled():
+    caller = ResilientCaller(hedge_nodes=["Query_Validation"], hedge_min_samples=3, hedge_min_delay=0.01, hedge_max_ratio=1.0)
+    fast = FaultInjectingChatModel(responses=["fast"], latency=0.01)
+    slow = FaultInjectingChatModel(responses=["slow"], latency=5)
+    cancelled = []
+
+    async def slow_call():
+        try:
+            return await slow.ainvoke(PROMPT)
+        except asyncio.CancelledError:
+            cancelled.append(True)
+            raise
+
+    async def run():
+        for _ in range(3):
+            await caller.call("Query_Validation", lambda: fast.ainvoke(PROMPT))
+        models = iter([slow_call, lambda: fast.ainvoke(PROMPT)])
+        start = time.perf_counter()
+        response = await caller.call("Query_Validation", lambda: next(models)())
+        await asyncio.sleep(0)
+        return response, time.perf_counter() - start
+
+    response, elapsed = asyncio.run(run())
+    assert response.content == "fast" and elapsed < 1
+    assert cancelled == [True]
+    assert caller.counters["hedges"] == 1 and caller.counters["hedge_wins"] == 1
+
+
+def test_agent_answer_is_not_hedged():
+    caller = ResilientCaller(hedge_nodes=["Query_Validation"], hedge_min_samples=1, hedge_min_delay=0.01)
+    model = FaultInjectingChatModel(latency=0)
+    asyncio.run(caller.call("Agent", lambda: model.ainvoke(PROMPT)))
+    assert caller.hedge_delay("Agent") is None
+
+
+def test_breaker_opens_then_probes_and_closes():
+    breaker = CircuitBreaker(window=4, min_calls=2, failure_rate=0.5, cooldown=0.05)
+    caller = ResilientCaller(breaker=breaker, attempts=1, hedge_nodes=[])
+    model = FaultInjectingChatModel(latency=0.05, error_rate=1.0, error_code=503)
+
+    async def call():
+        return await caller.call("Agent", lambda: model.ainvoke(PROMPT))
+
+    async def run():
+        for _ in range(2):
+            with pytest.raises(InjectedProviderError):
+                await call()
+        assert breaker.state == BREAKER_OPEN
+        with pytest.raises(LLMUnavailableError) as error:
+            await call()
+        assert error.value.error_code == "LLM_CIRCUIT_OPEN" and error.value.details["retry_after"] >= 1
+
+        await asyncio.sleep(0.06)
+        model.error_rate = 0.0
+        probe = asyncio.create_task(call())
+        await asyncio.sleep(0.01)
+        assert breaker.state == BREAKER_HALF_OPEN
+        # Only the probe goes through while half open
+        with pytest.raises(LLMUnavailableError):
+            await call()
+        await probe
+        assert breaker.state == BREAKER_CLOSED
+
+    asyncio.run(run())
+    assert breaker.stats()["opened"] == 1 and breaker.stats()["rejected"] == 2
+
+
+def test_validator_falls_back_to_the_fast_path_while_the_llm_is_unavailable(agent, monkeypatch):
+    monkeypatch.setattr("constructionagent.agent.core.SEMANTIC_CACHE_ENABLED", False)
+    model = FaultInjectingChatModel(latency=0)
+    agent.router.configure(model, None)
+    breaker = CircuitBreaker(cooldown=30)
+    breaker._open()
+    agent.resilience = ResilientCaller(breaker=breaker, hedge_nodes=[])
+
+    update = asyncio.run(agent.intent_and_slot_validator({"messages": [HumanMessage(content="What is the scale of drawing 7?")]}))
+    intent = json.loads(update["messages"][-1].content)["intents"][0]
+    assert (intent["tool"], intent["arguments"]) == ("get_scale", {"drawing": "drawing 7"})
+
+    with pytest.raises(LLMUnavailableError):
+        asyncio.run(agent.intent_and_slot_validator({"messages": [HumanMessage(content="Summarize the project risks")]}))
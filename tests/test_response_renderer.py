@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from constructionagent.agent.response_renderer import ResponseRenderer, parse_tool_output
+from constructionagent.utils.fake_llm import FaultInjectingChatModel
+from tests.conftest import make_tool
+
+PIPE = {"pipe_id": "P-12", "diameter": "300 mm", "length": "40 m", "installation_date": "2019-04-02",
+        "last_inspection_date": "2024-10-01", "condition": "good"}
+
+
+def templated(name, argument, template):
+    tool = make_tool(name, argument, f"{name} tool")
+    tool.metadata = {"responseTemplate": template}
+    return tool
+
+
+@pytest.fixture
+def templated_tools():
+    """The bundled tools with the templates of server/tools.py."""
+    return [
+        templated("measure_area", "region", "The area of {region} is {result}."),
+        templated("get_scale", "drawing", "The scale used in {drawing} is {result}."),
+        templated("query_pipe_info", "location", "The water pipe at {location} is {result[pipe_id]}: "
+                                                 "{result[diameter]} in diameter, condition: {result[condition]}."),
+        make_tool("list_drawings", "project", "Lists drawings"),
+    ]
+
+
+def turn(*calls, status="success"):
+    """A history ending with the tool calls of one AIMessage and their results."""
+    request = AIMessage(content="", tool_calls=[
+        {"name": name, "args": args, "id": f"call-{number}"} for number, (name, args, _) in enumerate(calls)
+    ])
+    results = [
+        ToolMessage(content=content, tool_call_id=f"call-{number}", status=status)
+        for number, (_, _, content) in enumerate(calls)
+    ]
+    return [HumanMessage(content="question"), request, *results]
+
+
+def test_single_result_is_rendered(templated_tools):
+    renderer = ResponseRenderer(templated_tools, llm_tools=set())
+    assert renderer.render(turn(("measure_area", {"region": "room 101"}, "100"))) == "The area of room 101 is 100."
+    assert renderer.render(turn(("query_pipe_info", {"location": "J-4"}, json.dumps(PIPE)))) == (
+        "The water pipe at J-4 is P-12: 300 mm in diameter, condition: good."
+    )
+    assert renderer.stats() == {"rendered": 2, "fallbacks": 0,
+                                "templated_tools": ["get_scale", "measure_area", "query_pipe_info"]}
+
+
+@pytest.mark.parametrize("history", [
+    # Several results are phrased together by the LLM
+    turn(("measure_area", {"region": "room 101"}, "100"), ("get_scale", {"drawing": "drawing 7"}, "meter")),
+    # No template
+    turn(("list_drawings", {"project": "north"}, "A-101, A-102")),
+    # Failed call
+    turn(("measure_area", {"region": "room 101"}, "Error: region not found"), status="error"),
+    # Result that does not fit its template
+    turn(("query_pipe_info", {"location": "J-4"}, "No pipe at J-4")),
+    turn(("query_pipe_info", {"location": "J-4"}, json.dumps({"pipe_id": "P-12"}))),
+    # No tool results at the end of the history
+    [HumanMessage(content="question"), AIMessage(content="answer")],
+    [ToolMessage(content="100", tool_call_id="call-0")],
+])
+def test_falls_back_to_the_llm(templated_tools, history):
+    renderer = ResponseRenderer(templated_tools, llm_tools=set())
+    assert renderer.render(history) is None
+    assert renderer.stats()["fallbacks"] == 1
+
+
+def test_llm_tools_are_not_templated(templated_tools, monkeypatch):
+    monkeypatch.setattr("constructionagent.agent.response_renderer.RESPONSE_LLM_TOOLS", {"measure_area"})
+    renderer = ResponseRenderer(templated_tools)
+    assert "measure_area" not in renderer.templates
+    assert renderer.render(turn(("measure_area", {"region": "room 101"}, "100"))) is None
+    assert renderer.render(turn(("get_scale", {"drawing": "drawing 7"}, "meter"))) == "The scale used in drawing 7 is meter."
+
+
+def test_tool_outputs_are_parsed():
+    assert parse_tool_output('{"diameter": "300 mm"}') == {"diameter": "300 mm"}
+    assert parse_tool_output(" meter\n") == "meter"
+
+
+def test_agent_answers_a_templated_result_without_the_llm(agent, templated_tools):
+    agent.response_renderer = ResponseRenderer(templated_tools, llm_tools=set())
+    agent.router.configure(FaultInjectingChatModel(latency=0, error_rate=1.0, error_code=400), None)
+    state = {"messages": turn(("get_scale", {"drawing": "drawing 7"}, "meter"))}
+    result = asyncio.run(agent.agent_call(state))
+    assert result["messages"][0].content == "The scale used in drawing 7 is meter."
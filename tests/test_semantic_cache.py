@@ -0,0 +1,72 @@
+import json
+
+import pytest
+
+from constructionagent.agent.fast_path import FastPathClassifier
+from constructionagent.agent.semantic_cache import SemanticIntentCache, parse_validation_json
+
+
+def validation(tool, arguments, ambiguous=False):
+    return json.dumps({"unrelated": False, "intents": [{
+        "tool": tool, "is_ambiguous": ambiguous, "ambiguous_reason": "", "arguments": arguments,
+        "missing_arguments": list(arguments) if ambiguous else [],
+    }]})
+
+
+@pytest.fixture
+def cache(tools):
+    cache = SemanticIntentCache(FastPathClassifier(tools), max_entries=2)
+    cache.ensure_version("v1")
+    return cache
+
+
+def test_rephrased_query_reuses_entry_with_new_slot(cache):
+    assert cache.store("How many square meters is Room A?", validation("measure_area", {"region": "Room A"}), first_turn=True)
+    result = cache.lookup("how many square metres is room B?", first_turn=False)
+    assert result["intents"][0]["arguments"] == {"region": "room B"}
+    assert cache.stats()["hits"] == 1
+
+
+def test_identifier_form_is_kept(cache):
+    cache.store("What is the scale of drawing D-1?", validation("get_scale", {"drawing": "D-1"}), first_turn=True)
+    assert cache.lookup("What is the scale of drawing D-2?", first_turn=True)["intents"][0]["arguments"] == {"drawing": "D-2"}
+
+
+def test_different_slot_count_misses(cache):
+    cache.store("What is the area of room A?", validation("measure_area", {"region": "room A"}), first_turn=True)
+    assert cache.lookup("What is the area of room A and room B?", first_turn=True) is None
+
+
+def test_unsafe_results_are_not_stored(cache):
+    assert not cache.store("What is the scale of this drawing?", validation("get_scale", {"drawing": "D-1"}), first_turn=True)
+    assert not cache.store("What is the scale?", validation("get_scale", {"drawing": None}, ambiguous=True), first_turn=True)
+    assert not cache.store("Tell me a joke", json.dumps({"unrelated": True, "intents": []}), first_turn=False)
+    assert not cache.store("What is the area of room A?", "not json", first_turn=True)
+    assert cache.stats()["size"] == 0
+
+
+def test_deictic_lookup_misses(cache):
+    cache.store("What is the scale of drawing D-1?", validation("get_scale", {"drawing": "D-1"}), first_turn=True)
+    assert cache.lookup("What is the scale of that drawing?", first_turn=True) is None
+
+
+def test_least_recently_used_entry_is_evicted(cache):
+    cache.store("What is the area of room A?", validation("measure_area", {"region": "room A"}), first_turn=True)
+    cache.store("What is the scale of drawing D-1?", validation("get_scale", {"drawing": "drawing D-1"}), first_turn=True)
+    cache.lookup("What is the area of room C?", first_turn=True)
+    cache.store("Pipe info at junction J-4", validation("query_pipe_info", {"location": "junction J-4"}), first_turn=True)
+    assert cache.stats()["evictions"] == 1
+    assert cache.lookup("What is the area of room D?", first_turn=True) is not None
+    assert cache.lookup("What is the scale of drawing D-9?", first_turn=True) is None
+
+
+def test_version_change_invalidates(cache):
+    cache.store("What is the area of room A?", validation("measure_area", {"region": "room A"}), first_turn=True)
+    cache.ensure_version("v2")
+    assert cache.stats()["size"] == 0
+    assert cache.stats()["invalidations"] == 1
+
+
+def test_parse_validation_json_accepts_fences():
+    assert parse_validation_json('```json\n{"unrelated": true, "intents": []}\n```') == {"unrelated": True, "intents": []}
+    assert parse_validation_json("[1, 2]") is None
@@ -0,0 +1,74 @@
+import asyncio
+import json
+
+from fastapi.testclient import TestClient
+
+from constructionagent.agent.admission import AdmissionController
+from constructionagent.service import create_app
+
+
+def service(agent, answer_after=0.0):
+    async def astream(inputs, config=None):
+        await asyncio.sleep(answer_after)
+        yield {"event": "answer", "text": "42 m2", "thread_id": config["configurable"]["thread_id"], "run_id": "run"}
+
+    agent.astream = astream
+    admission = AdmissionController(max_in_flight=1, max_queue=1, queue_timeout=1)
+    return create_app(agent, admission), admission
+
+
+def events(response):
+    return [json.loads(line[len("data: "):]) for line in response.text.splitlines() if line.startswith("data: ")]
+
+
+def stream_stats(client):
+    return client.get("/metrics").json()["endpoints"]["POST /v1/query/stream"]
+
+
+def test_stream_answers_and_releases_its_slot(agent):
+    app, admission = service(agent)
+    client = TestClient(app)
+    response = client.post("/v1/query/stream", json={"query": "area of room 5"})
+    assert response.status_code == 200
+    assert events(response)[-1]["text"] == "42 m2"
+    assert admission.in_flight == 0
+    assert stream_stats(client)["status_codes"] == {"200": 1}
+
+
+def test_stream_timeout_is_recorded_as_timeout(agent):
+    app, admission = service(agent, answer_after=1)
+    client = TestClient(app)
+    response = client.post("/v1/query/stream", json={"query": "area of room 5", "timeout": 0.05})
+    assert response.status_code == 200
+    assert events(response)[-1]["error_code"] == "TIMEOUT"
+    stats = stream_stats(client)
+    assert stats["timeouts"] == 1 and stats["status_codes"] == {"504": 1}
+    assert admission.in_flight == 0
+
+
+def test_slot_is_released_when_the_body_is_never_sent(agent):
+    app, admission = service(agent)
+    body = json.dumps({"query": "area of room 5"}).encode()
+    scope = {
+        "type": "http", "asgi": {"version": "3.0"}, "http_version": "1.1", "method": "POST", "scheme": "http",
+        "path": "/v1/query/stream", "raw_path": b"/v1/query/stream", "query_string": b"", "root_path": "",
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())],
+        "client": ("test", 1), "server": ("test", 80),
+    }
+    messages = iter([{"type": "http.request", "body": body, "more_body": False}])
+
+    async def receive():
+        return next(messages, {"type": "http.disconnect"})
+
+    async def send(message):
+        # The client is gone before the response starts
+        raise OSError("connection reset")
+
+    async def run():
+        try:
+            await app(scope, receive, send)
+        except Exception:
+            pass
+
+    asyncio.run(run())
+    assert admission.in_flight == 0
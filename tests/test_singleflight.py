@@ -0,0 +1,101 @@
+import asyncio
+
+import pytest
+from langchain_core.messages import AIMessage, HumanMessage
+
+from constructionagent.agent.singleflight import SingleFlight, normalize_messages, request_key
+
+
+def test_identical_calls_share_one_execution():
+    calls = []
+
+    async def fetch():
+        calls.append(1)
+        await asyncio.sleep(0.01)
+        return {"scale": "1:100"}
+
+    async def run():
+        flight = SingleFlight("llm")
+        results = await asyncio.gather(*(flight.do("scale", fetch) for _ in range(3)))
+        return flight, results
+
+    flight, results = asyncio.run(run())
+    assert len(calls) == 1
+    assert [shared for _, shared in results] == [False, True, True]
+    assert all(result is results[0][0] for result, _ in results)
+    assert flight.stats()["collapsed"] == 2 and flight.stats()["in_flight"] == 0
+
+
+def test_error_is_raised_to_every_caller():
+    async def fail():
+        await asyncio.sleep(0.01)
+        raise RuntimeError("provider down")
+
+    async def run():
+        flight = SingleFlight("llm")
+        results = await asyncio.gather(flight.do("k", fail), flight.do("k", fail), return_exceptions=True)
+        return flight, results
+
+    flight, results = asyncio.run(run())
+    assert all(isinstance(result, RuntimeError) for result in results)
+    assert flight.counters["errors"] == 1
+
+
+def test_call_is_cancelled_only_when_every_caller_is_gone():
+    async def run():
+        flight = SingleFlight("llm")
+        started = asyncio.Event()
+
+        async def slow():
+            started.set()
+            await asyncio.sleep(0.05)
+            return "answer"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        second = asyncio.create_task(flight.do("k", slow))
+        await started.wait()
+        first.cancel()
+        result = await second
+        with pytest.raises(asyncio.CancelledError):
+            await first
+
+        third = asyncio.create_task(flight.do("other", slow))
+        await asyncio.sleep(0)
+        leader = flight._calls["other"][0]
+        third.cancel()
+        await asyncio.sleep(0)
+        return result, leader
+
+    result, leader = asyncio.run(run())
+    assert result == ("answer", True)
+    assert leader.cancelled()
+
+
+def test_call_after_every_caller_left_starts_over():
+    async def run():
+        flight = SingleFlight("llm")
+        calls = []
+
+        async def slow():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return "answer"
+
+        first = asyncio.create_task(flight.do("k", slow))
+        await asyncio.sleep(0)
+        first.cancel()
+        await asyncio.sleep(0)
+        # Arrives after the leader task was cancelled, before it has finished
+        result = await flight.do("k", slow)
+        return result, len(calls)
+
+    assert asyncio.run(run()) == (("answer", False), 2)
+
+
+def test_key_ignores_ids_and_spacing():
+    one = [HumanMessage(content="Scale of  drawing 7?", id="a"),
+           AIMessage(content="", tool_calls=[{"name": "get_scale", "args": {"drawing": "7"}, "id": "call-1"}])]
+    two = [HumanMessage(content="Scale of drawing 7? ", id="b"),
+           AIMessage(content="", tool_calls=[{"name": "get_scale", "args": {"drawing": "7"}, "id": "call-2"}])]
+    assert request_key("Agent", normalize_messages(one)) == request_key("Agent", normalize_messages(two))
+    assert request_key("Agent", normalize_messages(one)) != request_key("History", normalize_messages(one))
@@ -0,0 +1,133 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+
+from constructionagent.agent.snapshot import SNAPSHOT_FORMAT_VERSION, load_snapshot, save_snapshot, snapshot_hash
+
+PROMPTS = {
+    "system_prompt": [{"role": "user", "content": "You answer questions about construction drawings."}],
+    "query_validation_prompt": [{"role": "user", "content": "Classify the query for these tools:\n{tool_descriptions}"}],
+    "clarification_prompt": [{"role": "user", "content": "Ask for the missing arguments."}],
+}
+
+
+def definition(name, argument):
+    return {
+        "server": "tool_server",
+        "name": name,
+        "description": f"{name} tool",
+        "input_schema": {"type": "object", "properties": {argument: {"type": "string"}}, "required": [argument]},
+        "annotations": {"readOnlyHint": True},
+    }
+
+
+def contents(*tools):
+    return {"tools": [definition(*tool) for tool in tools], "prompts": PROMPTS}
+
+
+@pytest.fixture
+def path(tmp_path):
+    return str(tmp_path / "cache" / "mcp_snapshot.json")
+
+
+def test_snapshot_round_trip(path):
+    saved = save_snapshot(contents(("measure_area", "region")), path)
+    assert saved["format_version"] == SNAPSHOT_FORMAT_VERSION
+    assert saved["content_hash"] == snapshot_hash(contents(("measure_area", "region")))
+    assert load_snapshot(path) == saved
+    # Written atomically, without a leftover temporary file
+    assert [file.name for file in Path(path).parent.iterdir()] == ["mcp_snapshot.json"]
+
+
+def test_hash_depends_on_tools_and_prompts_only():
+    snapshot = contents(("measure_area", "region"))
+    assert snapshot_hash({**snapshot, "created_at": "now"}) == snapshot_hash(snapshot)
+    assert snapshot_hash(contents(("measure_area", "area"))) != snapshot_hash(snapshot)
+
+
+@pytest.mark.parametrize("damage", [
+    lambda text: text[: len(text) // 2],
+    lambda text: "",
+    lambda text: text.replace("measure_area", "measure_volume"),
+    lambda text: text.replace(f'"format_version": {SNAPSHOT_FORMAT_VERSION}', '"format_version": 0'),
+])
+def test_corrupt_or_partial_snapshot_is_ignored(path, damage):
+    save_snapshot(contents(("measure_area", "region")), path)
+    with open(path, encoding="utf-8") as source:
+        text = source.read()
+    with open(path, "w", encoding="utf-8") as target:
+        target.write(damage(text))
+    assert load_snapshot(path) is None
+
+
+def test_missing_snapshot_is_ignored(path):
+    assert load_snapshot(path) is None
+
+
+@pytest.fixture
+def booted(agent, tmp_path, monkeypatch):
+    """An agent booted from a snapshot of one tool, with a compiled graph."""
+    monkeypatch.chdir(tmp_path)
+    snapshot = save_snapshot(contents(("measure_area", "region")))
+    agent.mcp_client.load_snapshot(snapshot)
+    agent.snapshot_hash = snapshot["content_hash"]
+    agent._apply_tools_and_prompts()
+    agent.graph = agent._compile_graph()
+    return agent
+
+
+def serve(agent, monkeypatch, snapshot):
+    """Make the MCP servers answer with the given tools and prompts."""
+    async def fetch_snapshot(prompt_names):
+        assert set(prompt_names) == set(PROMPTS)
+        return snapshot
+    monkeypatch.setattr(agent.mcp_client, "fetch_snapshot", fetch_snapshot)
+
+
+def test_stale_snapshot_is_reapplied_and_the_graph_rebuilt(booted, monkeypatch):
+    fresh = contents(("measure_area", "region"), ("get_scale", "drawing"))
+    serve(booted, monkeypatch, fresh)
+    graph = booted.graph
+    asyncio.run(booted.revalidate_snapshot())
+
+    assert booted.snapshot_hash == snapshot_hash(fresh)
+    assert [tool.name for tool in booted.tools] == ["measure_area", "get_scale"]
+    assert set(booted.clarifier.tool_arguments) == {"measure_area", "get_scale"}
+    assert booted.graph is not graph
+    assert load_snapshot()["content_hash"] == snapshot_hash(fresh)
+
+
+def test_up_to_date_snapshot_is_kept(booted, monkeypatch):
+    serve(booted, monkeypatch, contents(("measure_area", "region")))
+    graph, tools, saved = booted.graph, booted.tools, load_snapshot()
+    asyncio.run(booted.revalidate_snapshot())
+    assert booted.graph is graph and booted.tools is tools
+    assert load_snapshot() == saved
+
+
+def test_failed_revalidation_keeps_the_snapshot(booted, monkeypatch):
+    async def unreachable(prompt_names):
+        raise ConnectionError("tool_server is down")
+    monkeypatch.setattr(booted.mcp_client, "fetch_snapshot", unreachable)
+    graph, snapshot_hash_before = booted.graph, booted.snapshot_hash
+    asyncio.run(booted.revalidate_snapshot())
+    assert booted.graph is graph and booted.snapshot_hash == snapshot_hash_before
+
+
+def test_agent_boots_from_the_snapshot(agent, tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr("constructionagent.agent.core.MCP_SNAPSHOT_ENABLED", True)
+    snapshot = save_snapshot(contents(("get_scale", "drawing")))
+    serve(agent, monkeypatch, contents(("get_scale", "drawing")))
+
+    async def fetch_tools():
+        raise AssertionError("the servers were contacted before the agent booted")
+    monkeypatch.setattr(agent.mcp_client, "fetch_tools", fetch_tools)
+
+    async def boot():
+        await agent.fetch_tools_and_prompts()
+        await agent._revalidation_task
+    asyncio.run(boot())
+    assert [tool.name for tool in agent.tools] == ["get_scale"]
+    assert agent.snapshot_hash == snapshot["content_hash"]
@@ -0,0 +1,30 @@
+import random
+
+import pytest
+
+from constructionagent.agent.metrics import LLMCallStats
+from constructionagent.agent.tool_executor import ToolLatencyStats
+from constructionagent.utils.log_analytics import LatencyHistogram
+from constructionagent.utils.stats import percentile
+
+
+def test_percentile():
+    values = [float(value) for value in range(100, 0, -1)]
+    assert [percentile(values, q) for q in (0, 50, 90, 99, 100)] == [1.0, 51.0, 91.0, 100.0, 100.0]
+    assert percentile([7.0], 99) == 7.0
+    assert percentile([], 50) == 0.0
+
+
+@pytest.mark.parametrize("q", [50, 90, 95, 99])
+def test_latency_reports_agree(q):
+    latencies = [random.Random(seed).uniform(1, 5000) for seed in range(500)]
+    windows = [LLMCallStats(), ToolLatencyStats()]
+    histogram = LatencyHistogram()
+    for ms in latencies:
+        windows[0].latencies.append(ms)
+        windows[1].latencies.append(ms)
+        histogram.add(ms)
+    expected = percentile(latencies, q)
+    assert [stats.percentile(q) for stats in windows] == [expected, expected]
+    # The histogram reports the upper bound of the bucket holding it
+    assert expected <= histogram.percentile(q) <= expected * 1.05
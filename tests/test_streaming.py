@@ -0,0 +1,80 @@
+import asyncio
+import json
+
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+from langgraph.graph import START, StateGraph
+
+from constructionagent.agent.state import MessagesState
+from constructionagent.utils.fake_llm import FaultInjectingChatModel, InjectedProviderError
+
+VALIDATION = {"unrelated": False, "intents": [
+    {"tool": "measure_area", "is_ambiguous": False, "arguments": {"region": "room 5"}, "missing_arguments": []},
+    {"tool": "get_scale", "is_ambiguous": True, "ambiguous_reason": "Missing drawing",
+     "arguments": {"drawing": None}, "missing_arguments": ["drawing"]},
+]}
+QUESTION = "Which drawing should I read the scale from?"
+
+
+def stream(agent, text):
+    async def run():
+        config = {"configurable": {"thread_id": "stream"}}
+        return [event async for event in agent.astream({"messages": [HumanMessage(content=text)]}, config)]
+
+    return asyncio.run(run())
+
+
+def test_polished_clarification_is_streamed_once(agent, monkeypatch):
+    monkeypatch.setattr("constructionagent.agent.core.CLARIFICATION_LLM_POLISH", True)
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=json.dumps(VALIDATION)), AIMessage(content=QUESTION)]))
+    agent.router.configure(llm, None)
+    agent.checkpointer = InMemorySaver()
+    agent.graph = agent._compile_graph()
+
+    events = stream(agent, "Tell me about the area of room 5 and the scale, thanks")
+    tokens = "".join(event["text"] for event in events if event["event"] == "token")
+    answer = events[-1]
+    assert answer["event"] == "answer" and answer["text"].endswith(QUESTION)
+    assert tokens == answer["text"]
+
+
+def stream_agent_answer(agent, model, monkeypatch):
+    """Stream the tokens of one Agent LLM call, and its response or error."""
+    monkeypatch.setattr("constructionagent.agent.resilience.backoff_delay", lambda attempt: 0)
+    agent.router.configure(model, None)
+    builder = StateGraph(MessagesState)
+
+    async def answer(state):
+        return {"messages": [await agent._invoke_llm('Agent', state["messages"])]}
+
+    builder.add_node('Agent', answer)
+    builder.add_edge(START, 'Agent')
+    graph = builder.compile()
+
+    async def run():
+        tokens = []
+        try:
+            async for message, metadata in graph.astream({"messages": [HumanMessage(content="Area of room 101?")]}, stream_mode="messages"):
+                if isinstance(message, AIMessageChunk):
+                    tokens.append(message.text())
+        except Exception as e:
+            return "".join(tokens), e
+        return "".join(tokens), None
+
+    return asyncio.run(run())
+
+
+def test_streamed_answer_failing_midway_is_not_retried(agent, monkeypatch):
+    model = FaultInjectingChatModel(responses=["Room 101 is 20 m2"], latency=0, failures=1, stream_error_after=3)
+    tokens, error = stream_agent_answer(agent, model, monkeypatch)
+    assert tokens == "Room 101 is "
+    assert isinstance(error, InjectedProviderError)
+    assert agent.resilience.counters["streamed_failures"] == 1 and agent.resilience.counters["retries"] == 0
+
+
+def test_answer_failing_before_its_first_token_is_retried(agent, monkeypatch):
+    model = FaultInjectingChatModel(responses=["Room 101 is 20 m2"], latency=0, failures=1)
+    tokens, error = stream_agent_answer(agent, model, monkeypatch)
+    assert error is None and tokens == "Room 101 is 20 m2"
+    assert agent.resilience.counters["retries"] == 1
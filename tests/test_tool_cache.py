@@ -0,0 +1,114 @@
+import asyncio
+import time
+
+from mcp.types import CallToolResult, TextContent
+
+from constructionagent.agent.mcp_layer import MCPLayer
+from constructionagent.agent.tool_cache import ToolResultCache, canonical_arguments
+
+
+def store(cache, tool, arguments, result):
+    key = cache.key(tool, "v1", arguments)
+    cache.put(tool, key, arguments, result, cache.generation)
+    return key
+
+
+def test_equivalent_arguments_share_a_key():
+    cache = ToolResultCache(default_ttl=60, ttls={})
+    assert canonical_arguments({"region": " Room  101 ", "unit": None}) == {"region": "Room 101"}
+    key = store(cache, "measure_area", {"region": "Room 101"}, {"area": 42})
+    assert cache.key("measure_area", "v1", {"region": "Room  101 "}) == key
+    assert cache.key("measure_area", "v2", {"region": "Room 101"}) != key
+
+
+def test_hit_returns_a_copy():
+    cache = ToolResultCache(default_ttl=60, ttls={})
+    key = store(cache, "measure_area", {"region": "Room 101"}, {"area": 42})
+    cache.get("measure_area", key)["area"] = 0
+    assert cache.get("measure_area", key) == {"area": 42}
+    assert cache.get("measure_area", "missing") is None
+    stats = cache.stats()["tools"]["measure_area"]
+    assert (stats["hits"], stats["misses"], stats["hit_ratio"]) == (2, 1, 2 / 3)
+
+
+def test_ttl_per_tool():
+    cache = ToolResultCache(default_ttl=60, ttls={"query_pipe_info": 0, "get_scale": 0.01})
+    pipe = store(cache, "query_pipe_info", {"location": "J-4"}, "PVC")
+    scale = store(cache, "get_scale", {"drawing": "7"}, "1:100")
+    assert cache.get("query_pipe_info", pipe) is None
+    time.sleep(0.02)
+    assert cache.get("get_scale", scale) is None
+    assert cache.counters["get_scale"]["expired"] == 1
+    assert ToolResultCache(ttls={}, enabled=False).ttl("get_scale") == 0.0
+
+
+def test_invalidating_a_drawing_drops_its_entries_and_untagged_ones():
+    cache = ToolResultCache(default_ttl=60, ttls={})
+    seven = store(cache, "get_scale", {"drawing": "7"}, "1:100")
+    eight = store(cache, "get_scale", {"drawing": "8"}, "1:50")
+    untagged = store(cache, "measure_area", {"region": "Room 101"}, {"area": 42})
+    assert cache.invalidate_drawing(" 7 ") == 2
+    assert cache.get("get_scale", seven) is None and cache.get("measure_area", untagged) is None
+    assert cache.get("get_scale", eight) == "1:50"
+
+
+def test_call_running_during_an_invalidation_does_not_store():
+    cache = ToolResultCache(default_ttl=60, ttls={})
+    generation = cache.generation
+    key = cache.key("get_scale", "v1", {"drawing": "7"})
+    cache.invalidate_drawing("7")
+    cache.put("get_scale", key, {"drawing": "7"}, "stale", generation)
+    assert cache.get("get_scale", key) is None
+
+
+def test_least_recently_used_entry_is_evicted():
+    cache = ToolResultCache(default_ttl=60, ttls={}, max_entries=2)
+    first = store(cache, "get_scale", {"drawing": "1"}, "1:100")
+    second = store(cache, "get_scale", {"drawing": "2"}, "1:100")
+    cache.get("get_scale", first)
+    store(cache, "get_scale", {"drawing": "3"}, "1:100")
+    assert cache.get("get_scale", second) is None and cache.get("get_scale", first) == "1:100"
+    assert cache.counters["get_scale"]["evicted"] == 1
+
+
+def test_invalidating_a_tool():
+    cache = ToolResultCache(default_ttl=60, ttls={})
+    store(cache, "get_scale", {"drawing": "7"}, "1:100")
+    area = store(cache, "measure_area", {"region": "Room 101"}, {"area": 42})
+    assert cache.invalidate_tool("get_scale") == 1
+    assert cache.get("measure_area", area) == {"area": 42}
+    assert cache.stats()["generation"] == 1
+
+
+class CountingPool:
+    """Pool stand-in counting the calls that reach the server."""
+
+    def __init__(self):
+        self.calls = 0
+
+    async def call_tool(self, name, arguments):
+        self.calls += 1
+        return CallToolResult(content=[TextContent(type="text", text=f"{name} {self.calls}")], isError=False)
+
+
+def test_read_only_tool_results_are_served_from_the_cache():
+    layer = MCPLayer()
+    layer.pools["drawings"] = pool = CountingPool()
+    definition = {"server": "drawings", "name": "get_scale", "description": "Scale of a drawing",
+                  "input_schema": {"type": "object", "properties": {"drawing": {"type": "string"}}},
+                  "annotations": {"readOnlyHint": True}}
+    read_only = layer._to_langchain_tool(definition)
+    writer = layer._to_langchain_tool({**definition, "name": "set_scale", "annotations": {}})
+
+    async def run():
+        first = await read_only.ainvoke({"drawing": "7"})
+        second = await read_only.ainvoke({"drawing": "7"})
+        layer.invalidate_drawing("7")
+        third = await read_only.ainvoke({"drawing": "7"})
+        await writer.ainvoke({"drawing": "7"})
+        await writer.ainvoke({"drawing": "7"})
+        return first, second, third
+
+    first, second, third = asyncio.run(run())
+    assert first == second == "get_scale 1" and third == "get_scale 2"
+    assert pool.calls == 4
@@ -0,0 +1,52 @@
+import asyncio
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import StructuredTool
+
+from constructionagent.agent.tool_executor import ParallelToolNode
+
+
+def failing_tool(name, error):
+    async def run(**kwargs):
+        raise error
+
+    return StructuredTool(
+        name=name,
+        description=f"{name} that fails",
+        args_schema={"type": "object", "properties": {"region": {"type": "string"}}},
+        coroutine=run,
+    )
+
+
+def slow_tool(name, seconds):
+    async def run(**kwargs):
+        await asyncio.sleep(seconds)
+        return "late"
+
+    return StructuredTool(name=name, description=f"{name} that is slow", args_schema={"type": "object", "properties": {}}, coroutine=run)
+
+
+def call(name, index=0):
+    return {"name": name, "args": {"region": "room 5"}, "id": f"call-{name}-{index}", "type": "tool_call"}
+
+
+def test_failed_and_timed_out_calls_do_not_sink_the_others(tools):
+    node = ParallelToolNode(
+        [tools[0], failing_tool("get_scale", RuntimeError("boom")), slow_tool("query_pipe_info", 1)],
+        limits={"query_pipe_info": {"timeout": 0.05}},
+    )
+    state = {"messages": [AIMessage(content="", tool_calls=[call("measure_area"), call("get_scale"), call("query_pipe_info")])]}
+    messages = asyncio.run(node.execute(state))["messages"]
+
+    assert [(message.name, message.status) for message in messages] == [
+        ("measure_area", "success"), ("get_scale", "error"), ("query_pipe_info", "error"),
+    ]
+    assert "boom" in messages[1].content and "timed out" in messages[2].content
+    metrics = node.metrics
+    assert (metrics["get_scale"].errors, metrics["query_pipe_info"].timeouts) == (1, 1)
+
+
+def test_unknown_tool_is_an_error_message(tools):
+    node = ParallelToolNode(tools)
+    message = asyncio.run(node.run_tool_call(call("get_area")))
+    assert message.status == "error" and "measure_area" in message.content
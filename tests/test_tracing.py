@@ -0,0 +1,99 @@
+import asyncio
+import json
+
+import pytest
+from langchain_core.language_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.checkpoint.memory import InMemorySaver
+
+from constructionagent.agent.logger import ToolExecutionError
+from constructionagent.agent.tracing import (
+    STATUS_ERROR, STATUS_OK, InMemorySpanExporter, Tracer, otlp_request, tracer,
+)
+from constructionagent.utils.fake_llm import FaultInjectingChatModel
+
+QUERY = "Tell me about the area of room 5 please, thanks"
+
+
+@pytest.fixture
+def exporter(monkeypatch):
+    """Record the spans of the agent's tracer in memory."""
+    exporter = InMemorySpanExporter()
+    monkeypatch.setattr(tracer, "exporter", exporter)
+    return exporter
+
+
+def run_turn(agent, llm, thread_id="t1"):
+    agent.router.configure(llm, None)
+    agent.checkpointer = InMemorySaver()
+    agent.graph = agent._compile_graph()
+    config = {"configurable": {"thread_id": thread_id}, "run_id": "6ba26633-c12f-4a9d-904e-0176a26618c5"}
+    return asyncio.run(agent.ainvoke({"messages": [HumanMessage(content=QUERY)]}, config))
+
+
+def test_turn_spans_nest_and_carry_the_run_ids(agent, exporter):
+    run_turn(agent, GenericFakeChatModel(messages=iter([AIMessage(content="Room 5 is 20 m2")])))
+    spans = exporter.spans()
+    turn = spans[-1]
+    assert turn.name == "turn" and turn.parent_span_id is None
+    assert turn.trace_id == "6ba26633c12f4a9d904e0176a26618c5"
+    by_id = {span.span_id: span for span in spans}
+    assert {span.trace_id for span in spans} == {turn.trace_id}
+    assert [span.name for span in spans if span.parent_span_id == turn.span_id] == ["History", "Fast_Path", "Agent", "tools", "Agent"]
+
+    llm = next(span for span in spans if span.name == "llm Agent")
+    assert by_id[llm.parent_span_id].name == "Agent" and by_id[by_id[llm.parent_span_id].parent_span_id] is turn
+    assert llm.attributes["gen_ai.usage.output_tokens"] > 0
+    for span in spans:
+        assert span.attributes["thread_id"] == "t1"
+        assert span.attributes["run_id"] == "6ba26633-c12f-4a9d-904e-0176a26618c5"
+        assert span.status_code == STATUS_OK and span.end_ns >= span.start_ns
+
+
+def test_spans_serialize_to_otlp_json(agent, exporter):
+    run_turn(agent, GenericFakeChatModel(messages=iter([AIMessage(content="Room 5 is 20 m2")])))
+    request = json.loads(json.dumps(otlp_request(exporter.spans(), "site-7")))
+    resource = request["resourceSpans"][0]
+    assert resource["resource"]["attributes"] == [{"key": "service.name", "value": {"stringValue": "site-7"}}]
+    spans = resource["scopeSpans"][0]["spans"]
+    turn, llm = spans[-1], next(span for span in spans if span["name"] == "llm Agent")
+    assert "parentSpanId" not in turn and len(turn["traceId"]) == 32 and len(turn["spanId"]) == 16
+    assert int(turn["endTimeUnixNano"]) >= int(turn["startTimeUnixNano"])
+    assert turn["status"] == {"code": STATUS_OK}
+    attributes = {item["key"]: item["value"] for item in llm["attributes"]}
+    assert attributes["thread_id"] == {"stringValue": "t1"}
+    assert set(attributes["gen_ai.usage.input_tokens"]) == {"intValue"}
+    assert attributes["llm.cost_usd"] == {"doubleValue": 0.0}
+
+
+def test_failing_span_records_the_exception():
+    exporter = InMemorySpanExporter()
+    local = Tracer(exporter)
+    with pytest.raises(ToolExecutionError):
+        with local.span("turn", attributes={"thread_id": "t1", "run_id": "r1"}):
+            with local.span("tools"):
+                raise ToolExecutionError(message="Drawing not found", error_code="TOOL_FAILED")
+    tools, turn = exporter.spans()
+    for span in (tools, turn):
+        assert span.status_code == STATUS_ERROR and span.status_message == "Drawing not found"
+    event = tools.to_otlp()["events"][0]
+    assert event["name"] == "exception"
+    assert {item["key"]: item["value"]["stringValue"] for item in event["attributes"]} == {
+        "exception.type": "ToolExecutionError", "exception.message": "Drawing not found", "exception.error_code": "TOOL_FAILED",
+    }
+    assert tools.to_otlp()["status"] == {"code": STATUS_ERROR, "message": "Drawing not found"}
+    assert tools.attributes == {"thread_id": "t1", "run_id": "r1"}
+
+
+def test_failing_llm_call_fails_its_spans(agent, exporter):
+    with pytest.raises(Exception):
+        run_turn(agent, FaultInjectingChatModel(latency=0, error_rate=1.0, error_code=400))
+    spans = {span.name: span for span in exporter.spans()}
+    assert spans["llm Agent"].status_code == STATUS_ERROR
+    assert spans["llm Agent"].events[0]["attributes"]["exception.type"] == "InjectedProviderError"
+    assert spans["turn"].status_code == STATUS_ERROR
+
+
+def test_disabled_tracer_yields_no_span():
+    with Tracer().span("turn") as span:
+        assert span is None